@@ -8,257 +8,348 @@ Ce projet répond aux critères suivants :
 - Sauvegarde et gestion dans une base de données MySQL
 - Validation des entrées et gestion des erreurs
 - Code structuré, lisible et documenté
+
+Ce module n'est que l'interface : les données et les opérations sont dans
+`gestion.gestionnaire.GestionStagiaires`, partagé avec la version console.
 """
 
 import tkinter as tk
-from tkinter import messagebox, simpledialog
+from tkinter import messagebox, simpledialog, ttk
 from tkinter import PhotoImage
-import mysql.connector
-from mysql.connector import Error
 import os
-from abc import ABC, abstractmethod
-
-# =========================
-# CLASSE PERSONNE (POO : Abstraction, Encapsulation)
-# =========================
-class Person(ABC):
-    """
-    Classe abstraite représentant une personne (étudiant ou enseignant).
-    """
-    def __init__(self, id_person, nom, age, group, notes=None):
-        self.id_person = id_person
-        self.nom = nom
-        self.age = age
-        self.group = group
-        self.notes = notes if notes is not None else []
-
-    @abstractmethod
-    def get_role(self):
-        pass
+from gestion.exceptions import ErreurBase, PersonneIntrouvable, SaisieInvalide
+from gestion.executeur import ExecuteurTaches
+from gestion.gestionnaire import GestionStagiaires
+from gestion.pagination import COLONNES
+from gestion.modeles import formater_notes
+from gestion.validation import valider_evaluation, valider_nom, valider_notes, valider_notes_lot, valider_personne
 
 # =========================
-# CLASSE STAGIAIRE (POO : Encapsulation)
+# LISTE À DÉFILEMENT VIRTUEL
 # =========================
-class Stagiaire(Person):
+class ListeVirtuelle(tk.Toplevel):
     """
-    Représente un étudiant avec ses informations et ses notes.
-    Attributs privés, accès via getters/setters (encapsulation).
+    Fenêtre de liste des utilisateurs. Le Treeview ne contient que les lignes
+    visibles : la barre de défilement pilote une position dans la vue paginée,
+    et seules les lignes de la fenêtre d'affichage sont (re)construites.
+    Tri par clic sur un en-tête, filtre par groupe, rôle et début du nom.
+
+    En chargement différé, les notes en attente des lignes affichées (de
+    toute la sélection pour un tri par moyenne) sont lues par le thread de
+    travail ; la moyenne s'affiche « - » d'ici là, puis la liste est redessinée.
     """
-    def get_role(self):
-        return "Stagiaire"
-
-# =========================
-# CLASSE ENSEIGNANT (POO : Encapsulation)
-# =========================
-class Teacher(Person):
-    """
-    Représente un enseignant.
-    """
-    def get_role(self):
-        return "Enseignant"
-
-# =========================
-# CLASSE GESTIONNAIRE (POO : Encapsulation, gestion BDD, validation, erreurs)
-# =========================
-class GestionStagiaires:
-    """
-    Gère la liste des stagiaires et la connexion à la base de données.
-    Toutes les opérations CRUD sont ici, avec gestion des erreurs et validation.
-    """
-    def __init__(self):
-        self.__personnes = []
-        self.connect_db()
-        self.load_personnes_from_db()
-
-    def get_personnes(self):
-        return self.__personnes
-
-    def set_personnes(self, personnes):
-        self.__personnes = personnes
-
-    def connect_db(self):
-        try:
-            self.mydb = mysql.connector.connect(
-                host="localhost",
-                user="root",
-                password="YOUR_DB_PASSWORD",
-                database="YOUR_DB_NAME"
-            )
-            self.cur = self.mydb.cursor()
-        except Error as e:
-            messagebox.showerror("Database Error", f"Erreur de connexion à la base de données : {e}")
-
-    def load_personnes_from_db(self):
+    TITRES = {"id": "ID", "nom": "Nom", "age": "Âge", "groupe": "Groupe", "role": "Rôle", "moyenne": "Moyenne"}
+    LARGEURS = {"id": 70, "nom": 180, "age": 50, "groupe": 90, "role": 90, "moyenne": 70}
+    TOUS = "Tous"
+    DELAI_FILTRE_MS = 200
+    DELAI_SURVEILLANCE_MS = 500
+    HAUTEUR_LIGNE = 20
+
+    def __init__(self, master, gestion):
+        super().__init__(master)
+        self.title("Liste des utilisateurs")
+        self.geometry("600x500")
+        self.application = master
+        self.gestion = gestion
+        self.vue = gestion.vue_paginee()
+        self.debut = 0
+        self.nb_visibles = 20
+        self.__filtre_planifie = None
+        self.__surveillance = None
+        self.__prechargement = None
+
+        barre = tk.Frame(self)
+        barre.pack(fill=tk.X, padx=5, pady=5)
+        tk.Label(barre, text="Groupe").pack(side=tk.LEFT)
+        self.groupe_var = tk.StringVar(value=self.TOUS)
+        self.groupe_choix = ttk.Combobox(barre, textvariable=self.groupe_var, width=10, state="readonly",
+                                         values=[self.TOUS] + [str(g) for g in gestion.groupes()],
+                                         postcommand=self.__actualiser_groupes)
+        self.groupe_choix.pack(side=tk.LEFT, padx=5)
+        tk.Label(barre, text="Rôle").pack(side=tk.LEFT)
+        self.role_var = tk.StringVar(value=self.TOUS)
+        ttk.Combobox(barre, textvariable=self.role_var, width=10, state="readonly",
+                     values=[self.TOUS, "Stagiaire", "Enseignant"]).pack(side=tk.LEFT, padx=5)
+        tk.Label(barre, text="Nom").pack(side=tk.LEFT)
+        self.nom_var = tk.StringVar()
+        tk.Entry(barre, textvariable=self.nom_var, width=15).pack(side=tk.LEFT, padx=5)
+        for variable in (self.groupe_var, self.role_var, self.nom_var):
+            variable.trace_add("write", self.__planifier_filtre)
+
+        cadre = tk.Frame(self)
+        cadre.pack(fill=tk.BOTH, expand=True, padx=5)
+        ttk.Style(self).configure("Treeview", rowheight=self.HAUTEUR_LIGNE)
+        self.arbre = ttk.Treeview(cadre, columns=COLONNES, show="headings", height=self.nb_visibles,
+                                  selectmode="browse")
+        for colonne in COLONNES:
+            self.arbre.heading(colonne, text=self.TITRES[colonne], command=lambda c=colonne: self.trier(c))
+            self.arbre.column(colonne, width=self.LARGEURS[colonne], anchor=tk.W)
+        self.defilement = ttk.Scrollbar(cadre, orient=tk.VERTICAL, command=self.defiler)
+        self.defilement.pack(side=tk.RIGHT, fill=tk.Y)
+        self.arbre.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.statut = tk.Label(self, anchor=tk.W)
+        self.statut.pack(fill=tk.X, padx=5, pady=5)
+
+        self.arbre.bind("<Configure>", self.__redimensionner)
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.arbre.bind(sequence, self.__molette)
+        for touche, pas, unite in (("<Up>", -1, "units"), ("<Down>", 1, "units"),
+                                   ("<Prior>", -1, "pages"), ("<Next>", 1, "pages")):
+            self.arbre.bind(touche, lambda e, p=pas, u=unite: self.defiler("scroll", p, u) or "break")
+        self.arbre.bind("<Home>", lambda e: self.deplacer(0) or "break")
+        self.arbre.bind("<End>", lambda e: self.deplacer(len(self.vue)) or "break")
+        self.bind("<Destroy>", self.__fermer, add="+")
+
+        self.afficher()
+        self.__surveiller()
+
+    def deplacer(self, debut):
         """
-        Charge tous les stagiaires et leurs notes depuis la base de données.
+        Place la ligne `debut` de la vue en haut de la fenêtre d'affichage.
         """
-        self.__personnes.clear()
-        try:
-            self.cur.execute("SELECT id, name, age, ed_group, type FROM etudiant")
-            for (id_person, nom, age, group, type_person) in self.cur.fetchall():
-                self.cur.execute("SELECT note1, note2, note3 FROM notes WHERE id_ed = %s", (id_person,))
-                notes_row = self.cur.fetchone()
-                notes = [n for n in notes_row if n is not None] if notes_row else []
-                if type_person == "Enseignant":
-                    self.__personnes.append(Teacher(id_person, nom, age, group, notes))
-                else:
-                    self.__personnes.append(Stagiaire(id_person, nom, age, group, notes))
-        except Error as e:
-            messagebox.showerror("Database Error", f"Erreur lors du chargement des stagiaires : {e}")
-
-    def ajouter_personne(self, id_person, nom, age, group, type_person):
-        """
-        Ajoute une personne (stagiaire ou enseignant) à la base et à la liste locale, avec validation et gestion d'erreur.
-        """
-        if any(personne.id_person == id_person for personne in self.__personnes):
-            messagebox.showerror("Erreur", "Une personne avec cet ID existe déjà.")
-            return False
-        if type_person == "Enseignant":
-            personne = Teacher(id_person, nom, age, group)
-        else:
-            personne = Stagiaire(id_person, nom, age, group)
-        try:
-            sql = "INSERT INTO etudiant (id, name, age, ed_group, type) VALUES (%s, %s, %s, %s, %s)"
-            val = (id_person, nom, age, group, type_person)
-            self.cur.execute(sql, val)
-            self.mydb.commit()
-            self.__personnes.append(personne)
-            messagebox.showinfo("Succès", f"Personne {nom} ajoutée avec succès.")
-            return True
-        except Error as e:
-            messagebox.showerror("Database Error", f"Erreur lors de l'ajout : {e}")
-            return False
+        self.debut = max(0, min(debut, len(self.vue) - self.nb_visibles))
+        self.afficher()
 
-    def afficher_tous_les_personnes(self):
+    def defiler(self, action, valeur, unite=None):
         """
-        Affiche tous les stagiaires dans une boîte de dialogue.
+        Commande de la barre de défilement ("moveto" fraction ou "scroll" n unités/pages).
         """
-        if not self.__personnes:
-            messagebox.showinfo("Information", "Aucun utilisateur trouvé.")
-            return
-        result = "\nListe de tous les utilisateurs :\n"
-        for p in self.__personnes:
-            result += f"#- ID : {p.id_person}\n#- Nom : {p.nom}\n#- Âge : {p.age}\n#- Groupe : {p.group}\n#- Rôle : {p.get_role()}\n\n"
-        messagebox.showinfo("Liste des utilisateurs", result)
+        if action == "moveto":
+            self.deplacer(int(float(valeur) * len(self.vue)))
+        elif action == "scroll":
+            pas = self.nb_visibles if unite == "pages" else 1
+            self.deplacer(self.debut + int(valeur) * pas)
 
-    def rechercher_personne(self, id_person):
+    def afficher(self):
         """
-        Recherche une personne par ID.
+        Reconstruit uniquement les lignes visibles.
         """
-        for personne in self.__personnes:
-            if personne.id_person == id_person:
-                result = f"Personne trouvée : \n#- ID : {personne.id_person}\n#- Nom : {personne.nom}\n#- Âge : {personne.age}\n#- Groupe : {personne.group}\n#- Rôle : {personne.get_role()}"
-                messagebox.showinfo("Résultat de la recherche", result)
-                return
-        messagebox.showinfo("Information", "Personne non trouvée.")
-
-    def supprimer_personne(self, id_person):
-        """
-        Supprime une personne de la base et de la liste locale.
-        """
-        for personne in self.__personnes:
-            if personne.id_person == id_person:
-                self.__personnes.remove(personne)
-                try:
-                    self.cur.execute("DELETE FROM notes WHERE id_ed = %s", (id_person,))
-                    self.cur.execute("DELETE FROM etudiant WHERE id = %s", (id_person,))
-                    self.mydb.commit()
-                    messagebox.showinfo("Succès", f"Personne {personne.nom} supprimée avec succès.")
-                    return
-                except Error as e:
-                    messagebox.showerror("Database Error", f"Erreur lors de la suppression : {e}")
-                    return
-        messagebox.showinfo("Information", "Personne non trouvée.")
-
-    def calculer_notes(self, id_person):
+        total = len(self.vue)
+        lignes = self.vue.lignes(self.debut, self.nb_visibles)
+        selection = set(self.arbre.selection())
+        self.arbre.delete(*self.arbre.get_children())
+        for ligne in lignes:
+            iid = str(ligne[0])
+            self.arbre.insert("", tk.END, iid=iid, values=ligne)
+            if iid in selection:
+                self.arbre.selection_set(iid)
+        if total:
+            self.defilement.set(self.debut / total, (self.debut + len(lignes)) / total)
+            self.statut.config(text=f"{total} utilisateur(s) — lignes {self.debut + 1} à {self.debut + len(lignes)}")
+        else:
+            self.defilement.set(0, 1)
+            self.statut.config(text="Aucun utilisateur trouvé.")
+        self.__precharger()
+
+    def __precharger(self):
+        # Une seule lecture à la fois : les lignes affichées entre-temps sont
+        # préchargées au redessin qui suit sa fin.
+        if self.__prechargement is not None:
+            return
+        en_attente = self.vue.en_attente(self.debut, self.nb_visibles)
+        if en_attente:
+            self.__prechargement = self.application.executer(
+                self.gestion.precharger_notes, en_attente, message="Lecture des notes...",
+                succes=self.__notes_lues, echec=self.__lecture_echouee)
+
+    def __notes_lues(self, resultat):
+        self.__prechargement = None
+        if self.winfo_exists():
+            self.vue.rafraichir()
+            self.deplacer(self.debut)
+
+    def __lecture_echouee(self, erreur):
+        # Nouvel essai au prochain défilement.
+        self.__prechargement = None
+
+    def trier(self, colonne):
         """
-        Saisie ou modification des notes d'une personne, avec validation et gestion d'erreur.
+        Trie sur `colonne` ; un second clic inverse l'ordre.
         """
-        for personne in self.__personnes:
-            if personne.id_person == id_person:
-                notes = []
-                for i in range(1, 4):
-                    note = simpledialog.askstring("Saisir une note", f"Entrez la note {i} (laisser vide pour aucune) : ")
-                    if note is None or note == "":
-                        notes.append(None)
-                    else:
-                        try:
-                            note = float(note)
-                            if 0 <= note <= 20:
-                                notes.append(note)
-                            else:
-                                messagebox.showerror("Erreur", "La note doit être comprise entre 0 et 20.")
-                                return
-                        except ValueError:
-                            messagebox.showerror("Erreur", "Entrée invalide. Veuillez entrer un nombre valide.")
-                            return
-                try:
-                    self.cur.execute("SELECT id_note FROM notes WHERE id_ed = %s", (id_person,))
-                    exists = self.cur.fetchone()
-                    if exists:
-                        self.cur.execute(
-                            "UPDATE notes SET note1=%s, note2=%s, note3=%s WHERE id_ed=%s",
-                            (notes[0], notes[1], notes[2], id_person)
-                        )
-                    else:
-                        self.cur.execute(
-                            "INSERT INTO notes (id_ed, note1, note2, note3) VALUES (%s, %s, %s, %s)",
-                            (id_person, notes[0], notes[1], notes[2])
-                        )
-                    self.mydb.commit()
-                    personne.notes = [n for n in notes if n is not None]
-                    messagebox.showinfo("Succès", f"Notes enregistrées pour la personne {personne.nom}.")
-                except Error as e:
-                    messagebox.showerror("Database Error", f"Erreur lors de l'enregistrement des notes: {e}")
-                return
-        messagebox.showinfo("Information", "Personne non trouvée.")
+        descendant = self.vue.colonne_tri == colonne and not self.vue.descendant
+        self.vue.trier(colonne, descendant)
+        for c in COLONNES:
+            fleche = (" ▼" if descendant else " ▲") if c == colonne else ""
+            self.arbre.heading(c, text=self.TITRES[c] + fleche)
+        self.deplacer(0)
+
+    def filtrer(self):
+        self.__filtre_planifie = None
+        group = self.groupe_var.get()
+        role = self.role_var.get()
+        self.vue.filtrer(
+            group=None if group == self.TOUS else group,
+            role=None if role == self.TOUS else role,
+            prefixe_nom=self.nom_var.get().strip(),
+        )
+        self.deplacer(0)
+
+    def __planifier_filtre(self, *args):
+        # Filtrage « en direct », regroupé pour ne pas recalculer à chaque frappe.
+        if self.__filtre_planifie is not None:
+            self.after_cancel(self.__filtre_planifie)
+        self.__filtre_planifie = self.after(self.DELAI_FILTRE_MS, self.filtrer)
+
+    def __actualiser_groupes(self):
+        self.groupe_choix["values"] = [self.TOUS] + [str(g) for g in self.gestion.groupes()]
+
+    def __redimensionner(self, event):
+        nb_visibles = max(1, (event.height - self.HAUTEUR_LIGNE) // self.HAUTEUR_LIGNE)
+        if nb_visibles != self.nb_visibles:
+            self.nb_visibles = nb_visibles
+            self.deplacer(self.debut)
+
+    def __molette(self, event):
+        if event.num == 4 or getattr(event, "delta", 0) > 0:
+            self.defiler("scroll", -3)
+        else:
+            self.defiler("scroll", 3)
+        return "break"
+
+    def __surveiller(self):
+        # Les ajouts, suppressions et modifications faits ailleurs rendent la vue périmée.
+        if self.vue.perimee():
+            self.deplacer(self.debut)
+        self.__surveillance = self.after(self.DELAI_SURVEILLANCE_MS, self.__surveiller)
+
+    def __fermer(self, event):
+        if event.widget is self:
+            for tache in (self.__surveillance, self.__filtre_planifie):
+                if tache is not None:
+                    self.after_cancel(tache)
+            if self.__prechargement is not None:
+                self.__prechargement.annuler()
 
-    def obtenir_notes(self, id_person):
-        """
-        Affiche les notes et la moyenne d'une personne.
-        """
-        for personne in self.__personnes:
-            if personne.id_person == id_person:
-                self.cur.execute("SELECT note1, note2, note3 FROM notes WHERE id_ed = %s", (id_person,))
-                notes_row = self.cur.fetchone()
-                notes = [n for n in notes_row if n is not None] if notes_row else []
-                personne.notes = notes
-                if notes:
-                    result = f"Notes pour {personne.nom} : {notes}\nMoyenne : {personne.moyenne_notes():.2f}"
-                    messagebox.showinfo("Notes", result)
-                else:
-                    messagebox.showinfo("Information", f"{personne.nom} n'a aucune note enregistrée.")
-                return
-        messagebox.showinfo("Information", "Personne non trouvée.")
+# =========================
+# SAISIE DES NOTES D'UN GROUPE
+# =========================
+class SaisieNotesGroupe(tk.Toplevel):
+    """
+    Grille de saisie des notes de tous les stagiaires d'un groupe : une ligne
+    par stagiaire, trois champs par ligne. Toute la grille est validée avant
+    l'écriture (champs invalides en rouge) ; seules les lignes modifiées sont
+    envoyées, en une seule transaction, par le thread de travail.
+    """
+    COULEUR_ERREUR = "#ffcccc"
+
+    def __init__(self, application, gestion):
+        super().__init__(application)
+        self.title("Saisie des notes d'un groupe")
+        self.geometry("520x560")
+        self.application = application
+        self.gestion = gestion
+        self.lignes = []
+
+        barre = tk.Frame(self)
+        barre.pack(fill=tk.X, padx=5, pady=5)
+        tk.Label(barre, text="Groupe").pack(side=tk.LEFT)
+        self.groupe_var = tk.StringVar()
+        choix = ttk.Combobox(barre, textvariable=self.groupe_var, width=12, state="readonly",
+                             values=[str(g) for g in gestion.groupes()])
+        choix.pack(side=tk.LEFT, padx=5)
+        choix.bind("<<ComboboxSelected>>", lambda e: self.charger())
+
+        cadre = tk.Frame(self)
+        cadre.pack(fill=tk.BOTH, expand=True, padx=5)
+        self.canevas = tk.Canvas(cadre, highlightthickness=0)
+        defilement = ttk.Scrollbar(cadre, orient=tk.VERTICAL, command=self.canevas.yview)
+        self.canevas.configure(yscrollcommand=defilement.set)
+        defilement.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canevas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.grille = tk.Frame(self.canevas)
+        self.canevas.create_window((0, 0), window=self.grille, anchor=tk.NW)
+        self.grille.bind("<Configure>", lambda e: self.canevas.configure(scrollregion=self.canevas.bbox("all")))
+
+        bas = tk.Frame(self)
+        bas.pack(fill=tk.X, padx=5, pady=5)
+        self.statut = tk.Label(bas, anchor=tk.W)
+        self.statut.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        button_style = {"bg": "#0066ff", "fg": "white", "padx": 10, "pady": 5}
+        tk.Button(bas, text="Fermer", command=self.destroy, **button_style).pack(side=tk.RIGHT, padx=5)
+        tk.Button(bas, text="Enregistrer", command=self.enregistrer, **button_style).pack(side=tk.RIGHT, padx=5)
 
-    def modifier_personne(self, id_person, new_nom, new_age):
+    def charger(self):
         """
-        Modifie le nom et l'âge d'une personne.
+        Construit une ligne par stagiaire du groupe choisi, pré-remplie avec
+        ses notes. Les notes encore en attente sont d'abord lues par le thread
+        de travail.
         """
-        for personne in self.__personnes:
-            if personne.id_person == id_person:
-                personne.nom = new_nom
-                personne.age = new_age
-                try:
-                    sql = "UPDATE etudiant SET name = %s, age = %s WHERE id = %s"
-                    val = (new_nom, new_age, id_person)
-                    self.cur.execute(sql, val)
-                    self.mydb.commit()
-                    messagebox.showinfo("Succès", f"Personne modifiée : Nom : {new_nom}, Âge : {new_age}")
-                    return
-                except Error as e:
-                    messagebox.showerror("Database Error", f"Erreur lors de la modification : {e}")
-                    return
-        messagebox.showinfo("Information", "Personne non trouvée.")
+        group = self.groupe_var.get()
+        membres = self.gestion.rechercher_personnes(group=group, role="Stagiaire")
+        if not any(not p.notes_chargees() for p in membres):
+            self.__construire(membres)
+            return
+        for widget in self.grille.winfo_children():
+            widget.destroy()
+        self.lignes = []
+        self.statut.config(text="Lecture des notes...")
+
+        def lues(resultat):
+            # Le groupe a pu changer pendant la lecture : seule la dernière demande est affichée.
+            if self.winfo_exists() and self.groupe_var.get() == group:
+                self.__construire(membres)
+
+        self.application.executer(self.gestion.precharger_notes, membres, message="Lecture des notes du groupe...",
+                                  succes=lues)
+
+    def __construire(self, membres):
+        for widget in self.grille.winfo_children():
+            widget.destroy()
+        self.lignes = []
+        for colonne, titre in enumerate(("ID", "Nom", "Note 1", "Note 2", "Note 3")):
+            tk.Label(self.grille, text=titre, font=("Arial", 9, "bold")).grid(row=0, column=colonne, padx=3)
+        for rang, personne in enumerate(membres, start=1):
+            tk.Label(self.grille, text=personne.id_person).grid(row=rang, column=0, sticky=tk.W, padx=3)
+            tk.Label(self.grille, text=personne.nom).grid(row=rang, column=1, sticky=tk.W, padx=3)
+            initiales = ["" if n is None else f"{n:g}" for n in personne.triplet_notes()]
+            champs = []
+            for colonne, valeur in enumerate(initiales):
+                champ = tk.Entry(self.grille, width=7)
+                champ.insert(0, valeur)
+                champ.grid(row=rang, column=colonne + 2, padx=3, pady=1)
+                # Entrée : même note, stagiaire suivant (saisie d'une copie d'examen à la suite).
+                champ.bind("<Return>", lambda e, r=rang - 1, c=colonne: self.__suivant(r, c))
+                champs.append(champ)
+            self.lignes.append((personne.id_person, champs, initiales))
+        self.statut.config(text=f"{len(membres)} stagiaire(s).")
+        if self.lignes:
+            self.lignes[0][1][0].focus_set()
+
+    def __suivant(self, rang, colonne):
+        if rang + 1 < len(self.lignes):
+            self.lignes[rang + 1][1][colonne].focus_set()
+        return "break"
+
+    def enregistrer(self):
+        modifiees = {}
+        for id_person, champs, initiales in self.lignes:
+            valeurs = [champ.get().strip() for champ in champs]
+            for champ in champs:
+                champ.config(bg="white")
+            if valeurs != initiales:
+                modifiees[id_person] = valeurs
+        valides, erreurs = valider_notes_lot(modifiees)
+        if erreurs:
+            for id_person, champs, _ in self.lignes:
+                if id_person in erreurs:
+                    for champ in champs:
+                        champ.config(bg=self.COULEUR_ERREUR)
+            details = "\n".join(f"ID {id_person} : {message}" for id_person, message in list(erreurs.items())[:10])
+            messagebox.showerror("Erreur", f"{len(erreurs)} ligne(s) invalide(s), rien n'a été enregistré.\n{details}",
+                                 parent=self)
+            return
+        if not valides:
+            messagebox.showinfo("Information", "Aucune note modifiée.", parent=self)
+            return
+        def termine(nombre):
+            if self.winfo_exists():
+                self.charger()
+            messagebox.showinfo("Succès", f"Notes enregistrées pour {nombre} stagiaire(s).")
 
-    def __del__(self):
-        try:
-            if hasattr(self, 'cur') and self.cur:
-                self.cur.close()
-            if hasattr(self, 'mydb') and self.mydb:
-                self.mydb.close()
-        except Exception as e:
-            messagebox.showerror("Error", f"Erreur lors de la fermeture de la connexion : {e}")
+        # Une seconde validation identique réécrirait les mêmes valeurs : l'upsert est idempotent.
+        self.application.executer(self.gestion.enregistrer_notes_groupe, valides,
+                                  message="Enregistrement des notes du groupe...", succes=termine)
 
 # =========================
 # INTERFACE GRAPHIQUE TKINTER (Critère interface graphique)
@@ -266,11 +357,19 @@ class GestionStagiaires:
 class Application(tk.Tk):
     """
     Interface graphique principale de gestion des étudiants.
+
+    Les accès à la base passent par un exécuteur (thread de travail) ; les
+    résultats sont relevés toutes les `INTERVALLE_SONDAGE_MS` millisecondes
+    avec `after()`, si bien que la boucle Tk n'est jamais bloquée. La fenêtre
+    s'ouvre immédiatement et les données arrivent pendant le chargement.
     """
+    INTERVALLE_SONDAGE_MS = 50
+    DELAI_ARRET = 10.0
+
     def __init__(self):
         super().__init__()
         self.title("D7GT - Gestion Etudiant")
-        self.geometry("391x626")
+        self.geometry("391x830")
         try:
             icon = PhotoImage(file='D7GT.png')
             self.iconphoto(False, icon)
@@ -297,19 +396,128 @@ class Application(tk.Tk):
             self.picture_label = tk.Label(self, image=self.picture, relief=tk.RAISED, bd=10)
             self.picture_label.pack(pady=22)
 
-        self.gestion = GestionStagiaires()
+        self.gestion = GestionStagiaires(demarrer=False)
+        self.executeur = ExecuteurTaches()
 
         button_style = {"bg": "#0066ff", "fg": "white", "padx": 10, "pady": 5}
 
+        # Indicateur d'activité : visible tant qu'une opération sur la base est en cours.
+        self.indicateur = tk.Frame(self, bg="#e6f0ff")
+        self.progression = ttk.Progressbar(self.indicateur, mode="indeterminate", length=120)
+        self.progression.pack(side=tk.LEFT, padx=5, pady=5)
+        self.message_activite = tk.Label(self.indicateur, text="", bg="#e6f0ff")
+        self.message_activite.pack(side=tk.LEFT, padx=5)
+        tk.Button(self.indicateur, text="Annuler", command=self.annuler_operations, bg="#0066ff",
+                  fg="white").pack(side=tk.RIGHT, padx=5)
+
         tk.Button(self, text="Ajouter un utilisateur", command=self.ajouter_personne, **button_style).pack(pady=10)
-        tk.Button(self, text="Afficher tous les utilisateurs", command=self.gestion.afficher_tous_les_personnes, **button_style).pack(pady=10)
+        tk.Button(self, text="Afficher tous les utilisateurs", command=self.afficher_tous_les_personnes, **button_style).pack(pady=10)
         tk.Button(self, text="Rechercher un utilisateur", command=self.rechercher_personne, **button_style).pack(pady=10)
         tk.Button(self, text="Supprimer un utilisateur", command=self.supprimer_personne, **button_style).pack(pady=10)
         tk.Button(self, text="Saisir les notes d'un utilisateur", command=self.calculer_notes, **button_style).pack(pady=10)
         tk.Button(self, text="Afficher les notes d'un utilisateur", command=self.obtenir_notes, **button_style).pack(pady=10)
+        tk.Button(self, text="Saisir les notes d'un groupe", command=self.saisir_notes_groupe, **button_style).pack(pady=10)
+        tk.Button(self, text="Saisir une évaluation", command=self.saisir_evaluation, **button_style).pack(pady=10)
         tk.Button(self, text="Modifier un utilisateur", command=self.modifier_personne, **button_style).pack(pady=10)
+        tk.Button(self, text="Statistiques des notes", command=self.afficher_statistiques, **button_style).pack(pady=10)
         tk.Button(self, text="Quitter", command=self.destroy, **button_style).pack(pady=10)
 
+        self.__tache_synchro = None
+        self.executer(self.gestion.demarrer, message="Chargement des utilisateurs...", annulable=True,
+                      succes=self.__chargement_termine, progression=self.__chargement_progresse,
+                      titre_erreur="Database Error")
+        self.after(self.INTERVALLE_SONDAGE_MS, self.__sonder)
+        intervalle = self.gestion.config["intervalle_synchro"]
+        if intervalle > 0:
+            self.after(int(intervalle * 1000), self.__synchroniser, int(intervalle * 1000))
+
+    # ----- Exécution en arrière-plan -----
+
+    def executer(self, fonction, *args, succes=None, echec=None, message="Opération en cours...",
+                 titre_erreur="Database Error", **options):
+        """
+        Exécute `fonction(*args)` dans le thread de travail. `succes` reçoit le
+        résultat dans le thread Tk ; les erreurs sont affichées, puis passées
+        à `echec` s'il est fourni.
+        """
+        def afficher_erreur(erreur):
+            if isinstance(erreur, ErreurBase):
+                messagebox.showerror(titre_erreur, f"Erreur de base de données : {erreur}")
+            elif isinstance(erreur, PersonneIntrouvable):
+                messagebox.showinfo("Information", str(erreur))
+            elif isinstance(erreur, SaisieInvalide):
+                messagebox.showerror("Erreur", str(erreur))
+            else:
+                messagebox.showerror("Erreur", f"Erreur inattendue : {erreur}")
+            if echec is not None:
+                echec(erreur)
+
+        self.message_activite.config(text=message)
+        return self.executeur.soumettre(fonction, *args, succes=succes, echec=afficher_erreur, **options)
+
+    def annuler_operations(self):
+        self.executeur.annuler_tout()
+        self.message_activite.config(text="Annulation...")
+
+    def __sonder(self):
+        try:
+            self.executeur.traiter()
+        except Exception as e:
+            messagebox.showerror("Erreur", f"Erreur inattendue : {e}")
+        # La synchronisation périodique est silencieuse : elle n'affiche pas l'indicateur.
+        en_cours = self.executeur.en_cours() - (self.__tache_synchro is not None)
+        if en_cours:
+            if not self.indicateur.winfo_ismapped():
+                self.indicateur.pack(side=tk.BOTTOM, fill=tk.X)
+                self.progression.start(10)
+        elif self.indicateur.winfo_ismapped():
+            self.progression.stop()
+            self.indicateur.pack_forget()
+        self.after(self.INTERVALLE_SONDAGE_MS, self.__sonder)
+
+    def __synchroniser(self, intervalle_ms):
+        """
+        Tire périodiquement les modifications des autres postes, si aucune
+        autre opération n'est en attente.
+        """
+        if self.__tache_synchro is not None and self.__tache_synchro.annulee:
+            self.__tache_synchro = None
+        if self.__tache_synchro is None and not self.executeur.en_cours():
+            def terminee(resultat):
+                # Les listes ouvertes se mettent à jour d'elles-mêmes (version du registre).
+                # En cas d'erreur passagère, nouvel essai au prochain intervalle.
+                self.__tache_synchro = None
+
+            self.__tache_synchro = self.executeur.soumettre(self.gestion.synchroniser, succes=terminee,
+                                                            echec=terminee)
+        self.after(intervalle_ms, self.__synchroniser, intervalle_ms)
+
+    def __chargement_progresse(self, total):
+        self.message_activite.config(text=f"Chargement : {total} utilisateur(s)...")
+
+    def __chargement_termine(self, total):
+        self.message_activite.config(text=f"{total} utilisateur(s) chargé(s).")
+
+    def destroy(self):
+        # La tâche en cours utilise peut-être encore le dépôt et le registre :
+        # on attend sa fin avant d'écrire l'instantané et de fermer.
+        arrete = self.executeur.arreter(delai=self.DELAI_ARRET)
+        if arrete:
+            try:
+                self.gestion.enregistrer_instantane()
+            except (ErreurBase, OSError):
+                # Sans instantané, le prochain démarrage relira simplement toute la base.
+                pass
+        # Sinon, pas d'instantané d'un registre en cours de modification : le
+        # prochain démarrage relira la base.
+        try:
+            self.gestion.fermer()
+        except ErreurBase as e:
+            messagebox.showerror("Erreur", f"Des modifications n'ont pas pu être enregistrées : {e}")
+        super().destroy()
+
+    # ----- Actions -----
+
     def ajouter_personne(self):
         """
         Fenêtre de saisie pour ajouter une personne (stagiaire ou enseignant), avec validation et gestion d'erreur.
@@ -354,34 +562,19 @@ class Application(tk.Tk):
                 group = group_entry.get()
                 type_person = type_var.get()
 
-                if not id_person or not nom or not age or not group:
-                    messagebox.showerror("Erreur", "Tous les champs doivent être remplis.")
-                    return
-
-                # Vérification que le nom ne contient que des lettres et espaces
-                if not nom.replace(" ", "").isalpha():
-                    messagebox.showerror("Erreur", "Le nom doit contenir uniquement des lettres.")
-                    return
-
+                # Mêmes règles que la version console et l'import en masse
                 try:
-                    id_person_int = int(id_person)
-                except ValueError:
-                    messagebox.showerror("Erreur", "L'ID doit être un nombre entier.")
+                    personne = valider_personne(id_person, nom, age, group, type_person)
+                except SaisieInvalide as e:
+                    messagebox.showerror("Erreur", str(e))
                     return
 
-                if not age.isdigit():
-                    messagebox.showerror("Erreur", "L'âge doit être un nombre entier.")
-                    return
-
-                age_int = int(age)
-                if age_int < 18 or age_int > 30:
-                    messagebox.showerror("Erreur", "L'âge doit être un nombre entre 18 et 30.")
-                    return
+                def ajoutee(p):
+                    messagebox.showinfo("Succès", f"Personne {p.nom} ajoutée avec succès.")
+                    if form_window.winfo_exists():
+                        form_window.destroy()
 
-                if self.gestion.ajouter_personne(id_person_int, nom, age_int, group, type_person):
-                    form_window.destroy()
-                else:
-                    messagebox.showerror("Erreur", "Erreur lors de l'ajout de l'utilisateur.")
+                self.executer(self.gestion.ajouter_personne, *personne, succes=ajoutee, message="Ajout en cours...")
             except Exception as e:
                 messagebox.showerror("Erreur", f"Erreur inattendue : {e}")
 
@@ -390,11 +583,20 @@ class Application(tk.Tk):
         cancel_button = tk.Button(form_window, text="Annuler", command=form_window.destroy, **button_style)
         cancel_button.pack()
 
+    def afficher_tous_les_personnes(self):
+        """
+        Ouvre la liste des utilisateurs (défilement virtuel, tri et filtres).
+        """
+        try:
+            ListeVirtuelle(self, self.gestion)
+        except Exception as e:
+            messagebox.showerror("Erreur", f"Erreur inattendue : {e}")
+
     def rechercher_personne(self):
         try:
             form_window = tk.Toplevel(self)
             form_window.title("Rechercher un utilisateur")
-            form_window.geometry("350x200")
+            form_window.geometry("420x380")
 
             # Ajout du background
             if hasattr(self, 'bk') and self.bk:
@@ -402,26 +604,66 @@ class Application(tk.Tk):
                 bg_label.place(relwidth=1, relheight=1)
                 form_window.bg_label = bg_label
 
-            tk.Label(form_window, text="ID de l'utilisateur", bg="#e6f0ff").pack(pady=10)
+            tk.Label(form_window, text="ID ou nom de l'utilisateur", bg="#e6f0ff").pack(pady=10)
             id_entry = tk.Entry(form_window, bg="#e6f0ff")
             id_entry.pack(pady=10)
 
+            # Recherche approchée par nom, mise à jour à chaque frappe.
+            resultats = []
+            liste = tk.Listbox(form_window, width=52, height=10, bg="#e6f0ff")
+            liste.pack(pady=5)
+
+            def afficher(personne):
+                result = f"Personne trouvée : \n#- ID : {personne.id_person}\n#- Nom : {personne.nom}\n#- Âge : {personne.age}\n#- Groupe : {personne.group}\n#- Rôle : {personne.get_role()}"
+                messagebox.showinfo("Résultat de la recherche", result)
+
+            def filtrer(event=None):
+                texte = id_entry.get().strip()
+                if not texte or texte.isdigit():
+                    remplir(texte, [])
+                    return
+                # Recherche dans le thread de travail : le thread Tk n'attend pas le verrou du registre.
+                self.executer(self.gestion.rechercher_par_nom, texte, message="Recherche...",
+                              succes=lambda trouves: remplir(texte, trouves))
+
+            def remplir(texte, trouves):
+                # Fenêtre fermée, ou saisie modifiée depuis : le résultat est périmé.
+                if not liste.winfo_exists() or id_entry.get().strip() != texte:
+                    return
+                resultats[:] = trouves
+                liste.delete(0, tk.END)
+                for personne, score in resultats:
+                    liste.insert(tk.END, f"{score:>4.0%}  {personne.nom} (ID {personne.id_person}, {personne.group})")
+
+            def choisir(event=None):
+                selection = liste.curselection()
+                if selection:
+                    afficher(resultats[selection[0]][0])
+
             def submit():
                 try:
-                    id_person = id_entry.get()
+                    id_person = id_entry.get().strip()
                     if not id_person:
-                        messagebox.showerror("Erreur", "Veuillez entrer un ID.")
+                        messagebox.showerror("Erreur", "Veuillez entrer un ID ou un nom.")
                         return
-                    try:
-                        id_person_int = int(id_person)
-                    except ValueError:
-                        messagebox.showerror("Erreur", "L'ID doit être un nombre entier.")
+                    if not id_person.isdigit():
+                        if not resultats:
+                            messagebox.showinfo("Information", "Aucun nom proche trouvé.")
+                            return
+                        selection = liste.curselection()
+                        afficher(resultats[selection[0] if selection else 0][0])
                         return
-                    self.gestion.rechercher_personne(id_person_int)
+                    personne = self.gestion.rechercher_personne(int(id_person))
+                    if personne is None:
+                        messagebox.showinfo("Information", "Personne non trouvée.")
+                    else:
+                        afficher(personne)
                     form_window.destroy()
                 except Exception as e:
                     messagebox.showerror("Erreur", f"Erreur inattendue : {e}")
 
+            id_entry.bind("<KeyRelease>", filtrer)
+            liste.bind("<Double-Button-1>", choisir)
             tk.Button(form_window, text="Rechercher", command=submit, bg="#0066ff", fg="white").pack(pady=10)
         except Exception as e:
             messagebox.showerror("Erreur", f"Erreur inattendue : {e}")
@@ -430,23 +672,112 @@ class Application(tk.Tk):
         try:
             id_person = simpledialog.askinteger("Supprimer un utilisateur", "Entrez l'ID de l'utilisateur :")
             if id_person is not None:
-                self.gestion.supprimer_personne(id_person)
+                self.executer(
+                    self.gestion.supprimer_personne, id_person, message="Suppression en cours...",
+                    succes=lambda p: messagebox.showinfo("Succès", f"Personne {p.nom} supprimée avec succès."),
+                )
         except Exception as e:
             messagebox.showerror("Erreur", f"Erreur inattendue : {e}")
 
     def calculer_notes(self):
+        """
+        Saisie ou modification des notes d'une personne, avec validation et gestion d'erreur.
+        """
         try:
             id_person = simpledialog.askinteger("Saisir les notes", "Entrez l'ID de l'utilisateur :")
-            if id_person is not None:
-                self.gestion.calculer_notes(id_person)
+            if id_person is None:
+                return
+            if self.gestion.rechercher_personne(id_person) is None:
+                messagebox.showinfo("Information", "Personne non trouvée.")
+                return
+            saisies = [
+                simpledialog.askstring("Saisir une note", f"Entrez la note {i} (laisser vide pour aucune) : ")
+                for i in range(1, 4)
+            ]
+            try:
+                notes = valider_notes(saisies)
+            except SaisieInvalide as e:
+                messagebox.showerror("Erreur", str(e))
+                return
+            self.executer(
+                self.gestion.enregistrer_notes, id_person, notes, message="Enregistrement des notes...",
+                succes=lambda p: messagebox.showinfo("Succès", f"Notes enregistrées pour la personne {p.nom}."),
+            )
+        except Exception as e:
+            messagebox.showerror("Erreur", f"Erreur inattendue : {e}")
+
+    def saisir_evaluation(self):
+        """
+        Saisie d'une note d'évaluation nommée (partiel, projet...) avec son coefficient.
+        """
+        try:
+            id_person = simpledialog.askinteger("Saisir une évaluation", "Entrez l'ID de l'utilisateur :")
+            if id_person is None:
+                return
+            personne = self.gestion.rechercher_personne(id_person)
+            if personne is None:
+                messagebox.showinfo("Information", "Personne non trouvée.")
+                return
+            if personne.notes_chargees():
+                self.__saisir_evaluation(personne)
+            else:
+                # Notes en attente (chargement différé) : lues par le thread de travail.
+                self.executer(self.gestion.precharger_notes, [personne], message="Lecture des notes...",
+                              succes=lambda resultat: self.__saisir_evaluation(personne))
+        except Exception as e:
+            messagebox.showerror("Erreur", f"Erreur inattendue : {e}")
+
+    def __saisir_evaluation(self, personne):
+        try:
+            id_person = personne.id_person
+            actuelles = formater_notes(personne.evaluations()) or "aucune"
+            evaluation = simpledialog.askstring(
+                "Saisir une évaluation", f"Évaluations actuelles : {actuelles}\n\nNom de l'évaluation (ex. partiel) :")
+            if evaluation is None:
+                return
+            note = simpledialog.askstring("Saisir une évaluation", "Note (laisser vide pour retirer l'évaluation) :")
+            if note is None:
+                return
+            coefficient = simpledialog.askstring(
+                "Saisir une évaluation", "Coefficient (laisser vide pour le conserver, 1 par défaut) :")
+            if coefficient is None:
+                return
+            try:
+                valider_evaluation(evaluation, note, coefficient)
+            except SaisieInvalide as e:
+                messagebox.showerror("Erreur", str(e))
+                return
+            self.executer(
+                self.gestion.enregistrer_evaluation, id_person, evaluation, note, coefficient,
+                message="Enregistrement de l'évaluation...",
+                succes=lambda p: messagebox.showinfo("Succès", f"Évaluation enregistrée pour la personne {p.nom}."),
+            )
+        except Exception as e:
+            messagebox.showerror("Erreur", f"Erreur inattendue : {e}")
+
+    def saisir_notes_groupe(self):
+        """
+        Ouvre la grille de saisie des notes d'un groupe entier.
+        """
+        try:
+            SaisieNotesGroupe(self, self.gestion)
         except Exception as e:
             messagebox.showerror("Erreur", f"Erreur inattendue : {e}")
 
     def obtenir_notes(self):
+        def afficher(personne):
+            if personne.notes:
+                result = (f"Notes pour {personne.nom} : {formater_notes(personne.evaluations())}\n"
+                          f"Moyenne : {personne.moyenne_notes():.2f}")
+                messagebox.showinfo("Notes", result)
+            else:
+                messagebox.showinfo("Information", f"{personne.nom} n'a aucune note enregistrée.")
+
         try:
             id_person = simpledialog.askinteger("Afficher les notes", "Entrez l'ID de l'utilisateur :")
             if id_person is not None:
-                self.gestion.obtenir_notes(id_person)
+                self.executer(self.gestion.obtenir_notes, id_person, message="Lecture des notes...",
+                              succes=afficher)
         except Exception as e:
             messagebox.showerror("Erreur", f"Erreur inattendue : {e}")
 
@@ -459,17 +790,46 @@ class Application(tk.Tk):
             if new_nom is None:
                 return
             # Vérification que le nom ne contient que des lettres et espaces
-            if not new_nom.replace(" ", "").isalpha():
-                messagebox.showerror("Erreur", "Le nom doit contenir uniquement des lettres.")
+            try:
+                valider_nom(new_nom)
+            except SaisieInvalide as e:
+                messagebox.showerror("Erreur", str(e))
                 return
             new_age = simpledialog.askinteger("Modifier un utilisateur", "Entrez le nouvel âge (entre 18 et 30) :", minvalue=18, maxvalue=30)
             if new_age is None:
                 return
-            self.gestion.modifier_personne(id_person, new_nom, new_age)
+            self.executer(
+                self.gestion.modifier_personne, id_person, new_nom, new_age, message="Modification en cours...",
+                succes=lambda p: messagebox.showinfo(
+                    "Succès", f"Personne modifiée : Nom : {new_nom}, Âge : {new_age}"),
+            )
         except Exception as e:
             messagebox.showerror("Erreur", f"Erreur inattendue : {e}")
 
 
+    def afficher_statistiques(self):
+        """
+        Fenêtre des statistiques de notes : tableau par groupe, percentiles et classement général.
+        Le calcul est fait dans le thread de travail.
+        """
+        self.executer(self.gestion.analyser_notes, succes=self.__afficher_resultats,
+                      message="Calcul des statistiques...")
+
+    def __afficher_resultats(self, resultats):
+        try:
+            fenetre = tk.Toplevel(self)
+            fenetre.title("Statistiques des notes")
+            texte = tk.Text(fenetre, font=("Courier", 10), width=90, height=30)
+            texte.pack(fill=tk.BOTH, expand=True)
+            texte.insert(tk.END, resultats.resume())
+            meilleurs = resultats.classement(limite=20)
+            if meilleurs:
+                texte.insert(tk.END, "\n\nClassement général (20 premiers) :\n")
+                for rang, id_person, moyenne in meilleurs:
+                    texte.insert(tk.END, f"{rang:>4}. ID {id_person} : {moyenne:.2f}\n")
+            texte.config(state=tk.DISABLED)
+        except Exception as e:
+            messagebox.showerror("Erreur", f"Erreur inattendue : {e}")
 
 # =========================
 # LANCEMENT DE L'APPLICATION
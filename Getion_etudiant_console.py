@@ -1,198 +1,361 @@
 # Gestion_Etudiant_Console.py
 
-import mysql.connector
-from mysql.connector import Error
-from abc import ABC, abstractmethod
+import atexit
+import sys
+from gestion import cli
+from gestion.exceptions import ErreurBase, PersonneIntrouvable, SaisieInvalide
+from gestion.gestionnaire import GestionStagiaires
+from gestion.modeles import formater_notes
+from gestion.validation import valider_evaluation, valider_nom, valider_notes, valider_personne
 
-class Person(ABC):
-    def __init__(self, id_person, nom, age, group, notes=None):
-        self.id_person = id_person
-        self.nom = nom
-        self.age = age
-        self.group = group
-        self.notes = notes if notes is not None else []
+class GestionConsole:
+    """
+    Version console : affiche les résultats de `GestionStagiaires` et ses
+    erreurs ; les données et les opérations sont dans `gestion.gestionnaire`.
+    """
+    def __init__(self, config=None, depot=None, **options):
+        self.gestion = GestionStagiaires(config=config, depot=depot, demarrer=False, **options)
+        self.instrumentation = self.gestion.instrumentation
+        try:
+            if self.gestion.depot is None:
+                self.gestion.connect_db()
+        except ErreurBase as e:
+            print(f"Erreur de connexion à la base de données : {e}")
+        try:
+            self.gestion.load_personnes_from_db()
+        except ErreurBase as e:
+            print(f"Erreur lors du chargement des personnes : {e}")
+        atexit.register(self.fermer)
 
-    @abstractmethod
-    def get_role(self):
-        pass
+    def enregistrer_instantane(self):
+        """
+        Écrit l'instantané local du registre (option `instantane`), pour que
+        le prochain démarrage ne relise que les changements.
+        """
+        try:
+            return self.gestion.enregistrer_instantane()
+        except (ErreurBase, OSError) as e:
+            print(f"Erreur lors de l'écriture de l'instantané : {e}")
+            return None
 
-    def moyenne_notes(self):
-        return sum(self.notes) / len(self.notes) if self.notes else 0
+    def flush(self):
+        """
+        Valide tout de suite les écritures en attente (option `ecriture_differee`).
+        """
+        try:
+            self.gestion.flush()
+        except ErreurBase as e:
+            print(f"Erreur lors de l'enregistrement des modifications : {e}")
+            return False
+        return True
 
-class Stagiaire(Person):
-    def get_role(self):
-        return "Stagiaire"
+    def synchroniser(self):
+        """
+        Récupère les modifications faites par les autres postes depuis la
+        dernière synchronisation (journal des modifications).
+        """
+        try:
+            ecrites, supprimees = self.gestion.synchroniser()
+        except ErreurBase as e:
+            print(f"Erreur lors de la synchronisation : {e}")
+            return None
+        if ecrites or supprimees:
+            print(f"Synchronisation : {ecrites} utilisateur(s) ajouté(s) ou modifié(s), "
+                  f"{supprimees} supprimé(s) depuis un autre poste.")
+        return ecrites, supprimees
 
-class Teacher(Person):
-    def get_role(self):
-        return "Enseignant"
+    def ajouter_personne(self, id_person, nom, age, group, type_person):
+        try:
+            self.gestion.ajouter_personne(id_person, nom, age, group, type_person)
+        except SaisieInvalide as e:
+            print(e)
+            return False
+        except ErreurBase as e:
+            print(f"Erreur lors de l'ajout : {e}")
+            return False
+        print(f"{type_person} {nom} ajouté avec succès.")
+        return True
 
-class GestionStagiaires:
-    def __init__(self):
-        self.__personnes = []
-        self.connect_db()
-        self.load_personnes_from_db()
+    def importer_personnes(self, chemin, taille_lot=None, chemin_rapport=None):
+        try:
+            rapport = self.gestion.importer_personnes(chemin, taille_lot, chemin_rapport)
+        except (ErreurBase, OSError) as e:
+            print(f"Erreur lors de l'import : {e}")
+            return None
+        print(f"Import terminé : {rapport}")
+        return rapport
 
-    def connect_db(self):
+    def exporter_personnes(self, chemin, format_fichier="csv", group=None, role=None):
         try:
-            self.mydb = mysql.connector.connect(
-                host="localhost",
-                user="root",
-                password="YOUR_DB_PASSWORD",
-                database="YOUR_DB_NAME"
-            )
-            self.cur = self.mydb.cursor()
-        except Error as e:
-            print(f"Erreur de connexion à la base de données : {e}")
+            total = self.gestion.exporter_personnes(chemin, format_fichier, group, role)
+        except (ErreurBase, OSError, ValueError) as e:
+            print(f"Erreur lors de l'export : {e}")
+            return None
+        print(f"{total} utilisateur(s) exporté(s) dans {chemin}.")
+        return total
 
-    def load_personnes_from_db(self):
-        self.__personnes.clear()
+    def analyser_notes(self, limite=10):
         try:
-            self.cur.execute("SELECT id, name, age, ed_group, type FROM etudiant")
-            for (id_person, nom, age, group, type_person) in self.cur.fetchall():
-                self.cur.execute("SELECT note1, note2, note3 FROM notes WHERE id_ed = %s", (id_person,))
-                notes_row = self.cur.fetchone()
-                notes = [n for n in notes_row if n is not None] if notes_row else []
-                if type_person == "Enseignant":
-                    self.__personnes.append(Teacher(id_person, nom, age, group, notes))
-                else:
-                    self.__personnes.append(Stagiaire(id_person, nom, age, group, notes))
-        except Error as e:
-            print(f"Erreur lors du chargement des personnes : {e}")
+            resultats = self.gestion.analyser_notes()
+        except ErreurBase as e:
+            print(f"Erreur lors de la lecture des notes : {e}")
+            return None
+        print("\nStatistiques des notes par groupe :")
+        print(resultats.resume())
+        meilleurs = resultats.classement(limite=limite)
+        if meilleurs:
+            print(f"\nClassement général ({len(meilleurs)} premiers) :")
+            for rang, id_person, moyenne in meilleurs:
+                print(f"{rang:>4}. {self.gestion.rechercher_personne(id_person).nom} (ID {id_person}) : {moyenne:.2f}")
+        return resultats
 
-    def ajouter_personne(self, id_person, nom, age, group, type_person):
-        if any(p.id_person == id_person for p in self.__personnes):
-            print("Une personne avec cet ID existe déjà.")
-            return False
-        if type_person == "Enseignant":
-            personne = Teacher(id_person, nom, age, group)
-        else:
-            personne = Stagiaire(id_person, nom, age, group)
+    def afficher_moyennes_groupes(self):
         try:
-            sql = "INSERT INTO etudiant (id, name, age, ed_group, type) VALUES (%s, %s, %s, %s, %s)"
-            val = (id_person, nom, age, group, type_person)
-            self.cur.execute(sql, val)
-            self.mydb.commit()
-            self.__personnes.append(personne)
-            print(f"{type_person} {nom} ajouté avec succès.")
-            return True
-        except Error as e:
-            print(f"Erreur lors de l'ajout : {e}")
-            return False
+            moyennes = self.gestion.moyennes_groupes()
+        except ErreurBase as e:
+            print(f"Erreur lors de la lecture des moyennes : {e}")
+            return None
+        if not moyennes:
+            print("Aucun groupe enregistré.")
+            return moyennes
+        print(f"{'Groupe':<12} | {'Effectif':>8} | {'Notes':>6} | {'Moyenne':>7} | Moyenne par évaluation")
+        for group, stats in sorted(moyennes.items()):
+            moyenne = "-" if stats.moyenne is None else f"{stats.moyenne:.2f}"
+            detail = ", ".join(f"{evaluation} : {valeur:.2f}" for evaluation, valeur in stats.moyennes.items())
+            print(f"{group or '-':<12} | {stats.effectif:>8} | {stats.nb_notes:>6} | {moyenne:>7} | {detail or '-'}")
+        return moyennes
+
+    def verifier_stats_groupes(self, corriger=False):
+        try:
+            ecarts = self.gestion.verifier_stats_groupes(corriger)
+        except ErreurBase as e:
+            print(f"Erreur lors de la vérification : {e}")
+            return None
+        if not ecarts:
+            print("La table de synthèse des groupes est cohérente.")
+            return ecarts
+        print(f"{len(ecarts)} écart(s) détecté(s) :")
+        for ecart in ecarts:
+            print(f"  groupe {ecart.groupe or '-'}, emplacement {ecart.emplacement} : "
+                  f"attendu {ecart.attendu}, stocké {ecart.stocke}")
+        if corriger:
+            print("Table de synthèse reconstruite.")
+        return ecarts
+
+    def afficher_stats_cache(self):
+        stats = self.gestion.statistiques_cache()
+        if stats is None:
+            print("Le cache des notes est désactivé (cache_taille = 0).")
+            return None
+        print(f"Cache des notes (mode {stats['mode']}) : {stats['entrees']}/{stats['taille_max']} entrée(s)")
+        print(f"  succès : {stats['succes']}, échecs : {stats['echecs']} "
+              f"(taux de succès {stats['taux_succes']:.1%})")
+        print(f"  expirations : {stats['expirations']}, évictions : {stats['evictions']}, "
+              f"valeurs périmées détectées : {stats['perimees']}")
+        return stats
 
     def afficher_tous_les_personnes(self):
-        if not self.__personnes:
+        personnes = self.gestion.get_personnes()
+        if not personnes:
             print("Aucun utilisateur trouvé.")
             return
         print("\nListe de tous les utilisateurs :")
-        for p in self.__personnes:
+        for p in personnes:
             print(f"ID : {p.id_person} | Nom : {p.nom} | Âge : {p.age} | Groupe : {p.group} | Rôle : {p.get_role()}")
 
     def rechercher_personne(self, id_person):
-        for personne in self.__personnes:
-            if personne.id_person == id_person:
-                print(f"Personne trouvée : ID : {personne.id_person} | Nom : {personne.nom} | Âge : {personne.age} | Groupe : {personne.group} | Rôle : {personne.get_role()}")
-                return
-        print("Personne non trouvée.")
+        personne = self.gestion.rechercher_personne(id_person)
+        if personne is None:
+            print("Personne non trouvée.")
+            return
+        print(f"Personne trouvée : ID : {personne.id_person} | Nom : {personne.nom} | Âge : {personne.age} | Groupe : {personne.group} | Rôle : {personne.get_role()}")
+
+    def rechercher_personnes(self, group=None, role=None, age_min=None, age_max=None, prefixe_nom=None):
+        resultats = self.gestion.rechercher_personnes(group=group, role=role, age_min=age_min, age_max=age_max, prefixe_nom=prefixe_nom)
+        if not resultats:
+            print("Aucun utilisateur ne correspond aux critères.")
+            return resultats
+        print(f"\n{len(resultats)} utilisateur(s) trouvé(s) :")
+        for p in resultats:
+            print(f"ID : {p.id_person} | Nom : {p.nom} | Âge : {p.age} | Groupe : {p.group} | Rôle : {p.get_role()}")
+        return resultats
+
+    def rechercher_par_nom(self, texte):
+        """
+        Recherche approchée : tolère les fautes de frappe, les accents et la casse.
+        """
+        resultats = self.gestion.rechercher_par_nom(texte)
+        if not resultats:
+            print("Aucun nom proche trouvé.")
+            return resultats
+        print(f"\n{len(resultats)} nom(s) proche(s), du plus au moins ressemblant :")
+        for p, score in resultats:
+            print(f"{score:>5.0%} | ID : {p.id_person} | Nom : {p.nom} | Âge : {p.age} | Groupe : {p.group} | Rôle : {p.get_role()}")
+        return resultats
 
     def supprimer_personne(self, id_person):
-        for personne in self.__personnes:
-            if personne.id_person == id_person:
-                self.__personnes.remove(personne)
-                try:
-                    self.cur.execute("DELETE FROM notes WHERE id_ed = %s", (id_person,))
-                    self.cur.execute("DELETE FROM etudiant WHERE id = %s", (id_person,))
-                    self.mydb.commit()
-                    print(f"Personne {personne.nom} supprimée avec succès.")
-                    return
-                except Error as e:
-                    print(f"Erreur lors de la suppression : {e}")
-                    return
-        print("Personne non trouvée.")
+        try:
+            personne = self.gestion.supprimer_personne(id_person)
+        except PersonneIntrouvable as e:
+            print(e)
+            return
+        except ErreurBase as e:
+            print(f"Erreur lors de la suppression : {e}")
+            return
+        print(f"Personne {personne.nom} supprimée avec succès.")
 
     def calculer_notes(self, id_person):
-        for personne in self.__personnes:
-            if personne.id_person == id_person:
-                notes = []
-                for i in range(1, 4):
-                    note = input(f"Entrez la note {i} (laisser vide pour aucune) : ")
-                    if note == "":
-                        notes.append(None)
-                    else:
-                        try:
-                            note = float(note)
-                            if 0 <= note <= 20:
-                                notes.append(note)
-                            else:
-                                print("La note doit être comprise entre 0 et 20.")
-                                return
-                        except ValueError:
-                            print("Entrée invalide. Veuillez entrer un nombre valide.")
-                            return
+        if self.gestion.rechercher_personne(id_person) is None:
+            print("Personne non trouvée.")
+            return
+        try:
+            notes = valider_notes(input(f"Entrez la note {i} (laisser vide pour aucune) : ") for i in range(1, 4))
+        except SaisieInvalide as e:
+            print(e)
+            return
+        try:
+            personne = self.gestion.enregistrer_notes(id_person, notes)
+        except PersonneIntrouvable as e:
+            print(e)
+            return
+        except ErreurBase as e:
+            print(f"Erreur lors de l'enregistrement des notes: {e}")
+            return
+        print(f"Notes enregistrées pour la personne {personne.nom}.")
+
+    def saisir_evaluation(self, id_person):
+        """
+        Saisie d'une note d'évaluation nommée (partiel, projet...) avec son
+        coefficient ; une note vide retire l'évaluation.
+        """
+        personne = self.gestion.rechercher_personne(id_person)
+        if personne is None:
+            print("Personne non trouvée.")
+            return
+        if personne.evaluations():
+            print(f"Évaluations actuelles : {formater_notes(personne.evaluations())}")
+        try:
+            saisie = valider_evaluation(
+                input("Évaluation (ex. partiel) : "),
+                input("Note (laisser vide pour retirer l'évaluation) : "),
+                input("Coefficient (laisser vide pour le conserver, 1 par défaut) : "),
+            )
+        except SaisieInvalide as e:
+            print(e)
+            return
+        try:
+            self.gestion.enregistrer_notes(id_person, [saisie])
+        except PersonneIntrouvable as e:
+            print(e)
+            return
+        except ErreurBase as e:
+            print(f"Erreur lors de l'enregistrement de la note : {e}")
+            return
+        print(f"Évaluation « {saisie[0]} » enregistrée pour la personne {personne.nom}.")
+
+    def saisir_notes_groupe(self, group):
+        """
+        Saisie en grille des notes de tous les stagiaires d'un groupe : une
+        ligne par stagiaire, validée dès sa saisie ; rien n'est écrit avant la
+        fin, puis l'ensemble est enregistré en une seule transaction.
+        """
+        membres = self.gestion.rechercher_personnes(group=group, role="Stagiaire")
+        if not membres:
+            print("Aucun stagiaire dans ce groupe.")
+            return
+        print(f"{len(membres)} stagiaire(s). Saisir les trois notes séparées par des espaces "
+              "('-' : pas de note) ; Entrée seule : ligne inchangée.")
+        print(f"{'ID':>6} | {'Nom':<20} | {'Notes actuelles':<20}")
+        saisies = {}
+        for personne in membres:
+            actuelles = " ".join("-" if n is None else f"{n:g}" for n in personne.triplet_notes())
+            while True:
+                texte = input(f"{personne.id_person:>6} | {personne.nom:<20} | {actuelles:<20} : ").strip()
+                if not texte:
+                    break
+                notes = [None if valeur == "-" else valeur for valeur in texte.split()]
                 try:
-                    self.cur.execute("SELECT id_note FROM notes WHERE id_ed = %s", (id_person,))
-                    exists = self.cur.fetchone()
-                    if exists:
-                        self.cur.execute(
-                            "UPDATE notes SET note1=%s, note2=%s, note3=%s WHERE id_ed=%s",
-                            (notes[0], notes[1], notes[2], id_person)
-                        )
-                    else:
-                        self.cur.execute(
-                            "INSERT INTO notes (id_ed, note1, note2, note3) VALUES (%s, %s, %s, %s)",
-                            (id_person, notes[0], notes[1], notes[2])
-                        )
-                    self.mydb.commit()
-                    personne.notes = [n for n in notes if n is not None]
-                    print(f"Notes enregistrées pour la personne {personne.nom}.")
-                except Error as e:
-                    print(f"Erreur lors de l'enregistrement des notes: {e}")
-                return
-        print("Personne non trouvée.")
+                    saisies[personne.id_person] = valider_notes(notes)
+                    break
+                except SaisieInvalide as e:
+                    print(f"  {e} Recommencez (Entrée pour ignorer cette ligne).")
+        if not saisies:
+            print("Aucune note à enregistrer.")
+            return
+        if input(f"Enregistrer les notes de {len(saisies)} stagiaire(s) ? (o/n) : ").strip().lower() != "o":
+            print("Saisie abandonnée.")
+            return
+        try:
+            self.gestion.enregistrer_notes_groupe(saisies)
+        except (ErreurBase, PersonneIntrouvable) as e:
+            print(f"Erreur lors de l'enregistrement des notes (aucune note enregistrée) : {e}")
+            return
+        print(f"Notes enregistrées pour {len(saisies)} stagiaire(s).")
 
     def obtenir_notes(self, id_person):
-        for personne in self.__personnes:
-            if personne.id_person == id_person:
-                self.cur.execute("SELECT note1, note2, note3 FROM notes WHERE id_ed = %s", (id_person,))
-                notes_row = self.cur.fetchone()
-                notes = [n for n in notes_row if n is not None] if notes_row else []
-                personne.notes = notes
-                if notes:
-                    print(f"Notes pour {personne.nom} : {notes}\nMoyenne : {personne.moyenne_notes():.2f}")
-                else:
-                    print(f"{personne.nom} n'a aucune note enregistrée.")
-                return
-        print("Personne non trouvée.")
+        try:
+            personne = self.gestion.obtenir_notes(id_person)
+        except PersonneIntrouvable as e:
+            print(e)
+            return
+        except ErreurBase as e:
+            print(f"Erreur lors de la lecture des notes : {e}")
+            return
+        notes = personne.evaluations()
+        if notes:
+            print(f"Notes pour {personne.nom} : {formater_notes(notes)}\nMoyenne : {personne.moyenne_notes():.2f}")
+        else:
+            print(f"{personne.nom} n'a aucune note enregistrée.")
 
     def modifier_personne(self, id_person, new_nom, new_age):
-        for personne in self.__personnes:
-            if personne.id_person == id_person:
-                personne.nom = new_nom
-                personne.age = new_age
-                try:
-                    sql = "UPDATE etudiant SET name = %s, age = %s WHERE id = %s"
-                    val = (new_nom, new_age, id_person)
-                    self.cur.execute(sql, val)
-                    self.mydb.commit()
-                    print(f"Personne modifiée : Nom : {new_nom}, Âge : {new_age}")
-                    return
-                except Error as e:
-                    print(f"Erreur lors de la modification : {e}")
-                    return
-        print("Personne non trouvée.")
+        try:
+            self.gestion.modifier_personne(id_person, new_nom, new_age)
+        except PersonneIntrouvable as e:
+            print(e)
+            return
+        except ErreurBase as e:
+            print(f"Erreur lors de la modification : {e}")
+            return
+        print(f"Personne modifiée : Nom : {new_nom}, Âge : {new_age}")
 
-    def __del__(self):
+    def afficher_instrumentation(self):
+        """
+        Mesures des requêtes et des méthodes depuis le lancement (option cachée 99 du menu).
+        """
+        if self.instrumentation is None:
+            print("L'instrumentation est désactivée (option `instrumentation` de la configuration).")
+            return
+        print(self.instrumentation.texte())
+        chemin = input("Exporter les mesures (fichier JSON, vide pour ignorer) : ").strip()
+        if chemin:
+            try:
+                self.instrumentation.exporter(chemin)
+                print(f"Mesures exportées dans {chemin}.")
+            except OSError as e:
+                print(f"Erreur lors de l'export : {e}")
+        if input("Remettre les compteurs à zéro ? (o/n) : ").strip().lower() == "o":
+            self.instrumentation.reinitialiser()
+
+    def fermer(self):
+        """
+        Valide les écritures en attente, écrit l'instantané puis ferme la
+        connexion. Appelé en quittant le menu et, à défaut, à la sortie du
+        programme (atexit).
+        """
+        atexit.unregister(self.fermer)
+        if self.gestion.depot is None:
+            return
+        if self.flush():
+            self.enregistrer_instantane()
         try:
-            if hasattr(self, 'cur') and self.cur:
-                self.cur.close()
-            if hasattr(self, 'mydb') and self.mydb:
-                self.mydb.close()
-        except Exception as e:
+            self.gestion.fermer()
+        except ErreurBase as e:
             print(f"Erreur lors de la fermeture de la connexion : {e}")
 
 def menu():
-    gestion = GestionStagiaires()
+    gestion = GestionConsole()
     while True:
+        gestion.synchroniser()
         print("\n--- Menu Gestion des Utilisateurs ---")
         print("1. Ajouter un utilisateur")
         print("2. Afficher tous les utilisateurs")
@@ -201,23 +364,26 @@ def menu():
         print("5. Saisir les notes d'un utilisateur")
         print("6. Afficher les notes d'un utilisateur")
         print("7. Modifier un utilisateur")
+        print("8. Rechercher par critères (groupe, rôle, âge, nom)")
+        print("9. Importer des utilisateurs (CSV / JSON Lines)")
+        print("10. Exporter des utilisateurs (CSV / JSON Lines / colonnaire)")
+        print("11. Statistiques des notes (moyennes par groupe, classement)")
+        print("12. Moyennes par groupe calculées par la base")
+        print("13. Vérifier la table de synthèse des groupes")
+        print("14. Statistiques du cache des notes")
+        print("15. Saisir les notes d'un groupe (grille)")
+        print("16. Rechercher par nom approché (sans accents, fautes tolérées)")
+        print("17. Saisir une évaluation nommée (avec coefficient)")
         print("0. Quitter")
         choix = input("Votre choix : ")
         if choix == "1":
             try:
-                id_person = int(input("ID : "))
+                id_person = input("ID : ")
                 nom = input("Nom : ")
-                # Vérification du nom
-                if not nom.replace(" ", "").isalpha():
-                    print("Erreur : Le nom doit contenir uniquement des lettres.")
-                    continue
-                age = int(input("Âge (18-30) : "))
+                age = input("Âge (18-30) : ")
                 group = input("Groupe : ")
                 type_person = input("Rôle (Stagiaire/Enseignant) : ")
-                if type_person not in ["Stagiaire", "Enseignant"]:
-                    print("Type invalide.")
-                    continue
-                gestion.ajouter_personne(id_person, nom, age, group, type_person)
+                gestion.ajouter_personne(*valider_personne(id_person, nom, age, group, type_person))
             except Exception as e:
                 print(f"Erreur : {e}")
         elif choix == "2":
@@ -249,20 +415,67 @@ def menu():
         elif choix == "7":
             try:
                 id_person = int(input("ID à modifier : "))
-                new_nom = input("Nouveau nom : ")
-                # Vérification du nom
-                if not new_nom.replace(" ", "").isalpha():
-                    print("Erreur : Le nom doit contenir uniquement des lettres.")
-                    continue
+                new_nom = valider_nom(input("Nouveau nom : "))
                 new_age = int(input("Nouvel âge (18-30) : "))
                 gestion.modifier_personne(id_person, new_nom, new_age)
             except Exception as e:
                 print(f"Erreur : {e}")
+        elif choix == "8":
+            try:
+                print("Laisser vide pour ignorer un critère.")
+                group = input("Groupe : ") or None
+                role = input("Rôle (Stagiaire/Enseignant) : ") or None
+                age_min = input("Âge minimum : ")
+                age_max = input("Âge maximum : ")
+                prefixe_nom = input("Début du nom : ") or None
+                gestion.rechercher_personnes(
+                    group=group,
+                    role=role,
+                    age_min=int(age_min) if age_min else None,
+                    age_max=int(age_max) if age_max else None,
+                    prefixe_nom=prefixe_nom,
+                )
+            except Exception as e:
+                print(f"Erreur : {e}")
+        elif choix == "9":
+            chemin = input("Fichier à importer : ")
+            gestion.importer_personnes(chemin)
+        elif choix == "10":
+            chemin = input("Fichier de destination : ")
+            format_fichier = input("Format (csv/jsonl/colonnes) [csv] : ") or "csv"
+            group = input("Groupe (vide pour tous) : ") or None
+            role = input("Rôle (vide pour tous) : ") or None
+            gestion.exporter_personnes(chemin, format_fichier, group, role)
+        elif choix == "11":
+            gestion.analyser_notes()
+        elif choix == "12":
+            gestion.afficher_moyennes_groupes()
+        elif choix == "13":
+            corriger = input("Reconstruire la table en cas d'écart ? (o/n) : ").strip().lower() == "o"
+            gestion.verifier_stats_groupes(corriger)
+        elif choix == "14":
+            gestion.afficher_stats_cache()
+        elif choix == "15":
+            gestion.saisir_notes_groupe(input("Groupe : ").strip())
+        elif choix == "16":
+            gestion.rechercher_par_nom(input("Nom (ou partie du nom) : "))
+        elif choix == "17":
+            try:
+                id_person = int(input("ID pour saisir l'évaluation : "))
+                gestion.saisir_evaluation(id_person)
+            except Exception as e:
+                print(f"Erreur : {e}")
+        elif choix == "99":
+            # Option non affichée dans le menu : mesures de performance.
+            gestion.afficher_instrumentation()
         elif choix == "0":
+            gestion.fermer()
             print("Au revoir !")
             break
         else:
             print("Choix invalide.")
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(cli.main(sys.argv[1:]))
     menu()
\ No newline at end of file
@@ -0,0 +1,4 @@
+# benchmarks/__init__.py
+"""
+Bancs de mesure des performances (exécutables avec `python -m benchmarks.<module>`).
+"""
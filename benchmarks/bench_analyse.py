@@ -0,0 +1,85 @@
+# benchmarks/bench_analyse.py
+"""
+Compare le moteur d'analyse vectorisé (NumPy) au moteur de repli et à une
+boucle Python naïve (une moyenne pondérée par personne, puis regroupement et
+tris). Chaque stagiaire a entre 0 et `--evaluations` notes, de coefficients
+variés.
+
+    python -m benchmarks.bench_analyse --personnes 100000
+"""
+
+import argparse
+import random
+import statistics
+import time
+from array import array
+
+from gestion import analyse
+
+
+def generer(nb_personnes, nb_groupes=40, nb_evaluations=3, graine=42):
+    """
+    Données au format de `analyse.extraire` : (ids, groupes, notes, debuts, coefficients).
+    """
+    alea = random.Random(graine)
+    ids = list(range(1, nb_personnes + 1))
+    groupes = [f"G{alea.randrange(nb_groupes)}" for _ in ids]
+    notes, coefficients, debuts = array("f"), array("f"), array("q", [0])
+    for _ in ids:
+        for _ in range(nb_evaluations):
+            if alea.random() < 0.8:
+                notes.append(alea.uniform(0, 20))
+                coefficients.append(alea.choice((1.0, 1.0, 2.0, 0.5)))
+        debuts.append(len(notes))
+    return ids, groupes, notes, debuts, coefficients
+
+
+def boucle_naive(ids, groupes, notes, debuts, coefficients):
+    """
+    Référence : ce qu'on écrirait avec `moyenne_notes()` personne par personne.
+    """
+    moyennes = {}
+    par_groupe = {}
+    for i, id_person in enumerate(ids):
+        valeurs = notes[debuts[i]:debuts[i + 1]]
+        poids = coefficients[debuts[i]:debuts[i + 1]]
+        if valeurs:
+            moyennes[id_person] = sum(v * c for v, c in zip(valeurs, poids)) / sum(poids)
+            par_groupe.setdefault(groupes[i], []).append(id_person)
+    stats = {}
+    for group, membres in par_groupe.items():
+        valeurs = [moyennes[m] for m in membres]
+        stats[group] = (statistics.mean(valeurs), statistics.median(valeurs), statistics.pstdev(valeurs),
+                        sum(v >= analyse.SEUIL_REUSSITE for v in valeurs) / len(valeurs),
+                        sorted(membres, key=lambda m: -moyennes[m]))
+    classement = sorted(moyennes, key=lambda m: -moyennes[m])
+    return stats, classement
+
+
+def chronometrer(fonction, *args, **kwargs):
+    debut = time.perf_counter()
+    fonction(*args, **kwargs)
+    return time.perf_counter() - debut
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--personnes", type=int, default=100000)
+    parser.add_argument("--groupes", type=int, default=40)
+    parser.add_argument("--evaluations", type=int, default=3, help="évaluations au plus par personne")
+    args = parser.parse_args()
+
+    donnees = generer(args.personnes, args.groupes, args.evaluations)
+    print(f"{args.personnes} personnes, {args.groupes} groupes, {len(donnees[2])} notes")
+    reference = chronometrer(boucle_naive, *donnees)
+    print(f"{'boucle Python naïve':<24} {reference:8.3f} s")
+    moteurs = ["python"] + (["numpy"] if analyse.np is not None else [])
+    for moteur in moteurs:
+        duree = chronometrer(analyse.analyser, *donnees, moteur=moteur)
+        print(f"{'moteur ' + moteur:<24} {duree:8.3f} s  ({reference / duree:.1f}x)")
+    if analyse.np is None:
+        print("NumPy n'est pas installé : moteur vectorisé non mesuré.")
+
+
+if __name__ == "__main__":
+    main()
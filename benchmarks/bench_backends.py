@@ -0,0 +1,81 @@
+# benchmarks/bench_backends.py
+"""
+Exécute la même charge de travail sur plusieurs moteurs de stockage et
+compare les temps de chaque étape (insertion, chargement, notes, etc.).
+
+    python -m benchmarks.bench_backends --personnes 2000 --backends sqlite mysql
+
+Le moteur MySQL utilise la configuration habituelle (variables GESTION_*) ;
+s'il est indisponible, il est simplement ignoré.
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from gestion.config import charger_config
+from gestion.depots import ErreurBase, creer_depot
+
+
+def charge_de_travail(depot, nb_personnes, graine=42):
+    """
+    Déroule la charge sur `depot` et retourne la durée de chaque étape.
+    """
+    alea = random.Random(graine)
+    ids = list(range(1, nb_personnes + 1))
+    durees = {}
+
+    def etape(nom, fonction):
+        debut = time.perf_counter()
+        fonction()
+        durees[nom] = time.perf_counter() - debut
+
+    etape("insertion", lambda: [
+        depot.inserer_personne(i, f"Personne {i}", alea.randint(18, 30), f"G{i % 20}", "Stagiaire")
+        for i in ids
+    ])
+    etape("notes", lambda: [
+        depot.enregistrer_notes(i, (alea.uniform(0, 20), alea.uniform(0, 20), None)) for i in ids
+    ])
+    etape("chargement", lambda: list(depot.iterer_personnes()))
+    etape("lecture_notes", lambda: [depot.lire_notes(i) for i in ids])
+    etape("modification", lambda: [depot.modifier_personne(i, f"Modifie {i}", 25) for i in ids])
+    etape("suppression", lambda: [depot.supprimer_personne(i) for i in ids])
+    return durees
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--personnes", type=int, default=2000)
+    parser.add_argument("--backends", nargs="+", default=["sqlite"], choices=["sqlite", "mysql"])
+    args = parser.parse_args()
+
+    resultats = {}
+    with tempfile.TemporaryDirectory() as dossier:
+        for backend in args.backends:
+            config = charger_config()
+            config["backend"] = backend
+            config["chemin_sqlite"] = os.path.join(dossier, "bench.db")
+            config["cache_taille"] = 0  # on mesure le moteur, pas le cache des notes
+            try:
+                depot = creer_depot(config)
+            except ErreurBase as e:
+                print(f"{backend} ignoré : {e}")
+                continue
+            try:
+                resultats[backend] = charge_de_travail(depot, args.personnes)
+            finally:
+                depot.fermer()
+
+    if not resultats:
+        return
+    etapes = list(next(iter(resultats.values())))
+    print(f"{'étape':<15}" + "".join(f" | {backend + ' (s)':>12}" for backend in resultats))
+    for etape in etapes:
+        print(f"{etape:<15}" + "".join(f" | {resultats[backend][etape]:>12.3f}" for backend in resultats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# benchmarks/bench_bulletins.py
+"""
+Mesure la génération des bulletins de notes selon le nombre de processus.
+
+Une base SQLite temporaire est peuplée de `--personnes` personnes réparties en
+`--groupes` groupes, puis les bulletins (texte, CSV et HTML) sont générés avec
+1, 2, 4... processus jusqu'à `--processus`. On relève la durée, le débit en
+bulletins par seconde et l'accélération par rapport à un seul processus
+(qui travaille sans pool, sur la connexion du processus principal).
+
+    python -m benchmarks.bench_bulletins --personnes 100000 --groupes 40 --processus 8
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.donnees import generer_personnes, peupler
+from gestion.bulletins import FORMATS, generer_bulletins
+from gestion.config import charger_config
+from gestion.depots import creer_depot
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--personnes", type=int, default=100000)
+    parser.add_argument("--groupes", type=int, default=40)
+    parser.add_argument("--processus", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--format", action="append", choices=FORMATS)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as dossier:
+        config = charger_config()
+        config.update(backend="sqlite", chemin_sqlite=os.path.join(dossier, "bench.db"), cache_taille=0)
+        depot = creer_depot(config)
+        peupler(depot, generer_personnes(args.personnes, nb_groupes=args.groupes))
+        depot.fermer()
+
+        nombres = [1]
+        while nombres[-1] * 2 <= args.processus:
+            nombres.append(nombres[-1] * 2)
+        if nombres[-1] != args.processus:
+            nombres.append(args.processus)
+
+        print(f"{'processus':>9} | {'bulletins':>9} | {'fichiers':>8} | {'durée (s)':>9} | {'bulletins/s':>11} | {'accélération':>12}")
+        reference = None
+        for nombre in nombres:
+            debut = time.perf_counter()
+            bilans = generer_bulletins(config, os.path.join(dossier, f"sortie{nombre}"),
+                                       formats=args.format or FORMATS, nb_processus=nombre)
+            duree = time.perf_counter() - debut
+            reference = reference or duree
+            total = sum(bilan.bulletins for bilan in bilans)
+            fichiers = sum(bilan.fichiers for bilan in bilans)
+            print(f"{nombre:>9} | {total:>9} | {fichiers:>8} | {duree:>9.3f} | {total / duree:>11.0f} | "
+                  f"{reference / duree:>11.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# benchmarks/bench_chargement.py
+"""
+Compare le temps de démarrage (chargement des personnes) entre l'ancien
+schéma N+1 et le chargement en une seule requête, selon le nombre de lignes.
+
+Le banc tourne sur une base SQLite en mémoire, sans serveur MySQL. L'option
+`--latence-ms` simule l'aller-retour réseau d'un serveur distant à chaque
+requête, ce qui est précisément ce que le schéma N+1 multiplie :
+
+    python -m benchmarks.bench_chargement --tailles 1000 10000 100000 --latence-ms 0.2
+"""
+
+import argparse
+import random
+import sqlite3
+import time
+
+from gestion.chargement import TAILLE_LOT_DEFAUT, iterer_personnes
+from gestion.modeles import Note
+
+
+class CurseurLatent:
+    """
+    Enveloppe un curseur et ajoute une latence fixe à chaque `execute`.
+    """
+    def __init__(self, cur, latence):
+        self.cur = cur
+        self.latence = latence
+
+    def execute(self, *args):
+        if self.latence:
+            time.sleep(self.latence)
+        return self.cur.execute(*args)
+
+    def __getattr__(self, nom):
+        return getattr(self.cur, nom)
+
+
+def creer_base(nb_personnes, graine=42):
+    """
+    Crée une base SQLite en mémoire peuplée de `nb_personnes` personnes,
+    dont environ 80 % possèdent deux notes (évaluations note1 et note2).
+    """
+    alea = random.Random(graine)
+    db = sqlite3.connect(":memory:")
+    cur = db.cursor()
+    cur.execute("CREATE TABLE etudiant (id INTEGER PRIMARY KEY, name TEXT, age INTEGER, ed_group TEXT, type TEXT)")
+    cur.execute("CREATE TABLE evaluations (id_ed INTEGER NOT NULL, evaluation TEXT NOT NULL, note REAL NOT NULL, "
+                "coefficient REAL NOT NULL DEFAULT 1, PRIMARY KEY (id_ed, evaluation)) WITHOUT ROWID")
+    cur.executemany(
+        "INSERT INTO etudiant (id, name, age, ed_group, type) VALUES (?, ?, ?, ?, ?)",
+        ((i, f"Personne {i}", alea.randint(18, 30), f"G{i % 20}",
+          "Enseignant" if i % 25 == 0 else "Stagiaire") for i in range(1, nb_personnes + 1))
+    )
+    cur.executemany(
+        "INSERT INTO evaluations (id_ed, evaluation, note, coefficient) VALUES (?, ?, ?, 1)",
+        ((i, evaluation, alea.uniform(0, 20))
+         for i in range(1, nb_personnes + 1) if alea.random() < 0.8
+         for evaluation in ("note1", "note2"))
+    )
+    db.commit()
+    return db
+
+
+def charger_n_plus_un(cur):
+    """
+    Reproduit l'ancien chargement : une requête de notes par personne.
+    """
+    resultat = []
+    cur.execute("SELECT id, name, age, ed_group, type FROM etudiant")
+    for (id_person, nom, age, group, type_person) in cur.fetchall():
+        cur.execute("SELECT evaluation, note, coefficient FROM evaluations WHERE id_ed = ? ORDER BY evaluation",
+                    (id_person,))
+        notes = [Note(*ligne) for ligne in cur.fetchall()]
+        resultat.append((id_person, nom, age, group, type_person, notes))
+    return resultat
+
+
+def charger_en_masse(cur, taille_lot):
+    """
+    Chargement actuel : une seule requête lue par lots.
+    """
+    return list(iterer_personnes(cur, taille_lot))
+
+
+def chronometrer(fonction, *args):
+    debut = time.perf_counter()
+    resultat = fonction(*args)
+    return time.perf_counter() - debut, resultat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tailles", type=int, nargs="+", default=[1000, 10000, 50000, 100000])
+    parser.add_argument("--taille-lot", type=int, default=TAILLE_LOT_DEFAUT)
+    parser.add_argument("--latence-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    print(f"{'lignes':>10} | {'N+1 (s)':>10} | {'en masse (s)':>12} | {'gain':>6}")
+    for taille in args.tailles:
+        db = creer_base(taille)
+        latence = args.latence_ms / 1000
+        duree_ancien, ancien = chronometrer(charger_n_plus_un, CurseurLatent(db.cursor(), latence))
+        duree_nouveau, nouveau = chronometrer(charger_en_masse, CurseurLatent(db.cursor(), latence), args.taille_lot)
+        assert ancien == nouveau, "les deux chargements doivent produire les mêmes personnes"
+        print(f"{taille:>10} | {duree_ancien:>10.3f} | {duree_nouveau:>12.3f} | {duree_ancien / duree_nouveau:>5.1f}x")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
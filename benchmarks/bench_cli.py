@@ -0,0 +1,92 @@
+# benchmarks/bench_cli.py
+"""
+Compare un processus par commande et le mode lot (`--batch`) de la ligne de commande.
+
+Une base SQLite temporaire est peuplée de `--personnes` personnes, puis une
+suite de commandes tirées au hasard (ajouts, saisies de notes, lectures) est
+exécutée de deux façons : `--echantillon` commandes lancées chacune dans son
+propre processus, comme un script shell qui appelle la version console en
+boucle, puis toutes les `--commandes` dans un seul processus avec `--batch`
+(une connexion, une transaction). On relève le débit en commandes par seconde.
+
+    python -m benchmarks.bench_cli --personnes 10000 --commandes 10000 --echantillon 50
+"""
+
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.donnees import generer_personnes
+from gestion.config import charger_config
+from gestion.depots import creer_depot
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Getion_etudiant_console.py")
+
+
+def commandes(nb_personnes, nombre, graine):
+    """
+    Produit des lignes de commande (listes d'arguments) sur les personnes 1 à `nb_personnes`.
+    """
+    alea = random.Random(graine)
+    suivant = nb_personnes + 1
+    for _ in range(nombre):
+        tirage = alea.random()
+        if tirage < 0.2:
+            yield ["add", str(suivant), f"Nouveau {chr(65 + suivant % 26)}", str(alea.randint(18, 30)), "G0", "Stagiaire"]
+            suivant += 1
+        elif tirage < 0.7:
+            yield ["set-grades", str(alea.randint(1, nb_personnes)), "-e", f"devoir{alea.randint(1, 3)}={alea.randint(0, 20)}"]
+        else:
+            yield ["get", str(alea.randint(1, nb_personnes))]
+
+
+def lancer(arguments, environnement, entree=None):
+    resultat = subprocess.run([sys.executable, SCRIPT] + arguments, input=entree, env=environnement,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, universal_newlines=True)
+    # 3 : personne introuvable (une lecture peut viser une personne absente) ; 2 : vraie erreur.
+    if resultat.returncode == 2:
+        raise RuntimeError(f"Échec de la commande : {' '.join(arguments)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--personnes", type=int, default=10000)
+    parser.add_argument("--commandes", type=int, default=10000)
+    parser.add_argument("--echantillon", type=int, default=50)
+    parser.add_argument("--graine", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as dossier:
+        config = charger_config()
+        config.update(backend="sqlite", chemin_sqlite=os.path.join(dossier, "bench.db"), cache_taille=0)
+        depot = creer_depot(config)
+        lignes = list(generer_personnes(args.personnes, graine=args.graine))
+        depot.inserer_personnes(ligne[:5] for ligne in lignes)
+        depot.fermer()
+        environnement = dict(os.environ, GESTION_BACKEND="sqlite", GESTION_CHEMIN_SQLITE=config["chemin_sqlite"],
+                             PYTHONPATH=os.path.dirname(SCRIPT))
+        suite = list(commandes(args.personnes, args.commandes, args.graine))
+
+        print(f"{'mode':<22} | {'commandes':>9} | {'durée (s)':>9} | {'commandes/s':>11}")
+        echantillon = suite[:args.echantillon]
+        debut = time.perf_counter()
+        for arguments in echantillon:
+            lancer(arguments, environnement)
+        duree = time.perf_counter() - debut
+        print(f"{'un processus chacune':<22} | {len(echantillon):>9} | {duree:>9.3f} | {len(echantillon) / duree:>11.1f}")
+
+        # Les ajouts de l'échantillon sont déjà en base : le lot reprend après lui.
+        lot = "\n".join(" ".join(f'"{mot}"' for mot in arguments) for arguments in suite[args.echantillon:])
+        debut = time.perf_counter()
+        lancer(["--batch", "-", "--continuer"], environnement, entree=lot)
+        duree = time.perf_counter() - debut
+        nombre = len(suite) - len(echantillon)
+        print(f"{'--batch':<22} | {nombre:>9} | {duree:>9.3f} | {nombre / duree:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
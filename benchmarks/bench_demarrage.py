@@ -0,0 +1,105 @@
+# benchmarks/bench_demarrage.py
+"""
+Mesure le démarrage à froid de `GestionStagiaires` selon le mode de chargement.
+
+Pour chaque taille, une base SQLite temporaire est peuplée de données
+synthétiques, puis le gestionnaire est démarré quatre fois :
+- complet : personnes et notes lues au démarrage (comportement historique) ;
+- différé : notes lues au premier accès (option `chargement_differe`) ;
+- instantané : reprise de l'instantané local (option `instantane`) après
+  `--modifications` écritures faites par un autre client ;
+- instantané + différé : les deux options à la fois.
+
+On relève la durée du démarrage, celle de la première page de la liste
+(50 lignes triées par nom) et le nombre de lectures groupées de notes.
+
+    python -m benchmarks.bench_demarrage --tailles 10000 100000
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.donnees import generer_personnes
+from gestion.config import charger_config
+from gestion.depots import creer_depot
+from gestion.gestionnaire import GestionStagiaires
+
+MODES = {
+    "complet": {},
+    "différé": {"chargement_differe": True},
+    "instantané": {"instantane": True},
+    "instantané + différé": {"instantane": True, "chargement_differe": True},
+}
+TAILLE_PAGE = 50
+
+
+def creer_base(config, nb_personnes, graine):
+    depot = creer_depot(config)
+    try:
+        lignes = list(generer_personnes(nb_personnes, graine=graine))
+        depot.inserer_personnes(ligne[:5] for ligne in lignes)
+        depot.enregistrer_notes_lot([(ligne[0], ligne[5]) for ligne in lignes if ligne[5] is not None])
+    finally:
+        depot.fermer()
+
+
+def modifier(config, nb_personnes, nombre, graine):
+    """
+    Écritures d'un autre client, entre l'écriture de l'instantané et le redémarrage.
+    """
+    alea = random.Random(graine)
+    depot = creer_depot(config)
+    try:
+        for id_person in alea.sample(range(1, nb_personnes + 1), min(nombre, nb_personnes)):
+            depot.enregistrer_notes(id_person, [("rattrapage", round(alea.uniform(0, 20), 2))])
+    finally:
+        depot.fermer()
+
+
+def demarrer(config):
+    debut = time.perf_counter()
+    gestion = GestionStagiaires(config=config)
+    demarrage = time.perf_counter() - debut
+    debut = time.perf_counter()
+    vue = gestion.vue_paginee()
+    vue.taille_page = TAILLE_PAGE
+    vue.trier("nom")
+    gestion.precharger_notes(vue.en_attente(0, TAILLE_PAGE))
+    vue.page(0)
+    premiere_page = time.perf_counter() - debut
+    gestion.fermer()
+    return demarrage, premiere_page, gestion.chargeur.lectures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tailles", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--modifications", type=int, default=100)
+    parser.add_argument("--graine", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'personnes':>10} | {'mode':<22} | {'démarrage (s)':>13} | {'1re page (s)':>12} | {'lectures':>8}")
+    for taille in args.tailles:
+        with tempfile.TemporaryDirectory() as dossier:
+            base = charger_config()
+            base.update(backend="sqlite", chemin_sqlite=os.path.join(dossier, "bench.db"), cache_taille=0,
+                        instrumentation=False, chargement_differe=False, instantane="")
+            creer_base(base, taille, args.graine)
+            for mode, options in MODES.items():
+                config = dict(base, **options)
+                if options.get("instantane"):
+                    config["instantane"] = os.path.join(dossier, "instantane.bin")
+                    if os.path.exists(config["instantane"]):
+                        os.remove(config["instantane"])
+                    # Premier démarrage : écrit l'instantané ; un autre client écrit ensuite.
+                    GestionStagiaires(config=config).fermer()
+                    modifier(base, taille, args.modifications, args.graine)
+                demarrage, premiere_page, lectures = demarrer(config)
+                print(f"{taille:>10} | {mode:<22} | {demarrage:>13.3f} | {premiere_page:>12.4f} | {lectures:>8}")
+
+
+if __name__ == "__main__":
+    main()
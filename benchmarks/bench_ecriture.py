@@ -0,0 +1,88 @@
+# benchmarks/bench_ecriture.py
+"""
+Compare l'écriture immédiate et l'écriture différée lors d'une rafale de modifications.
+
+Une base SQLite temporaire reçoit une rafale de modifications tirées au
+hasard : renommages répétés d'une même personne, saisies de notes
+successives, ajouts suivis d'une suppression. On mesure la
+durée de la rafale vue par l'appelant, la durée jusqu'à ce que tout soit en
+base (`flush`) et le nombre de transactions validées, en écriture immédiate,
+différée, et différée avec journal local (file durable).
+
+    python -m benchmarks.bench_ecriture --personnes 2000 --operations 5000
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.donnees import generer_personnes
+from gestion.config import charger_config
+from gestion.depots import creer_depot
+from gestion.ecriture_differee import DepotEcritureDifferee
+
+
+def rafale(nb_personnes, nb_operations, graine):
+    """
+    Produit des opérations (méthode, arguments) sur les personnes 1 à `nb_personnes`.
+    """
+    alea = random.Random(graine)
+    suivant = nb_personnes + 1
+    for rang in range(nb_operations):
+        id_person = alea.randint(1, nb_personnes)
+        tirage = alea.random()
+        if tirage < 0.5:
+            yield "modifier_personne", (id_person, f"Renommé {rang}", alea.randint(18, 30))
+        elif tirage < 0.9:
+            yield "enregistrer_notes", (id_person, [(f"devoir{alea.randint(1, 3)}", round(alea.uniform(0, 20), 2))])
+        else:
+            yield "inserer_personne", (suivant, f"Temporaire {suivant}", 20, "G0", "Stagiaire")
+            yield "supprimer_personne", (suivant,)
+            suivant += 1
+
+
+def mesurer(depot, operations):
+    debut = time.perf_counter()
+    for methode, arguments in operations:
+        getattr(depot, methode)(*arguments)
+    appel = time.perf_counter() - debut
+    depot.flush()
+    return appel, time.perf_counter() - debut
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--personnes", type=int, default=2000)
+    parser.add_argument("--operations", type=int, default=5000)
+    parser.add_argument("--delai", type=float, default=0.05)
+    parser.add_argument("--graine", type=int, default=42)
+    args = parser.parse_args()
+
+    operations = list(rafale(args.personnes, args.operations, args.graine))
+    print(f"{len(operations)} opérations sur {args.personnes} personnes")
+    print(f"{'mode':<11} | {'appels (s)':>10} | {'en base (s)':>11} | {'transactions':>12}")
+    for mode in ("immédiate", "différée", "journalisée"):
+        differee = mode != "immédiate"
+        with tempfile.TemporaryDirectory() as dossier:
+            config = charger_config()
+            config.update(backend="sqlite", chemin_sqlite=os.path.join(dossier, "bench.db"), cache_taille=0,
+                          instrumentation=False, ecriture_differee=False)
+            depot = creer_depot(config)
+            lignes = list(generer_personnes(args.personnes, graine=args.graine))
+            depot.inserer_personnes(ligne[:5] for ligne in lignes)
+            depot.enregistrer_notes_lot([(ligne[0], ligne[5]) for ligne in lignes if ligne[5] is not None])
+            version = depot.version_journal()
+            if differee:
+                journal = os.path.join(dossier, "file.journal") if mode == "journalisée" else None
+                depot = DepotEcritureDifferee(depot, delai=args.delai, journal=journal)
+            appel, total = mesurer(depot, operations)
+            transactions = depot.lots if differee else len(operations)
+            print(f"{mode:<11} | {appel:>10.3f} | {total:>11.3f} | {transactions:>12}"
+                  f"   (journal : {depot.version_journal() - version} entrées)")
+            depot.fermer()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# benchmarks/bench_memoire.py
+"""
+Mesure la mémoire occupée par personne chargée selon la représentation retenue.
+
+Les représentations comparées, mesurées avec `tracemalloc` sur la même
+population. Les lignes sont produites à la volée, comme par un curseur : les
+notes (objets float) ne restent en mémoire que si la représentation les
+garde. Les noms et groupes, identiques partout, sont créés à l'avance et ne
+sont pas comptés :
+- l'ancienne classe (dictionnaire d'attributs, notes dans une liste) ;
+- `gestion.modeles.Person` (`__slots__`, notes et coefficients dans des array('f'),
+  suite des noms d'évaluations partagée) ;
+- `gestion.modeles.PersonTable` avec une vue par personne (ce que garde le registre) ;
+- `PersonTable` seule (colonnes brutes, sans objet par personne).
+
+    python -m benchmarks.bench_memoire --personnes 100000
+"""
+
+import argparse
+import gc
+import random
+import tracemalloc
+
+from gestion.modeles import Note, PersonTable, creer_personne
+
+GROUPES = [f"G{g}" for g in range(20)]
+
+
+class PersonneAncienne:
+    """
+    Reproduit l'ancienne classe Person : attributs dans un __dict__, notes dans une liste.
+    """
+    def __init__(self, id_person, nom, age, group, notes=None):
+        self.id_person = id_person
+        self.nom = nom
+        self.age = age
+        self.group = group
+        self.notes = notes if notes is not None else []
+
+
+def generer(noms, graine=42):
+    """
+    Lignes (id, nom, age, groupe, type, notes) comme les produit `iterer_personnes`.
+    """
+    alea = random.Random(graine)
+    for i, nom in enumerate(noms, 1):
+        notes = [Note("note1", alea.uniform(0, 20), 1.0),
+                 Note("note2", alea.uniform(0, 20), 1.0)] if alea.random() < 0.8 else []
+        yield (i, nom, alea.randint(18, 30), GROUPES[i % len(GROUPES)],
+               "Enseignant" if i % 25 == 0 else "Stagiaire", notes)
+
+
+def construire_ancien(lignes):
+    return [PersonneAncienne(i, nom, age, group, [n.note for n in notes]) for (i, nom, age, group, _, notes) in lignes]
+
+
+def construire_slots(lignes):
+    return [creer_personne(ligne) for ligne in lignes]
+
+
+def construire_vues(lignes):
+    table = PersonTable()
+    return table, [table.creer_personne(ligne) for ligne in lignes]
+
+
+def construire_table(lignes):
+    table = PersonTable()
+    for ligne in lignes:
+        table.ajouter(*ligne)
+    return table
+
+
+def mesurer(construire, noms):
+    """
+    Octets alloués (et toujours vivants) par la construction.
+    """
+    gc.collect()
+    tracemalloc.start()
+    avant = tracemalloc.get_traced_memory()[0]
+    resultat = construire(generer(noms))
+    apres = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del resultat
+    return apres - avant
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--personnes", type=int, default=100000)
+    args = parser.parse_args()
+
+    noms = [f"Personne {i}" for i in range(1, args.personnes + 1)]
+    variantes = [
+        ("classe avec __dict__", construire_ancien),
+        ("Person (__slots__)", construire_slots),
+        ("PersonTable + vues", construire_vues),
+        ("PersonTable seule", construire_table),
+    ]
+    print(f"{args.personnes} personnes (noms et groupes partagés, non comptés)")
+    print(f"{'représentation':<24} | {'total (Mo)':>10} | {'octets/personne':>15}")
+    reference = None
+    for libelle, construire in variantes:
+        octets = mesurer(construire, noms)
+        reference = reference or octets
+        print(f"{libelle:<24} | {octets / 1e6:>10.1f} | {octets / args.personnes:>15.0f}"
+              f"  ({reference / octets:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# benchmarks/bench_recherche.py
+"""
+Mesure la recherche approchée par nom (`gestion.index_noms`) sur une grande population.
+
+Les noms sont composés de prénoms et de noms accentués et de syllabes tirées
+au hasard (graine fixe). Les recherches reprennent des noms existants,
+altérés comme le ferait un utilisateur : accents omis, majuscules, nom de
+famille seul, lettre oubliée ou inversée. On relève la construction de
+l'index, la durée des recherches (médiane, 95e centile, maximum) et celle
+des mises à jour incrémentales.
+
+    python -m benchmarks.bench_recherche --personnes 200000
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from gestion.index_noms import IndexNoms, replier
+
+PRENOMS = ["Ali", "Sara", "Lina", "Karim", "Yasmine", "Mehdi", "Inès", "Noé", "Chloé", "Zoé", "Amine", "Rémi",
+           "Hélène", "Jérôme", "Françoise", "Loïc", "Anaïs", "Maël", "Océane", "Benoît", "Léa", "Hugo", "Aïcha",
+           "Youssef", "Céline", "Théo", "Manon", "Éloïse", "Nour", "Gaëlle"]
+NOMS = ["Benaïssa", "Dupont", "Lefèvre", "Müller", "Ngô", "García", "Moreau", "Østergaard", "Brahimi",
+        "El Amrani", "Boulanger", "Côté", "Lévêque", "Haddad", "Rousseau", "Fontaine", "Chevalier", "Gauthier",
+        "Mercier", "Bouchard", "Saïdi", "Lemaître", "Pérez", "Œuvrard", "Kowalski", "Nguyễn"]
+SYLLABES = ["ba", "ben", "cha", "dé", "el", "fa", "gui", "ha", "ka", "lou", "ma", "mé", "na", "ni", "ou", "ra",
+            "ré", "sa", "sou", "ta", "té", "va", "ya", "za", "zi", "ïa", "ro", "lin", "mar", "tin"]
+
+
+def generer_noms(nb, graine):
+    alea = random.Random(graine)
+    for id_person in range(1, nb + 1):
+        if alea.random() < 0.5:
+            nom = f"{alea.choice(PRENOMS)} {alea.choice(NOMS)}"
+        else:
+            nom = "".join(alea.choice(SYLLABES) for _ in range(alea.randint(2, 4)))
+            nom = f"{alea.choice(PRENOMS)} {nom.capitalize()}"
+        yield id_person, nom
+
+
+def alterer(nom, alea):
+    """
+    Variante d'un nom telle qu'un utilisateur la taperait.
+    """
+    choix = alea.randrange(4)
+    if choix == 0:
+        return replier(nom)
+    if choix == 1:
+        return nom.split()[-1].upper()
+    lettres = list(replier(nom))
+    position = alea.randrange(1, len(lettres) - 1)
+    if choix == 2:
+        del lettres[position]
+    else:
+        lettres[position - 1], lettres[position] = lettres[position], lettres[position - 1]
+    return "".join(lettres)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--personnes", type=int, default=200000)
+    parser.add_argument("--recherches", type=int, default=1000)
+    parser.add_argument("--limite", type=int, default=20)
+    parser.add_argument("--graine", type=int, default=42)
+    args = parser.parse_args()
+
+    noms = dict(generer_noms(args.personnes, args.graine))
+    debut = time.perf_counter()
+    index = IndexNoms(noms.items())
+    print(f"{args.personnes} noms : index construit en {time.perf_counter() - debut:.2f} s")
+
+    alea = random.Random(args.graine)
+    durees, trouves = [], 0
+    for id_person in alea.sample(list(noms), args.recherches):
+        texte = alterer(noms[id_person], alea)
+        debut = time.perf_counter()
+        resultats = index.rechercher(texte, args.limite)
+        durees.append((time.perf_counter() - debut) * 1000)
+        trouves += any(replier(noms[i]) == replier(noms[id_person]) for i, _ in resultats)
+    durees.sort()
+    print(f"{args.recherches} recherches : médiane {statistics.median(durees):.2f} ms, "
+          f"95e centile {durees[int(len(durees) * 0.95)]:.2f} ms, maximum {durees[-1]:.2f} ms")
+    print(f"nom visé parmi les {args.limite} premiers : {trouves / args.recherches:.1%}")
+
+    nouveaux = list(generer_noms(args.recherches, args.graine + 1))
+    debut = time.perf_counter()
+    for id_person, nom in nouveaux:
+        index.ajouter(args.personnes + id_person, nom)
+    for id_person, nom in nouveaux:
+        index.ajouter(args.personnes + id_person, nom[::-1])
+    for id_person, _ in nouveaux:
+        index.retirer(args.personnes + id_person)
+    duree = time.perf_counter() - debut
+    print(f"mises à jour (ajout, renommage, retrait) : {duree / (3 * len(nouveaux)) * 1e6:.1f} µs par opération")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# benchmarks/bench_service.py
+"""
+Test de charge du service asynchrone : débit et latence selon le nombre de clients concurrents.
+
+Chaque client enchaîne, pendant `--duree` secondes, des lectures (personne ou
+notes d'un ID tiré au hasard) et une part `--ecritures` d'enregistrements de
+notes. Deux dépôts sont proposés : une base SQLite locale (fichier temporaire,
+mode WAL) ou un dépôt factice en mémoire dont chaque appel coûte
+`--latence-ms` millisecondes, pour simuler un serveur distant :
+
+    python -m benchmarks.bench_service --backend sqlite --clients 1 10 100
+    python -m benchmarks.bench_service --backend factice --latence-ms 2
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from gestion.config import charger_config
+from gestion.depots import creer_depot
+from gestion.service import AsyncGestionStagiaires
+
+from benchmarks.donnees import DepotFactice
+
+
+def peupler(depot, nb_personnes, graine=42):
+    alea = random.Random(graine)
+    depot.inserer_personnes(
+        (i, f"Personne {i}", alea.randint(18, 30), f"G{i % 20}", "Stagiaire") for i in range(1, nb_personnes + 1)
+    )
+    for i in range(1, nb_personnes + 1, 10):
+        depot.enregistrer_notes(i, (alea.uniform(0, 20), alea.uniform(0, 20), None))
+
+
+async def client(service, nb_personnes, fin, part_ecritures, alea, latences):
+    while time.perf_counter() < fin:
+        id_person = alea.randint(1, nb_personnes)
+        tirage = alea.random()
+        debut = time.perf_counter()
+        if tirage < part_ecritures:
+            await service.enregistrer_notes(id_person, [alea.uniform(0, 20), None, None])
+        elif tirage < (1 + part_ecritures) / 2:
+            await service.obtenir_personne(id_person)
+        else:
+            await service.obtenir_notes(id_person)
+        latences.append(time.perf_counter() - debut)
+
+
+async def mesurer(service, nb_clients, nb_personnes, duree, part_ecritures):
+    latences = []
+    fin = time.perf_counter() + duree
+    debut = time.perf_counter()
+    await asyncio.gather(*(
+        client(service, nb_personnes, fin, part_ecritures, random.Random(numero), latences)
+        for numero in range(nb_clients)
+    ))
+    ecoule = time.perf_counter() - debut
+    latences.sort()
+    p95 = latences[int(0.95 * (len(latences) - 1))] if latences else 0.0
+    return len(latences), len(latences) / ecoule, statistics.median(latences) if latences else 0.0, p95
+
+
+async def executer(args, dossier):
+    if args.backend == "factice":
+        depot = DepotFactice(args.latence_ms / 1000)
+        nb_threads = args.threads
+    else:
+        config = charger_config()
+        config["backend"] = "sqlite"
+        config["chemin_sqlite"] = os.path.join(dossier, "service.db")
+        config["taille_pool"] = args.threads
+        config["cache_taille"] = args.cache_taille
+        depot = creer_depot(config)
+        nb_threads = args.threads
+    peupler(depot, args.personnes)
+    async with AsyncGestionStagiaires(depot, nb_threads=nb_threads) as service:
+        print(f"{args.backend}, {args.personnes} personnes, {nb_threads} threads, "
+              f"{args.ecritures:.0%} d'écritures, {args.duree:.0f} s par palier")
+        print(f"{'clients':>8} | {'requêtes':>9} | {'req/s':>9} | {'p50 (ms)':>9} | {'p95 (ms)':>9}")
+        for nb_clients in args.clients:
+            total, debit, p50, p95 = await mesurer(service, nb_clients, args.personnes, args.duree, args.ecritures)
+            print(f"{nb_clients:>8} | {total:>9} | {debit:>9.0f} | {p50 * 1000:>9.2f} | {p95 * 1000:>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--backend", choices=["sqlite", "factice"], default="sqlite")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--personnes", type=int, default=10000)
+    parser.add_argument("--duree", type=float, default=3.0)
+    parser.add_argument("--ecritures", type=float, default=0.1)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--latence-ms", type=float, default=1.0)
+    parser.add_argument("--cache-taille", type=int, default=0, help="cache des notes (SQLite), 0 pour aucun")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as dossier:
+        asyncio.run(executer(args, dossier))
+
+
+if __name__ == "__main__":
+    main()
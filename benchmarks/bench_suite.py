@@ -0,0 +1,226 @@
+# benchmarks/bench_suite.py
+"""
+Suite de mesures de `GestionStagiaires` sur des données synthétiques, de 1 000 à 1 000 000 de personnes.
+
+Pour chaque taille, la population est générée de façon déterministe (voir
+`benchmarks.donnees`), insérée dans un dépôt sans serveur (factice en
+mémoire, ou SQLite dans un fichier temporaire), puis on chronomètre le
+chargement, chaque méthode CRUD, le calcul des moyennes et l'affichage de la
+liste. Chaque étape est répétée `--repetitions` fois ; on retient la plus
+courte. Les résultats s'écrivent en JSON et se comparent à une exécution
+précédente pour repérer les régressions (code de sortie 1 s'il y en a) :
+
+    python -m benchmarks.bench_suite --tailles 1000 10000 --sortie avant.json
+    python -m benchmarks.bench_suite --tailles 1000 10000 --comparer avant.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from gestion.config import charger_config
+from gestion.depots import creer_depot
+from gestion.gestionnaire import GestionStagiaires
+from gestion.pagination import ligne_affichage
+
+from benchmarks.donnees import DepotFactice, generer_personnes, peupler
+
+FORMAT = 1
+TAILLES_DEFAUT = [1000, 10000, 100000, 1000000]
+SEUIL_DEFAUT = 0.25      # +25 % de temps : régression
+PLANCHER_S = 0.001       # en dessous d'une milliseconde d'écart, c'est du bruit
+
+
+def chronometrer(fonction, repetitions, preparer=None):
+    """
+    Plus courte durée de `fonction()` sur `repetitions` essais ; `preparer()`
+    est appelée avant chaque essai, hors chronomètre.
+    """
+    meilleure = None
+    for _ in range(repetitions):
+        if preparer is not None:
+            preparer()
+        debut = time.perf_counter()
+        fonction()
+        duree = time.perf_counter() - debut
+        meilleure = duree if meilleure is None else min(meilleure, duree)
+    return meilleure
+
+
+def creer(args, dossier, taille):
+    config = charger_config()
+    config["cache_taille"] = 0  # on mesure le gestionnaire et le moteur, pas le cache des notes
+    config["table_personnes"] = args.table_personnes
+    if args.backend == "factice":
+        return config, DepotFactice()
+    config["backend"] = "sqlite"
+    config["chemin_sqlite"] = os.path.join(dossier, f"suite_{taille}.db")
+    return config, creer_depot(config)
+
+
+def mesurer_taille(args, dossier, taille):
+    """
+    Déroule toutes les étapes pour une taille donnée.
+    Retourne {étape: {"secondes", "operations", "us_par_operation"}}.
+    """
+    resultats = {}
+
+    def noter(etape, secondes, operations=1):
+        resultats[etape] = {
+            "secondes": secondes,
+            "operations": operations,
+            "us_par_operation": secondes / operations * 1e6,
+        }
+
+    config, depot = creer(args, dossier, taille)
+    lignes = generer_personnes(taille, args.groupes, args.enseignants, args.densite, args.graine,
+                               nb_evaluations=args.evaluations)
+    debut = time.perf_counter()
+    peupler(depot, lignes)
+    noter("peuplement", time.perf_counter() - debut, taille)
+
+    gestion = GestionStagiaires(config=config, depot=depot, demarrer=False)
+    try:
+        repetitions = args.repetitions
+        noter("chargement", chronometrer(gestion.load_personnes_from_db, repetitions), taille)
+
+        alea = random.Random(args.graine)
+        ids = alea.sample(range(1, taille + 1), min(args.operations, taille))
+        nouveaux = range(taille + 1, taille + 1 + len(ids))
+        groupes = gestion.groupes()
+        n = len(ids)
+
+        def boucle(fonction, valeurs):
+            return lambda: [fonction(valeur) for valeur in valeurs]
+
+        noter("rechercher_personne", chronometrer(boucle(gestion.rechercher_personne, ids), repetitions), n)
+        noter("rechercher_personnes", chronometrer(
+            boucle(lambda g: gestion.rechercher_personnes(group=g, role="Stagiaire"), groupes), repetitions),
+            len(groupes))
+        noter("modifier_personne", chronometrer(
+            boucle(lambda i: gestion.modifier_personne(i, f"Modifié {i}", 25), ids), repetitions), n)
+        noter("enregistrer_notes", chronometrer(
+            boucle(lambda i: gestion.enregistrer_notes(i, (10.0, 12.5, None)), ids), repetitions), n)
+        noter("obtenir_notes", chronometrer(boucle(gestion.obtenir_notes, ids), repetitions), n)
+
+        # Ajout et suppression se défont l'un l'autre : on les alterne pour répéter.
+        ajouts, suppressions = [], []
+        for _ in range(repetitions):
+            ajouts.append(chronometrer(boucle(
+                lambda i: gestion.ajouter_personne(i, f"Nouveau {i}", 20, "G0", "Stagiaire"), nouveaux), 1))
+            suppressions.append(chronometrer(boucle(gestion.supprimer_personne, nouveaux), 1))
+        noter("ajouter_personne", min(ajouts), n)
+        noter("supprimer_personne", min(suppressions), n)
+
+        noter("synchroniser", chronometrer(gestion.synchroniser, repetitions))
+        noter("moyennes", chronometrer(gestion.analyser_notes, repetitions), taille)
+        noter("moyennes_groupes", chronometrer(depot.moyennes_groupes, repetitions))
+        noter("liste", chronometrer(
+            lambda: [ligne_affichage(p) for p in gestion.get_personnes()], repetitions), taille)
+
+        def liste_triee():
+            vue = gestion.vue_paginee()
+            vue.trier("moyenne", descendant=True)
+            en_attente = vue.en_attente(0, vue.taille_page)
+            if en_attente:
+                gestion.precharger_notes(en_attente)
+                vue.rafraichir()
+            vue.page(0)
+
+        noter("liste_triee", chronometrer(liste_triee, repetitions), taille)
+    finally:
+        gestion.fermer()
+    return resultats
+
+
+def environnement():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "plateforme": platform.platform(),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def comparer(reference, courant, seuil):
+    """
+    Compare deux résultats étape par étape ; retourne la liste des régressions
+    (taille, étape, avant, après) et affiche le tableau des rapports.
+    """
+    regressions = []
+    print(f"{'taille':>8} | {'étape':<22} | {'avant (s)':>10} | {'après (s)':>10} | {'rapport':>7}")
+    for taille, etapes in courant["resultats"].items():
+        anciennes = reference["resultats"].get(taille, {})
+        for etape, mesure in etapes.items():
+            if etape not in anciennes:
+                continue
+            avant, apres = anciennes[etape]["secondes"], mesure["secondes"]
+            rapport = apres / avant if avant else float("inf")
+            regression = rapport > 1 + seuil and apres - avant > PLANCHER_S
+            if regression:
+                regressions.append((taille, etape, avant, apres))
+            print(f"{taille:>8} | {etape:<22} | {avant:>10.4f} | {apres:>10.4f} | {rapport:>6.2f}x"
+                  + ("  <-- régression" if regression else ""))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tailles", type=int, nargs="+", default=TAILLES_DEFAUT)
+    parser.add_argument("--backend", choices=["factice", "sqlite"], default="factice")
+    parser.add_argument("--groupes", type=int, default=40)
+    parser.add_argument("--enseignants", type=float, default=0.04, help="part d'enseignants")
+    parser.add_argument("--densite", type=float, default=0.8, help="probabilité qu'une note soit saisie")
+    parser.add_argument("--evaluations", type=int, default=3, help="évaluations par stagiaire")
+    parser.add_argument("--graine", type=int, default=42)
+    parser.add_argument("--operations", type=int, default=1000, help="appels par méthode CRUD")
+    parser.add_argument("--repetitions", type=int, default=3)
+    parser.add_argument("--table-personnes", action="store_true", help="personnes rangées en colonnes")
+    parser.add_argument("--sortie", help="fichier JSON des résultats")
+    parser.add_argument("--comparer", metavar="REFERENCE", help="résultats JSON d'une exécution précédente")
+    parser.add_argument("--seuil", type=float, default=SEUIL_DEFAUT, help="hausse tolérée (0.25 = +25 %%)")
+    args = parser.parse_args()
+
+    parametres = {cle: getattr(args, cle) for cle in
+                  ("backend", "groupes", "enseignants", "densite", "graine", "evaluations", "operations",
+                   "repetitions", "table_personnes")}
+    courant = {"format": FORMAT, "environnement": environnement(), "parametres": parametres, "resultats": {}}
+    with tempfile.TemporaryDirectory() as dossier:
+        for taille in args.tailles:
+            print(f"--- {taille} personnes ({args.backend}) ---", file=sys.stderr)
+            resultats = mesurer_taille(args, dossier, taille)
+            courant["resultats"][str(taille)] = resultats
+            for etape, mesure in resultats.items():
+                print(f"{etape:<22} {mesure['secondes']:>10.4f} s  {mesure['us_par_operation']:>12.2f} µs/op",
+                      file=sys.stderr)
+
+    if args.sortie:
+        with open(args.sortie, "w", encoding="utf-8") as fichier:
+            json.dump(courant, fichier, indent=2, ensure_ascii=False)
+    if args.comparer:
+        with open(args.comparer, encoding="utf-8") as fichier:
+            reference = json.load(fichier)
+        if reference.get("parametres") != parametres:
+            print("Attention : paramètres différents de ceux de la référence.", file=sys.stderr)
+        regressions = comparer(reference, courant, args.seuil)
+        if regressions:
+            print(f"{len(regressions)} régression(s) au-delà de +{args.seuil:.0%}.")
+            sys.exit(1)
+    elif not args.sortie:
+        json.dump(courant, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+# benchmarks/donnees.py
+"""
+Données synthétiques et dépôt factice partagés par les bancs de mesure.
+
+`generer_personnes` produit une population déterministe (même graine, mêmes
+lignes) : nombre de personnes, nombre de groupes, part d'enseignants, nombre
+d'évaluations par personne et densité de notes (probabilité qu'une
+évaluation soit notée) sont réglables. `DepotFactice` est un dépôt complet en mémoire, sans base de
+données, qui peut simuler la latence d'un serveur distant.
+"""
+
+import random
+import threading
+import time
+
+from gestion.chargement import TAILLE_LOT_DEFAUT
+from gestion.depots import DepotPersonnes
+from gestion.modeles import NB_NOTES, fusionner_notes
+from gestion.resume_groupes import EMPLACEMENT_EFFECTIF, ajouter_delta, delta_notes, moyennes
+
+AGE_MIN, AGE_MAX = 18, 30
+
+
+def generer_personnes(nb_personnes, nb_groupes=20, part_enseignants=0.04, densite_notes=0.8, graine=42, premier_id=1,
+                      nb_evaluations=NB_NOTES):
+    """
+    Produit les lignes (id, nom, age, groupe, type, notes) d'une population
+    synthétique ; `notes` est une suite positionnelle de `nb_evaluations`
+    notes (évaluations note1, note2... ; None pour une note absente), ou
+    None si la personne n'a aucune note (c'est toujours le cas d'un enseignant).
+    """
+    alea = random.Random(graine)
+    for id_person in range(premier_id, premier_id + nb_personnes):
+        group = f"G{alea.randrange(nb_groupes)}"
+        age = alea.randint(AGE_MIN, AGE_MAX)
+        if alea.random() < part_enseignants:
+            yield (id_person, f"Enseignant {id_person}", age, group, "Enseignant", None)
+            continue
+        notes = tuple(round(alea.uniform(0, 20), 2) if alea.random() < densite_notes else None
+                      for _ in range(nb_evaluations))
+        yield (id_person, f"Stagiaire {id_person}", age, group, "Stagiaire",
+               notes if any(n is not None for n in notes) else None)
+
+
+def peupler(depot, lignes, taille_lot=TAILLE_LOT_DEFAUT):
+    """
+    Insère les lignes de `generer_personnes` dans `depot` (personnes par lots,
+    puis notes). Retourne le nombre de personnes insérées.
+    """
+    lignes = list(lignes)
+    total = depot.inserer_personnes((ligne[:5] for ligne in lignes), taille_lot)
+    for ligne in lignes:
+        if ligne[5] is not None:
+            depot.enregistrer_notes(ligne[0], ligne[5])
+    return total
+
+
+class DepotFactice(DepotPersonnes):
+    """
+    Dépôt en mémoire ; chaque appel unitaire attend `latence` secondes (sans
+    tenir le GIL). Il tient un journal des modifications comme les dépôts SQL.
+    """
+    def __init__(self, latence=0.0):
+        self.latence = latence
+        self.personnes = {}
+        self.notes = {}
+        self.journal = []
+        self.verrou = threading.Lock()
+
+    def _attendre(self):
+        if self.latence:
+            time.sleep(self.latence)
+
+    def _journaliser(self, id_person):
+        self.journal.append(id_person)
+
+    def _ligne(self, id_person):
+        return self.personnes[id_person] + (list(self.notes.get(id_person, ())),)
+
+    def iterer_personnes(self, taille_lot=TAILLE_LOT_DEFAUT, avec_notes=True):
+        self._attendre()
+        with self.verrou:
+            if avec_notes:
+                lignes = [self._ligne(id_person) for id_person in sorted(self.personnes)]
+            else:
+                lignes = [self.personnes[id_person] + (None,) for id_person in sorted(self.personnes)]
+        yield from lignes
+
+    def inserer_personne(self, id_person, nom, age, group, type_person):
+        self._attendre()
+        with self.verrou:
+            self.personnes[id_person] = (id_person, nom, age, group, type_person)
+            self._journaliser(id_person)
+
+    def inserer_personnes(self, personnes, taille_lot=TAILLE_LOT_DEFAUT):
+        total = 0
+        with self.verrou:
+            for personne in personnes:
+                self.personnes[personne[0]] = tuple(personne)
+                self._journaliser(personne[0])
+                total += 1
+        return total
+
+    def iterer_ids(self):
+        return iter(list(self.personnes))
+
+    def compter_personnes(self):
+        return len(self.personnes)
+
+    def lire_personne(self, id_person):
+        self._attendre()
+        with self.verrou:
+            return self._ligne(id_person) if id_person in self.personnes else None
+
+    def modifier_personne(self, id_person, nom, age):
+        self._attendre()
+        with self.verrou:
+            ligne = self.personnes.get(id_person)
+            if ligne is not None:
+                self.personnes[id_person] = (id_person, nom, age) + ligne[3:]
+                self._journaliser(id_person)
+        return ligne is not None
+
+    def supprimer_personne(self, id_person):
+        self._attendre()
+        with self.verrou:
+            self.notes.pop(id_person, None)
+            existait = self.personnes.pop(id_person, None) is not None
+            if existait:
+                self._journaliser(id_person)
+            return existait
+
+    def lire_notes(self, id_person):
+        self._attendre()
+        return list(self.notes.get(id_person, ()))
+
+    def lire_notes_lot(self, ids):
+        self._attendre()
+        with self.verrou:
+            return {id_person: list(self.notes[id_person]) for id_person in ids if self.notes.get(id_person)}
+
+    def enregistrer_notes(self, id_person, notes):
+        self._attendre()
+        with self.verrou:
+            self.notes[id_person] = fusionner_notes(self.notes.get(id_person, ()), notes)
+            self._journaliser(id_person)
+
+    def enregistrer_notes_lot(self, saisies):
+        self._attendre()
+        saisies = list(saisies)
+        with self.verrou:
+            for id_person, notes in saisies:
+                self.notes[id_person] = fusionner_notes(self.notes.get(id_person, ()), notes)
+                self._journaliser(id_person)
+        return len(saisies)
+
+    def moyennes_groupes(self):
+        self._attendre()
+        contenu = {}
+        with self.verrou:
+            for id_person, ligne in self.personnes.items():
+                ajouter_delta(contenu, ligne[3], EMPLACEMENT_EFFECTIF, 0.0, 1)
+                delta_notes(contenu, ligne[3], (), self.notes.get(id_person, ()))
+        return moyennes(contenu)
+
+    def verifier_stats(self, corriger=False):
+        # Les moyennes sont recalculées à chaque appel : aucune synthèse à vérifier.
+        return []
+
+    def version_journal(self):
+        return len(self.journal)
+
+    def changements_depuis(self, version, trous=()):
+        # Journal en mémoire, numéroté dans l'ordre des écritures : jamais de trou.
+        self._attendre()
+        with self.verrou:
+            ids = set(self.journal[version:])
+            ecrites = [self._ligne(id_person) for id_person in ids if id_person in self.personnes]
+            supprimees = [id_person for id_person in ids if id_person not in self.personnes]
+            return len(self.journal), ecrites, supprimees, []
+
+    def initialiser_schema(self):
+        pass
+
+    def fermer(self):
+        pass
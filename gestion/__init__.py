@@ -0,0 +1,9 @@
+# gestion/__init__.py
+"""
+Couche de données partagée par la version console et la version graphique.
+
+Le paquet n'importe aucun de ses modules : chacun est importé directement
+(`from gestion.gestionnaire import GestionStagiaires`), ce qui ne charge que
+ce dont l'appelant a besoin (numpy pour `gestion.analyse`, multiprocessing
+pour `gestion.bulletins`, asyncio pour `gestion.service`...).
+"""
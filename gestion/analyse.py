@@ -0,0 +1,293 @@
+# gestion/analyse.py
+"""
+Statistiques sur les notes : moyenne pondérée de chaque personne, moyenne,
+médiane et écart-type par groupe, taux de réussite, percentiles et classements.
+
+Les notes de toutes les personnes sont mises bout à bout dans un tableau
+plat, avec le tableau parallèle des coefficients ; `debuts` (n + 1 entrées)
+donne la tranche de chaque personne : ses notes sont
+`notes[debuts[i]:debuts[i + 1]]`, en nombre quelconque. Avec NumPy,
+l'ensemble des statistiques est calculé en une passe vectorisée (bincount,
+tri lexicographique) ; sans NumPy, un moteur de repli en Python pur sur des
+tableaux `array` produit exactement les mêmes résultats.
+"""
+
+import math
+import statistics
+from array import array
+from collections import namedtuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy est facultatif
+    np = None
+
+SEUIL_REUSSITE = 10.0
+PERCENTILES = (10, 25, 50, 75, 90)
+
+StatsGroupe = namedtuple("StatsGroupe", "effectif evalues moyenne mediane ecart_type taux_reussite")
+
+
+class ResultatsAnalyse:
+    """
+    Résultats d'une analyse. Les séquences `ids`, `groupes`, `moyennes`,
+    `rangs_groupe` et `rangs_general` sont alignées et ne concernent que les
+    personnes ayant au moins une note.
+    """
+    def __init__(self, ids, groupes, moyennes, rangs_groupe, rangs_general, par_groupe, percentiles, moteur):
+        self.ids = ids
+        self.groupes = groupes
+        self.moyennes = moyennes
+        self.rangs_groupe = rangs_groupe
+        self.rangs_general = rangs_general
+        self.par_groupe = par_groupe
+        self.percentiles = percentiles
+        self.moteur = moteur
+        self.__positions = None
+
+    def __position(self, id_person):
+        if self.__positions is None:
+            self.__positions = {int(i): position for position, i in enumerate(self.ids)}
+        return self.__positions.get(id_person)
+
+    def moyenne(self, id_person):
+        """
+        Moyenne d'une personne, ou None si elle n'a aucune note.
+        """
+        position = self.__position(id_person)
+        return None if position is None else float(self.moyennes[position])
+
+    def rang(self, id_person):
+        """
+        Couple (rang dans le groupe, rang général), ou None si la personne n'a aucune note.
+        """
+        position = self.__position(id_person)
+        if position is None:
+            return None
+        return int(self.rangs_groupe[position]), int(self.rangs_general[position])
+
+    def classement(self, group=None, limite=None):
+        """
+        Liste de tuples (rang, id, moyenne) triée par rang, pour un groupe ou pour tous.
+        """
+        rangs = self.rangs_general if group is None else self.rangs_groupe
+        lignes = [
+            (int(rangs[i]), int(self.ids[i]), float(self.moyennes[i]))
+            for i in range(len(self.ids))
+            if group is None or self.groupes[i] == group
+        ]
+        lignes.sort()
+        return lignes[:limite] if limite is not None else lignes
+
+    def resume(self):
+        """
+        Texte récapitulatif (statistiques par groupe et percentiles).
+        """
+        lignes = [f"{'Groupe':<12} | {'Effectif':>8} | {'Évalués':>7} | {'Moyenne':>7} | {'Médiane':>7} | {'Écart-type':>10} | {'Réussite':>8}"]
+        for nom, stats in sorted(self.par_groupe.items()):
+            lignes.append(
+                f"{nom:<12} | {stats.effectif:>8} | {stats.evalues:>7} | {_format(stats.moyenne):>7} | "
+                f"{_format(stats.mediane):>7} | {_format(stats.ecart_type):>10} | {_format(stats.taux_reussite * 100, '%'):>8}"
+            )
+        lignes.append("Percentiles des moyennes : " + ", ".join(
+            f"P{p} = {_format(valeur)}" for p, valeur in self.percentiles.items()
+        ))
+        return "\n".join(lignes)
+
+
+def _format(valeur, suffixe=""):
+    return "-" if valeur is None or math.isnan(valeur) else f"{valeur:.2f}{suffixe}"
+
+
+def extraire(personnes):
+    """
+    Convertit des objets Person en (ids, groupes, notes, debuts,
+    coefficients) : `notes` et `coefficients` sont des array('f') plats,
+    `debuts` un array('q') de n + 1 positions.
+    """
+    ids = array("q")
+    groupes = []
+    notes = array("f")
+    coefficients = array("f")
+    debuts = array("q", [0])
+    un = array("f", [1.0])
+    for p in personnes:
+        ids.append(p.id_person)
+        groupes.append(str(p.group))
+        valeurs, poids = p.tableaux_notes()
+        notes.extend(valeurs)
+        coefficients.extend(un * len(valeurs) if poids is None else poids)
+        debuts.append(len(notes))
+    return ids, groupes, notes, debuts, coefficients
+
+
+def analyser_personnes(personnes, moteur=None):
+    return analyser(*extraire(personnes), moteur=moteur)
+
+
+def analyser(ids, groupes, notes, debuts, coefficients=None, moteur=None):
+    """
+    Calcule toutes les statistiques (voir `extraire` pour le format des
+    données ; sans `coefficients`, toutes les notes pèsent 1). `moteur` vaut
+    "numpy", "python" ou None (NumPy s'il est installé).
+    """
+    if moteur is None:
+        moteur = "numpy" if np is not None else "python"
+    if moteur == "numpy":
+        if np is None:
+            raise RuntimeError("NumPy n'est pas installé.")
+        return _analyser_numpy(ids, groupes, notes, debuts, coefficients)
+    return _analyser_python(ids, groupes, notes, debuts, coefficients)
+
+
+def _percentile(valeurs_triees, p):
+    """
+    Percentile par interpolation linéaire (même méthode que numpy.percentile).
+    """
+    if not valeurs_triees:
+        return math.nan
+    position = (len(valeurs_triees) - 1) * p / 100
+    bas = math.floor(position)
+    haut = min(bas + 1, len(valeurs_triees) - 1)
+    return valeurs_triees[bas] + (valeurs_triees[haut] - valeurs_triees[bas]) * (position - bas)
+
+
+def _analyser_numpy(ids, groupes, notes, debuts, coefficients):
+    n = len(ids)
+    valeurs = np.asarray(notes, dtype=np.float64)
+    poids = np.ones_like(valeurs) if coefficients is None else np.asarray(coefficients, dtype=np.float64)
+    # Numéro de la personne de chaque note, puis sommes par personne.
+    personnes = np.repeat(np.arange(n), np.diff(np.asarray(debuts, dtype=np.int64)))
+    sommes = np.bincount(personnes, weights=valeurs * poids, minlength=n)
+    total_poids = np.bincount(personnes, weights=poids, minlength=n)
+    evalue = total_poids > 0
+    moyennes = sommes[evalue] / total_poids[evalue]
+
+    # Codage des groupes par dictionnaire (bien plus rapide qu'un np.unique sur des chaînes),
+    # puis renumérotation pour que les codes suivent l'ordre alphabétique.
+    index = {}
+    codes = np.fromiter((index.setdefault(g, len(index)) for g in groupes), dtype=np.int64, count=n)
+    noms_groupes = np.array(sorted(index), dtype=object)
+    renumerotation = np.empty(len(index), dtype=np.int64)
+    renumerotation[[index[nom] for nom in noms_groupes]] = np.arange(len(index))
+    codes = renumerotation[codes]
+    k = len(noms_groupes)
+    effectifs = np.bincount(codes, minlength=k)
+    codes_ev = codes[evalue]
+    evalues = np.bincount(codes_ev, minlength=k)
+    somme = np.bincount(codes_ev, weights=moyennes, minlength=k)
+    somme_carres = np.bincount(codes_ev, weights=moyennes * moyennes, minlength=k)
+    reussis = np.bincount(codes_ev, weights=(moyennes >= SEUIL_REUSSITE), minlength=k)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        moyenne_groupe = somme / evalues
+        ecart_type = np.sqrt(np.maximum(somme_carres / evalues - moyenne_groupe ** 2, 0.0))
+        taux = reussis / evalues
+
+    # Tri par groupe puis moyenne décroissante : médianes et rangs dans le groupe.
+    ordre = np.lexsort((-moyennes, codes_ev))
+    codes_tries = codes_ev[ordre]
+    moyennes_triees = moyennes[ordre]
+    debuts = np.searchsorted(codes_tries, np.arange(k))
+    mediane = np.full(k, np.nan)
+    valides = evalues > 0
+    bas = (debuts + (evalues - 1) // 2)[valides]
+    haut = (debuts + evalues // 2)[valides]
+    mediane[valides] = (moyennes_triees[bas] + moyennes_triees[haut]) / 2
+
+    rangs_groupe = np.empty(len(moyennes), dtype=np.int64)
+    rangs_groupe[ordre] = _rangs_numpy(moyennes_triees, codes_tries) - debuts[codes_tries] + 1
+
+    ordre_general = np.argsort(-moyennes, kind="stable")
+    rangs_general = np.empty(len(moyennes), dtype=np.int64)
+    rangs_general[ordre_general] = _rangs_numpy(moyennes[ordre_general]) + 1
+
+    if len(moyennes):
+        valeurs = np.percentile(moyennes, PERCENTILES)
+    else:
+        valeurs = [math.nan] * len(PERCENTILES)
+
+    par_groupe = {
+        str(noms_groupes[g]): StatsGroupe(
+            int(effectifs[g]), int(evalues[g]), float(moyenne_groupe[g]), float(mediane[g]),
+            float(ecart_type[g]), float(taux[g]),
+        )
+        for g in range(k)
+    }
+    return ResultatsAnalyse(
+        np.asarray(ids)[evalue], noms_groupes[codes_ev], moyennes, rangs_groupe, rangs_general,
+        par_groupe, dict(zip(PERCENTILES, map(float, valeurs))), "numpy",
+    )
+
+
+def _rangs_numpy(valeurs_triees, codes_tries=None):
+    """
+    Position (base 0) du premier élément de chaque série d'ex æquo : donne un
+    classement « 1224 » une fois ramené au début du groupe.
+    """
+    positions = np.arange(len(valeurs_triees))
+    nouveau = np.ones(len(valeurs_triees), dtype=bool)
+    nouveau[1:] = valeurs_triees[1:] != valeurs_triees[:-1]
+    if codes_tries is not None:
+        nouveau[1:] |= codes_tries[1:] != codes_tries[:-1]
+    return np.maximum.accumulate(np.where(nouveau, positions, 0))
+
+
+def _classer(positions, moyennes):
+    """
+    Rangs « 1224 » des `positions` triées par moyenne décroissante.
+    """
+    rangs = {}
+    precedente = None
+    rang = 0
+    for numero, position in enumerate(sorted(positions, key=lambda i: -moyennes[i]), start=1):
+        if moyennes[position] != precedente:
+            rang = numero
+            precedente = moyennes[position]
+        rangs[position] = rang
+    return rangs
+
+
+def _analyser_python(ids, groupes, notes, debuts, coefficients):
+    ids_ev = array("q")
+    groupes_ev = []
+    moyennes = array("d")
+    effectifs = {}
+    for i, id_person in enumerate(ids):
+        effectifs[groupes[i]] = effectifs.get(groupes[i], 0) + 1
+        debut, fin = debuts[i], debuts[i + 1]
+        valeurs = notes[debut:fin]
+        poids = [1.0] * (fin - debut) if coefficients is None else coefficients[debut:fin]
+        total_poids = sum(poids)
+        if total_poids > 0:
+            ids_ev.append(id_person)
+            groupes_ev.append(groupes[i])
+            moyennes.append(sum(v * c for v, c in zip(valeurs, poids)) / total_poids)
+
+    positions_par_groupe = {}
+    for position, group in enumerate(groupes_ev):
+        positions_par_groupe.setdefault(group, []).append(position)
+
+    rangs_groupe = array("q", bytes(8 * len(moyennes)))
+    par_groupe = {}
+    for group, effectif in effectifs.items():
+        positions = positions_par_groupe.get(group, [])
+        valeurs = [moyennes[p] for p in positions]
+        if valeurs:
+            moyenne = sum(valeurs) / len(valeurs)
+            ecart_type = math.sqrt(max(sum(v * v for v in valeurs) / len(valeurs) - moyenne ** 2, 0.0))
+            stats = StatsGroupe(effectif, len(valeurs), moyenne, statistics.median(valeurs), ecart_type,
+                                sum(1 for v in valeurs if v >= SEUIL_REUSSITE) / len(valeurs))
+        else:
+            stats = StatsGroupe(effectif, 0, math.nan, math.nan, math.nan, math.nan)
+        par_groupe[group] = stats
+        for position, rang in _classer(positions, moyennes).items():
+            rangs_groupe[position] = rang
+
+    rangs_general = array("q", bytes(8 * len(moyennes)))
+    for position, rang in _classer(range(len(moyennes)), moyennes).items():
+        rangs_general[position] = rang
+
+    triees = sorted(moyennes)
+    percentiles = {p: _percentile(triees, p) for p in PERCENTILES}
+    return ResultatsAnalyse(ids_ev, groupes_ev, moyennes, rangs_groupe, rangs_general,
+                            par_groupe, percentiles, "python")
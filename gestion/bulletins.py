@@ -0,0 +1,411 @@
+# gestion/bulletins.py
+"""
+Génération parallèle des bulletins de notes.
+
+Les personnes sont réparties en lots par groupe : le rang d'un stagiaire et
+les statistiques de son groupe se calculent alors dans le lot même, sans
+échange entre processus. Un groupe plus gros que la part d'un processus est
+découpé en sous-lots (`partie` sur `parties`) : chaque sous-lot lit tout le
+groupe et le classe (lecture et analyse sont rapides, et faites une seule
+fois par processus), mais ne met en forme et n'écrit qu'une part de ses
+bulletins, ce qui est l'essentiel du travail. Un seul gros groupe occupe
+ainsi tous les processus.
+
+Les lots sont confiés à un `ProcessPoolExecutor`, du plus gros au plus
+petit, pour qu'un gros lot traité en dernier ne retarde pas la fin. Chaque
+processus ouvre sa propre connexion en lecture seule (voir
+`config_lecture`), fermée à la fin du processus, lit ses groupes, met en
+forme les bulletins et les écrit lui-même dans le dossier de sortie : seul
+un court bilan (`BilanGroupe`) revient au processus principal, qui signale
+l'avancement à chaque lot terminé.
+
+Pour chaque groupe, le dossier `<sortie>/<groupe>/` reçoit le bulletin de
+chaque stagiaire (`<id>.txt`, `<id>.csv`, `<id>.html`) et le récapitulatif
+du groupe (`groupe.txt`, `groupe.csv`, `groupe.html`), dans les formats
+demandés. Un nom de groupe qui n'est pas un nom de dossier sûr, ou qui en
+rencontre un autre une fois la casse ignorée, reçoit un suffixe tiré de son
+empreinte (voir `dossiers_groupes`) : deux groupes n'écrivent jamais dans le
+même dossier.
+"""
+
+import csv
+import hashlib
+import html
+import io
+import math
+import os
+import re
+import time
+from array import array
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing.util import Finalize
+
+from gestion.analyse import SEUIL_REUSSITE, analyser
+from gestion.depots import creer_depot
+from gestion.exceptions import SaisieInvalide
+
+FORMATS = ("txt", "csv", "html")
+# Taille minimale d'un sous-lot : en deçà, relire le groupe coûterait plus que ce qu'on partage.
+TAILLE_SOUS_LOT_MIN = 500
+
+BilanGroupe = namedtuple("BilanGroupe", "groupe partie parties personnes bulletins fichiers duree")
+Bulletin = namedtuple("Bulletin", "id_person nom age notes moyenne rang")
+Recapitulatif = namedtuple("Recapitulatif", "groupe stats moyennes_evaluations bulletins")
+
+
+def _nombre(valeur):
+    return "-" if valeur is None or math.isnan(valeur) else f"{valeur:.2f}"
+
+
+def _resultat(moyenne):
+    if moyenne is None:
+        return "Non évalué"
+    return "Admis" if moyenne >= SEUIL_REUSSITE else "Non admis"
+
+
+def nom_dossier(group):
+    """
+    Nom de dossier sûr pour un groupe (caractères hors [A-Za-z0-9_.-] remplacés).
+    """
+    nom = re.sub(r"[^\w.-]", "_", str(group)).lstrip(".") if group is not None else ""
+    return nom or "sans_groupe"
+
+
+def _suffixer(group, nom):
+    empreinte = hashlib.sha1(repr(group).encode("utf-8")).hexdigest()[:8]
+    return f"{nom}-{empreinte}"
+
+
+def dossiers_groupes(groupes):
+    """
+    Retourne {groupe: nom de dossier}, sans doublon : un nom transformé par
+    `nom_dossier` ("G 1", "G/1" -> "G_1") reçoit le suffixe de l'empreinte du
+    groupe, de même que les noms qui se confondent une fois la casse ignorée
+    (systèmes de fichiers insensibles à la casse).
+    """
+    noms = {}
+    for group in groupes:
+        nom = nom_dossier(group)
+        noms[group] = nom if group is not None and nom == str(group) else _suffixer(group, nom)
+    occupes = {}
+    for group, nom in noms.items():
+        occupes.setdefault(nom.casefold(), []).append(group)
+    for candidats in occupes.values():
+        if len(candidats) > 1:
+            for group in candidats:
+                noms[group] = _suffixer(group, nom_dossier(group))
+    return noms
+
+
+# =========================
+# MISE EN FORME
+# =========================
+# Chaque format fournit le bulletin d'un stagiaire et le récapitulatif du
+# groupe, sous forme de texte.
+def bulletin_txt(bulletin, recap):
+    lignes = [
+        "Bulletin de notes",
+        f"Nom : {bulletin.nom} (ID {bulletin.id_person})",
+        f"Groupe : {recap.groupe}    Âge : {bulletin.age}",
+        "",
+        f"{'Évaluation':<20} | {'Note':>6} | {'Coef.':>5} | {'Moy. groupe':>11}",
+    ]
+    for note in bulletin.notes:
+        lignes.append(f"{note.evaluation:<20} | {note.note:>6.2f} | {note.coefficient:>5g} | "
+                      f"{_nombre(recap.moyennes_evaluations.get(note.evaluation)):>11}")
+    if not bulletin.notes:
+        lignes.append("Aucune note.")
+    rang = "-" if bulletin.rang is None else f"{bulletin.rang} / {recap.stats.evalues}"
+    lignes += [
+        "",
+        f"Moyenne : {_nombre(bulletin.moyenne)}    Rang dans le groupe : {rang}",
+        f"Moyenne du groupe : {_nombre(recap.stats.moyenne if recap.stats else None)}",
+        f"Résultat : {_resultat(bulletin.moyenne)}",
+    ]
+    return "\n".join(lignes) + "\n"
+
+
+def groupe_txt(recap):
+    stats = recap.stats
+    lignes = [
+        f"Récapitulatif du groupe {recap.groupe}",
+        f"Stagiaires : {len(recap.bulletins)}    Évalués : {stats.evalues if stats else 0}",
+        f"Moyenne : {_nombre(stats.moyenne if stats else None)}    "
+        f"Médiane : {_nombre(stats.mediane if stats else None)}    "
+        f"Écart-type : {_nombre(stats.ecart_type if stats else None)}    "
+        f"Réussite : {_nombre(stats.taux_reussite * 100 if stats else None)} %",
+        "",
+        f"{'Rang':>4} | {'ID':>8} | {'Nom':<30} | {'Moyenne':>7} | Résultat",
+    ]
+    for b in recap.bulletins:
+        lignes.append(f"{'-' if b.rang is None else b.rang:>4} | {b.id_person:>8} | {b.nom:<30} | "
+                      f"{_nombre(b.moyenne):>7} | {_resultat(b.moyenne)}")
+    return "\n".join(lignes) + "\n"
+
+
+def bulletin_csv(bulletin, recap):
+    tampon = io.StringIO()
+    writer = csv.writer(tampon)
+    writer.writerow(["evaluation", "note", "coefficient", "moyenne_groupe"])
+    for note in bulletin.notes:
+        writer.writerow([note.evaluation, note.note, note.coefficient,
+                         _nombre(recap.moyennes_evaluations.get(note.evaluation))])
+    writer.writerow(["moyenne", _nombre(bulletin.moyenne), "", _nombre(recap.stats.moyenne if recap.stats else None)])
+    writer.writerow(["rang", "-" if bulletin.rang is None else bulletin.rang, "", ""])
+    return tampon.getvalue()
+
+
+def groupe_csv(recap):
+    tampon = io.StringIO()
+    writer = csv.writer(tampon)
+    writer.writerow(["rang", "id", "nom", "moyenne", "resultat"])
+    for b in recap.bulletins:
+        writer.writerow(["" if b.rang is None else b.rang, b.id_person, b.nom,
+                         "" if b.moyenne is None else f"{b.moyenne:.2f}", _resultat(b.moyenne)])
+    return tampon.getvalue()
+
+
+PAGE_HTML = (
+    "<!DOCTYPE html>\n<html lang=\"fr\">\n<head><meta charset=\"utf-8\"><title>{titre}</title></head>\n"
+    "<body>\n<h1>{titre}</h1>\n{contenu}\n</body>\n</html>\n"
+)
+
+
+def _table_html(entete, lignes):
+    cellules = "".join(f"<th>{html.escape(str(c))}</th>" for c in entete)
+    corps = "".join(
+        "<tr>" + "".join(f"<td>{html.escape(str(c))}</td>" for c in ligne) + "</tr>\n" for ligne in lignes
+    )
+    return f"<table border=\"1\">\n<tr>{cellules}</tr>\n{corps}</table>"
+
+
+def bulletin_html(bulletin, recap):
+    rang = "-" if bulletin.rang is None else f"{bulletin.rang} / {recap.stats.evalues}"
+    contenu = (
+        f"<p>{html.escape(bulletin.nom)} (ID {bulletin.id_person}), groupe {html.escape(str(recap.groupe))}, "
+        f"{bulletin.age} ans</p>\n"
+        + _table_html(
+            ("Évaluation", "Note", "Coef.", "Moy. groupe"),
+            [(n.evaluation, f"{n.note:.2f}", f"{n.coefficient:g}",
+              _nombre(recap.moyennes_evaluations.get(n.evaluation))) for n in bulletin.notes],
+        )
+        + f"\n<p>Moyenne : {_nombre(bulletin.moyenne)} ; rang dans le groupe : {rang} ; "
+          f"moyenne du groupe : {_nombre(recap.stats.moyenne if recap.stats else None)}</p>\n"
+          f"<p>Résultat : {_resultat(bulletin.moyenne)}</p>"
+    )
+    return PAGE_HTML.format(titre="Bulletin de notes", contenu=contenu)
+
+
+def groupe_html(recap):
+    stats = recap.stats
+    contenu = (
+        f"<p>Stagiaires : {len(recap.bulletins)} ; évalués : {stats.evalues if stats else 0} ; "
+        f"moyenne : {_nombre(stats.moyenne if stats else None)} ; "
+        f"réussite : {_nombre(stats.taux_reussite * 100 if stats else None)} %</p>\n"
+        + _table_html(
+            ("Rang", "ID", "Nom", "Moyenne", "Résultat"),
+            [("-" if b.rang is None else b.rang, b.id_person, b.nom, _nombre(b.moyenne), _resultat(b.moyenne))
+             for b in recap.bulletins],
+        )
+    )
+    return PAGE_HTML.format(titre=html.escape(f"Groupe {recap.groupe}"), contenu=contenu)
+
+
+RENDUS = {
+    "txt": (bulletin_txt, groupe_txt),
+    "csv": (bulletin_csv, groupe_csv),
+    "html": (bulletin_html, groupe_html),
+}
+
+
+# =========================
+# TRAITEMENT D'UN GROUPE
+# =========================
+
+def recapituler(group, lignes, moteur=None):
+    """
+    Construit le `Recapitulatif` d'un groupe à partir de ses lignes
+    (id, nom, age, groupe, type, notes) : seuls les stagiaires ont un
+    bulletin, classés par rang (les non évalués en dernier).
+    """
+    stagiaires = [ligne for ligne in lignes if ligne[4] == "Stagiaire"]
+    ids = array("q")
+    notes = array("f")
+    coefficients = array("f")
+    debuts = array("q", [0])
+    sommes = {}
+    for ligne in stagiaires:
+        ids.append(ligne[0])
+        for note in ligne[5]:
+            notes.append(note.note)
+            coefficients.append(note.coefficient)
+            somme, nombre = sommes.get(note.evaluation, (0.0, 0))
+            sommes[note.evaluation] = (somme + note.note, nombre + 1)
+        debuts.append(len(notes))
+    resultats = analyser(ids, [str(group)] * len(ids), notes, debuts, coefficients, moteur=moteur) if stagiaires else None
+    bulletins = []
+    for id_person, nom, age, _, _, notes_personne in stagiaires:
+        rang = resultats.rang(id_person)
+        bulletins.append(Bulletin(id_person, nom, age, notes_personne, resultats.moyenne(id_person),
+                                  None if rang is None else rang[0]))
+    bulletins.sort(key=lambda b: (b.rang is None, b.rang or 0, b.id_person))
+    return Recapitulatif(
+        group,
+        resultats.par_groupe.get(str(group)) if resultats else None,
+        {evaluation: somme / nombre for evaluation, (somme, nombre) in sorted(sommes.items())},
+        bulletins,
+    )
+
+
+def _ecrire(chemin, contenu):
+    with open(chemin, "w", encoding="utf-8", newline="") as fichier:
+        fichier.write(contenu)
+
+
+def lire_groupe(depot, group, moteur=None):
+    """
+    Lit un groupe et retourne (nombre de personnes lues, `Recapitulatif`).
+    """
+    lignes = list(depot.iterer_groupe(group))
+    return len(lignes), recapituler(group, lignes, moteur)
+
+
+def generer_groupe(depot, group, dossier_groupe, formats=FORMATS, moteur=None, partie=0, parties=1, lecture=None):
+    """
+    Écrit dans `dossier_groupe` les bulletins des stagiaires d'un groupe
+    (seulement un sur `parties`, à partir du rang `partie`, pour un sous-lot)
+    et, pour la partie 0, son récapitulatif. `lecture` est le résultat de
+    `lire_groupe`, relu si absent. Retourne un `BilanGroupe`.
+    """
+    debut = time.perf_counter()
+    personnes, recap = lecture if lecture is not None else lire_groupe(depot, group, moteur)
+    bulletins = recap.bulletins[partie::parties]
+    os.makedirs(dossier_groupe, exist_ok=True)
+    fichiers = 0
+    for format_fichier in formats:
+        rendre_bulletin, rendre_groupe = RENDUS[format_fichier]
+        for bulletin in bulletins:
+            _ecrire(os.path.join(dossier_groupe, f"{bulletin.id_person}.{format_fichier}"),
+                    rendre_bulletin(bulletin, recap))
+        fichiers += len(bulletins)
+        if partie == 0:
+            _ecrire(os.path.join(dossier_groupe, f"groupe.{format_fichier}"), rendre_groupe(recap))
+            fichiers += 1
+    # Les personnes lues sont réparties entre les parties, pour que leur somme fasse l'effectif.
+    part = len(range(partie, personnes, parties))
+    return BilanGroupe(group, partie, parties, part, len(bulletins), fichiers, time.perf_counter() - debut)
+
+
+# État d'un processus de travail : dépôt ouvert à son premier lot (fermé à la
+# fin du processus) et dernier groupe lu, que ses autres sous-lots réutilisent.
+_depot_processus = None
+_lecture_processus = None
+
+
+def _generer_lot_processus(config, group, dossier_groupe, formats, moteur, partie, parties):
+    global _depot_processus, _lecture_processus
+    if _depot_processus is None:
+        _depot_processus = creer_depot(config)
+        # Les processus du pool se terminent par os._exit : atexit n'y est pas
+        # appelé, contrairement aux finaliseurs de multiprocessing.
+        Finalize(None, _depot_processus.fermer, exitpriority=10)
+    if _lecture_processus is None or _lecture_processus[0] != group:
+        _lecture_processus = (group, lire_groupe(_depot_processus, group, moteur))
+    return generer_groupe(_depot_processus, group, dossier_groupe, formats, moteur, partie, parties,
+                          _lecture_processus[1])
+
+
+# =========================
+# PIPELINE
+# =========================
+
+def config_lecture(config):
+    """
+    Configuration des connexions de la génération : lecture seule, une
+    connexion par processus, ni cache des notes ni écriture différée.
+    """
+    return dict(config, lecture_seule=True, taille_pool=1, cache_taille=0, ecriture_differee=False)
+
+
+def generer_bulletins(config, dossier, groupes=None, formats=FORMATS, nb_processus=None, progression=None,
+                      moteur=None):
+    """
+    Génère les bulletins des `groupes` (tous par défaut) dans `dossier`, avec
+    `nb_processus` processus (`os.cpu_count()` par défaut ; 1 : dans le
+    processus courant, sans pool). `progression(faites, total, bilan)` est
+    appelée à chaque lot terminé, `faites` et `total` comptant les
+    personnes lues. Retourne la liste des `BilanGroupe`, dans l'ordre où les
+    lots se sont terminés.
+    """
+    formats = tuple(formats)
+    inconnus = [f for f in formats if f not in RENDUS]
+    if inconnus or not formats:
+        raise SaisieInvalide(f"Formats de bulletin possibles : {', '.join(FORMATS)}.")
+    if config["backend"] == "sqlite" and config["chemin_sqlite"] == ":memory:":
+        raise SaisieInvalide("Une base SQLite en mémoire ne peut pas être lue par d'autres processus.")
+    config = config_lecture(config)
+    # Le processus principal ouvre la base normalement : le schéma est créé ou
+    # migré avant que les processus de travail ne la lisent en lecture seule.
+    depot = creer_depot(dict(config, lecture_seule=False))
+    try:
+        effectifs = depot.compter_groupes()
+        if groupes is None:
+            groupes = list(effectifs)
+        else:
+            groupes = list(groupes)
+            absents = [group for group in groupes if group not in effectifs]
+            if absents:
+                raise SaisieInvalide(f"Groupe(s) inconnu(s) : {absents}")
+        total = sum(effectifs[group] for group in groupes)
+        dossiers = {group: os.path.join(dossier, nom) for group, nom in dossiers_groupes(groupes).items()}
+        os.makedirs(dossier, exist_ok=True)
+        nb_processus = nb_processus or os.cpu_count() or 1
+        if nb_processus <= 1:
+            # Sans pool, la lecture se fait sur la connexion déjà ouverte.
+            return _suivre((generer_groupe(depot, group, dossiers[group], formats, moteur) for group in groupes),
+                           total, progression)
+    finally:
+        depot.fermer()
+
+    lots = decouper(effectifs, groupes, nb_processus)
+    with ProcessPoolExecutor(max_workers=min(nb_processus, len(lots))) as executeur:
+        futures = [executeur.submit(_generer_lot_processus, config, group, dossiers[group], formats, moteur,
+                                    partie, parties)
+                   for group, partie, parties in lots]
+        try:
+            return _suivre((future.result() for future in as_completed(futures)), total, progression)
+        except BaseException:
+            # Python 3.8 : pas de shutdown(cancel_futures=True).
+            for future in futures:
+                future.cancel()
+            raise
+
+
+def decouper(effectifs, groupes, nb_processus):
+    """
+    Retourne les lots (groupe, partie, parties), du plus gros au plus petit :
+    un groupe plus gros que la part d'un processus (total / `nb_processus`,
+    au moins `TAILLE_SOUS_LOT_MIN`) est découpé en sous-lots de cette taille.
+    Les sous-lots d'un même groupe se suivent, pour qu'un processus qui en
+    reçoit plusieurs ne relise pas le groupe.
+    """
+    total = sum(effectifs[group] for group in groupes)
+    part = max(TAILLE_SOUS_LOT_MIN, -(-total // nb_processus))
+    lots = []
+    for group in sorted(groupes, key=lambda g: effectifs[g], reverse=True):
+        parties = max(1, -(-effectifs[group] // part))
+        lots.extend((group, partie, parties) for partie in range(parties))
+    lots.sort(key=lambda lot: effectifs[lot[0]] / lot[2], reverse=True)
+    return lots
+
+
+def _suivre(bilans, total, progression):
+    resultat = []
+    faites = 0
+    for bilan in bilans:
+        resultat.append(bilan)
+        faites += bilan.personnes
+        if progression is not None:
+            progression(faites, total, bilan)
+    return resultat
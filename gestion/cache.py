@@ -0,0 +1,285 @@
+# gestion/cache.py
+"""
+Cache en lecture des notes, avec éviction LRU et durée de validité (TTL).
+
+`DepotEnCache` enveloppe un dépôt : `lire_notes` passe par le cache, les
+écritures (`enregistrer_notes`, `enregistrer_notes_lot`, `supprimer_personne`)
+invalident les entrées concernées, tout comme les changements faits par
+d'autres clients et relevés par `changements_depuis`, et le chargement initial
+(`iterer_personnes`) pré-remplit le cache avec les notes qu'il lit de toute façon.
+Les lectures groupées du chargement différé (`lire_notes_lot`) ne demandent
+au dépôt que les personnes absentes du cache. `session` et `etape` sont
+celles du dépôt enveloppé ; si elles sont annulées, le cache est vidé, car
+il a pu retenir des notes lues dans la transaction défaite.
+
+Deux modes :
+- `confiance` : une entrée valide est servie sans interroger la base ;
+- `revalidation` : la base est relue à chaque appel (plusieurs écrivains) ;
+  le cache sert alors à mesurer combien de valeurs étaient périmées.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from gestion.chargement import TAILLE_LOT_DEFAUT
+from gestion.depots import DepotPersonnes
+
+CONFIANCE = "confiance"
+REVALIDATION = "revalidation"
+MODES = (CONFIANCE, REVALIDATION)
+
+
+class CacheLRU:
+    """
+    Dictionnaire borné à `taille_max` entrées, les moins récemment utilisées
+    étant évincées en premier ; une entrée plus ancienne que `ttl` secondes
+    est considérée comme absente. Utilisable depuis plusieurs threads.
+    """
+    def __init__(self, taille_max, ttl, horloge=time.monotonic):
+        self.taille_max = taille_max
+        self.ttl = ttl
+        self.horloge = horloge
+        self.succes = 0
+        self.echecs = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.__entrees = OrderedDict()
+        self.__generations = {}
+        self.__verrou = threading.Lock()
+
+    def __len__(self):
+        return len(self.__entrees)
+
+    def obtenir(self, cle):
+        """
+        Retourne (True, valeur) si une entrée valide existe, (False, None) sinon.
+        """
+        with self.__verrou:
+            entree = self.__entrees.get(cle)
+            if entree is not None:
+                valeur, echeance = entree
+                if self.horloge() < echeance:
+                    self.__entrees.move_to_end(cle)
+                    self.succes += 1
+                    return True, valeur
+                del self.__entrees[cle]
+                self.expirations += 1
+            self.echecs += 1
+            return False, None
+
+    def placer(self, cle, valeur, generation=None):
+        """
+        Enregistre une valeur. Si `generation` est fournie et que la clé a été
+        invalidée depuis (voir `generation`), la valeur, lue trop tôt, est ignorée.
+        """
+        if self.taille_max <= 0:
+            return
+        with self.__verrou:
+            if generation is not None and self.__generations.get(cle, 0) != generation:
+                return
+            self.__entrees[cle] = (valeur, self.horloge() + self.ttl)
+            self.__entrees.move_to_end(cle)
+            while len(self.__entrees) > self.taille_max:
+                self.__entrees.popitem(last=False)
+                self.evictions += 1
+
+    def generation(self, cle):
+        """
+        Numéro d'invalidation courant d'une clé, à relever avant de lire la source.
+        """
+        with self.__verrou:
+            return self.__generations.get(cle, 0)
+
+    def invalider(self, cle):
+        with self.__verrou:
+            self.__entrees.pop(cle, None)
+            self.__generations[cle] = self.__generations.get(cle, 0) + 1
+
+    def vider(self):
+        with self.__verrou:
+            self.__entrees.clear()
+            self.__generations.clear()
+
+    def statistiques(self):
+        lectures = self.succes + self.echecs
+        return {
+            "entrees": len(self.__entrees),
+            "taille_max": self.taille_max,
+            "succes": self.succes,
+            "echecs": self.echecs,
+            "expirations": self.expirations,
+            "evictions": self.evictions,
+            "taux_succes": self.succes / lectures if lectures else 0.0,
+        }
+
+
+class DepotEnCache(DepotPersonnes):
+    """
+    Dépôt qui met en cache les lectures de notes du dépôt `depot`.
+    """
+    def __init__(self, depot, taille_max=10000, ttl=60.0, mode=CONFIANCE):
+        if mode not in MODES:
+            raise ValueError(f"Mode de cache inconnu : {mode!r}")
+        self.depot = depot
+        self.mode = mode
+        self.cache = CacheLRU(taille_max, ttl)
+        self.perimees = 0
+
+    def lire_notes(self, id_person):
+        trouve, valeur = self.cache.obtenir(id_person)
+        if trouve and self.mode == CONFIANCE:
+            return valeur
+        generation = self.cache.generation(id_person)
+        notes = self.depot.lire_notes(id_person)
+        if trouve and notes != valeur:
+            self.perimees += 1
+        self.cache.placer(id_person, notes, generation)
+        return notes
+
+    def lire_notes_lot(self, ids):
+        resultat, manquants = {}, []
+        for id_person in ids:
+            trouve, valeur = self.cache.obtenir(id_person)
+            if trouve and self.mode == CONFIANCE:
+                if valeur:
+                    resultat[id_person] = valeur
+            else:
+                manquants.append(id_person)
+        if manquants:
+            generations = {id_person: self.cache.generation(id_person) for id_person in manquants}
+            lues = self.depot.lire_notes_lot(manquants)
+            for id_person in manquants:
+                notes = lues.get(id_person, [])
+                self.cache.placer(id_person, notes, generations[id_person])
+                if notes:
+                    resultat[id_person] = notes
+        return resultat
+
+    def enregistrer_notes(self, id_person, notes):
+        self.cache.invalider(id_person)
+        try:
+            return self.depot.enregistrer_notes(id_person, notes)
+        finally:
+            self.cache.invalider(id_person)
+
+    def enregistrer_notes_lot(self, saisies):
+        saisies = list(saisies)
+        for id_person, _ in saisies:
+            self.cache.invalider(id_person)
+        try:
+            return self.depot.enregistrer_notes_lot(saisies)
+        finally:
+            for id_person, _ in saisies:
+                self.cache.invalider(id_person)
+
+    def ecrire_lot(self, suppressions=(), insertions=(), modifications=(), saisies=()):
+        insertions, modifications, saisies = list(insertions), list(modifications), list(saisies)
+        ids = set(suppressions) | {p[0] for p in insertions} | {m[0] for m in modifications} | {s[0] for s in saisies}
+        for id_person in ids:
+            self.cache.invalider(id_person)
+        try:
+            return self.depot.ecrire_lot(suppressions, insertions, modifications, saisies)
+        finally:
+            for id_person in ids:
+                self.cache.invalider(id_person)
+
+    def supprimer_personne(self, id_person):
+        self.cache.invalider(id_person)
+        try:
+            return self.depot.supprimer_personne(id_person)
+        finally:
+            self.cache.invalider(id_person)
+
+    def iterer_personnes(self, taille_lot=TAILLE_LOT_DEFAUT, avec_notes=True):
+        # Le chargement lit toutes les évaluations de chaque personne : de quoi
+        # pré-remplir le cache avec la valeur exacte de `lire_notes`.
+        for ligne in self.depot.iterer_personnes(taille_lot, avec_notes):
+            if ligne[5] is not None:
+                self.cache.placer(ligne[0], list(ligne[5]))
+            yield ligne
+
+    def changements_depuis(self, version, trous=()):
+        courante, ecrites, supprimees, manquants = self.depot.changements_depuis(version, trous)
+        for ligne in ecrites:
+            self.cache.invalider(ligne[0])
+        for id_person in supprimees:
+            self.cache.invalider(id_person)
+        return courante, ecrites, supprimees, manquants
+
+    def trous_journal(self, version):
+        return self.depot.trous_journal(version)
+
+    @contextmanager
+    def session(self):
+        try:
+            with self.depot.session():
+                yield self
+        except BaseException:
+            self.cache.vider()
+            raise
+
+    @contextmanager
+    def etape(self):
+        try:
+            with self.depot.etape():
+                yield
+        except BaseException:
+            self.cache.vider()
+            raise
+
+    @property
+    def instrumentation(self):
+        return self.depot.instrumentation
+
+    def statistiques(self):
+        stats = self.cache.statistiques()
+        stats["mode"] = self.mode
+        stats["perimees"] = self.perimees
+        return stats
+
+    # Opérations sans effet sur les notes en cache : simple délégation.
+
+    def inserer_personne(self, id_person, nom, age, group, type_person):
+        return self.depot.inserer_personne(id_person, nom, age, group, type_person)
+
+    def inserer_personnes(self, personnes, taille_lot=TAILLE_LOT_DEFAUT):
+        return self.depot.inserer_personnes(personnes, taille_lot)
+
+    def iterer_ids(self):
+        return self.depot.iterer_ids()
+
+    def compter_personnes(self):
+        return self.depot.compter_personnes()
+
+    def lire_personne(self, id_person):
+        return self.depot.lire_personne(id_person)
+
+    def modifier_personne(self, id_person, nom, age):
+        return self.depot.modifier_personne(id_person, nom, age)
+
+    def iterer_groupe(self, group, taille_lot=TAILLE_LOT_DEFAUT):
+        return self.depot.iterer_groupe(group, taille_lot)
+
+    def compter_groupes(self):
+        return self.depot.compter_groupes()
+
+    def moyennes_groupes(self):
+        return self.depot.moyennes_groupes()
+
+    def verifier_stats(self, corriger=False):
+        return self.depot.verifier_stats(corriger)
+
+    def version_journal(self):
+        return self.depot.version_journal()
+
+    def initialiser_schema(self):
+        return self.depot.initialiser_schema()
+
+    def flush(self):
+        return self.depot.flush()
+
+    def fermer(self):
+        self.cache.vider()
+        return self.depot.fermer()
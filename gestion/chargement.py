@@ -0,0 +1,178 @@
+# gestion/chargement.py
+"""
+Chargement en masse des personnes et de leurs notes.
+
+Une seule requête LEFT JOIN remplace l'ancien schéma N+1 (une requête `notes`
+par ligne de `etudiant`). Les lignes sont lues par lots avec `fetchmany`, si
+bien que la mémoire consommée par le curseur reste bornée par la taille du lot.
+
+La requête produit une ligne par évaluation (une seule, sans évaluation, pour
+une personne qui n'a pas de note) ; les lignes d'une même personne se suivent
+et sont regroupées en une liste de `Note`.
+
+En chargement différé, seule la table `etudiant` est lue (`iterer_identites`) :
+les notes restent en attente et `ChargeurNotes` les lit au premier accès, par
+lots de personnes du même groupe.
+"""
+
+from contextlib import nullcontext
+
+from gestion.modeles import Note
+
+TAILLE_LOT_DEFAUT = 1000
+
+REQUETE_CHARGEMENT = (
+    "SELECT e.id, e.name, e.age, e.ed_group, e.type, v.evaluation, v.note, v.coefficient "
+    "FROM etudiant e LEFT JOIN evaluations v ON v.id_ed = e.id "
+    "ORDER BY e.id, v.evaluation"
+)
+
+# Même lecture, restreinte à une liste d'IDs (le marqueur `{}` reçoit les paramètres).
+REQUETE_CHARGEMENT_IDS = (
+    "SELECT e.id, e.name, e.age, e.ed_group, e.type, v.evaluation, v.note, v.coefficient "
+    "FROM etudiant e LEFT JOIN evaluations v ON v.id_ed = e.id "
+    "WHERE e.id IN ({}) "
+    "ORDER BY e.id, v.evaluation"
+)
+
+# Même lecture, restreinte aux personnes d'un groupe.
+REQUETE_CHARGEMENT_GROUPE = (
+    "SELECT e.id, e.name, e.age, e.ed_group, e.type, v.evaluation, v.note, v.coefficient "
+    "FROM etudiant e LEFT JOIN evaluations v ON v.id_ed = e.id "
+    "WHERE e.ed_group = %s "
+    "ORDER BY e.id, v.evaluation"
+)
+
+REQUETE_IDENTITES = "SELECT id, name, age, ed_group, type FROM etudiant ORDER BY id"
+
+
+def iterer_lignes(cur, taille_lot=TAILLE_LOT_DEFAUT):
+    """
+    Parcourt le résultat courant du curseur par lots de `taille_lot` lignes.
+    """
+    while True:
+        lignes = cur.fetchmany(taille_lot)
+        if not lignes:
+            return
+        yield from lignes
+
+
+def iterer_personnes(cur, taille_lot=TAILLE_LOT_DEFAUT, requete=REQUETE_CHARGEMENT, parametres=None):
+    """
+    Exécute la requête de chargement et produit des tuples
+    (id, nom, age, groupe, type, notes) au fil de la lecture, `notes` étant
+    la liste des `Note` de la personne, triée par évaluation.
+    """
+    if parametres is None:
+        cur.execute(requete)
+    else:
+        cur.execute(requete, parametres)
+    courante = None
+    for (id_person, nom, age, group, type_person, evaluation, note, coefficient) in iterer_lignes(cur, taille_lot):
+        if courante is None or id_person != courante[0]:
+            if courante is not None:
+                yield courante
+            courante = (id_person, nom, age, group, type_person, [])
+        if evaluation is not None:
+            courante[5].append(Note(evaluation, note, coefficient))
+    if courante is not None:
+        yield courante
+
+
+def iterer_identites(cur, taille_lot=TAILLE_LOT_DEFAUT):
+    """
+    Produit des tuples (id, nom, age, groupe, type, None) sans lire les
+    notes : None signifie « notes en attente ».
+    """
+    cur.execute(REQUETE_IDENTITES)
+    for ligne in iterer_lignes(cur, taille_lot):
+        yield tuple(ligne) + (None,)
+
+
+class ChargeurNotes:
+    """
+    Lecture à la demande des notes en attente.
+
+    Les personnes en attente sont rangées par groupe, dans l'ordre de
+    chargement. Le premier accès aux notes d'une personne les lit en une
+    requête avec celles des `taille_lot - 1` premières personnes encore en
+    attente de son groupe : parcourir un groupe, ou la liste triée par
+    groupe, coûte une requête par lot et non une par personne.
+    `precharger` lit d'un coup les notes d'une liste de personnes (la page
+    affichée, avant un tri par moyenne ou une analyse).
+
+    `verrou` est celui qui protège le registre. Il n'est tenu que pour
+    choisir les personnes à lire puis pour ranger les notes lues, jamais
+    pendant la requête : les autres threads (l'interface) ne l'attendent pas.
+    Les notes lues ne sont rangées que dans les personnes encore en attente,
+    si bien qu'une saisie faite entre-temps n'est jamais écrasée.
+    """
+
+    def __init__(self, depot, taille_lot=TAILLE_LOT_DEFAUT, verrou=None):
+        self.depot = depot
+        self.taille_lot = taille_lot
+        self.verrou = verrou if verrou is not None else nullcontext()
+        self.lectures = 0
+        self.__groupes = {}
+        self.__debuts = {}
+
+    def fabrique(self, fabrique):
+        """
+        Enveloppe une fabrique de personnes : une ligne dont les notes valent
+        None donne une personne dont les notes sont en attente.
+        """
+        def creer(ligne):
+            personne = fabrique(ligne)
+            if ligne[5] is None:
+                self.attendre(personne)
+            return personne
+        return creer
+
+    def attendre(self, personne):
+        personne.attendre_notes(self)
+        self.__groupes.setdefault(personne.group, []).append(personne)
+
+    def charger(self, personne):
+        with self.verrou:
+            if personne.notes_chargees():
+                return
+            lot = [personne] + self.__voisines(personne, self.taille_lot - 1)
+        self.__lire(lot)
+
+    def precharger(self, personnes):
+        with self.verrou:
+            en_attente = [p for p in personnes if not p.notes_chargees()]
+        for debut in range(0, len(en_attente), self.taille_lot):
+            self.__lire(en_attente[debut:debut + self.taille_lot])
+
+    def __voisines(self, personne, nombre):
+        group = personne.group
+        membres = self.__groupes.get(group)
+        if not membres:
+            return []
+        # Les premières personnes du groupe déjà chargées ne sont plus parcourues.
+        debut = self.__debuts.get(group, 0)
+        while debut < len(membres) and membres[debut].notes_chargees():
+            debut += 1
+        if debut == len(membres):
+            del self.__groupes[group]
+            self.__debuts.pop(group, None)
+            return []
+        self.__debuts[group] = debut
+        voisines = []
+        for i in range(debut, len(membres)):
+            if len(voisines) >= nombre:
+                break
+            voisine = membres[i]
+            if voisine.id_person != personne.id_person and not voisine.notes_chargees():
+                voisines.append(voisine)
+        return voisines
+
+    def __lire(self, lot):
+        notes = self.depot.lire_notes_lot([p.id_person for p in lot])
+        with self.verrou:
+            self.lectures += 1
+            for personne in lot:
+                # Une personne lue aussi par un autre thread, ou notée entre-temps, est laissée telle quelle.
+                if not personne.notes_chargees():
+                    personne.notes = notes.get(personne.id_person, [])
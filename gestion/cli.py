@@ -0,0 +1,369 @@
+# gestion/cli.py
+"""
+Interface en ligne de commande (non interactive) de la version console.
+
+    python Getion_etudiant_console.py add 42 "Ali Ben" 20 G1 Stagiaire
+    python Getion_etudiant_console.py get 42
+    python Getion_etudiant_console.py set-grades 42 15 12 - --evaluation partiel=14:2
+    python Getion_etudiant_console.py list --groupe G1
+    python Getion_etudiant_console.py stats
+    python Getion_etudiant_console.py delete 42
+    python Getion_etudiant_console.py import etudiants.csv --taille-lot 1000
+    python Getion_etudiant_console.py export g1.jsonl --format jsonl --groupe G1
+    python Getion_etudiant_console.py report bulletins --processus 4 --progression
+    python Getion_etudiant_console.py --batch commandes.txt
+
+Chaque commande écrit son résultat en JSON sur la sortie standard ; une
+erreur est écrite en JSON ({"erreur": type, "message": texte}) sur la sortie
+d'erreur.
+
+Avec `--batch`, le fichier (`-` : entrée standard) contient une commande par
+ligne, écrite comme sur la ligne de commande (`#` commence un commentaire).
+Toutes s'exécutent sur une seule connexion, dans une seule transaction (voir
+`DepotPersonnes.session`) : à la première erreur, rien n'est enregistré. Avec
+`--continuer`, seule la commande en erreur est annulée et les suivantes
+s'exécutent. Chaque commande produit une ligne JSON ({"ligne", "commande",
+"resultat"} ou {"ligne", "commande", "erreur", "message"}), suivie d'un
+bilan ({"commandes", "reussies", "echecs", "validee"}).
+
+Codes de sortie : 0 succès, 1 succès partiel (lignes ou commandes rejetées),
+2 erreur, 3 personne introuvable.
+"""
+
+import argparse
+import json
+import os
+import shlex
+import sys
+import time
+
+from gestion import bulletins
+from gestion.chargement import TAILLE_LOT_DEFAUT
+from gestion.config import charger_config
+from gestion.depots import creer_depot
+from gestion.exceptions import ErreurBase, ErreurGestion, PersonneExistante, PersonneIntrouvable, SaisieInvalide
+from gestion.exportation import FORMATS, depuis_depot, exporter, filtrer
+from gestion.importation import importer_fichier
+from gestion.service import en_dict
+from gestion.validation import ROLES, valider_evaluation, valider_notes, valider_personne
+
+SUCCES = 0
+SUCCES_PARTIEL = 1
+ERREUR = 2
+INTROUVABLE = 3
+
+# Erreurs d'une commande : rapportées en JSON, elles n'interrompent pas le programme.
+ERREURS_COMMANDE = (ErreurGestion, OSError, ValueError)
+
+
+# =========================
+# COMMANDES
+# =========================
+# Chaque commande reçoit le dépôt et les arguments, et retourne le couple
+# (code de sortie, résultat sérialisable en JSON).
+
+def lire_personne(depot, id_person):
+    ligne = depot.lire_personne(id_person)
+    if ligne is None:
+        raise PersonneIntrouvable(id_person)
+    return ligne
+
+
+def commande_add(depot, args):
+    personne = valider_personne(args.id, args.nom, args.age, args.groupe, args.role)
+    if depot.lire_personne(personne[0]) is not None:
+        raise PersonneExistante(personne[0])
+    depot.inserer_personne(*personne)
+    return SUCCES, en_dict(personne + ([],))
+
+
+def commande_get(depot, args):
+    return SUCCES, en_dict(lire_personne(depot, args.id))
+
+
+def commande_delete(depot, args):
+    if not depot.supprimer_personne(args.id):
+        raise PersonneIntrouvable(args.id)
+    return SUCCES, {"id": args.id}
+
+
+def lire_evaluation(texte):
+    """
+    Découpe une évaluation saisie sous la forme NOM=NOTE[:COEFFICIENT]
+    (note vide pour retirer l'évaluation).
+    """
+    evaluation, egal, reste = texte.partition("=")
+    if not egal:
+        raise SaisieInvalide(f"Évaluation attendue sous la forme NOM=NOTE[:COEFFICIENT] : {texte!r}")
+    note, _, coefficient = reste.partition(":")
+    return valider_evaluation(evaluation, note, coefficient)
+
+
+def commande_set_grades(depot, args):
+    notes = valider_notes(None if note == "-" else note for note in args.notes) if args.notes else []
+    notes += [lire_evaluation(texte) for texte in args.evaluation]
+    if not notes:
+        raise SaisieInvalide("Aucune note à enregistrer.")
+    lire_personne(depot, args.id)
+    depot.enregistrer_notes(args.id, notes)
+    return SUCCES, en_dict(lire_personne(depot, args.id))
+
+
+def commande_list(depot, args):
+    lignes = filtrer(depot.iterer_personnes(args.taille_lot), args.groupe, args.role)
+    return SUCCES, [en_dict(ligne) for ligne in lignes]
+
+
+def commande_stats(depot, args):
+    moyennes = depot.moyennes_groupes()
+    return SUCCES, {
+        group: stats._asdict() for group, stats in sorted(moyennes.items())
+        if args.groupe is None or group == args.groupe
+    }
+
+
+def commande_import(depot, args):
+    rapport = importer_fichier(
+        args.fichier,
+        depot,
+        ids_existants=set(depot.iterer_ids()),
+        taille_lot=args.taille_lot,
+        chemin_rapport=args.rapport,
+        format_fichier=args.format,
+    )
+    resultat = {
+        "lues": rapport.lues,
+        "importees": len(rapport.importees),
+        "rejetees": rapport.rejetees,
+        "rapport": rapport.chemin_rapport if rapport.rejetees else None,
+    }
+    return (SUCCES_PARTIEL if rapport.rejetees else SUCCES), resultat
+
+
+def commande_export(depot, args):
+    format_fichier = args.format or detecter_format_export(args.fichier)
+    total = exporter(depuis_depot(depot, args.taille_lot), args.fichier, format_fichier, args.groupe, args.role)
+    return SUCCES, {"fichier": args.fichier, "format": format_fichier, "exportees": total}
+
+
+def commande_report(depot, args):
+    if args.configuration is None:
+        # Les processus de la génération ne verraient pas les écritures non validées du lot.
+        raise SaisieInvalide("La commande report ne s'exécute pas en mode lot.")
+    debut = time.perf_counter()
+    bilans = bulletins.generer_bulletins(
+        args.configuration,
+        args.dossier,
+        groupes=args.groupe,
+        formats=args.format or bulletins.FORMATS,
+        nb_processus=args.processus,
+        progression=afficher_progression if args.progression else None,
+    )
+    return SUCCES, {
+        "dossier": args.dossier,
+        "groupes": len({bilan.groupe for bilan in bilans}),
+        "bulletins": sum(bilan.bulletins for bilan in bilans),
+        "fichiers": sum(bilan.fichiers for bilan in bilans),
+        "duree": round(time.perf_counter() - debut, 3),
+    }
+
+
+def afficher_progression(faites, total, bilan):
+    ecrire_json({"groupe": bilan.groupe, "partie": f"{bilan.partie + 1}/{bilan.parties}",
+                 "personnes": faites, "total": total}, sys.stderr)
+
+
+def detecter_format_export(chemin):
+    extension = os.path.splitext(chemin)[1].lower()
+    return {".jsonl": "jsonl", ".ndjson": "jsonl", ".gec": "colonnes"}.get(extension, "csv")
+
+
+# =========================
+# MODE LOT (--batch)
+# =========================
+
+class ParserCommandes(argparse.ArgumentParser):
+    """
+    Parser des lignes d'un fichier de commandes : une ligne mal formée lève
+    `SaisieInvalide` au lieu de terminer le programme.
+    """
+    def error(self, message):
+        raise SaisieInvalide(message)
+
+
+def executer_lot(depot, fichier, continuer=False, sortie=None):
+    """
+    Exécute les commandes de `fichier` dans une seule session du dépôt et
+    écrit une ligne JSON par commande, puis le bilan. Retourne le code de sortie.
+    """
+    sortie = sortie if sortie is not None else sys.stdout
+    parser = ParserCommandes(prog="--batch", add_help=False)
+    ajouter_commandes(parser, aide=False)
+    bilan = {"commandes": 0, "reussies": 0, "echecs": 0, "validee": False}
+    code = SUCCES
+    rapportee = None
+    try:
+        with depot.session():
+            for numero, texte in enumerate(fichier, start=1):
+                commande = None
+                try:
+                    mots = shlex.split(texte, comments=True)
+                    if not mots:
+                        continue
+                    commande = mots[0]
+                    with depot.etape():
+                        args = parser.parse_args(mots)
+                        code_commande, resultat = args.executer(depot, args)
+                except ERREURS_COMMANDE as e:
+                    bilan["echecs"] += 1
+                    ecrire_json(dict(ligne=numero, commande=commande, **erreur_json(e)), sortie)
+                    if not continuer:
+                        rapportee = e
+                        raise
+                    code = max(code, SUCCES_PARTIEL)
+                    continue
+                bilan["reussies"] += 1
+                code = max(code, code_commande)
+                ecrire_json({"ligne": numero, "commande": commande, "resultat": resultat}, sortie)
+        bilan["validee"] = True
+    except ERREURS_COMMANDE as e:
+        # Erreur d'une commande (déjà rapportée) ou de la validation finale : rien n'est enregistré.
+        if e is not rapportee:
+            ecrire_json(erreur_json(e), sortie)
+        code = code_erreur(e)
+    bilan["commandes"] = bilan["reussies"] + bilan["echecs"]
+    ecrire_json(bilan, sortie)
+    return code
+
+
+# =========================
+# SORTIE JSON ET CODES
+# =========================
+
+def ecrire_json(document, sortie=None):
+    sortie = sortie if sortie is not None else sys.stdout
+    sortie.write(json.dumps(document, ensure_ascii=False))
+    sortie.write("\n")
+
+
+def erreur_json(erreur):
+    return {"erreur": type(erreur).__name__, "message": str(erreur)}
+
+
+def code_erreur(erreur):
+    return INTROUVABLE if isinstance(erreur, PersonneIntrouvable) else ERREUR
+
+
+# =========================
+# PARSER
+# =========================
+
+def ajouter_commandes(parser, requise=True, aide=True):
+    commandes = parser.add_subparsers(dest="commande", required=requise)
+
+    ajouter = commandes.add_parser("add", add_help=aide, help="ajouter une personne")
+    ajouter.add_argument("id")
+    ajouter.add_argument("nom")
+    ajouter.add_argument("age")
+    ajouter.add_argument("groupe")
+    ajouter.add_argument("role", help=" ou ".join(ROLES))
+    ajouter.set_defaults(executer=commande_add)
+
+    lire = commandes.add_parser("get", add_help=aide, help="afficher une personne et ses notes")
+    lire.add_argument("id", type=int)
+    lire.set_defaults(executer=commande_get)
+
+    supprimer = commandes.add_parser("delete", add_help=aide, help="supprimer une personne")
+    supprimer.add_argument("id", type=int)
+    supprimer.set_defaults(executer=commande_delete)
+
+    notes = commandes.add_parser("set-grades", add_help=aide, help="enregistrer des notes (les autres évaluations sont conservées)")
+    notes.add_argument("id", type=int)
+    notes.add_argument("notes", nargs="*", help="note1 à note3 ('-' : pas de note, retire l'évaluation)")
+    notes.add_argument("--evaluation", "-e", action="append", default=[], metavar="NOM=NOTE[:COEFFICIENT]",
+                       help="évaluation nommée (note vide pour la retirer) ; répétable")
+    notes.set_defaults(executer=commande_set_grades)
+
+    lister = commandes.add_parser("list", add_help=aide, help="lister les personnes et leurs notes")
+    lister.add_argument("--groupe", help="ne lister que ce groupe")
+    lister.add_argument("--role", choices=ROLES, help="ne lister que ce rôle")
+    lister.add_argument("--taille-lot", type=int, default=TAILLE_LOT_DEFAUT)
+    lister.set_defaults(executer=commande_list)
+
+    stats = commandes.add_parser("stats", add_help=aide, help="moyennes par groupe calculées par la base")
+    stats.add_argument("--groupe", help="n'afficher que ce groupe")
+    stats.set_defaults(executer=commande_stats)
+
+    importer = commandes.add_parser("import", add_help=aide,
+                                    help="importer des personnes (et leurs notes) depuis un fichier CSV, JSON Lines ou colonnaire")
+    importer.add_argument("fichier")
+    importer.add_argument("--format", choices=["csv", "jsonl", "colonnes"], help="format du fichier (déduit de l'extension par défaut)")
+    importer.add_argument("--taille-lot", type=int, default=TAILLE_LOT_DEFAUT)
+    importer.add_argument("--rapport", help="fichier des lignes rejetées (par défaut <fichier>.rejets.csv)")
+    importer.set_defaults(executer=commande_import)
+
+    exporter_ = commandes.add_parser("export", add_help=aide, help="exporter les personnes et leurs notes")
+    exporter_.add_argument("fichier")
+    exporter_.add_argument("--format", choices=sorted(FORMATS), help="format du fichier (déduit de l'extension par défaut)")
+    exporter_.add_argument("--groupe", help="n'exporter que ce groupe")
+    exporter_.add_argument("--role", choices=ROLES, help="n'exporter que ce rôle")
+    exporter_.add_argument("--taille-lot", type=int, default=TAILLE_LOT_DEFAUT)
+    exporter_.set_defaults(executer=commande_export)
+
+    rapport = commandes.add_parser("report", add_help=aide, help="générer les bulletins de notes (plusieurs processus)")
+    rapport.add_argument("dossier", help="dossier de sortie (un sous-dossier par groupe)")
+    rapport.add_argument("--groupe", action="append", help="ne traiter que ce groupe (option répétable)")
+    rapport.add_argument("--format", action="append", choices=bulletins.FORMATS,
+                         help="format des bulletins (option répétable ; par défaut tous)")
+    rapport.add_argument("--processus", type=int, help="nombre de processus (par défaut, un par cœur)")
+    rapport.add_argument("--progression", action="store_true",
+                         help="écrire l'avancement en JSON sur la sortie d'erreur")
+    # Renseignée par `main` : la génération ouvre ses propres connexions.
+    rapport.set_defaults(executer=commande_report, configuration=None)
+    return commandes
+
+
+def construire_parser():
+    parser = argparse.ArgumentParser(prog="Getion_etudiant_console.py", description="Gestion des étudiants")
+    parser.add_argument("--config", help="fichier de configuration JSON")
+    parser.add_argument("--backend", choices=["mysql", "sqlite"], help="moteur de base de données")
+    parser.add_argument("--batch", metavar="FICHIER",
+                        help="exécuter les commandes du fichier (une par ligne, '-' : entrée standard) "
+                             "en une seule transaction")
+    parser.add_argument("--continuer", action="store_true",
+                        help="avec --batch : annuler seulement les commandes en erreur et poursuivre")
+    ajouter_commandes(parser, requise=False)
+    return parser
+
+
+def main(argv=None):
+    parser = construire_parser()
+    args = parser.parse_args(argv)
+    if (args.batch is None) == (args.commande is None):
+        parser.error("indiquer soit une commande, soit --batch FICHIER")
+    config = charger_config(args.config)
+    if args.backend:
+        config["backend"] = args.backend
+    # Processus de courte durée : chaque commande est en base à son retour,
+    # sans cache des notes ni écriture différée.
+    config.update(cache_taille=0, ecriture_differee=False)
+    try:
+        depot = creer_depot(config)
+    except ErreurBase as e:
+        ecrire_json(erreur_json(e), sys.stderr)
+        return ERREUR
+    try:
+        if args.batch == "-":
+            return executer_lot(depot, sys.stdin, args.continuer)
+        if args.batch is not None:
+            with open(args.batch, encoding="utf-8") as fichier:
+                return executer_lot(depot, fichier, args.continuer)
+        args.configuration = config
+        code, resultat = args.executer(depot, args)
+        ecrire_json(resultat)
+        return code
+    except ERREURS_COMMANDE as e:
+        ecrire_json(erreur_json(e), sys.stderr)
+        return code_erreur(e)
+    finally:
+        depot.fermer()
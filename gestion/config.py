@@ -0,0 +1,70 @@
+# gestion/config.py
+"""
+Configuration de l'accès à la base de données.
+
+Les valeurs par défaut peuvent être surchargées par un fichier JSON (chemin
+passé en argument ou variable d'environnement GESTION_CONFIG), puis par des
+variables d'environnement GESTION_<CLE> (par exemple GESTION_PASSWORD).
+"""
+
+import json
+import os
+
+CONFIG_DEFAUT = {
+    "backend": "mysql",         # "mysql" ou "sqlite"
+    "chemin_sqlite": "gestion_etudiant.db",
+    "host": "localhost",
+    "user": "root",
+    "password": "YOUR_DB_PASSWORD",
+    "database": "YOUR_DB_NAME",
+    # Pool de connexions
+    "taille_pool": 5,
+    "delai_attente": 10.0,      # secondes d'attente max pour obtenir une connexion du pool
+    "delai_connexion": 10,      # secondes avant abandon d'une tentative de connexion
+    "verification_apres": 30.0, # une connexion inactive depuis plus longtemps est vérifiée (ping)
+    "tentatives": 3,            # tentatives de (re)connexion avant d'abandonner
+    "pause_tentatives": 0.5,    # secondes entre deux tentatives (doublées à chaque échec)
+    "lecture_seule": False,     # True : connexions en lecture seule, schéma non créé ni migré
+    # Cache des notes (voir gestion/cache.py)
+    "cache_taille": 10000,      # nombre maximal d'entrées (0 : cache désactivé)
+    "cache_ttl": 60.0,          # durée de validité d'une entrée, en secondes
+    "cache_mode": "confiance",  # "confiance" ou "revalidation" (plusieurs écrivains)
+    # Représentation en mémoire
+    "table_personnes": False,   # True : personnes rangées en colonnes (gestion.modeles.PersonTable)
+    # Démarrage (voir gestion/chargement.py et gestion/instantane.py)
+    "chargement_differe": False, # True : notes lues au premier accès, par lots, et non au démarrage
+    "instantane": "",           # fichier d'instantané local du registre ("" : désactivé)
+    # Écriture différée (voir gestion/ecriture_differee.py)
+    "ecriture_differee": False, # True : écritures mises en file et validées par lots
+    "delai_ecriture": 0.5,      # secondes d'attente maximale d'une écriture en file
+    "taille_lot_ecriture": 500, # personnes en attente qui déclenchent une validation
+    "journal_ecriture": "",     # fichier journal de la file (survit à un arrêt brutal ; "" : file en mémoire seulement)
+    "journal_fsync": False,     # True : chaque opération journalisée est forcée sur disque (coupure de courant)
+    # Synchronisation incrémentale (voir gestion/synchro.py)
+    "intervalle_synchro": 5.0,  # secondes entre deux synchronisations de l'interface graphique (0 : jamais)
+    "delai_trous_synchro": 3600.0, # secondes pendant lesquelles un trou du journal (commit MySQL tardif) est relu
+    # Instrumentation (voir gestion/instrumentation.py)
+    "instrumentation": True,    # chronométrer requêtes et méthodes du gestionnaire
+    "seuil_requete_lente": 0.1, # secondes au-delà desquelles une requête est journalisée
+    "seuil_n_plus_1": 20,       # exécutions d'une même requête dans une opération : schéma N+1 probable
+}
+
+
+def charger_config(chemin=None):
+    """
+    Retourne la configuration effective (dictionnaire).
+    """
+    config = dict(CONFIG_DEFAUT)
+    chemin = chemin or os.environ.get("GESTION_CONFIG")
+    if chemin:
+        with open(chemin, encoding="utf-8") as fichier:
+            config.update(json.load(fichier))
+    for cle, valeur in config.items():
+        variable = os.environ.get(f"GESTION_{cle.upper()}")
+        if variable is None:
+            continue
+        if isinstance(valeur, bool):
+            config[cle] = variable.strip().lower() in ("1", "true", "oui")
+        else:
+            config[cle] = type(valeur)(variable) if valeur is not None else variable
+    return config
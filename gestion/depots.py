@@ -0,0 +1,847 @@
+# gestion/depots.py
+"""
+Dépôts de persistance des personnes et de leurs notes.
+
+`DepotPersonnes` définit l'interface ; deux implémentations sont fournies :
+- `DepotMySQL` : le serveur MySQL historique ;
+- `DepotSQLite` : une base SQLite embarquée (mode WAL), pour un usage local,
+  hors ligne ou en intégration continue.
+
+Le moteur est choisi par la clé `backend` de la configuration (voir
+`creer_depot`). Toutes les erreurs du pilote sont converties en `ErreurBase`.
+Si le dépôt reçoit une `Instrumentation`, ses curseurs sont mesurés (voir
+`gestion.instrumentation`).
+
+Les notes sont rangées dans la table `evaluations`, une ligne par
+(personne, évaluation, coefficient) : le nombre d'évaluations par personne
+n'est pas limité. Les bases qui ont encore l'ancienne table `notes` (trois
+colonnes note1 à note3) sont migrées au démarrage (voir `_migrer_notes`).
+
+Les dépôts SQL tiennent à jour, dans la même transaction que chaque écriture :
+- la table de synthèse `group_stats` (voir `gestion.resume_groupes`) ;
+- le journal des modifications `journal` : une ligne numérotée par personne
+  écrite ou supprimée (pierre tombale), qui permet aux clients de ne relire
+  que ce qui a changé depuis leur dernière synchronisation (`gestion.synchro`).
+  Avec MySQL, un numéro est attribué à l'insertion mais n'est visible qu'au
+  commit : le journal peut donc avoir des trous (transactions en cours ou
+  annulées), que `trous_journal` et `changements_depuis` signalent.
+
+Une `session` regroupe plusieurs opérations sur une même connexion, dans une
+seule transaction ; une `etape` de la session peut être annulée seule
+(point de sauvegarde), sans abandonner les précédentes.
+
+Avec `lecture_seule`, les connexions refusent toute écriture et le schéma
+n'est ni créé ni migré : c'est ainsi que les processus de
+`gestion.bulletins` lisent la base sans risquer de la modifier.
+"""
+
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+
+from gestion import resume_groupes
+from gestion.chargement import (REQUETE_CHARGEMENT_GROUPE, REQUETE_CHARGEMENT_IDS, TAILLE_LOT_DEFAUT, iterer_identites, iterer_lignes,
+                                iterer_personnes)
+from gestion.exceptions import ErreurBase
+from gestion.instrumentation import CurseurInstrumente
+from gestion.modeles import EVALUATIONS_SAISIE, Note, fusionner_notes, normaliser_notes
+from gestion.pool import PoolConnexions, creer_pool_mysql
+
+
+ECRITURE = "ecriture"
+SUPPRESSION = "suppression"
+# Nombre maximal de paramètres d'une clause IN (SQLite en accepte 999 par défaut).
+TAILLE_LOT_IN = 500
+
+
+class DepotPersonnes(ABC):
+    """
+    Interface d'accès aux tables `etudiant` et `evaluations`.
+    """
+    instrumentation = None
+
+    @abstractmethod
+    def iterer_personnes(self, taille_lot=TAILLE_LOT_DEFAUT, avec_notes=True):
+        """
+        Produit des tuples (id, nom, age, groupe, type, notes) pour toutes les
+        personnes, par ID croissant. Si `avec_notes` est faux, les notes ne
+        sont pas lues et valent None (chargement différé).
+        """
+
+    @abstractmethod
+    def inserer_personne(self, id_person, nom, age, group, type_person):
+        pass
+
+    @abstractmethod
+    def inserer_personnes(self, personnes, taille_lot=TAILLE_LOT_DEFAUT):
+        """
+        Insère un flux de tuples (id, nom, age, groupe, type) par lots, dans
+        une seule transaction. Retourne le nombre de personnes insérées.
+        """
+
+    @abstractmethod
+    def iterer_ids(self):
+        """
+        Produit les IDs de toutes les personnes enregistrées.
+        """
+
+    def compter_personnes(self):
+        return sum(1 for _ in self.iterer_ids())
+
+    def iterer_groupe(self, group, taille_lot=TAILLE_LOT_DEFAUT):
+        """
+        Produit les tuples (id, nom, age, groupe, type, notes) des personnes
+        d'un groupe, par ID croissant.
+        """
+        return (ligne for ligne in self.iterer_personnes(taille_lot) if ligne[3] == group)
+
+    def compter_groupes(self):
+        """
+        Retourne {groupe: nombre de personnes}.
+        """
+        effectifs = {}
+        for ligne in self.iterer_personnes(avec_notes=False):
+            effectifs[ligne[3]] = effectifs.get(ligne[3], 0) + 1
+        return effectifs
+
+    def lire_personne(self, id_person):
+        """
+        Retourne le tuple (id, nom, age, groupe, type, notes) d'une personne, ou None.
+        Par défaut, toutes les personnes sont parcourues.
+        """
+        for ligne in self.iterer_personnes():
+            if ligne[0] == id_person:
+                return ligne
+        return None
+
+    @abstractmethod
+    def modifier_personne(self, id_person, nom, age):
+        """
+        Modifie le nom et l'âge. Retourne False si la personne n'existe pas.
+        """
+
+    @abstractmethod
+    def supprimer_personne(self, id_person):
+        """
+        Supprime la personne et ses notes. Retourne False si elle n'existait pas.
+        """
+
+    @abstractmethod
+    def lire_notes(self, id_person):
+        """
+        Retourne la liste des `Note` d'une personne, triée par évaluation
+        (liste vide si elle n'a aucune note).
+        """
+
+    def lire_notes_lot(self, ids):
+        """
+        Retourne {id: liste des `Note`} pour les personnes `ids` qui ont des
+        notes (une personne absente du résultat n'en a aucune).
+        """
+        resultat = {}
+        for id_person in ids:
+            notes = self.lire_notes(id_person)
+            if notes:
+                resultat[id_person] = notes
+        return resultat
+
+    @abstractmethod
+    def enregistrer_notes(self, id_person, notes):
+        """
+        Crée ou remplace des notes d'une personne. `notes` est une saisie au
+        sens de `normaliser_notes` : une note None retire l'évaluation, les
+        évaluations non saisies sont conservées.
+        """
+
+    @abstractmethod
+    def enregistrer_notes_lot(self, saisies):
+        """
+        Crée ou remplace, en une seule transaction, les notes [(id, notes), ...]
+        de plusieurs personnes (tout ou rien), comme `enregistrer_notes`.
+        Retourne le nombre de personnes écrites.
+        """
+
+    def ecrire_lot(self, suppressions=(), insertions=(), modifications=(), saisies=()):
+        """
+        Applique un lot d'écritures, dans cet ordre : suppressions (IDs),
+        insertions (id, nom, age, groupe, type), modifications (id, nom, age)
+        et saisies de notes (id, notes). Les dépôts SQL le font en une seule
+        transaction (tout ou rien) ; par défaut, les opérations s'enchaînent.
+        """
+        for id_person in suppressions:
+            self.supprimer_personne(id_person)
+        for personne in insertions:
+            self.inserer_personne(*personne)
+        for id_person, nom, age in modifications:
+            self.modifier_personne(id_person, nom, age)
+        saisies = list(saisies)
+        if saisies:
+            self.enregistrer_notes_lot(saisies)
+
+    @abstractmethod
+    def moyennes_groupes(self):
+        """
+        Retourne {groupe: MoyennesGroupe} calculé par le moteur de base.
+        """
+
+    @abstractmethod
+    def verifier_stats(self, corriger=False):
+        """
+        Compare la table de synthèse à un recalcul complet et retourne la
+        liste des écarts ; si `corriger` est vrai, la table est reconstruite.
+        """
+
+    @abstractmethod
+    def version_journal(self):
+        """
+        Numéro de la dernière entrée du journal des modifications (0 s'il est vide).
+        """
+
+    @abstractmethod
+    def changements_depuis(self, version, trous=()):
+        """
+        Retourne (version courante, personnes écrites, IDs supprimés, trous
+        restants) pour les entrées du journal postérieures à `version` et
+        celles des intervalles `trous` [(début, fin), ...] (bornes incluses)
+        déjà signalés. Les personnes sont des tuples (id, nom, age, groupe,
+        type, notes), comme `iterer_personnes`. Les trous restants sont les
+        intervalles de numéros, parmi ceux relus, encore absents du journal.
+        """
+
+    def trous_journal(self, version):
+        """
+        Intervalles [(début, fin), ...] de numéros absents du journal jusqu'à
+        `version` incluse. Aucun par défaut : les entrées deviennent visibles
+        dans l'ordre de leurs numéros.
+        """
+        return []
+
+    def initialiser_schema(self):
+        """
+        Crée les tables et index manquants (si le moteur le permet).
+        """
+
+    def flush(self):
+        """
+        Applique les écritures encore en attente (écriture différée, voir
+        `gestion.ecriture_differee`) ; sans effet par défaut.
+        """
+
+    @contextmanager
+    def session(self):
+        """
+        Exécute les opérations du bloc sur une seule connexion et dans une
+        seule transaction, validée à la sortie du bloc et annulée entièrement
+        s'il lève une exception. Par défaut, les opérations sont simplement
+        appliquées l'une après l'autre, sans garantie d'atomicité.
+        """
+        yield self
+
+    @contextmanager
+    def etape(self):
+        """
+        Dans une session, annule les seules écritures du bloc s'il lève une
+        exception ; la session continue. Sans effet par défaut.
+        """
+        yield
+
+    def fermer(self):
+        pass
+
+
+def intervalles_manquants(intervalles, presents):
+    """
+    Parties des intervalles [(début, fin), ...] (bornes incluses) qui ne
+    contiennent aucun des numéros `presents`.
+    """
+    presents = sorted(presents)
+    manquants = []
+    for debut, fin in intervalles:
+        courant = debut
+        i = bisect_left(presents, debut)
+        while i < len(presents) and presents[i] <= fin:
+            if presents[i] > courant:
+                manquants.append((courant, presents[i] - 1))
+            courant = presents[i] + 1
+            i += 1
+        if courant <= fin:
+            manquants.append((courant, fin))
+    return manquants
+
+
+class DepotSQL(DepotPersonnes):
+    """
+    Implémentation commune aux moteurs SQL accessibles via un pool DB-API.
+
+    Les requêtes sont écrites avec le marqueur `%s` ; les sous-classes dont le
+    pilote attend un autre marqueur redéfinissent `marqueur`. Elles fournissent
+    aussi `SCHEMA`, `REQUETE_CUMUL`, l'upsert qui ajoute un écart
+    (somme, nb, somme pondérée, poids) à une ligne de `group_stats`,
+    `REQUETE_UPSERT_NOTES`, qui écrit une évaluation d'une personne, et
+    `_colonnes`, qui décrit une table existante.
+    """
+    marqueur = "%s"
+    options_curseur = {}
+    options_curseur_lot = {}
+    options_curseur_session = {}
+    verrou_lecture = ""
+    SCHEMA = ()
+    REQUETE_CUMUL = None
+    REQUETE_UPSERT_NOTES = None
+
+    def __init__(self, pool, erreurs_pilote):
+        self.pool = pool
+        self.erreurs_pilote = erreurs_pilote
+        self.__requetes = {}
+        # Curseur de la session en cours, propre à chaque thread.
+        self.__session = threading.local()
+
+    def _sql(self, requete):
+        sql = self.__requetes.get(requete)
+        if sql is None:
+            sql = self.__requetes[requete] = requete.replace("%s", self.marqueur)
+        return sql
+
+    @contextmanager
+    def _transaction(self, options_curseur=None):
+        cur = getattr(self.__session, "curseur", None)
+        if cur is not None:
+            # Dans une session : même curseur, validé à la fin de la session.
+            try:
+                yield cur
+            except self.erreurs_pilote as e:
+                raise ErreurBase(str(e)) from e
+            return
+        if options_curseur is None:
+            options_curseur = self.options_curseur
+        try:
+            with self.pool.transaction(**options_curseur) as cur:
+                yield cur if self.instrumentation is None else CurseurInstrumente(cur, self.instrumentation)
+        except self.erreurs_pilote as e:
+            raise ErreurBase(str(e)) from e
+
+    @contextmanager
+    def session(self):
+        if getattr(self.__session, "curseur", None) is not None:
+            # Session imbriquée : elle fait partie de la session englobante.
+            yield self
+            return
+        with self._transaction(self.options_curseur_session) as cur:
+            self._verrouiller(cur)
+            self.__session.curseur = cur
+            self.__session.profondeur = 0
+            try:
+                yield self
+            finally:
+                self.__session.curseur = None
+
+    @contextmanager
+    def etape(self):
+        if getattr(self.__session, "curseur", None) is None:
+            yield
+            return
+        # Un nom par niveau d'imbrication : MySQL remplace un point de sauvegarde du même nom.
+        nom = f"etape{self.__session.profondeur}"
+        with self._transaction() as cur:
+            cur.execute(f"SAVEPOINT {nom}")
+        self.__session.profondeur += 1
+        try:
+            yield
+        except BaseException:
+            with self._transaction() as cur:
+                cur.execute(f"ROLLBACK TO SAVEPOINT {nom}")
+                cur.execute(f"RELEASE SAVEPOINT {nom}")
+            raise
+        else:
+            with self._transaction() as cur:
+                cur.execute(f"RELEASE SAVEPOINT {nom}")
+        finally:
+            self.__session.profondeur -= 1
+
+    def _verrouiller(self, cur):
+        """
+        Prend le verrou d'écriture avant les lectures qui servent à calculer
+        les écarts de `group_stats` (sans effet par défaut).
+        """
+
+    def _cumuler(self, cur, deltas):
+        lignes = resume_groupes.lignes_deltas(deltas)
+        if lignes:
+            cur.executemany(self._sql(self.REQUETE_CUMUL), lignes)
+
+    def _journaliser(self, cur, ids, operation):
+        cur.executemany(self._sql("INSERT INTO journal (id_ed, operation) VALUES (%s, %s)"),
+                        [(id_person, operation) for id_person in ids])
+
+    def _groupe(self, cur, id_person):
+        """
+        Retourne (existe, groupe) pour une personne, en verrouillant sa ligne.
+        """
+        cur.execute(self._sql("SELECT ed_group FROM etudiant WHERE id = %s" + self.verrou_lecture), (id_person,))
+        ligne = cur.fetchone()
+        return (False, None) if ligne is None else (True, ligne[0])
+
+    def iterer_personnes(self, taille_lot=TAILLE_LOT_DEFAUT, avec_notes=True):
+        with self._transaction() as cur:
+            if avec_notes:
+                yield from iterer_personnes(cur, taille_lot)
+            else:
+                yield from iterer_identites(cur, taille_lot)
+
+    def inserer_personne(self, id_person, nom, age, group, type_person):
+        with self._transaction() as cur:
+            self._inserer(cur, [(id_person, nom, age, group, type_person)])
+
+    def _inserer(self, cur, personnes):
+        cur.executemany(
+            self._sql("INSERT INTO etudiant (id, name, age, ed_group, type) VALUES (%s, %s, %s, %s, %s)"),
+            personnes,
+        )
+        deltas = {}
+        for personne in personnes:
+            resume_groupes.ajouter_delta(deltas, personne[3], resume_groupes.EMPLACEMENT_EFFECTIF, 0.0, 1)
+        self._cumuler(cur, deltas)
+        self._journaliser(cur, [personne[0] for personne in personnes], ECRITURE)
+
+    def inserer_personnes(self, personnes, taille_lot=TAILLE_LOT_DEFAUT):
+        sql = self._sql("INSERT INTO etudiant (id, name, age, ed_group, type) VALUES (%s, %s, %s, %s, %s)")
+        total = 0
+        deltas = {}
+        with self._transaction(self.options_curseur_lot) as cur:
+            lot = []
+            for personne in personnes:
+                lot.append(personne)
+                resume_groupes.ajouter_delta(deltas, personne[3], resume_groupes.EMPLACEMENT_EFFECTIF, 0.0, 1)
+                if len(lot) >= taille_lot:
+                    cur.executemany(sql, lot)
+                    self._journaliser(cur, [p[0] for p in lot], ECRITURE)
+                    total += len(lot)
+                    lot = []
+            if lot:
+                cur.executemany(sql, lot)
+                self._journaliser(cur, [p[0] for p in lot], ECRITURE)
+                total += len(lot)
+            self._cumuler(cur, deltas)
+        return total
+
+    def iterer_ids(self):
+        with self._transaction() as cur:
+            cur.execute("SELECT id FROM etudiant")
+            for (id_person,) in iterer_lignes(cur):
+                yield id_person
+
+    def compter_personnes(self):
+        with self._transaction() as cur:
+            cur.execute("SELECT COUNT(*) FROM etudiant")
+            return cur.fetchone()[0]
+
+    def iterer_groupe(self, group, taille_lot=TAILLE_LOT_DEFAUT):
+        with self._transaction() as cur:
+            yield from iterer_personnes(cur, taille_lot, requete=self._sql(REQUETE_CHARGEMENT_GROUPE),
+                                        parametres=(group,))
+
+    def compter_groupes(self):
+        with self._transaction() as cur:
+            cur.execute("SELECT ed_group, COUNT(*) FROM etudiant GROUP BY ed_group")
+            return {group: nombre for group, nombre in cur.fetchall()}
+
+    def lire_personne(self, id_person):
+        with self._transaction() as cur:
+            lignes = list(iterer_personnes(cur, requete=self._sql(REQUETE_CHARGEMENT_IDS.format("%s")),
+                                           parametres=(id_person,)))
+        return lignes[0] if lignes else None
+
+    def modifier_personne(self, id_person, nom, age):
+        with self._transaction() as cur:
+            return self._modifier(cur, id_person, nom, age)
+
+    def _modifier(self, cur, id_person, nom, age):
+        existe, _ = self._groupe(cur, id_person)
+        if existe:
+            cur.execute(self._sql("UPDATE etudiant SET name = %s, age = %s WHERE id = %s"), (nom, age, id_person))
+            self._journaliser(cur, [id_person], ECRITURE)
+        return existe
+
+    def supprimer_personne(self, id_person):
+        with self._transaction() as cur:
+            self._verrouiller(cur)
+            return self._supprimer(cur, id_person)
+
+    def _supprimer(self, cur, id_person):
+        existe, group = self._groupe(cur, id_person)
+        deltas = {}
+        if existe:
+            cur.execute(self._sql("SELECT evaluation, note, coefficient FROM evaluations WHERE id_ed = %s"),
+                        (id_person,))
+            resume_groupes.delta_notes(deltas, group, cur.fetchall(), [])
+            resume_groupes.ajouter_delta(deltas, group, resume_groupes.EMPLACEMENT_EFFECTIF, 0.0, -1)
+        cur.execute(self._sql("DELETE FROM evaluations WHERE id_ed = %s"), (id_person,))
+        cur.execute(self._sql("DELETE FROM etudiant WHERE id = %s"), (id_person,))
+        self._cumuler(cur, deltas)
+        if existe:
+            self._journaliser(cur, [id_person], SUPPRESSION)
+        return existe
+
+    def lire_notes(self, id_person):
+        with self._transaction() as cur:
+            cur.execute(self._sql("SELECT evaluation, note, coefficient FROM evaluations "
+                                  "WHERE id_ed = %s ORDER BY evaluation"), (id_person,))
+            return [Note(*ligne) for ligne in cur.fetchall()]
+
+    def lire_notes_lot(self, ids):
+        ids = list(ids)
+        resultat = {}
+        with self._transaction(self.options_curseur_lot) as cur:
+            for debut in range(0, len(ids), TAILLE_LOT_IN):
+                lot = ids[debut:debut + TAILLE_LOT_IN]
+                cur.execute(f"SELECT id_ed, evaluation, note, coefficient FROM evaluations "
+                            f"WHERE id_ed IN ({', '.join([self.marqueur] * len(lot))}) "
+                            f"ORDER BY id_ed, evaluation", lot)
+                for id_person, *note in cur.fetchall():
+                    resultat.setdefault(id_person, []).append(Note(*note))
+        return resultat
+
+    def enregistrer_notes(self, id_person, notes):
+        self.enregistrer_notes_lot([(id_person, notes)])
+
+    def enregistrer_notes_lot(self, saisies):
+        # Une ligne par (personne, évaluation) : un upsert groupé pour les notes
+        # saisies et une suppression groupée pour les notes retirées, après
+        # lecture groupée des groupes et des anciennes notes (écarts de
+        # `group_stats`, coefficients conservés).
+        saisies = {id_person: normaliser_notes(notes) for id_person, notes in saisies}
+        if not saisies:
+            return 0
+        with self._transaction(self.options_curseur_lot) as cur:
+            self._verrouiller(cur)
+            return self._enregistrer_notes_lot(cur, saisies)
+
+    def _enregistrer_notes_lot(self, cur, saisies):
+        ids = list(saisies)
+        groupes, anciennes = {}, {}
+        for debut in range(0, len(ids), TAILLE_LOT_IN):
+            lot = ids[debut:debut + TAILLE_LOT_IN]
+            marqueurs = ", ".join([self.marqueur] * len(lot))
+            cur.execute(f"SELECT id, ed_group FROM etudiant WHERE id IN ({marqueurs}){self.verrou_lecture}", lot)
+            groupes.update(cur.fetchall())
+            cur.execute(f"SELECT id_ed, evaluation, note, coefficient FROM evaluations "
+                        f"WHERE id_ed IN ({marqueurs}){self.verrou_lecture}", lot)
+            for id_person, *note in cur.fetchall():
+                anciennes.setdefault(id_person, []).append(Note(*note))
+        ecritures, suppressions, deltas = [], [], {}
+        for id_person, notes in saisies.items():
+            actuelles = anciennes.get(id_person, [])
+            nouvelles = fusionner_notes(actuelles, notes)
+            saisies_personne = {n.evaluation for n in notes}
+            ecritures.extend((id_person, n.evaluation, n.note, n.coefficient)
+                             for n in nouvelles if n.evaluation in saisies_personne)
+            suppressions.extend((id_person, n.evaluation) for n in notes if n.note is None)
+            if id_person in groupes:
+                resume_groupes.delta_notes(deltas, groupes[id_person], actuelles, nouvelles)
+        if ecritures:
+            cur.executemany(self._sql(self.REQUETE_UPSERT_NOTES), ecritures)
+        if suppressions:
+            cur.executemany(self._sql("DELETE FROM evaluations WHERE id_ed = %s AND evaluation = %s"),
+                            suppressions)
+        self._cumuler(cur, deltas)
+        self._journaliser(cur, [id_person for id_person in ids if id_person in groupes], ECRITURE)
+        return len(saisies)
+
+    def ecrire_lot(self, suppressions=(), insertions=(), modifications=(), saisies=()):
+        insertions = [tuple(personne) for personne in insertions]
+        saisies = {id_person: normaliser_notes(notes) for id_person, notes in saisies}
+        with self._transaction(self.options_curseur_lot) as cur:
+            self._verrouiller(cur)
+            for id_person in suppressions:
+                self._supprimer(cur, id_person)
+            if insertions:
+                self._inserer(cur, insertions)
+            for id_person, nom, age in modifications:
+                self._modifier(cur, id_person, nom, age)
+            if saisies:
+                self._enregistrer_notes_lot(cur, saisies)
+
+    def version_journal(self):
+        with self._transaction() as cur:
+            cur.execute("SELECT COALESCE(MAX(version), 0) FROM journal")
+            return cur.fetchone()[0]
+
+    def trous_journal(self, version):
+        with self._transaction() as cur:
+            cur.execute(self._sql("SELECT MIN(version) FROM journal WHERE version <= %s"), (version,))
+            premiere = cur.fetchone()[0]
+            if premiere is None:
+                return [(1, version)] if version > 0 else []
+            # Chaque entrée non suivie de la suivante ouvre un trou, qui va
+            # jusqu'à l'entrée présente d'après.
+            cur.execute(self._sql("SELECT j.version + 1, (SELECT MIN(k.version) FROM journal k WHERE k.version > j.version) - 1 "
+                                  "FROM journal j WHERE j.version < %s "
+                                  "AND NOT EXISTS (SELECT 1 FROM journal k WHERE k.version = j.version + 1)"), (version,))
+            trous = sorted(cur.fetchall())
+        return ([(1, premiere - 1)] if premiere > 1 else []) + [(debut, fin) for debut, fin in trous]
+
+    def changements_depuis(self, version, trous=()):
+        trous = list(trous)
+        with self._transaction() as cur:
+            # La version courante est lue en premier : une écriture validée
+            # pendant la lecture sera simplement relue à la synchronisation suivante.
+            cur.execute("SELECT COALESCE(MAX(version), 0) FROM journal")
+            courante = cur.fetchone()[0]
+            cur.execute(self._sql("SELECT version, id_ed FROM journal WHERE version > %s AND version <= %s"),
+                        (version, courante))
+            lignes = list(cur.fetchall())
+            # Deux paramètres par trou : lots de TAILLE_LOT_IN paramètres au plus.
+            for debut in range(0, len(trous), TAILLE_LOT_IN // 2):
+                lot = trous[debut:debut + TAILLE_LOT_IN // 2]
+                cur.execute(self._sql("SELECT version, id_ed FROM journal WHERE "
+                                      + " OR ".join(["version BETWEEN %s AND %s"] * len(lot))),
+                            [borne for trou in lot for borne in trou])
+                lignes.extend(cur.fetchall())
+            ids = list(dict.fromkeys(id_person for _, id_person in lignes))
+            ecrites = []
+            for debut in range(0, len(ids), TAILLE_LOT_IN):
+                lot = ids[debut:debut + TAILLE_LOT_IN]
+                requete = REQUETE_CHARGEMENT_IDS.format(", ".join([self.marqueur] * len(lot)))
+                ecrites.extend(iterer_personnes(cur, requete=requete, parametres=lot))
+        presentes = {ligne[0] for ligne in ecrites}
+        lues = trous + ([(version + 1, courante)] if courante > version else [])
+        return (courante, ecrites, [id_person for id_person in ids if id_person not in presentes],
+                intervalles_manquants(lues, [numero for numero, _ in lignes]))
+
+    def moyennes_groupes(self):
+        with self._transaction() as cur:
+            return resume_groupes.moyennes(resume_groupes.lire(cur))
+
+    def verifier_stats(self, corriger=False):
+        with self._transaction() as cur:
+            self._verrouiller(cur)
+            attendu = resume_groupes.reconstruire(cur)
+            ecarts = resume_groupes.comparer(attendu, resume_groupes.lire(cur))
+            if ecarts and corriger:
+                self._reecrire_stats(cur, attendu)
+        return ecarts
+
+    def _reecrire_stats(self, cur, contenu):
+        cur.execute("DELETE FROM group_stats")
+        lignes = [(group, emplacement) + tuple(valeurs) for (group, emplacement), valeurs in contenu.items()]
+        if lignes:
+            cur.executemany(self._sql("INSERT INTO group_stats (ed_group, evaluation, somme, nb, somme_ponderee, poids) "
+                                      "VALUES (%s, %s, %s, %s, %s, %s)"), lignes)
+
+    def initialiser_schema(self):
+        with self._transaction() as cur:
+            # Ancien format de `group_stats` (une ligne par colonne note1 à
+            # note3) : la table est recréée puis remplie ci-dessous.
+            if "slot" in self._colonnes(cur, "group_stats"):
+                cur.execute("DROP TABLE group_stats")
+            for requete in self.SCHEMA:
+                cur.execute(requete)
+            migrees = self._migrer_notes(cur)
+            # Première mise en service de `group_stats` sur une base existante (ou
+            # notes reprises de l'ancienne table) : remplissage complet.
+            cur.execute("SELECT COUNT(*) FROM group_stats")
+            if cur.fetchone()[0] == 0 or migrees:
+                self._verrouiller(cur)
+                self._reecrire_stats(cur, resume_groupes.reconstruire(cur))
+
+    def _colonnes(self, cur, table):
+        """
+        Noms des colonnes de `table` (ensemble vide si la table n'existe pas).
+        """
+        return set()
+
+    def _migrer_notes(self, cur):
+        """
+        Reprend l'ancienne table `notes` (une ligne de trois notes par
+        personne) dans `evaluations` : chaque note présente devient
+        l'évaluation note1, note2 ou note3, de coefficient 1. S'il existait
+        plusieurs lignes pour une même personne, seule la plus récente est
+        reprise. L'ancienne table est ensuite renommée `notes_v1`.
+        Retourne le nombre de notes reprises.
+        """
+        if not self._colonnes(cur, "notes"):
+            return 0
+        self._verrouiller(cur)
+        reprises = 0
+        for evaluation in EVALUATIONS_SAISIE:
+            cur.execute(
+                f"INSERT INTO evaluations (id_ed, evaluation, note, coefficient) "
+                f"SELECT n.id_ed, '{evaluation}', n.{evaluation}, 1 FROM notes n JOIN etudiant e ON e.id = n.id_ed "
+                f"WHERE n.{evaluation} IS NOT NULL "
+                f"AND n.id_note = (SELECT MAX(d.id_note) FROM notes d WHERE d.id_ed = n.id_ed)"
+            )
+            reprises += max(cur.rowcount, 0)
+        cur.execute("ALTER TABLE notes RENAME TO notes_v1")
+        return reprises
+
+    def fermer(self):
+        self.pool.fermer()
+
+
+class DepotMySQL(DepotSQL):
+    """
+    Dépôt MySQL. Les requêtes passent par des curseurs préparés
+    (`prepared=True`), compilés une fois par connexion côté serveur. Les
+    insertions par lots utilisent un curseur classique, dont `executemany`
+    regroupe les lignes en un seul INSERT multi-valeurs.
+    """
+    options_curseur = {"prepared": True}
+    options_curseur_lot = {}
+    # Une session enchaîne des requêtes sur un même curseur : résultats lus en entier à chaque requête.
+    options_curseur_session = {"buffered": True}
+    verrou_lecture = " FOR UPDATE"
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS evaluations ("
+        " id_ed INT NOT NULL, evaluation VARCHAR(50) NOT NULL,"
+        " note DOUBLE NOT NULL, coefficient DOUBLE NOT NULL DEFAULT 1,"
+        " PRIMARY KEY (id_ed, evaluation),"
+        " CONSTRAINT fk_evaluations_etudiant FOREIGN KEY (id_ed) REFERENCES etudiant(id) ON DELETE CASCADE)",
+        "CREATE TABLE IF NOT EXISTS group_stats ("
+        " ed_group VARCHAR(50) NOT NULL, evaluation VARCHAR(50) NOT NULL,"
+        " somme DOUBLE NOT NULL DEFAULT 0, nb INT NOT NULL DEFAULT 0,"
+        " somme_ponderee DOUBLE NOT NULL DEFAULT 0, poids DOUBLE NOT NULL DEFAULT 0,"
+        " PRIMARY KEY (ed_group, evaluation))",
+        "CREATE TABLE IF NOT EXISTS journal ("
+        " version BIGINT AUTO_INCREMENT PRIMARY KEY, id_ed INT NOT NULL,"
+        " operation VARCHAR(12) NOT NULL, INDEX idx_journal_id_ed (id_ed))",
+    )
+    REQUETE_CUMUL = (
+        "INSERT INTO group_stats (ed_group, evaluation, somme, nb, somme_ponderee, poids) "
+        "VALUES (%s, %s, %s, %s, %s, %s) "
+        "ON DUPLICATE KEY UPDATE somme = somme + VALUES(somme), nb = nb + VALUES(nb), "
+        "somme_ponderee = somme_ponderee + VALUES(somme_ponderee), poids = poids + VALUES(poids)"
+    )
+    REQUETE_UPSERT_NOTES = (
+        "INSERT INTO evaluations (id_ed, evaluation, note, coefficient) VALUES (%s, %s, %s, %s) "
+        "ON DUPLICATE KEY UPDATE note = VALUES(note), coefficient = VALUES(coefficient)"
+    )
+
+    def __init__(self, config):
+        try:
+            from mysql.connector import Error
+        except ImportError:
+            raise ErreurBase(
+                "Le pilote MySQL n'est pas installé (pip install mysql-connector-python)."
+            ) from None
+        super().__init__(creer_pool_mysql(config), (Error,))
+        if not config.get("lecture_seule"):
+            self.initialiser_schema()
+
+    def _colonnes(self, cur, table):
+        cur.execute(
+            "SELECT column_name FROM information_schema.columns "
+            "WHERE table_schema = DATABASE() AND table_name = %s",
+            (table,),
+        )
+        return {colonne for (colonne,) in cur.fetchall()}
+
+
+class DepotSQLite(DepotSQL):
+    """
+    Dépôt SQLite embarqué, en mode WAL (lecteurs concurrents d'un écrivain).
+    Le module `sqlite3` met en cache les requêtes compilées de chaque connexion.
+    """
+    marqueur = "?"
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS etudiant ("
+        " id INTEGER PRIMARY KEY, name TEXT, age INTEGER, ed_group TEXT, type TEXT)",
+        "CREATE TABLE IF NOT EXISTS evaluations ("
+        " id_ed INTEGER NOT NULL REFERENCES etudiant(id) ON DELETE CASCADE,"
+        " evaluation TEXT NOT NULL, note REAL NOT NULL, coefficient REAL NOT NULL DEFAULT 1,"
+        " PRIMARY KEY (id_ed, evaluation)) WITHOUT ROWID",
+        "CREATE TABLE IF NOT EXISTS group_stats ("
+        " ed_group TEXT NOT NULL, evaluation TEXT NOT NULL,"
+        " somme REAL NOT NULL DEFAULT 0, nb INTEGER NOT NULL DEFAULT 0,"
+        " somme_ponderee REAL NOT NULL DEFAULT 0, poids REAL NOT NULL DEFAULT 0,"
+        " PRIMARY KEY (ed_group, evaluation))",
+        "CREATE TABLE IF NOT EXISTS journal ("
+        " version INTEGER PRIMARY KEY AUTOINCREMENT, id_ed INTEGER NOT NULL, operation TEXT NOT NULL)",
+    )
+    REQUETE_CUMUL = (
+        "INSERT INTO group_stats (ed_group, evaluation, somme, nb, somme_ponderee, poids) "
+        "VALUES (%s, %s, %s, %s, %s, %s) "
+        "ON CONFLICT (ed_group, evaluation) DO UPDATE SET somme = somme + excluded.somme, nb = nb + excluded.nb, "
+        "somme_ponderee = somme_ponderee + excluded.somme_ponderee, poids = poids + excluded.poids"
+    )
+    REQUETE_UPSERT_NOTES = (
+        "INSERT INTO evaluations (id_ed, evaluation, note, coefficient) VALUES (%s, %s, %s, %s) "
+        "ON CONFLICT (id_ed, evaluation) DO UPDATE SET note = excluded.note, coefficient = excluded.coefficient"
+    )
+
+    def __init__(self, config):
+        chemin = config["chemin_sqlite"]
+        lecture_seule = config.get("lecture_seule", False) and chemin != ":memory:"
+
+        def fabrique():
+            if lecture_seule:
+                # mode=ro : toute écriture échoue (le mode WAL est déjà inscrit dans le fichier).
+                conn = sqlite3.connect(f"{Path(chemin).resolve().as_uri()}?mode=ro", uri=True,
+                                       timeout=config["delai_attente"], check_same_thread=False,
+                                       cached_statements=256)
+            else:
+                conn = sqlite3.connect(chemin, timeout=config["delai_attente"],
+                                       check_same_thread=False, cached_statements=256)
+                conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            return conn
+
+        # Une base en mémoire n'existe que dans sa connexion : une seule connexion dans ce cas.
+        taille = 1 if chemin == ":memory:" else config["taille_pool"]
+        pool = PoolConnexions(
+            fabrique,
+            taille=taille,
+            delai_attente=config["delai_attente"],
+            verification_apres=config["verification_apres"],
+            tentatives=config["tentatives"],
+            pause_tentatives=config["pause_tentatives"],
+            erreurs_connexion=(sqlite3.Error,),
+        )
+        super().__init__(pool, (sqlite3.Error,))
+        if not lecture_seule:
+            self.initialiser_schema()
+
+    def _colonnes(self, cur, table):
+        cur.execute(f"PRAGMA table_info({table})")
+        return {ligne[1] for ligne in cur.fetchall()}
+
+    def _verrouiller(self, cur):
+        # BEGIN IMMEDIATE : le verrou d'écriture est pris avant les lectures, et
+        # non au premier INSERT/UPDATE comme avec la transaction implicite.
+        if not cur.connection.in_transaction:
+            cur.execute("BEGIN IMMEDIATE")
+
+
+MOTEURS = {
+    "mysql": DepotMySQL,
+    "sqlite": DepotSQLite,
+}
+
+
+def creer_depot(config, instrumentation=None):
+    """
+    Instancie le dépôt correspondant à `config["backend"]`, enveloppé dans
+    l'écriture différée si `config["ecriture_differee"]` est vrai, puis dans
+    le cache des notes si `config["cache_taille"]` est positif. Les requêtes
+    sont mesurées par `instrumentation` si elle est fournie.
+    """
+    try:
+        classe = MOTEURS[config["backend"]]
+    except KeyError:
+        raise ValueError(f"Moteur de base de données inconnu : {config['backend']!r}") from None
+    depot = classe(config)
+    depot.instrumentation = instrumentation
+    if config.get("ecriture_differee"):
+        from gestion.ecriture_differee import DepotEcritureDifferee
+        depot = DepotEcritureDifferee(depot, config["delai_ecriture"], config["taille_lot_ecriture"],
+                                      journal=config.get("journal_ecriture") or None,
+                                      journal_fsync=config.get("journal_fsync", False))
+    if config.get("cache_taille", 0) > 0:
+        from gestion.cache import DepotEnCache
+        depot = DepotEnCache(depot, config["cache_taille"], config["cache_ttl"], config["cache_mode"])
+    return depot
@@ -0,0 +1,511 @@
+# gestion/ecriture_differee.py
+"""
+Écriture différée (write-behind) des modifications.
+
+`DepotEcritureDifferee` enveloppe un dépôt : les écritures (ajout,
+modification, suppression, notes) retournent aussitôt, le registre en
+mémoire étant déjà à jour, et sont mises en file. Un thread de vidange les
+applique en une seule transaction par lot (`DepotPersonnes.ecrire_lot`) dès
+que `taille_lot` personnes sont en attente ou que la plus ancienne attend
+depuis `delai` secondes.
+
+Les opérations en attente sur une même personne sont fusionnées : plusieurs
+modifications n'en font qu'une, des saisies de notes successives n'en font
+qu'une, un ajout suivi d'une suppression n'écrit rien. L'ordre est conservé :
+pour une personne, suppression puis ajout, modification et notes, comme elles
+ont été demandées ; les lots sont validés l'un après l'autre, dans l'ordre.
+
+Une écriture ne pouvant plus rien dire de la base, `modifier_personne` et
+`supprimer_personne` retournent toujours vrai : ce mode convient aux
+interfaces qui vérifient l'existence dans leur registre en mémoire.
+
+Toute lecture (chargement, notes, journal, moyennes) vide d'abord la file :
+la base relue contient toujours les écritures déjà faites. Une `session` vide
+aussi la file, puis les écritures faites dans la session par le même thread
+vont directement au dépôt enveloppé, dans sa transaction : elles sont
+validées ou annulées avec elle (tout ou rien), sans passer par la file. `flush` la vide
+explicitement ; `fermer` aussi, et il est appelé à la sortie du programme
+(`atexit`).
+
+Si un lot échoue, ses personnes sont réessayées une par une : celles qui
+échouent encore sont rejetées (`rejets`, rappel `sur_rejet`) et les autres
+validées. Si toutes échouent et que la base ne répond plus, le lot reste en
+file pour la vidange suivante. Les personnes rejetées sont rendues par le prochain
+`changements_depuis` comme des changements : la synchronisation remet leur
+copie en mémoire dans l'état de la base.
+
+Durabilité. Sans journal, la file n'existe qu'en mémoire : un arrêt brutal
+du processus (plantage, kill -9, coupure) perd toutes les écritures
+acquittées depuis la dernière vidange, soit jusqu'à `delai` secondes ou
+`taille_lot` personnes d'écritures. Avec `journal` (clé `journal_ecriture`
+de la configuration), chaque opération est ajoutée à ce fichier local
+(`JournalEcritures`, une ligne JSON par opération) avant d'être acquittée ;
+la partie du journal couverte par un lot validé est coupée après la
+validation, et les opérations restantes sont rejouées, dans l'ordre, à
+l'ouverture suivante. Le journal survit à l'arrêt du processus ; pour
+survivre aussi à une coupure de courant, `journal_fsync` force l'écriture
+sur disque de chaque opération (au prix d'une écriture synchrone par
+opération). Le rejeu peut refaire un lot déjà validé si l'arrêt est survenu
+entre la validation et la coupe du journal : les opérations sont
+idempotentes, et l'ajout d'une personne déjà en base est rejoué comme une
+modification. Un journal ne doit être ouvert que par un seul processus.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from gestion.chargement import TAILLE_LOT_DEFAUT
+from gestion.depots import DepotPersonnes, ErreurBase
+from gestion.exceptions import ErreurGestion
+from gestion.modeles import COEFFICIENT_DEFAUT, Note, normaliser_notes
+
+DELAI_DEFAUT = 0.5
+TAILLE_LOT_ECRITURE = 500
+
+
+class Attente:
+    """
+    Opérations en attente pour une personne, fusionnées. Elles s'appliquent
+    dans l'ordre : suppression, ajout, modification (nom, âge), notes.
+    """
+    __slots__ = ("supprimer", "inserer", "modifier", "notes")
+
+    def __init__(self):
+        self.supprimer = False
+        self.inserer = None
+        self.modifier = None
+        self.notes = None
+
+    def vide(self):
+        return not self.supprimer and self.inserer is None and self.modifier is None and self.notes is None
+
+    def ajout(self, personne):
+        self.inserer = tuple(personne)
+
+    def modification(self, nom, age):
+        if self.inserer is not None:
+            self.inserer = (self.inserer[0], nom, age) + self.inserer[3:]
+        else:
+            self.modifier = (nom, age)
+
+    def suppression(self):
+        # Un ajout encore en attente n'a jamais atteint la base : il suffit de l'oublier.
+        if self.inserer is None or self.supprimer:
+            self.supprimer = True
+        self.inserer = self.modifier = self.notes = None
+
+    def saisie(self, notes):
+        """
+        Ajoute une saisie de notes aux précédentes : la dernière note d'une
+        évaluation l'emporte, un coefficient « inchangé » reprend celui de la
+        saisie précédente (1 si elle retirait l'évaluation).
+        """
+        par_evaluation = OrderedDict((n.evaluation, n) for n in self.notes or ())
+        for n in normaliser_notes(notes):
+            ancienne = par_evaluation.pop(n.evaluation, None)
+            if n.coefficient is None and n.note is not None and ancienne is not None:
+                coefficient = COEFFICIENT_DEFAUT if ancienne.note is None else ancienne.coefficient
+                n = Note(n.evaluation, n.note, coefficient)
+            par_evaluation[n.evaluation] = n
+        self.notes = list(par_evaluation.values())
+
+    def suivre(self, autre):
+        """
+        Ajoute à la suite les opérations d'`autre`, plus récentes.
+        """
+        if autre.supprimer:
+            self.suppression()
+        if autre.inserer is not None:
+            self.ajout(autre.inserer)
+        if autre.modifier is not None:
+            self.modification(*autre.modifier)
+        if autre.notes is not None:
+            self.saisie(autre.notes)
+
+
+class JournalEcritures:
+    """
+    Journal local des opérations en file : une ligne JSON
+    {"id", "operation", "args"} par opération, ajoutée avant son acquittement.
+    """
+    def __init__(self, chemin, fsync=False):
+        self.chemin = chemin
+        self.fsync = fsync
+        self.__fichier = open(chemin, "a+b")
+
+    def relire(self):
+        """
+        Retourne les opérations du journal [(id, operation, args), ...], dans
+        l'ordre. Une dernière ligne incomplète (arrêt pendant son écriture)
+        est ignorée : son opération n'avait pas été acquittée.
+        """
+        self.__fichier.seek(0)
+        lignes = self.__fichier.read().split(b"\n")
+        operations = []
+        for numero, ligne in enumerate(lignes[:-1], start=1):
+            try:
+                entree = json.loads(ligne.decode("utf-8"))
+                operations.append((entree["id"], entree["operation"], entree["args"]))
+            except (ValueError, KeyError, TypeError):
+                raise ErreurGestion(f"Journal d'écriture différée illisible : {self.chemin}, ligne {numero}.") from None
+        return operations
+
+    def ajouter(self, id_person, operation, args):
+        ligne = json.dumps({"id": id_person, "operation": operation, "args": args}, ensure_ascii=False)
+        self.__fichier.write(ligne.encode("utf-8") + b"\n")
+        self.__fichier.flush()
+        if self.fsync:
+            os.fsync(self.__fichier.fileno())
+
+    def position(self):
+        self.__fichier.seek(0, os.SEEK_END)
+        return self.__fichier.tell()
+
+    def couper(self, position):
+        """
+        Retire les opérations écrites avant `position` (validées en base).
+        """
+        self.__fichier.seek(position)
+        reste = self.__fichier.read()
+        self.__fichier.seek(0)
+        self.__fichier.truncate()
+        self.__fichier.write(reste)
+        self.__fichier.flush()
+        if self.fsync:
+            os.fsync(self.__fichier.fileno())
+
+    def fermer(self):
+        self.__fichier.close()
+
+
+def _args_journal(operation, args):
+    # Les notes sont journalisées normalisées, en listes [évaluation, note, coefficient].
+    if operation == "saisie":
+        return [[list(note) for note in normaliser_notes(args[0])]]
+    if operation == "ajout":
+        return [list(args[0])]
+    return list(args)
+
+
+class DepotEcritureDifferee(DepotPersonnes):
+    """
+    Dépôt qui met en file les écritures du dépôt `depot` et les applique par
+    lots ; avec `journal` (chemin), la file est aussi tenue dans ce fichier.
+    """
+    def __init__(self, depot, delai=DELAI_DEFAUT, taille_lot=TAILLE_LOT_ECRITURE, sur_rejet=None, journal=None,
+                 journal_fsync=False):
+        self.depot = depot
+        self.delai = delai
+        self.taille_lot = taille_lot
+        self.sur_rejet = sur_rejet
+        self.rejets = []
+        self.lots = 0
+        self.operations = 0
+        self.__attente = OrderedDict()
+        self.__premiere = None
+        self.__journal = JournalEcritures(journal, journal_fsync) if journal else None
+        if self.__journal is not None:
+            try:
+                self.__rejouer()
+            except BaseException:
+                self.__journal.fermer()
+                raise
+        self.__condition = threading.Condition()
+        self.__vidange = threading.Lock()
+        self.__arret = False
+        # Session en cours, propre à chaque thread : ses écritures ne passent pas par la file.
+        self.__session = threading.local()
+        self.__thread = threading.Thread(target=self.__boucle, name="ecriture-differee", daemon=True)
+        self.__thread.start()
+        atexit.register(self.fermer)
+
+    def __len__(self):
+        with self.__condition:
+            return len(self.__attente)
+
+    # ----- Mise en file -----
+
+    def __rejouer(self):
+        """
+        Remet en file les opérations du journal laissées par un arrêt brutal.
+        """
+        for id_person, operation, args in self.__journal.relire():
+            if operation == "ajout":
+                args = [tuple(args[0])]
+            attente = self.__attente.get(id_person)
+            if attente is None:
+                attente = self.__attente[id_person] = Attente()
+            getattr(attente, operation)(*args)
+            if attente.vide():
+                del self.__attente[id_person]
+        for id_person, attente in self.__attente.items():
+            # Ajout déjà validé avant l'arrêt (journal pas encore coupé) : il devient une modification.
+            if attente.inserer is not None and not attente.supprimer and self.depot.lire_personne(id_person) is not None:
+                attente.modifier = attente.inserer[1:3]
+                attente.inserer = None
+        if self.__attente:
+            self.__premiere = time.monotonic()
+
+    def __mettre_en_file(self, id_person, operation, *args):
+        with self.__condition:
+            if self.__journal is not None:
+                # Journalisée avant d'être acquittée : une erreur d'écriture remonte à l'appelant.
+                self.__journal.ajouter(id_person, operation, _args_journal(operation, args))
+            attente = self.__attente.get(id_person)
+            if attente is None:
+                attente = self.__attente[id_person] = Attente()
+            getattr(attente, operation)(*args)
+            if attente.vide():
+                del self.__attente[id_person]
+            self.operations += 1
+            if self.__premiere is None:
+                self.__premiere = time.monotonic()
+            self.__condition.notify()
+
+    def __en_session(self):
+        return getattr(self.__session, "active", False)
+
+    def inserer_personne(self, id_person, nom, age, group, type_person):
+        if self.__en_session():
+            return self.depot.inserer_personne(id_person, nom, age, group, type_person)
+        self.__mettre_en_file(id_person, "ajout", (id_person, nom, age, group, type_person))
+
+    def inserer_personnes(self, personnes, taille_lot=TAILLE_LOT_DEFAUT):
+        # Import en masse : écrit directement, après les écritures en attente.
+        self.flush()
+        return self.depot.inserer_personnes(personnes, taille_lot)
+
+    def modifier_personne(self, id_person, nom, age):
+        if self.__en_session():
+            return self.depot.modifier_personne(id_person, nom, age)
+        self.__mettre_en_file(id_person, "modification", nom, age)
+        return True
+
+    def supprimer_personne(self, id_person):
+        if self.__en_session():
+            return self.depot.supprimer_personne(id_person)
+        self.__mettre_en_file(id_person, "suppression")
+        return True
+
+    def enregistrer_notes(self, id_person, notes):
+        if self.__en_session():
+            return self.depot.enregistrer_notes(id_person, notes)
+        self.__mettre_en_file(id_person, "saisie", notes)
+
+    def enregistrer_notes_lot(self, saisies):
+        if self.__en_session():
+            return self.depot.enregistrer_notes_lot(saisies)
+        # Les saisies d'un lot partent dans la même vidange, donc la même transaction.
+        saisies = list(saisies)
+        with self.__condition:
+            for id_person, notes in saisies:
+                self.__mettre_en_file(id_person, "saisie", notes)
+        return len(saisies)
+
+    # ----- Session -----
+
+    @contextmanager
+    def session(self):
+        # La session part d'une base à jour, puis écrit directement dans sa transaction.
+        self.flush()
+        with self.depot.session():
+            precedente = self.__en_session()
+            self.__session.active = True
+            try:
+                yield self
+            finally:
+                self.__session.active = precedente
+
+    def etape(self):
+        return self.depot.etape()
+
+    # ----- Vidange -----
+
+    def flush(self):
+        """
+        Applique maintenant toutes les écritures en attente. Lève `ErreurBase`
+        si la base est injoignable (les écritures restent alors en file).
+        """
+        with self.__vidange:
+            with self.__condition:
+                lot, self.__attente = self.__attente, OrderedDict()
+                self.__premiere = None
+                # Les opérations du lot sont toutes dans le journal avant cette position.
+                position = self.__journal.position() if self.__journal is not None else 0
+            if lot:
+                self.__appliquer(lot)
+            if position:
+                with self.__condition:
+                    self.__journal.couper(position)
+
+    def __boucle(self):
+        while True:
+            with self.__condition:
+                while not self.__arret and not self.__echeance_atteinte():
+                    attente = None if self.__premiere is None else \
+                        max(self.__premiere + self.delai - time.monotonic(), 0)
+                    self.__condition.wait(attente)
+                if self.__arret:
+                    return
+            try:
+                self.flush()
+            except ErreurBase:
+                # Base injoignable : nouvel essai au prochain délai.
+                with self.__condition:
+                    self.__condition.wait(self.delai)
+
+    def __echeance_atteinte(self):
+        if self.__premiere is None:
+            return False
+        return len(self.__attente) >= self.taille_lot or time.monotonic() >= self.__premiere + self.delai
+
+    def __appliquer(self, lot):
+        try:
+            self.__ecrire(lot)
+            self.lots += 1
+            return
+        except ErreurBase:
+            pass
+        # Le lot a échoué : chaque personne est réessayée seule, pour isoler les écritures en cause.
+        reussies, echecs = 0, []
+        for id_person, attente in lot.items():
+            try:
+                self.__ecrire({id_person: attente})
+                reussies += 1
+            except ErreurBase as e:
+                echecs.append((id_person, attente, e))
+        if not reussies:
+            # Tout a échoué : si la base ne répond plus, on réessaiera ; sinon
+            # les écritures elles-mêmes sont en cause (clé en double, etc.).
+            try:
+                self.depot.version_journal()
+            except ErreurBase:
+                self.__remettre_en_file(lot)
+                raise echecs[0][2] from None
+        self.lots += reussies
+        for id_person, _, erreur in echecs:
+            with self.__condition:
+                self.rejets.append((id_person, erreur))
+            if self.sur_rejet is not None:
+                self.sur_rejet(id_person, erreur)
+
+    def __ecrire(self, lot):
+        self.depot.ecrire_lot(
+            suppressions=[id_person for id_person, a in lot.items() if a.supprimer],
+            insertions=[a.inserer for a in lot.values() if a.inserer is not None],
+            modifications=[(id_person,) + a.modifier for id_person, a in lot.items() if a.modifier is not None],
+            saisies=[(id_person, a.notes) for id_person, a in lot.items() if a.notes is not None],
+        )
+
+    def __remettre_en_file(self, lot):
+        # Les opérations du lot sont plus anciennes que celles arrivées entre-temps.
+        with self.__condition:
+            for id_person, attente in self.__attente.items():
+                if id_person in lot:
+                    lot[id_person].suivre(attente)
+                    if lot[id_person].vide():
+                        del lot[id_person]
+                else:
+                    lot[id_person] = attente
+            self.__attente = lot
+            if lot and self.__premiere is None:
+                self.__premiere = time.monotonic()
+
+    def fermer(self):
+        """
+        Arrête le thread de vidange, applique les écritures en attente puis
+        ferme le dépôt enveloppé.
+        """
+        atexit.unregister(self.fermer)
+        with self.__condition:
+            self.__arret = True
+            self.__condition.notify()
+        if self.__thread is not threading.current_thread():
+            self.__thread.join()
+        try:
+            self.flush()
+        finally:
+            if self.__journal is not None:
+                # Si la vidange a échoué, le journal garde les écritures pour l'ouverture suivante.
+                self.__journal.fermer()
+            self.depot.fermer()
+
+    # ----- Lectures : la file est vidée d'abord -----
+
+    def iterer_personnes(self, taille_lot=TAILLE_LOT_DEFAUT, avec_notes=True):
+        self.flush()
+        return self.depot.iterer_personnes(taille_lot, avec_notes)
+
+    def iterer_ids(self):
+        self.flush()
+        return self.depot.iterer_ids()
+
+    def compter_personnes(self):
+        self.flush()
+        return self.depot.compter_personnes()
+
+    def lire_personne(self, id_person):
+        self.flush()
+        return self.depot.lire_personne(id_person)
+
+    def lire_notes(self, id_person):
+        self.flush()
+        return self.depot.lire_notes(id_person)
+
+    def lire_notes_lot(self, ids):
+        self.flush()
+        return self.depot.lire_notes_lot(ids)
+
+    def iterer_groupe(self, group, taille_lot=TAILLE_LOT_DEFAUT):
+        self.flush()
+        return self.depot.iterer_groupe(group, taille_lot)
+
+    def compter_groupes(self):
+        self.flush()
+        return self.depot.compter_groupes()
+
+    def moyennes_groupes(self):
+        self.flush()
+        return self.depot.moyennes_groupes()
+
+    def verifier_stats(self, corriger=False):
+        self.flush()
+        return self.depot.verifier_stats(corriger)
+
+    def version_journal(self):
+        self.flush()
+        return self.depot.version_journal()
+
+    def trous_journal(self, version):
+        self.flush()
+        return self.depot.trous_journal(version)
+
+    def changements_depuis(self, version, trous=()):
+        self.flush()
+        courante, ecrites, supprimees, manquants = self.depot.changements_depuis(version, trous)
+        with self.__condition:
+            rejetees, self.rejets = {id_person for id_person, _ in self.rejets}, []
+        rejetees -= {ligne[0] for ligne in ecrites}
+        for id_person in sorted(rejetees):
+            ligne = self.depot.lire_personne(id_person)
+            if ligne is None:
+                supprimees.append(id_person)
+            else:
+                ecrites.append(ligne)
+        return courante, ecrites, supprimees, manquants
+
+    def ecrire_lot(self, suppressions=(), insertions=(), modifications=(), saisies=()):
+        self.flush()
+        return self.depot.ecrire_lot(suppressions, insertions, modifications, saisies)
+
+    def initialiser_schema(self):
+        return self.depot.initialiser_schema()
+
+    @property
+    def instrumentation(self):
+        return self.depot.instrumentation
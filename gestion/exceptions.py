@@ -0,0 +1,50 @@
+# gestion/exceptions.py
+"""
+Exceptions levées par la couche de données et par le gestionnaire.
+
+Toutes dérivent de `ErreurGestion` : une interface peut les intercepter
+d'un bloc, ou les distinguer pour choisir le message à afficher. Les erreurs
+de saisie dérivent aussi de `ValueError`, et `PersonneIntrouvable` de
+`LookupError`, pour rester compatibles avec le code qui intercepte ces
+exceptions standard.
+"""
+
+
+class ErreurGestion(Exception):
+    """
+    Classe de base des erreurs de la gestion des étudiants.
+    """
+
+
+class ErreurBase(ErreurGestion):
+    """
+    Erreur remontée par le moteur de base de données, quel qu'il soit.
+    """
+
+
+class SaisieInvalide(ErreurGestion, ValueError):
+    """
+    Valeur saisie refusée par les règles de validation.
+    """
+
+
+class PersonneExistante(SaisieInvalide):
+    """
+    Une personne avec cet ID existe déjà.
+    """
+    def __init__(self, id_person):
+        super().__init__("Une personne avec cet ID existe déjà.")
+        self.id_person = id_person
+
+
+class PersonneIntrouvable(ErreurGestion, LookupError):
+    """
+    Aucune personne ne porte cet ID ; pour une opération groupée, `ids` est
+    la liste des IDs inconnus.
+    """
+    def __init__(self, ids):
+        if isinstance(ids, list):
+            super().__init__(f"Personne(s) non trouvée(s) : {ids}")
+        else:
+            super().__init__("Personne non trouvée.")
+        self.ids = ids
@@ -0,0 +1,146 @@
+# gestion/executeur.py
+"""
+Exécution des accès à la base hors du thread de l'interface.
+
+Les tâches soumises à `ExecuteurTaches` sont exécutées, dans l'ordre, par un
+thread de travail ; leurs résultats sont déposés dans une file que le thread
+de l'interface vide régulièrement avec `traiter()` (par exemple depuis une
+boucle `after()` de Tkinter). Les rappels `succes`, `echec` et `progression`
+sont donc toujours appelés dans le thread de l'interface.
+
+Une tâche peut être annulée : si elle n'a pas commencé, elle n'est pas
+exécutée ; si elle est en cours, ses rappels ne sont plus appelés, et une
+fonction soumise avec `annulable=True` reçoit l'événement `annulation` pour
+s'interrompre d'elle-même.
+"""
+
+import queue
+import threading
+import time
+
+SUCCES = "succes"
+ECHEC = "echec"
+PROGRESSION = "progression"
+ANNULEE = "annulee"
+
+
+class Tache:
+    """
+    Tâche soumise à l'exécuteur.
+    """
+    def __init__(self, fonction, args, kwargs, succes=None, echec=None, progression=None, annulable=False):
+        self.fonction = fonction
+        self.args = args
+        self.kwargs = kwargs
+        self.succes = succes
+        self.echec = echec
+        self.progression = progression
+        self.annulable = annulable
+        self.annulation = threading.Event()
+
+    @property
+    def annulee(self):
+        return self.annulation.is_set()
+
+    def annuler(self):
+        self.annulation.set()
+
+
+class ExecuteurTaches:
+    """
+    File de tâches traitée par `nb_travailleurs` threads (un seul par défaut,
+    pour que les opérations sur la base s'enchaînent dans l'ordre de soumission).
+    """
+    def __init__(self, nb_travailleurs=1, nom="executeur-bd"):
+        self.__taches = queue.Queue()
+        self.__resultats = queue.Queue()
+        self.__actives = []
+        self.__verrou = threading.Lock()
+        self.__travailleurs = [
+            threading.Thread(target=self.__travailler, name=f"{nom}-{i}", daemon=True)
+            for i in range(nb_travailleurs)
+        ]
+        for travailleur in self.__travailleurs:
+            travailleur.start()
+
+    def soumettre(self, fonction, *args, succes=None, echec=None, progression=None, annulable=False, **kwargs):
+        """
+        Planifie `fonction(*args, **kwargs)` et retourne la `Tache` correspondante.
+        Avec `progression`, la fonction reçoit un paramètre `progression` à
+        appeler depuis le thread de travail ; avec `annulable`, elle reçoit
+        l'événement `annulation`.
+        """
+        tache = Tache(fonction, args, kwargs, succes, echec, progression, annulable)
+        with self.__verrou:
+            self.__actives.append(tache)
+        self.__taches.put(tache)
+        return tache
+
+    def en_cours(self):
+        """
+        Nombre de tâches soumises dont le résultat n'a pas encore été traité.
+        """
+        with self.__verrou:
+            return len(self.__actives)
+
+    def annuler_tout(self):
+        with self.__verrou:
+            for tache in self.__actives:
+                tache.annuler()
+
+    def traiter(self, limite=100):
+        """
+        Appelle les rappels des tâches terminées (au plus `limite` résultats).
+        À appeler depuis le thread de l'interface. Retourne le nombre de résultats traités.
+        """
+        traites = 0
+        while traites < limite:
+            try:
+                tache, etat, valeur = self.__resultats.get_nowait()
+            except queue.Empty:
+                break
+            traites += 1
+            if etat != PROGRESSION:
+                with self.__verrou:
+                    self.__actives.remove(tache)
+            if tache.annulee or etat == ANNULEE:
+                continue
+            rappel = {SUCCES: tache.succes, ECHEC: tache.echec, PROGRESSION: tache.progression}[etat]
+            if rappel is not None:
+                rappel(valeur)
+        return traites
+
+    def arreter(self, delai=None):
+        """
+        Annule les tâches en attente et arrête les threads de travail. Avec
+        `delai` (secondes), attend au plus ce temps la fin de la tâche en
+        cours ; retourne False si un thread travaille encore à l'échéance.
+        """
+        self.annuler_tout()
+        for _ in self.__travailleurs:
+            self.__taches.put(None)
+        if delai is None:
+            return not any(travailleur.is_alive() for travailleur in self.__travailleurs)
+        echeance = time.monotonic() + delai
+        for travailleur in self.__travailleurs:
+            travailleur.join(max(0.0, echeance - time.monotonic()))
+        return not any(travailleur.is_alive() for travailleur in self.__travailleurs)
+
+    def __travailler(self):
+        while True:
+            tache = self.__taches.get()
+            if tache is None:
+                return
+            if tache.annulee:
+                self.__resultats.put((tache, ANNULEE, None))
+                continue
+            kwargs = dict(tache.kwargs)
+            if tache.annulable:
+                kwargs["annulation"] = tache.annulation
+            if tache.progression is not None:
+                kwargs["progression"] = lambda valeur, t=tache: self.__resultats.put((t, PROGRESSION, valeur))
+            try:
+                resultat = (tache, SUCCES, tache.fonction(*tache.args, **kwargs))
+            except Exception as e:
+                resultat = (tache, ECHEC, e)
+            self.__resultats.put(resultat)
@@ -0,0 +1,289 @@
+# gestion/exportation.py
+"""
+Export en flux des personnes et de leurs notes.
+
+Les lignes (id, nom, age, groupe, type, notes) proviennent soit de la base
+(lecture par lots), soit du registre en mémoire, et traversent une chaîne de
+générateurs jusqu'au fichier : la mémoire utilisée ne dépend pas du nombre de
+lignes exportées. `notes` est la liste des `Note` de la personne.
+
+Formats disponibles :
+- `csv` : une ligne par personne, colonnes note1 à note3 puis colonne
+  `evaluations` (liste JSON des [évaluation, note, coefficient]) ;
+- `jsonl` : un objet JSON par ligne, avec toutes les évaluations ;
+- `colonnes` : format binaire colonnaire compact (voir `ecrire_colonnes`),
+  relu par `lire_colonnes` pour les analyses.
+
+Les trois formats conservent toutes les évaluations nommées et leurs
+coefficients : `gestion.importation` les relit.
+"""
+
+import csv
+import json
+import math
+import struct
+import sys
+from array import array
+
+from gestion.chargement import TAILLE_LOT_DEFAUT
+from gestion.modeles import EVALUATIONS_SAISIE, Note
+
+ENTETE = ("id", "nom", "age", "groupe", "role", "note1", "note2", "note3")
+COLONNE_EVALUATIONS = "evaluations"
+
+MAGIQUE = b"GEC1"
+VERSION = 2
+VERSIONS_LISIBLES = (1, 2)
+TAILLE_GROUPE_LIGNES = 4096
+CODES_ROLE = {"Stagiaire": 0, "Enseignant": 1}
+ROLES_PAR_CODE = {code: role for role, code in CODES_ROLE.items()}
+AGE_ABSENT = -1
+
+
+def depuis_depot(depot, taille_lot=TAILLE_LOT_DEFAUT):
+    """
+    Lignes lues en flux depuis la base.
+    """
+    return depot.iterer_personnes(taille_lot)
+
+
+def depuis_personnes(personnes):
+    """
+    Lignes construites à partir d'objets Person (registre en mémoire).
+    """
+    for p in personnes:
+        yield p.id_person, p.nom, p.age, p.group, p.get_role(), p.evaluations()
+
+
+def filtrer(lignes, group=None, role=None):
+    """
+    Ne conserve que les lignes du groupe et/ou du rôle demandés.
+    """
+    for ligne in lignes:
+        if group is not None and ligne[3] != group:
+            continue
+        if role is not None and ligne[4] != role:
+            continue
+        yield ligne
+
+
+def _trois_notes(notes):
+    presentes = {n.evaluation: n.note for n in notes}
+    return [presentes.get(evaluation) for evaluation in EVALUATIONS_SAISIE]
+
+
+def _evaluations_json(notes):
+    return json.dumps([list(n) for n in notes], ensure_ascii=False)
+
+
+def ecrire_csv(lignes, chemin):
+    """
+    Écrit les lignes au format CSV. Retourne le nombre de lignes écrites.
+    """
+    total = 0
+    with open(chemin, "w", encoding="utf-8", newline="") as fichier:
+        ecrivain = csv.writer(fichier)
+        ecrivain.writerow(ENTETE + (COLONNE_EVALUATIONS,))
+        for (id_person, nom, age, group, type_person, notes) in lignes:
+            ecrivain.writerow([id_person, nom, age, group, type_person] + _trois_notes(notes)
+                              + [_evaluations_json(notes)])
+            total += 1
+    return total
+
+
+def ecrire_jsonl(lignes, chemin):
+    """
+    Écrit les lignes au format JSON Lines. Retourne le nombre de lignes écrites.
+    """
+    total = 0
+    with open(chemin, "w", encoding="utf-8") as fichier:
+        for (id_person, nom, age, group, type_person, notes) in lignes:
+            objet = dict(zip(ENTETE, [id_person, nom, age, group, type_person] + _trois_notes(notes)))
+            objet[COLONNE_EVALUATIONS] = [n._asdict() for n in notes]
+            fichier.write(json.dumps(objet, ensure_ascii=False))
+            fichier.write("\n")
+            total += 1
+    return total
+
+
+# =========================
+# FORMAT COLONNAIRE
+# =========================
+#
+# En-tête : b"GEC1" puis la version (uint16, 2 ; la version 1, sans la
+# colonne evaluations, reste lisible). Suivent des groupes de lignes,
+# chacun précédé de son nombre de lignes (uint32) ; un nombre nul marque la
+# fin du fichier. Dans un groupe, chaque colonne est un bloc préfixé par sa
+# taille en octets (uint32), ce qui permet de sauter les colonnes inutiles :
+#   id      int64
+#   nom     offsets uint32 (n + 1) puis texte UTF-8 concaténé
+#   age     int32 (AGE_ABSENT si inconnu)
+#   groupe  comme nom
+#   role    uint8 (CODES_ROLE)
+#   note1..note3  float64 (NaN si absente)
+#   evaluations   offsets uint32 (n + 1) dans la suite des m évaluations du
+#                 groupe, puis notes float64 (m), coefficients float64 (m)
+#                 et noms (comme nom, m textes)
+# Tous les entiers et flottants sont en petit-boutiste.
+
+COLONNES_V1 = ("id", "nom", "age", "groupe", "role", "note1", "note2", "note3")
+COLONNES = COLONNES_V1 + (COLONNE_EVALUATIONS,)
+
+
+def _octets(tableau):
+    if sys.byteorder != "little":
+        tableau = array(tableau.typecode, tableau)
+        tableau.byteswap()
+    return tableau.tobytes()
+
+
+def _tableau(typecode, octets):
+    tableau = array(typecode)
+    tableau.frombytes(octets)
+    if sys.byteorder != "little":
+        tableau.byteswap()
+    return tableau
+
+
+def _bloc_textes(textes):
+    offsets = array("I", [0])
+    morceaux = []
+    position = 0
+    for texte in textes:
+        donnees = ("" if texte is None else str(texte)).encode("utf-8")
+        morceaux.append(donnees)
+        position += len(donnees)
+        offsets.append(position)
+    return _octets(offsets) + b"".join(morceaux)
+
+
+def _lire_textes(octets, nb):
+    taille_offsets = 4 * (nb + 1)
+    offsets = _tableau("I", octets[:taille_offsets])
+    texte = octets[taille_offsets:]
+    return [texte[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(nb)]
+
+
+def _bloc_evaluations(listes):
+    offsets = array("I", [0])
+    toutes = []
+    for notes in listes:
+        toutes.extend(notes)
+        offsets.append(len(toutes))
+    return (_octets(offsets)
+            + _octets(array("d", (n.note for n in toutes)))
+            + _octets(array("d", (n.coefficient for n in toutes)))
+            + _bloc_textes(n.evaluation for n in toutes))
+
+
+def _lire_evaluations(octets, nb):
+    taille_offsets = 4 * (nb + 1)
+    offsets = _tableau("I", octets[:taille_offsets])
+    m = offsets[nb]
+    debut_noms = taille_offsets + 16 * m
+    notes = _tableau("d", octets[taille_offsets:taille_offsets + 8 * m])
+    coefficients = _tableau("d", octets[taille_offsets + 8 * m:debut_noms])
+    noms = _lire_textes(octets[debut_noms:], m)
+    return [[Note(noms[k], notes[k], coefficients[k]) for k in range(offsets[i], offsets[i + 1])]
+            for i in range(nb)]
+
+
+def _ecrire_groupe(fichier, groupe):
+    nb = len(groupe)
+    blocs = [
+        _octets(array("q", (ligne[0] for ligne in groupe))),
+        _bloc_textes(ligne[1] for ligne in groupe),
+        _octets(array("i", (AGE_ABSENT if ligne[2] is None else ligne[2] for ligne in groupe))),
+        _bloc_textes(ligne[3] for ligne in groupe),
+        _octets(array("B", (CODES_ROLE.get(ligne[4], 0) for ligne in groupe))),
+    ]
+    notes = [_trois_notes(ligne[5]) for ligne in groupe]
+    for rang in range(3):
+        blocs.append(_octets(array("d", (math.nan if n[rang] is None else n[rang] for n in notes))))
+    blocs.append(_bloc_evaluations(ligne[5] for ligne in groupe))
+    fichier.write(struct.pack("<I", nb))
+    for bloc in blocs:
+        fichier.write(struct.pack("<I", len(bloc)))
+        fichier.write(bloc)
+
+
+def ecrire_colonnes(lignes, chemin, taille_groupe=TAILLE_GROUPE_LIGNES):
+    """
+    Écrit les lignes au format colonnaire, par groupes de `taille_groupe`
+    lignes (seul le groupe courant est gardé en mémoire). Retourne le nombre
+    de lignes écrites.
+    """
+    total = 0
+    with open(chemin, "wb") as fichier:
+        fichier.write(MAGIQUE + struct.pack("<H", VERSION))
+        groupe = []
+        for ligne in lignes:
+            groupe.append(ligne)
+            if len(groupe) >= taille_groupe:
+                _ecrire_groupe(fichier, groupe)
+                total += len(groupe)
+                groupe = []
+        if groupe:
+            _ecrire_groupe(fichier, groupe)
+            total += len(groupe)
+        fichier.write(struct.pack("<I", 0))
+    return total
+
+
+def lire_colonnes(chemin, colonnes=COLONNES):
+    """
+    Relit un fichier colonnaire groupe par groupe. Produit, pour chaque groupe
+    de lignes, un dictionnaire colonne -> valeurs (array pour les colonnes
+    numériques, liste pour les textes, liste de listes de `Note` pour
+    `evaluations`). Seules les `colonnes` demandées sont décodées ; un fichier
+    de version 1 n'a pas de colonne `evaluations`.
+    """
+    voulues = set(colonnes)
+    with open(chemin, "rb") as fichier:
+        entete = fichier.read(6)
+        if entete[:4] != MAGIQUE:
+            raise ValueError(f"{chemin} n'est pas un fichier colonnaire d'export.")
+        (version,) = struct.unpack("<H", entete[4:])
+        if version not in VERSIONS_LISIBLES:
+            raise ValueError(f"Version de fichier non prise en charge : {version}.")
+        presentes = COLONNES_V1 if version == 1 else COLONNES
+        while True:
+            (nb,) = struct.unpack("<I", fichier.read(4))
+            if nb == 0:
+                return
+            groupe = {}
+            for colonne in presentes:
+                (taille,) = struct.unpack("<I", fichier.read(4))
+                if colonne not in voulues:
+                    fichier.seek(taille, 1)
+                    continue
+                octets = fichier.read(taille)
+                if colonne in ("nom", "groupe"):
+                    groupe[colonne] = _lire_textes(octets, nb)
+                elif colonne == COLONNE_EVALUATIONS:
+                    groupe[colonne] = _lire_evaluations(octets, nb)
+                elif colonne == "role":
+                    groupe[colonne] = [ROLES_PAR_CODE.get(code, "Stagiaire") for code in _tableau("B", octets)]
+                else:
+                    typecode = {"id": "q", "age": "i"}.get(colonne, "d")
+                    groupe[colonne] = _tableau(typecode, octets)
+            yield groupe
+
+
+FORMATS = {
+    "csv": ecrire_csv,
+    "jsonl": ecrire_jsonl,
+    "colonnes": ecrire_colonnes,
+}
+
+
+def exporter(lignes, chemin, format_fichier="csv", group=None, role=None):
+    """
+    Exporte les lignes (filtrées par groupe et/ou rôle) dans `chemin`.
+    Retourne le nombre de lignes écrites.
+    """
+    try:
+        ecrire = FORMATS[format_fichier]
+    except KeyError:
+        raise ValueError(f"Format d'export inconnu : {format_fichier!r}") from None
+    return ecrire(filtrer(lignes, group, role), chemin)
@@ -0,0 +1,383 @@
+# gestion/gestionnaire.py
+"""
+Gestionnaire des stagiaires, sans interface.
+
+`GestionStagiaires` tient le registre en mémoire et le dépôt ; la version
+graphique et la version console n'en sont que des façades. Ses méthodes
+n'affichent rien : elles retournent un résultat ou lèvent une exception de
+`gestion.exceptions`. Importer ce module ne charge ni Tkinter ni image : un
+script de traitement par lots ou un serveur démarre sans elles.
+"""
+
+import threading
+
+from gestion.cache import DepotEnCache
+from gestion.chargement import TAILLE_LOT_DEFAUT, ChargeurNotes
+from gestion.config import charger_config
+from gestion.depots import creer_depot
+from gestion.exceptions import ErreurBase, PersonneExistante, PersonneIntrouvable, SaisieInvalide
+from gestion.exportation import depuis_personnes, exporter
+from gestion.importation import importer_fichier
+from gestion.instantane import ecrire_instantane, reprendre, source_base
+from gestion.instrumentation import Instrumentation, instrumenter
+from gestion.modeles import PersonTable, creer_personne, fusionner_notes
+from gestion.pagination import VuePaginee
+from gestion.registre import RegistrePersonnes
+from gestion.synchro import Synchroniseur
+from gestion.validation import valider_evaluation, valider_notes_lot
+
+
+# =========================
+# CLASSE GESTIONNAIRE (POO : Encapsulation, gestion BDD, validation, erreurs)
+# =========================
+class GestionStagiaires:
+    """
+    Gère la liste des stagiaires et la connexion à la base de données.
+    Toutes les opérations CRUD sont ici, avec gestion des erreurs et validation.
+
+    Les méthodes n'affichent rien : elles retournent la personne concernée
+    ou lèvent `PersonneIntrouvable`, `PersonneExistante`, `SaisieInvalide`
+    ou `ErreurBase` (voir `gestion.exceptions`). Elles peuvent être appelées
+    depuis un thread de travail : le registre en mémoire est protégé par
+    `self.verrou`, que la liste des utilisateurs partage.
+    """
+    def __init__(self, taille_lot=TAILLE_LOT_DEFAUT, config=None, depot=None, demarrer=True):
+        self.__personnes = RegistrePersonnes()
+        self.verrou = threading.RLock()
+        self.taille_lot = taille_lot
+        self.config = config if config is not None else charger_config()
+        self.depot = depot
+        self.synchro = None
+        self.chargeur = None
+        self.__complet = False
+        self.fabrique = creer_personne
+        self.instrumentation = Instrumentation.depuis_config(self.config)
+        if self.instrumentation is not None:
+            instrumenter(self, self.instrumentation)
+        if demarrer:
+            self.demarrer()
+
+    def demarrer(self, annulation=None, progression=None):
+        """
+        Ouvre la connexion si nécessaire puis charge les personnes. Retourne le nombre de personnes chargées.
+        """
+        if self.depot is None:
+            self.connect_db()
+        return self.load_personnes_from_db(annulation, progression)
+
+    def get_personnes(self):
+        with self.verrou:
+            return self.__personnes.lister()
+
+    def set_personnes(self, personnes):
+        with self.verrou:
+            self.__personnes.remplacer(personnes)
+
+    def connect_db(self):
+        self.depot = creer_depot(self.config, self.instrumentation)
+
+    def __depot(self):
+        if self.depot is None:
+            raise ErreurBase("Pas de connexion à la base de données.")
+        return self.depot
+
+    def load_personnes_from_db(self, annulation=None, progression=None):
+        """
+        Charge tous les stagiaires et leurs notes depuis la base de données,
+        en une seule requête lue par lots de `taille_lot` lignes. Chaque lot
+        est ajouté au registre dès sa lecture (l'interface peut afficher les
+        données au fur et à mesure) ; le chargement s'arrête entre deux lots
+        si l'événement `annulation` est positionné.
+
+        Si l'instantané local (option `instantane`) correspond à la base, il
+        remplace la lecture complète : seuls les changements survenus depuis
+        sont lus. En chargement différé (option `chargement_differe`), les
+        notes ne sont lues qu'au premier accès (voir `ChargeurNotes`).
+        """
+        with self.verrou:
+            self.__personnes.vider()
+            # Index des noms approchés rempli lot par lot, dans ce thread : la
+            # première recherche (thread Tk) ne le construit pas d'un bloc.
+            self.__personnes.indexer_noms()
+        self.__complet = False
+        total = 0
+        lot = []
+        # Option `table_personnes` : personnes rangées en colonnes (PersonTable), plus compact.
+        fabrique = PersonTable().creer_personne if self.config["table_personnes"] else creer_personne
+        self.chargeur = ChargeurNotes(self.__depot(), self.taille_lot, verrou=self.verrou)
+        self.fabrique = self.chargeur.fabrique(fabrique)
+        self.synchro = Synchroniseur(self.__depot(), self.__personnes, self.fabrique, verrou=self.verrou,
+                                     delai_trous=self.config["delai_trous_synchro"])
+        if self.config["instantane"]:
+            total = reprendre(self.config["instantane"], source_base(self.config), self.__depot(),
+                              self.__personnes, self.fabrique, self.synchro, self.verrou)
+            if total is not None:
+                self.__complet = True
+                if progression is not None:
+                    progression(total)
+                return total
+            total = 0
+        self.synchro.marquer()
+        lignes = self.__depot().iterer_personnes(self.taille_lot, avec_notes=not self.config["chargement_differe"])
+        try:
+            for ligne in lignes:
+                lot.append(self.fabrique(ligne))
+                if len(lot) >= self.taille_lot:
+                    total += self.__ajouter_lot(lot, progression)
+                    lot = []
+                    if annulation is not None and annulation.is_set():
+                        return total
+            if lot:
+                total += self.__ajouter_lot(lot, progression)
+        finally:
+            lignes.close()
+        self.__complet = True
+        self.enregistrer_instantane()
+        return total
+
+    def enregistrer_instantane(self):
+        """
+        Écrit l'instantané local du registre (option `instantane`). Retourne
+        le nombre de personnes écrites, None si l'option est désactivée ou
+        si le chargement n'est pas allé à son terme.
+        """
+        if not self.config["instantane"] or not self.__complet:
+            return None
+        # Les écritures encore en file doivent être en base avant que l'instantané ne les contienne.
+        self.__depot().flush()
+        with self.verrou:
+            personnes = self.__personnes.lister()
+            version = self.synchro.version_sure
+        # Écrit hors du verrou : une modification faite pendant l'écriture
+        # figure au journal après `version` et sera rejouée à la reprise,
+        # comme celles des trous du journal encore ouverts.
+        return ecrire_instantane(self.config["instantane"], personnes, version, source_base(self.config))
+
+    def synchroniser(self):
+        """
+        Applique les modifications faites depuis d'autres postes (journal des
+        modifications). Retourne le couple (écrites, supprimées).
+        """
+        if self.synchro is None:
+            return 0, 0
+        return self.synchro.synchroniser()
+
+    def __ajouter_lot(self, lot, progression):
+        with self.verrou:
+            for personne in lot:
+                self.__personnes.ajouter(personne)
+            total = len(self.__personnes)
+        if progression is not None:
+            progression(total)
+        return len(lot)
+
+    def __obtenir(self, id_person):
+        personne = self.rechercher_personne(id_person)
+        if personne is None:
+            raise PersonneIntrouvable(id_person)
+        return personne
+
+    def ajouter_personne(self, id_person, nom, age, group, type_person):
+        """
+        Ajoute une personne (stagiaire ou enseignant) à la base et à la liste locale.
+        Lève PersonneExistante si l'ID existe déjà.
+        """
+        with self.verrou:
+            if id_person in self.__personnes:
+                raise PersonneExistante(id_person)
+        self.__depot().inserer_personne(id_person, nom, age, group, type_person)
+        with self.verrou:
+            personne = self.fabrique((id_person, nom, age, group, type_person, []))
+            self.__personnes.ajouter(personne)
+        return personne
+
+    def importer_personnes(self, chemin, taille_lot=None, chemin_rapport=None):
+        """
+        Importe un fichier CSV, JSON Lines ou colonnaire (voir
+        `gestion.importation`) et ajoute les personnes importées, avec leurs
+        notes, à la liste locale. Retourne le rapport d'import.
+        """
+        with self.verrou:
+            ids_existants = {p.id_person for p in self.__personnes}
+        rapport = importer_fichier(chemin, self.__depot(), ids_existants, taille_lot or self.taille_lot,
+                                   chemin_rapport)
+        with self.verrou:
+            for personne in rapport.importees:
+                self.__personnes.ajouter(self.fabrique(tuple(personne) + (rapport.notes.get(personne[0], []),)))
+        return rapport
+
+    def exporter_personnes(self, chemin, format_fichier="csv", group=None, role=None):
+        """
+        Exporte les personnes (toutes, ou celles d'un groupe et/ou d'un rôle).
+        Retourne le nombre de personnes exportées.
+        """
+        if group is None and role is None:
+            personnes = self.get_personnes()
+        else:
+            personnes = self.rechercher_personnes(group=group, role=role)
+        self.precharger_notes(personnes)
+        return exporter(depuis_personnes(personnes), chemin, format_fichier)
+
+    def vue_paginee(self):
+        """
+        Vue filtrable et triable des personnes, servie page par page (voir
+        ListeVirtuelle). La vue ne lit pas la base : les notes qu'elle signale
+        en attente (`VuePaginee.en_attente`) se lisent avec `precharger_notes`.
+        """
+        return VuePaginee(self.__personnes, verrou=self.verrou)
+
+    def groupes(self):
+        with self.verrou:
+            return self.__personnes.groupes()
+
+    def rechercher_personne(self, id_person):
+        """
+        Recherche une personne par ID. Retourne None si elle n'existe pas.
+        """
+        with self.verrou:
+            return self.__personnes.obtenir(id_person)
+
+    def rechercher_personnes(self, group=None, role=None, age_min=None, age_max=None, prefixe_nom=None):
+        """
+        Recherche multicritère (groupe, rôle, tranche d'âge, début du nom) via les index secondaires.
+        """
+        with self.verrou:
+            return self.__personnes.rechercher(group=group, role=role, age_min=age_min, age_max=age_max, prefixe_nom=prefixe_nom)
+
+    def rechercher_par_nom(self, texte, limite=20):
+        """
+        Recherche approchée par nom (accents, casse et fautes de frappe tolérés).
+        Retourne des couples (personne, score), du plus au moins ressemblant.
+        """
+        with self.verrou:
+            return self.__personnes.rechercher_nom(texte, limite)
+
+    def precharger_notes(self, personnes):
+        """
+        Lit par lots les notes encore en attente des `personnes` (chargement différé).
+        """
+        if self.chargeur is not None:
+            self.chargeur.precharger(personnes)
+
+    def analyser_notes(self):
+        """
+        Statistiques des notes (moyennes par groupe, percentiles, classements).
+        """
+        # Importé ici : NumPy n'est chargé qu'à la première analyse.
+        from gestion.analyse import analyser, extraire
+        self.precharger_notes(self.get_personnes())
+        with self.verrou:
+            donnees = extraire(self.__personnes)
+        return analyser(*donnees)
+
+    def moyennes_groupes(self):
+        """
+        Moyennes par groupe calculées par la base (table de synthèse).
+        """
+        return self.__depot().moyennes_groupes()
+
+    def verifier_stats_groupes(self, corriger=False):
+        """
+        Compare la table de synthèse des groupes aux tables de détail ; la
+        reconstruit si `corriger`. Retourne la liste des écarts.
+        """
+        return self.__depot().verifier_stats(corriger)
+
+    def statistiques_cache(self):
+        """
+        Statistiques du cache des notes, ou None s'il est désactivé (`cache_taille` = 0).
+        """
+        if not isinstance(self.depot, DepotEnCache):
+            return None
+        return self.depot.statistiques()
+
+    def supprimer_personne(self, id_person):
+        """
+        Supprime une personne de la base et de la liste locale.
+        """
+        personne = self.__obtenir(id_person)
+        self.__depot().supprimer_personne(id_person)
+        with self.verrou:
+            self.__personnes.retirer(id_person)
+        return personne
+
+    def enregistrer_notes(self, id_person, notes):
+        """
+        Enregistre des notes d'une personne : un triplet (note1 à note3, None
+        pour une note absente) ou des tuples (évaluation, note, coefficient).
+        Les autres évaluations de la personne sont conservées.
+        """
+        personne = self.__obtenir(id_person)
+        self.__depot().enregistrer_notes(id_person, notes)
+        with self.verrou:
+            self.__personnes.modifier(id_person, notes=fusionner_notes(personne.evaluations(), notes))
+        return personne
+
+    def enregistrer_evaluation(self, id_person, evaluation, note, coefficient=None):
+        """
+        Valide et enregistre une note d'évaluation nommée (note vide pour la
+        retirer, coefficient vide pour le conserver). Lève SaisieInvalide si
+        la saisie est invalide.
+        """
+        return self.enregistrer_notes(id_person, [valider_evaluation(evaluation, note, coefficient)])
+
+    def enregistrer_notes_groupe(self, saisies):
+        """
+        Enregistre en une seule transaction les notes {id: triplet} de
+        plusieurs personnes (tout ou rien). Retourne le nombre de personnes.
+        Lève SaisieInvalide si une saisie est invalide, PersonneIntrouvable
+        si une personne est inconnue.
+        """
+        saisies, erreurs = valider_notes_lot(saisies)
+        if erreurs:
+            raise SaisieInvalide(f"{len(erreurs)} ligne(s) invalide(s), aucune note enregistrée.")
+        with self.verrou:
+            inconnues = [id_person for id_person in saisies if id_person not in self.__personnes]
+        if inconnues:
+            raise PersonneIntrouvable(inconnues)
+        nombre = self.__depot().enregistrer_notes_lot(saisies.items())
+        with self.verrou:
+            for id_person, notes in saisies.items():
+                actuelles = self.__personnes.obtenir(id_person).evaluations()
+                self.__personnes.modifier(id_person, notes=fusionner_notes(actuelles, notes))
+        return nombre
+
+    def obtenir_notes(self, id_person):
+        """
+        Relit les notes d'une personne dans la base et met à jour la liste locale.
+        """
+        personne = self.__obtenir(id_person)
+        notes = self.__depot().lire_notes(id_person)
+        with self.verrou:
+            self.__personnes.modifier(id_person, notes=notes)
+        return personne
+
+    def modifier_personne(self, id_person, new_nom, new_age):
+        """
+        Modifie le nom et l'âge d'une personne.
+        """
+        personne = self.__obtenir(id_person)
+        self.__depot().modifier_personne(id_person, new_nom, new_age)
+        with self.verrou:
+            self.__personnes.modifier(id_person, nom=new_nom, age=new_age)
+        return personne
+
+    def flush(self):
+        """
+        Valide tout de suite les écritures en attente (option `ecriture_differee`).
+        """
+        self.__depot().flush()
+
+    def fermer(self):
+        """
+        Valide les écritures en attente puis ferme la connexion.
+        """
+        if self.depot is not None:
+            depot, self.depot = self.depot, None
+            depot.fermer()
+
+    def __del__(self):
+        try:
+            self.fermer()
+        except Exception:
+            pass
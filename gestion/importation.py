@@ -0,0 +1,169 @@
+# gestion/importation.py
+"""
+Import en masse de personnes depuis un fichier CSV, JSON Lines ou colonnaire.
+
+Le fichier est lu en flux, chaque ligne est validée avec les mêmes règles que
+le formulaire de saisie, les doublons (déjà en base ou répétés dans le fichier)
+sont écartés, puis les lignes valides sont insérées par lots (`executemany`),
+avec leurs notes, dans une seule session du dépôt. Les lignes rejetées sont
+consignées dans un rapport CSV au lieu d'interrompre l'import.
+
+Colonnes attendues : id, nom, age, groupe, role. Les notes, facultatives, sont
+lues dans la colonne `evaluations` (liste JSON de [évaluation, note,
+coefficient] ou d'objets {evaluation, note, coefficient}) ou, à défaut, dans
+les colonnes note1 à note3 : un fichier produit par `gestion.exportation` se
+réimporte tel quel.
+"""
+
+import csv
+import json
+import math
+import os
+
+from gestion.chargement import TAILLE_LOT_DEFAUT
+from gestion.exportation import COLONNE_EVALUATIONS, lire_colonnes
+from gestion.modeles import COEFFICIENT_DEFAUT, EVALUATIONS_SAISIE, Note
+from gestion.validation import valider_evaluation, valider_personne
+
+COLONNES = ("id", "nom", "age", "groupe", "role")
+
+
+class RapportImport:
+    """
+    Bilan d'un import : lignes lues, personnes importées et lignes rejetées.
+    """
+    def __init__(self, chemin_rapport):
+        self.chemin_rapport = chemin_rapport
+        self.lues = 0
+        self.rejetees = 0
+        self.importees = []
+        self.notes = {}
+
+    def __str__(self):
+        texte = f"{self.lues} ligne(s) lue(s), {len(self.importees)} importée(s), {self.rejetees} rejetée(s)"
+        if self.rejetees:
+            texte += f" (détail dans {self.chemin_rapport})"
+        return texte
+
+
+def detecter_format(chemin):
+    extension = os.path.splitext(chemin)[1].lower()
+    if extension == ".gec":
+        return "colonnes"
+    return "jsonl" if extension in (".jsonl", ".ndjson", ".json") else "csv"
+
+
+def _lire_colonnaire(chemin):
+    numero = 0
+    for groupe in lire_colonnes(chemin):
+        colonnes = list(groupe)
+        for rang in range(len(groupe["id"])):
+            numero += 1
+            ligne = {colonne: groupe[colonne][rang] for colonne in colonnes}
+            for evaluation in EVALUATIONS_SAISIE:
+                # Fichiers de version 1 : NaN marque une note absente.
+                if math.isnan(ligne[evaluation]):
+                    ligne[evaluation] = None
+            yield numero, ligne
+
+
+def lire_lignes(chemin, format_fichier=None):
+    """
+    Produit des couples (numéro de ligne, dictionnaire) depuis un fichier CSV,
+    JSON Lines ou colonnaire (numéro de personne pour ce dernier).
+    """
+    format_fichier = format_fichier or detecter_format(chemin)
+    if format_fichier == "colonnes":
+        yield from _lire_colonnaire(chemin)
+        return
+    with open(chemin, encoding="utf-8", newline="") as fichier:
+        if format_fichier == "csv":
+            # La ligne 1 est l'en-tête.
+            for numero, ligne in enumerate(csv.DictReader(fichier), start=2):
+                yield numero, ligne
+        else:
+            for numero, texte in enumerate(fichier, start=1):
+                if not texte.strip():
+                    continue
+                try:
+                    ligne = json.loads(texte)
+                except json.JSONDecodeError as e:
+                    yield numero, ValueError(f"JSON invalide : {e.msg}")
+                    continue
+                yield numero, ligne if isinstance(ligne, dict) else ValueError("Objet JSON attendu.")
+
+
+def lire_notes(ligne):
+    """
+    Valide les notes d'une ligne lue par `lire_lignes` et retourne la liste
+    de `Note` présentes ; lève ValueError si elles sont mal formées.
+    """
+    evaluations = ligne.get(COLONNE_EVALUATIONS)
+    if isinstance(evaluations, str):
+        try:
+            evaluations = json.loads(evaluations) if evaluations.strip() else []
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Colonne evaluations invalide : {e.msg}") from None
+    if evaluations is None:
+        evaluations = [(evaluation, ligne.get(evaluation)) for evaluation in EVALUATIONS_SAISIE]
+    elif not isinstance(evaluations, list):
+        raise ValueError("La colonne evaluations doit être une liste.")
+    notes = []
+    for evaluation in evaluations:
+        if isinstance(evaluation, dict):
+            evaluation = (evaluation.get("evaluation"), evaluation.get("note"), evaluation.get("coefficient"))
+        elif not isinstance(evaluation, (list, tuple)) or not 2 <= len(evaluation) <= 3:
+            raise ValueError("Évaluation attendue sous la forme [évaluation, note, coefficient].")
+        nom, note, coefficient = valider_evaluation(*evaluation)
+        if note is not None:
+            notes.append(Note(nom, note, COEFFICIENT_DEFAUT if coefficient is None else coefficient))
+    return notes
+
+
+def importer_fichier(chemin, depot, ids_existants=(), taille_lot=TAILLE_LOT_DEFAUT,
+                     chemin_rapport=None, format_fichier=None):
+    """
+    Importe les personnes de `chemin` via `depot` et retourne un `RapportImport`.
+    Les personnes importées sont listées dans `rapport.importees` sous forme de
+    tuples (id, nom, age, groupe, type), leurs notes dans `rapport.notes`
+    ({id: [Note, ...]}, personnes sans note omises).
+    """
+    chemin_rapport = chemin_rapport or chemin + ".rejets.csv"
+    rapport = RapportImport(chemin_rapport)
+    vus = set()
+
+    with open(chemin_rapport, "w", encoding="utf-8", newline="") as fichier_rapport:
+        rejets = csv.writer(fichier_rapport)
+        rejets.writerow(("ligne", "raison") + COLONNES)
+
+        def lignes_valides():
+            for numero, ligne in lire_lignes(chemin, format_fichier):
+                rapport.lues += 1
+                if isinstance(ligne, ValueError):
+                    rejets.writerow((numero, str(ligne)))
+                    rapport.rejetees += 1
+                    continue
+                try:
+                    personne = valider_personne(*(ligne.get(colonne) for colonne in COLONNES))
+                    if personne[0] in ids_existants or personne[0] in vus:
+                        raise ValueError("Une personne avec cet ID existe déjà.")
+                    notes = lire_notes(ligne)
+                except ValueError as e:
+                    rejets.writerow((numero, str(e)) + tuple(ligne.get(colonne, "") for colonne in COLONNES))
+                    rapport.rejetees += 1
+                    continue
+                vus.add(personne[0])
+                rapport.importees.append(personne)
+                if notes:
+                    rapport.notes[personne[0]] = notes
+                yield personne
+
+        with depot.session():
+            depot.inserer_personnes(lignes_valides(), taille_lot)
+            saisies = list(rapport.notes.items())
+            for debut in range(0, len(saisies), taille_lot):
+                depot.enregistrer_notes_lot(saisies[debut:debut + taille_lot])
+
+    if not rapport.rejetees:
+        os.remove(chemin_rapport)
+    return rapport
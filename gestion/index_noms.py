@@ -0,0 +1,235 @@
+# gestion/index_noms.py
+"""
+Recherche approchée des noms, insensible aux accents et à la casse.
+
+Les noms sont « repliés » (décomposition Unicode, accents et ponctuation
+retirés, minuscules : « Benaïssa » et « BENAISSA » donnent « benaissa »), puis
+découpés en trigrammes de caractères, mot par mot, avec un remplissage qui
+marque le début et la fin des mots (« ben » donne «   b », «  be », « ben »,
+« en  »). Un index inversé associe chaque trigramme aux lignes qui le
+contiennent.
+
+Le score d'un nom est la moyenne de deux mesures : la part des trigrammes de
+la recherche qu'il contient (un nom complet est trouvé à partir du seul nom de
+famille) et la similarité de Jaccard, qui classe en tête les noms les plus
+proches en entier.
+
+Pour rester rapide sur des centaines de milliers de noms (quelques
+millisecondes pour 200 000), les trigrammes très fréquents de la recherche
+ne servent pas à produire les candidats, dans la limite où un nom qui atteint
+le seuil partage forcément au moins un des autres ; ils sont ensuite vérifiés
+pour ces seuls candidats. Les candidats sont examinés du plus prometteur au
+moins prometteur, et l'examen s'arrête dès que les suivants ne peuvent plus
+entrer dans le classement.
+
+Chaque forme repliée distincte n'occupe qu'une ligne, partagée par toutes les
+personnes qui portent ce nom. Les lignes sont stockées dans des tableaux
+compacts (`array`) ; un nom qui n'est plus porté laisse une ligne morte, et
+l'index est compacté quand les lignes mortes deviennent majoritaires.
+"""
+
+import heapq
+import math
+import re
+import unicodedata
+from array import array
+from collections import Counter
+
+SEUIL_DEFAUT = 0.5
+LIMITE_DEFAUT = 20
+# Un trigramme présent dans plus de max(FREQUENCE_MIN, lignes / DIVISEUR_FREQUENCE)
+# noms ne sert pas à produire les candidats (voir `IndexNoms.rechercher`).
+FREQUENCE_MIN = 1000
+DIVISEUR_FREQUENCE = 15
+
+_LIGATURES = str.maketrans({"œ": "oe", "æ": "ae", "ø": "o", "đ": "d", "ł": "l", "ı": "i"})
+_SEPARATEURS = re.compile(r"[\W_]+")
+
+
+def replier(texte):
+    """
+    Forme normalisée d'un texte : sans accents, en minuscules, mots séparés par une espace.
+    """
+    texte = unicodedata.normalize("NFKD", texte)
+    texte = "".join(c for c in texte if not unicodedata.combining(c))
+    texte = texte.casefold().translate(_LIGATURES)
+    return " ".join(_SEPARATEURS.sub(" ", texte).split())
+
+
+def trigrammes(texte):
+    """
+    Ensemble des trigrammes du texte replié, mot par mot.
+    """
+    return _trigrammes_forme(replier(texte))
+
+
+def _trigrammes_forme(forme):
+    resultat = set()
+    for mot in forme.split():
+        mot = f"  {mot} "
+        resultat.update(mot[i:i + 3] for i in range(len(mot) - 2))
+    return resultat
+
+
+class IndexNoms:
+    """
+    Index inversé de trigrammes sur les noms, mis à jour au fil des ajouts,
+    renommages et retraits.
+    """
+    def __init__(self, noms=()):
+        self.__codes = {}            # trigramme -> code
+        self.__listes = []           # code -> array des lignes contenant ce trigramme
+        self.__ids = []              # ligne -> liste des ids portant ce nom (vide : ligne morte)
+        self.__formes = {}           # forme repliée -> ligne
+        self.__debuts = array("I", [0])  # ligne -> position de ses codes dans __trigrammes
+        self.__trigrammes = array("I")   # codes des trigrammes de chaque ligne, bout à bout
+        self.__lignes = {}           # id -> ligne de son nom
+        self.__mortes = 0
+        for id_person, nom in noms:
+            self.ajouter(id_person, nom)
+
+    def __len__(self):
+        return len(self.__lignes)
+
+    def __contains__(self, id_person):
+        return id_person in self.__lignes
+
+    def ajouter(self, id_person, nom):
+        """
+        Indexe (ou ré-indexe) le nom d'une personne.
+        """
+        if id_person in self.__lignes:
+            self.retirer(id_person)
+        forme = replier(nom)
+        ligne = self.__formes.get(forme)
+        if ligne is not None:
+            if not self.__ids[ligne]:
+                self.__mortes -= 1
+            self.__ids[ligne].append(id_person)
+            self.__lignes[id_person] = ligne
+            return
+        ligne = self.__formes[forme] = len(self.__ids)
+        self.__ids.append([id_person])
+        self.__lignes[id_person] = ligne
+        for trigramme in _trigrammes_forme(forme):
+            code = self.__codes.get(trigramme)
+            if code is None:
+                code = self.__codes[trigramme] = len(self.__listes)
+                self.__listes.append(array("I"))
+            self.__listes[code].append(ligne)
+            self.__trigrammes.append(code)
+        self.__debuts.append(len(self.__trigrammes))
+
+    def retirer(self, id_person):
+        ligne = self.__lignes.pop(id_person, None)
+        if ligne is None:
+            return
+        ids = self.__ids[ligne]
+        ids.remove(id_person)
+        if ids:
+            return
+        self.__mortes += 1
+        if self.__mortes > 1000 and self.__mortes > len(self.__ids) // 2:
+            self.__compacter()
+
+    def rechercher(self, texte, limite=LIMITE_DEFAUT, seuil=SEUIL_DEFAUT):
+        """
+        Retourne au plus `limite` couples (id, score) classés par score
+        décroissant ; seuls les noms contenant au moins la part `seuil` des
+        trigrammes de la recherche sont retenus.
+        """
+        if limite <= 0:
+            return []
+        codes = [self.__codes.get(t) for t in trigrammes(texte)]
+        nb_recherche = len(codes)
+        if not nb_recherche:
+            return []
+        connus = sorted((c for c in codes if c is not None), key=lambda c: len(self.__listes[c]))
+        minimum = max(1, math.ceil(seuil * nb_recherche - 1e-9))
+        if len(connus) < minimum:
+            return []
+        # Un candidat doit partager `minimum` trigrammes : en écartant jusqu'à
+        # `minimum - 1` trigrammes, il en partage encore au moins un autre.
+        # Seuls les très fréquents sont écartés : compter les autres coûte
+        # moins que de les vérifier ensuite candidat par candidat.
+        frequence_max = max(FREQUENCE_MIN, len(self.__ids) // DIVISEUR_FREQUENCE)
+        nb_rares = len(connus)
+        while len(connus) - nb_rares < minimum - 1 and len(self.__listes[connus[nb_rares - 1]]) > frequence_max:
+            nb_rares -= 1
+        rares, frequents = connus[:nb_rares], set(connus[nb_rares:])
+        comptes = Counter()
+        for code in rares:
+            comptes.update(self.__listes[code])
+
+        # Candidats regroupés par nombre de trigrammes partagés (plus rapide qu'un tri).
+        bonus = len(frequents)
+        plancher = minimum - bonus
+        paliers = [[] for _ in range(len(rares) + 1)]
+        for ligne, commun in comptes.items():
+            if commun >= plancher:
+                paliers[commun].append(ligne)
+
+        # Les candidats sont parcourus par nombre décroissant de trigrammes
+        # rares partagés. Le score ne dépasse jamais la part des trigrammes
+        # de la recherche retrouvés : dès que même les fréquents ne suffiraient
+        # plus à battre le dernier des `limite` meilleurs, le classement est acquis.
+        ids, debuts, tous = self.__ids, self.__debuts, self.__trigrammes
+        meilleurs = []  # tas (score, ligne) des meilleures lignes
+        couverts = 0    # personnes portant les noms du tas
+        candidats = ((commun, ligne) for commun in range(len(rares), plancher - 1, -1) for ligne in paliers[commun])
+        for commun, ligne in candidats:
+            complet = couverts >= limite
+            if complet and (commun + bonus) / nb_recherche < meilleurs[0][0]:
+                break
+            if not ids[ligne]:
+                continue
+            debut, fin = debuts[ligne], debuts[ligne + 1]
+            if complet:
+                # Borne plus fine, qui tient compte de la longueur de ce nom.
+                plafond = commun + bonus
+                if (plafond / nb_recherche + plafond / (nb_recherche + fin - debut - plafond)) / 2 < meilleurs[0][0]:
+                    continue
+            if bonus:
+                commun += len(frequents.intersection(tous[debut:fin]))
+                if commun < minimum:
+                    continue
+            part = commun / nb_recherche
+            jaccard = commun / (nb_recherche + (fin - debut) - commun)
+            candidat = (round((part + jaccard) / 2, 4), ligne)
+            if complet and candidat <= meilleurs[0]:
+                continue
+            heapq.heappush(meilleurs, candidat)
+            couverts += len(ids[ligne])
+            # Le nom le moins proche sort s'il n'est plus nécessaire pour atteindre `limite`.
+            while couverts - len(ids[meilleurs[0][1]]) >= limite:
+                couverts -= len(ids[heapq.heappop(meilleurs)[1]])
+        resultats = []
+        for score, ligne in sorted(meilleurs, reverse=True):
+            resultats.extend((id_person, score) for id_person in ids[ligne])
+        return resultats[:limite]
+
+    def __compacter(self):
+        """
+        Reconstruit les tableaux sans les lignes mortes.
+        """
+        anciens_ids, anciens_debuts, anciens_codes = self.__ids, self.__debuts, self.__trigrammes
+        nouvelles = {}
+        self.__listes = [array("I") for _ in self.__listes]
+        self.__ids = []
+        self.__debuts = array("I", [0])
+        self.__trigrammes = array("I")
+        self.__lignes = {}
+        self.__mortes = 0
+        for ancienne, ids in enumerate(anciens_ids):
+            if not ids:
+                continue
+            ligne = nouvelles[ancienne] = len(self.__ids)
+            self.__ids.append(ids)
+            for id_person in ids:
+                self.__lignes[id_person] = ligne
+            codes = anciens_codes[anciens_debuts[ancienne]:anciens_debuts[ancienne + 1]]
+            for code in codes:
+                self.__listes[code].append(ligne)
+            self.__trigrammes.extend(codes)
+            self.__debuts.append(len(self.__trigrammes))
+        self.__formes = {forme: nouvelles[ligne] for forme, ligne in self.__formes.items() if ligne in nouvelles}
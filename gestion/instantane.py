@@ -0,0 +1,219 @@
+# gestion/instantane.py
+"""
+Instantané local du registre, pour un démarrage à froid quasi immédiat.
+
+À la fermeture (et après chaque chargement complet), le registre est écrit
+dans un fichier binaire en colonnes, avec la version du journal des
+modifications à laquelle il correspond. Au démarrage suivant, `reprendre`
+relit ce fichier (projeté en mémoire avec `mmap`), puis ne demande à la base
+que les changements survenus depuis cette version (`Synchroniseur`) au lieu
+de relire toutes les tables.
+
+L'instantané est ignoré, et le chargement complet a lieu comme avant, si le
+fichier est absent ou illisible, si sa somme de contrôle est fausse, s'il a
+été écrit pour une autre base (`source`), si le journal de la base est
+antérieur à sa version (base recréée ou restaurée) ou si, après
+synchronisation, le nombre de personnes diffère de celui de la base.
+
+Les personnes dont les notes étaient encore en attente (chargement différé)
+le restent : elles seront lues au premier accès.
+"""
+
+import mmap
+import os
+import struct
+import zlib
+from array import array
+from contextlib import nullcontext
+
+from gestion.exportation import _bloc_textes, _lire_textes, _octets, _tableau
+from gestion.modeles import ROLES, Note
+
+# =========================
+# FORMAT DU FICHIER
+# =========================
+#
+# En-tête : b"GEI1", version du format (uint16), version du journal (int64),
+# nombre de personnes (uint32), taille de la charge utile (uint64), CRC32 de
+# la charge utile (uint32), taille de la source (uint16) puis la source en
+# UTF-8. La charge utile est une suite de blocs préfixés par leur taille en
+# octets (uint32) :
+#   id          int64
+#   nom         offsets uint32 (n + 1) puis texte UTF-8 concaténé
+#   age         int32 (AGE_ABSENT si inconnu)
+#   role        uint8 (rang dans ROLES)
+#   groupe      uint32, rang dans la liste des groupes (GROUPE_ABSENT : aucun)
+#   groupes     comme nom, une entrée par groupe distinct
+#   etat        uint8 (1 : notes chargées, 0 : en attente)
+#   debuts      uint32 (n + 1), tranche de chaque personne dans les notes
+#   notes       float32
+#   poids       float32, coefficient de chaque note
+#   evaluation  uint32, rang dans la liste des évaluations
+#   evaluations comme nom, une entrée par évaluation distincte
+# Tous les entiers et flottants sont en petit-boutiste.
+
+MAGIQUE = b"GEI1"
+VERSION = 1
+ENTETE = struct.Struct("<4sHqIQIH")
+AGE_ABSENT = -1
+GROUPE_ABSENT = 0xFFFFFFFF
+
+
+def source_base(config):
+    """
+    Identifie la base décrite par `config` : un instantané n'est repris que
+    pour la base qui l'a produit.
+    """
+    if config["backend"] == "sqlite":
+        return "sqlite:" + os.path.abspath(config["chemin_sqlite"])
+    return f"{config['backend']}:{config['user']}@{config['host']}/{config['database']}"
+
+
+class Instantane:
+    """
+    Contenu décodé d'un instantané : `version` du journal et colonnes.
+    """
+
+    def __init__(self, version, colonnes):
+        self.version = version
+        self.colonnes = colonnes
+
+    def __len__(self):
+        return len(self.colonnes["id"])
+
+    def lignes(self):
+        """
+        Produit des tuples (id, nom, age, groupe, type, notes), `notes` valant
+        None pour une personne dont les notes sont en attente.
+        """
+        c = self.colonnes
+        noms_groupes = c["groupes"] + [None]
+        groupes = [noms_groupes[code] if code != GROUPE_ABSENT else None for code in c["groupe"]]
+        ages = [None if age == AGE_ABSENT else age for age in c["age"]]
+        roles = [ROLES[code] for code in c["role"]]
+        noms_evaluations = c["evaluations"]
+        evaluations = [noms_evaluations[code] for code in c["evaluation"]]
+        notes, poids, debuts = c["notes"].tolist(), c["poids"].tolist(), c["debuts"]
+        lignes = zip(c["id"], c["nom"], ages, groupes, roles, c["etat"], debuts, debuts[1:])
+        for id_person, nom, age, group, role, etat, debut, fin in lignes:
+            if etat:
+                notes_personne = list(map(Note, evaluations[debut:fin], notes[debut:fin], poids[debut:fin]))
+            else:
+                notes_personne = None
+            yield id_person, nom, age, group, role, notes_personne
+
+
+def ecrire_instantane(chemin, personnes, version, source):
+    """
+    Écrit l'instantané des `personnes` à la `version` du journal. Le fichier
+    est remplacé d'un coup (écriture dans un fichier temporaire puis
+    renommage) : un arrêt brutal ne laisse jamais un instantané tronqué.
+    Retourne le nombre de personnes écrites.
+    """
+    ids, ages, roles, etats = array("q"), array("i"), array("B"), array("B")
+    groupes, debuts = array("I"), array("I", [0])
+    notes, poids, evaluations = array("f"), array("f"), array("I")
+    noms, codes_groupes, codes_evaluations = [], {}, {}
+    for personne in personnes:
+        ids.append(personne.id_person)
+        noms.append(personne.nom)
+        ages.append(AGE_ABSENT if personne.age is None else personne.age)
+        roles.append(ROLES.index(personne.get_role()))
+        if personne.group is None:
+            groupes.append(GROUPE_ABSENT)
+        else:
+            groupes.append(codes_groupes.setdefault(personne.group, len(codes_groupes)))
+        etats.append(personne.notes_chargees())
+        if personne.notes_chargees():
+            for evaluation, note, coefficient in personne.evaluations():
+                notes.append(note)
+                poids.append(coefficient)
+                evaluations.append(codes_evaluations.setdefault(evaluation, len(codes_evaluations)))
+        debuts.append(len(notes))
+    blocs = [
+        _octets(ids), _bloc_textes(noms), _octets(ages), _octets(roles), _octets(groupes),
+        _bloc_textes(codes_groupes), _octets(etats), _octets(debuts), _octets(notes), _octets(poids),
+        _octets(evaluations), _bloc_textes(codes_evaluations),
+    ]
+    charge = b"".join(struct.pack("<I", len(bloc)) + bloc for bloc in blocs)
+    source = source.encode("utf-8")
+    temporaire = f"{chemin}.tmp"
+    with open(temporaire, "wb") as fichier:
+        fichier.write(ENTETE.pack(MAGIQUE, VERSION, version, len(ids), len(charge), zlib.crc32(charge), len(source)))
+        fichier.write(source)
+        fichier.write(charge)
+    os.replace(temporaire, chemin)
+    return len(ids)
+
+
+def lire_instantane(chemin, source):
+    """
+    Relit l'instantané `chemin` écrit pour `source`. Retourne un
+    `Instantane`, ou None si le fichier est absent, invalide ou d'une autre base.
+    """
+    try:
+        with open(chemin, "rb") as fichier, mmap.mmap(fichier.fileno(), 0, access=mmap.ACCESS_READ) as carte:
+            return _decoder(carte, source.encode("utf-8"))
+    except (OSError, ValueError, IndexError, struct.error, UnicodeDecodeError):
+        return None
+
+
+def _decoder(carte, source):
+    magique, version_format, version, nb, taille, crc, taille_source = ENTETE.unpack_from(carte, 0)
+    debut = ENTETE.size + taille_source
+    if magique != MAGIQUE or version_format != VERSION or carte[ENTETE.size:debut] != source:
+        return None
+    charge = carte[debut:debut + taille]
+    if len(charge) != taille or zlib.crc32(charge) != crc:
+        return None
+    blocs, position = [], 0
+    while position < taille:
+        (longueur,) = struct.unpack_from("<I", charge, position)
+        blocs.append(charge[position + 4:position + 4 + longueur])
+        position += 4 + longueur
+    (ids, noms, ages, roles, groupes, noms_groupes, etats, debuts, notes, poids,
+     evaluations, noms_evaluations) = blocs
+    ids = _tableau("q", ids)
+    groupes = _tableau("I", groupes)
+    evaluations = _tableau("I", evaluations)
+    colonnes = {
+        "id": ids,
+        "nom": _lire_textes(noms, nb),
+        "age": _tableau("i", ages),
+        "role": _tableau("B", roles),
+        "groupe": groupes,
+        "groupes": _lire_textes(noms_groupes, len({g for g in groupes if g != GROUPE_ABSENT})),
+        "etat": _tableau("B", etats),
+        "debuts": _tableau("I", debuts),
+        "notes": _tableau("f", notes),
+        "poids": _tableau("f", poids),
+        "evaluation": evaluations,
+        "evaluations": _lire_textes(noms_evaluations, len(set(evaluations))),
+    }
+    if len(ids) != nb or len(colonnes["debuts"]) != nb + 1:
+        return None
+    return Instantane(version, colonnes)
+
+
+def reprendre(chemin, source, depot, registre, fabrique, synchro, verrou=None):
+    """
+    Remplit `registre` depuis l'instantané puis lui applique, avec `synchro`,
+    les changements survenus en base depuis. Retourne le nombre de personnes,
+    ou None (registre vidé) si l'instantané ne peut pas servir : il faut
+    alors procéder à un chargement complet.
+    """
+    verrou = verrou if verrou is not None else nullcontext()
+    instantane = lire_instantane(chemin, source)
+    if instantane is None or depot.version_journal() < instantane.version:
+        return None
+    with verrou:
+        registre.remplacer(fabrique(ligne) for ligne in instantane.lignes())
+    synchro.version = instantane.version
+    synchro.synchroniser()
+    attendu = depot.compter_personnes()
+    with verrou:
+        nb = len(registre)
+        if nb != attendu:
+            registre.vider()
+            return None
+    return nb
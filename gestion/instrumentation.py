@@ -0,0 +1,316 @@
+# gestion/instrumentation.py
+"""
+Mesures des chemins critiques : requêtes SQL et méthodes du gestionnaire.
+
+`CurseurInstrumente` enveloppe un curseur DB-API et relève, pour chaque forme
+de requête (texte normalisé, valeurs littérales remplacées par `?`), le
+nombre d'appels, les lignes lues et un histogramme des durées. Les requêtes
+plus lentes que `seuil_lente` secondes sont journalisées (logger
+`gestion.requetes` et liste des dernières requêtes lentes).
+
+`instrumenter` chronomètre les méthodes publiques d'un objet. Chaque appel
+de premier niveau forme une « opération » : si une même forme de requête y
+est exécutée au moins `seuil_n_plus_1` fois, l'opération est signalée comme
+un probable schéma N+1 (une requête par élément au lieu d'une requête par lot).
+"""
+
+import bisect
+import functools
+import json
+import logging
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Bornes supérieures des classes de l'histogramme, en millisecondes (la dernière classe est ouverte).
+BORNES_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000)
+SEUIL_LENTE_DEFAUT = 0.1
+SEUIL_N_PLUS_1_DEFAUT = 20
+TAILLE_JOURNAL = 100
+
+journal_requetes = logging.getLogger("gestion.requetes")
+journal_requetes.addHandler(logging.NullHandler())
+
+_LITTERAUX = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_LISTES = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_ESPACES = re.compile(r"\s+")
+
+
+def forme_requete(sql):
+    """
+    Forme normalisée d'une requête : espaces réduits, littéraux et marqueurs
+    remplacés par `?`, listes `IN (?, ?, ...)` réduites à `(...)`.
+    """
+    forme = _ESPACES.sub(" ", sql.strip())
+    forme = _LITTERAUX.sub("?", forme.replace("%s", "?"))
+    return _LISTES.sub("(...)", forme)
+
+
+class Mesures:
+    """
+    Compteur d'appels, durée totale et maximale, et histogramme des durées ;
+    pour une requête, lignes lues ou écrites et temps passé dans les `fetch`.
+    """
+    __slots__ = ("appels", "lignes", "total", "maximum", "lecture", "histogramme")
+
+    def __init__(self):
+        self.appels = 0
+        self.lignes = 0
+        self.total = 0.0
+        self.maximum = 0.0
+        self.lecture = 0.0
+        self.histogramme = [0] * (len(BORNES_MS) + 1)
+
+    def ajouter(self, duree, lignes=0):
+        self.appels += 1
+        self.histogramme[bisect.bisect_left(BORNES_MS, duree * 1000)] += 1
+        self.lignes += lignes
+        self.total += duree
+        self.maximum = max(self.maximum, duree)
+
+    def ajouter_lecture(self, duree, lignes):
+        self.lignes += lignes
+        self.lecture += duree
+
+    def en_dict(self):
+        return {
+            "appels": self.appels,
+            "lignes": self.lignes,
+            "total_s": self.total,
+            "moyenne_ms": self.total / self.appels * 1000 if self.appels else 0.0,
+            "max_ms": self.maximum * 1000,
+            "lecture_s": self.lecture,
+            "histogramme_ms": {
+                (f"<={borne}" if rang < len(BORNES_MS) else f">{BORNES_MS[-1]}"): nb
+                for rang, (borne, nb) in enumerate(zip(BORNES_MS + (None,), self.histogramme))
+            },
+        }
+
+
+class Instrumentation:
+    """
+    Collecteur des mesures, partagé par les curseurs et les méthodes
+    instrumentés. Utilisable depuis plusieurs threads.
+    """
+    def __init__(self, seuil_lente=SEUIL_LENTE_DEFAUT, seuil_n_plus_1=SEUIL_N_PLUS_1_DEFAUT):
+        self.seuil_lente = seuil_lente
+        self.seuil_n_plus_1 = seuil_n_plus_1
+        self.__verrou = threading.Lock()
+        self.__local = threading.local()
+        self.reinitialiser()
+
+    @classmethod
+    def depuis_config(cls, config):
+        """
+        Collecteur décrit par la configuration, ou None si l'instrumentation est désactivée.
+        """
+        if not config.get("instrumentation"):
+            return None
+        return cls(config["seuil_requete_lente"], config["seuil_n_plus_1"])
+
+    def reinitialiser(self):
+        with self.__verrou:
+            self.requetes = {}
+            self.methodes = {}
+            self.lentes = deque(maxlen=TAILLE_JOURNAL)
+            self.n_plus_1 = {}
+
+    def __operation(self):
+        pile = getattr(self.__local, "pile", None)
+        return pile[0] if pile else None
+
+    def enregistrer_requete(self, sql, duree, lignes=0):
+        """
+        Relève une exécution de requête (durée d'`execute`, lignes écrites).
+        Retourne sa forme, qui sert à lui rattacher ensuite les lignes lues.
+        """
+        forme = forme_requete(sql)
+        operation = self.__operation()
+        with self.__verrou:
+            self.requetes.setdefault(forme, Mesures()).ajouter(duree, lignes)
+            if duree >= self.seuil_lente:
+                self.lentes.append({
+                    "horodatage": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "duree_ms": duree * 1000,
+                    "operation": operation["nom"] if operation else None,
+                    "requete": forme,
+                })
+        if operation is not None:
+            operation["formes"][forme] = operation["formes"].get(forme, 0) + 1
+        if duree >= self.seuil_lente:
+            journal_requetes.warning("Requête lente (%.1f ms) : %s", duree * 1000, forme)
+        return forme
+
+    def enregistrer_lecture(self, forme, duree, lignes):
+        """
+        Ajoute à une requête déjà exécutée le temps et les lignes de ses `fetch`.
+        """
+        with self.__verrou:
+            mesures = self.requetes.get(forme)
+            if mesures is not None:
+                mesures.ajouter_lecture(duree, lignes)
+
+    @contextmanager
+    def operation(self, nom):
+        """
+        Chronomètre le bloc sous le nom `nom`. Les blocs imbriqués sont
+        chronométrés aussi, mais leurs requêtes comptent pour l'opération de
+        premier niveau (détection N+1).
+        """
+        debut = self.entrer(nom)
+        try:
+            yield
+        finally:
+            self.sortir(nom, debut)
+
+    def entrer(self, nom):
+        """
+        Ouvre une opération ; retourne l'instant de début, à passer à `sortir`.
+        """
+        pile = getattr(self.__local, "pile", None)
+        if pile is None:
+            pile = self.__local.pile = []
+        pile.append({"nom": nom, "formes": {}})
+        return time.perf_counter()
+
+    def sortir(self, nom, debut):
+        duree = time.perf_counter() - debut
+        pile = self.__local.pile
+        contexte = pile.pop()
+        with self.__verrou:
+            mesures = self.methodes.get(nom)
+            if mesures is None:
+                mesures = self.methodes[nom] = Mesures()
+            mesures.ajouter(duree)
+            if not pile:
+                for forme, nb in contexte["formes"].items():
+                    if nb >= self.seuil_n_plus_1:
+                        alerte = self.n_plus_1.setdefault((nom, forme), {"occurrences": 0, "max_repetitions": 0})
+                        alerte["occurrences"] += 1
+                        alerte["max_repetitions"] = max(alerte["max_repetitions"], nb)
+
+    def rapport(self):
+        """
+        Toutes les mesures, sous forme de dictionnaire sérialisable en JSON.
+        """
+        with self.__verrou:
+            return {
+                "seuil_lente_ms": self.seuil_lente * 1000,
+                "seuil_n_plus_1": self.seuil_n_plus_1,
+                "requetes": {forme: m.en_dict() for forme, m in
+                             sorted(self.requetes.items(), key=lambda e: -(e[1].total + e[1].lecture))},
+                "methodes": {nom: m.en_dict() for nom, m in
+                             sorted(self.methodes.items(), key=lambda e: -e[1].total)},
+                "requetes_lentes": list(self.lentes),
+                "n_plus_1": [dict(operation=nom, requete=forme, **alerte)
+                             for (nom, forme), alerte in self.n_plus_1.items()],
+            }
+
+    def exporter(self, chemin):
+        with open(chemin, "w", encoding="utf-8") as fichier:
+            json.dump(self.rapport(), fichier, indent=2, ensure_ascii=False)
+
+    def texte(self, limite=15):
+        """
+        Résumé lisible des mesures (les `limite` entrées les plus coûteuses).
+        """
+        rapport = self.rapport()
+        lignes = ["Méthodes (temps total décroissant) :",
+                  f"  {'méthode':<48} {'appels':>8} {'total (s)':>10} {'moy. (ms)':>10} {'max (ms)':>10}"]
+        for nom, m in list(rapport["methodes"].items())[:limite]:
+            lignes.append(f"  {nom:<48} {m['appels']:>8} {m['total_s']:>10.3f} "
+                          f"{m['moyenne_ms']:>10.2f} {m['max_ms']:>10.2f}")
+        lignes.append("Requêtes (temps total décroissant) :")
+        lignes.append(f"  {'appels':>8} {'lignes':>9} {'total (s)':>10} {'moy. (ms)':>10} {'max (ms)':>10} "
+                      f"{'fetch (s)':>10}  requête")
+        for forme, m in list(rapport["requetes"].items())[:limite]:
+            lignes.append(f"  {m['appels']:>8} {m['lignes']:>9} {m['total_s']:>10.3f} "
+                          f"{m['moyenne_ms']:>10.2f} {m['max_ms']:>10.2f} {m['lecture_s']:>10.3f}  {forme[:80]}")
+        lignes.append(f"Requêtes lentes (> {rapport['seuil_lente_ms']:g} ms) : {len(rapport['requetes_lentes'])}")
+        for lente in rapport["requetes_lentes"][-5:]:
+            lignes.append(f"  {lente['horodatage']}  {lente['duree_ms']:8.1f} ms  "
+                          f"[{lente['operation'] or '-'}] {lente['requete'][:80]}")
+        lignes.append(f"Schémas N+1 (même requête >= {rapport['seuil_n_plus_1']} fois dans une opération) : "
+                      f"{len(rapport['n_plus_1'])}")
+        for alerte in rapport["n_plus_1"]:
+            lignes.append(f"  {alerte['operation']} : {alerte['max_repetitions']} x {alerte['requete'][:80]} "
+                          f"({alerte['occurrences']} fois)")
+        return "\n".join(lignes)
+
+
+class CurseurInstrumente:
+    """
+    Enveloppe un curseur DB-API : `execute`, `executemany` et les `fetch` sont
+    mesurés, le reste est délégué au curseur d'origine.
+    """
+    def __init__(self, cur, instrumentation):
+        self.cur = cur
+        self.instrumentation = instrumentation
+        self.__forme = None
+
+    def execute(self, sql, *args):
+        debut = time.perf_counter()
+        try:
+            return self.cur.execute(sql, *args)
+        finally:
+            self.__forme = self.instrumentation.enregistrer_requete(
+                sql, time.perf_counter() - debut, max(getattr(self.cur, "rowcount", 0) or 0, 0))
+
+    def executemany(self, sql, parametres):
+        debut = time.perf_counter()
+        try:
+            return self.cur.executemany(sql, parametres)
+        finally:
+            self.__forme = self.instrumentation.enregistrer_requete(
+                sql, time.perf_counter() - debut, max(getattr(self.cur, "rowcount", 0) or 0, 0))
+
+    def __lire(self, fonction, *args):
+        debut = time.perf_counter()
+        resultat = fonction(*args)
+        if self.__forme is not None:
+            nb = len(resultat) if isinstance(resultat, list) else int(resultat is not None)
+            self.instrumentation.enregistrer_lecture(self.__forme, time.perf_counter() - debut, nb)
+        return resultat
+
+    def fetchone(self):
+        return self.__lire(self.cur.fetchone)
+
+    def fetchmany(self, *args):
+        return self.__lire(self.cur.fetchmany, *args)
+
+    def fetchall(self):
+        return self.__lire(self.cur.fetchall)
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def __getattr__(self, nom):
+        return getattr(self.cur, nom)
+
+
+def instrumenter(objet, instrumentation, prefixe=None):
+    """
+    Remplace, sur l'instance `objet`, chaque méthode publique par une version
+    chronométrée (nom « Classe.méthode »). Retourne `objet`.
+    """
+    prefixe = prefixe or type(objet).__name__
+    for nom in dir(type(objet)):
+        if nom.startswith("_") or not callable(getattr(type(objet), nom)):
+            continue
+        setattr(objet, nom, _chronometrer(getattr(objet, nom), instrumentation, f"{prefixe}.{nom}"))
+    return objet
+
+
+def _chronometrer(methode, instrumentation, nom):
+    entrer, sortir = instrumentation.entrer, instrumentation.sortir
+
+    @functools.wraps(methode)
+    def enveloppe(*args, **kwargs):
+        debut = entrer(nom)
+        try:
+            return methode(*args, **kwargs)
+        finally:
+            sortir(nom, debut)
+    return enveloppe
@@ -0,0 +1,461 @@
+# gestion/modeles.py
+"""
+Modèle objet des personnes : Person (abstraite), Stagiaire et Teacher.
+
+Une personne a autant d'évaluations que nécessaire, chacune identifiée par
+son nom et affectée d'un coefficient (`Note`). La représentation est
+compacte : `__slots__` supprime le dictionnaire d'attributs de chaque
+instance, les notes et les coefficients sont rangés dans des tableaux
+`array('f')` parallèles, et la suite des noms d'évaluations est partagée par
+toutes les personnes qui ont les mêmes évaluations. L'attribut `notes` reste
+la liste des notes présentes, comme avant ; `moyenne_notes` est pondérée par
+les coefficients.
+
+Les formulaires à trois notes continuent de fonctionner : une suite
+positionnelle de notes est rangée dans les évaluations note1, note2 et note3
+(voir `normaliser_notes`).
+
+Pour une promotion entière, `PersonTable` range toutes les personnes en
+colonnes (un tableau par attribut) et fournit des vues légères
+(`VuePersonne`) qui se comportent comme des Person.
+
+Les notes d'une personne peuvent être « en attente » (`attendre_notes`) :
+elles sont alors lues au premier accès par le chargeur associé (voir
+`gestion.chargement.ChargeurNotes`), qui en profite pour lire celles de ses
+voisines.
+"""
+
+import math
+from abc import ABC, abstractmethod
+from array import array
+from collections import namedtuple
+
+NB_NOTES = 3
+EVALUATIONS_SAISIE = tuple(f"note{rang}" for rang in range(1, NB_NOTES + 1))
+COEFFICIENT_DEFAUT = 1.0
+# Les notes sont stockées en simple précision : on les relit arrondies à 4 décimales.
+DECIMALES = 4
+ROLES = ("Stagiaire", "Enseignant")
+
+Note = namedtuple("Note", "evaluation note coefficient")
+
+_SUITES_EVALUATIONS = {}
+# Tableau partagé par les personnes sans note (jamais modifié sur place).
+_AUCUNE_NOTE = array("f")
+
+
+def normaliser_notes(valeurs):
+    """
+    Convertit une saisie de notes en liste de `Note`. Sont acceptés :
+    - des tuples (évaluation, note) ou (évaluation, note, coefficient) ;
+    - un dictionnaire {évaluation: note} ou {évaluation: (note, coefficient)} ;
+    - une suite positionnelle de notes (formulaires à trois notes), rangées
+      dans les évaluations note1, note2, ...
+
+    Une note None (ou NaN) est conservée : à l'enregistrement, elle retire
+    l'évaluation. Un coefficient None signifie « inchangé » (1 pour une
+    nouvelle évaluation).
+    """
+    if isinstance(valeurs, dict):
+        valeurs = [(evaluation,) + (tuple(v) if isinstance(v, (tuple, list)) else (v,))
+                   for evaluation, v in valeurs.items()]
+    resultat = []
+    for rang, valeur in enumerate(valeurs, start=1):
+        if isinstance(valeur, (tuple, list)):
+            evaluation, note = valeur[0], valeur[1]
+            coefficient = valeur[2] if len(valeur) > 2 else None
+        else:
+            evaluation, note, coefficient = f"note{rang}", valeur, None
+        if note is not None:
+            note = float(note)
+            if math.isnan(note):
+                note = None
+        resultat.append(Note(str(evaluation), note, None if coefficient is None else float(coefficient)))
+    return resultat
+
+
+def fusionner_notes(actuelles, saisie):
+    """
+    Applique une saisie (voir `normaliser_notes`) aux notes `actuelles` :
+    les évaluations saisies sont créées ou remplacées, celles dont la note
+    est None sont retirées, les autres sont conservées. Retourne la liste de
+    `Note` triée par évaluation.
+    """
+    par_evaluation = {n.evaluation: n for n in actuelles}
+    for n in normaliser_notes(saisie):
+        ancienne = par_evaluation.pop(n.evaluation, None)
+        if n.note is None:
+            continue
+        coefficient = n.coefficient
+        if coefficient is None:
+            coefficient = ancienne.coefficient if ancienne is not None else COEFFICIENT_DEFAUT
+        par_evaluation[n.evaluation] = Note(n.evaluation, n.note, coefficient)
+    return [par_evaluation[e] for e in sorted(par_evaluation)]
+
+
+def ranger_notes(valeurs):
+    """
+    Range des notes en trois colonnes : (suite partagée des noms
+    d'évaluations, array('f') des notes, array('f') des coefficients ou None
+    s'ils valent tous 1). Les notes absentes sont ignorées.
+    """
+    if _deja_rangees(valeurs):
+        notes = valeurs
+    else:
+        notes = sorted((n for n in normaliser_notes(valeurs) if n.note is not None), key=lambda n: n.evaluation)
+    evaluations = tuple(n.evaluation for n in notes)
+    evaluations = _SUITES_EVALUATIONS.setdefault(evaluations, evaluations)
+    if not notes:
+        return evaluations, _AUCUNE_NOTE, None
+    coefficients = [COEFFICIENT_DEFAUT if n.coefficient is None else n.coefficient for n in notes]
+    if all(c == COEFFICIENT_DEFAUT for c in coefficients):
+        return evaluations, array("f", [n.note for n in notes]), None
+    return evaluations, array("f", [n.note for n in notes]), array("f", coefficients)
+
+
+def _deja_rangees(valeurs):
+    """
+    Vrai pour une liste de `Note` complètes et triées par évaluation, telle
+    que la produisent la base et l'instantané : elle se range sans conversion.
+    """
+    if type(valeurs) is not list:
+        return False
+    precedente = None
+    for n in valeurs:
+        if type(n) is not Note or n.note is None or n.coefficient is None or \
+                (precedente is not None and n.evaluation <= precedente):
+            return False
+        precedente = n.evaluation
+    return True
+
+
+def moyenne_ponderee(notes, coefficients=None):
+    """
+    Moyenne des `notes` pondérée par les `coefficients` (tous à 1 si None) ; 0 sans note.
+    """
+    if coefficients is None:
+        return sum(notes) / len(notes) if notes else 0
+    poids = sum(coefficients)
+    return sum(n * c for n, c in zip(notes, coefficients)) / poids if poids else 0
+
+
+def formater_notes(notes):
+    """
+    Texte d'une liste de `Note` : « note1 : 12, partiel : 15 (coef. 2) ».
+    """
+    return ", ".join(
+        f"{n.evaluation} : {n.note:g}" + ("" if n.coefficient == COEFFICIENT_DEFAUT else f" (coef. {n.coefficient:g})")
+        for n in notes
+    )
+
+
+def relire_notes(valeurs):
+    """
+    Liste des `Note` telle que `evaluations()` la retournera une fois
+    `valeurs` rangées (arrondi en float32 compris) : de quoi comparer des
+    notes lues en base à celles d'une personne en mémoire.
+    """
+    evaluations, notes, coefficients = ranger_notes(valeurs)
+    coefficients = coefficients or [COEFFICIENT_DEFAUT] * len(notes)
+    return [Note(e, _relire(n), _relire(c)) for e, n, c in zip(evaluations, notes, coefficients)]
+
+
+def _relire(valeur):
+    return round(valeur, DECIMALES)
+
+
+# =========================
+# CLASSE PERSONNE (POO : Abstraction, Encapsulation)
+# =========================
+class Person(ABC):
+    """
+    Classe abstraite représentant une personne (étudiant ou enseignant).
+    """
+    __slots__ = ("id_person", "nom", "age", "group", "_evaluations", "_notes", "_coefficients", "_chargeur")
+
+    def __init__(self, id_person, nom, age, group, notes=None):
+        self.id_person = id_person
+        self.nom = nom
+        self.age = age
+        self.group = group
+        self.notes = notes if notes is not None else ()
+
+    @property
+    def notes(self):
+        """
+        Liste des notes présentes, dans l'ordre des évaluations.
+        """
+        self._hydrater()
+        return [_relire(n) for n in self._notes]
+
+    @notes.setter
+    def notes(self, valeurs):
+        self._evaluations, self._notes, self._coefficients = ranger_notes(valeurs)
+        self._chargeur = None
+
+    def attendre_notes(self, chargeur):
+        """
+        Met les notes en attente : `chargeur.charger(self)` les lira au premier accès.
+        """
+        self._evaluations, self._notes, self._coefficients = (), _AUCUNE_NOTE, None
+        self._chargeur = chargeur
+
+    def notes_chargees(self):
+        return self._chargeur is None
+
+    def _hydrater(self):
+        if self._chargeur is not None:
+            self._chargeur.charger(self)
+
+    def evaluations(self):
+        """
+        Liste des `Note` (évaluation, note, coefficient), triée par évaluation.
+        """
+        self._hydrater()
+        coefficients = self._coefficients or [COEFFICIENT_DEFAUT] * len(self._notes)
+        return [Note(e, _relire(n), _relire(c)) for e, n, c in zip(self._evaluations, self._notes, coefficients)]
+
+    def tableaux_notes(self):
+        """
+        Couple (array('f') des notes, array('f') des coefficients ou None), pour les calculs en masse.
+        """
+        self._hydrater()
+        return self._notes, self._coefficients
+
+    def triplet_notes(self):
+        """
+        Les notes des évaluations note1 à note3 (formulaires), None pour une note absente.
+        """
+        self._hydrater()
+        presentes = dict(zip(self._evaluations, self._notes))
+        return tuple(None if e not in presentes else _relire(presentes[e]) for e in EVALUATIONS_SAISIE)
+
+    @abstractmethod
+    def get_role(self):
+        pass
+
+    def moyenne_notes(self):
+        self._hydrater()
+        return moyenne_ponderee(self._notes, self._coefficients)
+
+# =========================
+# CLASSE STAGIAIRE (POO : Encapsulation)
+# =========================
+class Stagiaire(Person):
+    """
+    Représente un étudiant avec ses informations et ses notes.
+    """
+    __slots__ = ()
+
+    def get_role(self):
+        return "Stagiaire"
+
+# =========================
+# CLASSE ENSEIGNANT (POO : Encapsulation)
+# =========================
+class Teacher(Person):
+    """
+    Représente un enseignant.
+    """
+    __slots__ = ()
+
+    def get_role(self):
+        return "Enseignant"
+
+
+def creer_personne(ligne):
+    """
+    Construit un Stagiaire ou un Teacher à partir d'un tuple (id, nom, age, groupe, type, notes).
+    """
+    id_person, nom, age, group, type_person, notes = ligne
+    if type_person == "Enseignant":
+        return Teacher(id_person, nom, age, group, notes)
+    return Stagiaire(id_person, nom, age, group, notes)
+
+
+# =========================
+# TABLE EN COLONNES (une promotion entière)
+# =========================
+class PersonTable:
+    """
+    Stockage en colonnes d'un ensemble de personnes : IDs, âges et rôles dans
+    des `array` ; noms dans une liste ; groupes codés par un entier (chaque
+    nom de groupe n'est stocké qu'une fois).
+
+    Les notes de toutes les personnes sont mises bout à bout dans trois
+    colonnes (note, coefficient, code de l'évaluation) ; chaque personne
+    connaît le début et la longueur de sa tranche. Des notes modifiées sont
+    écrites dans une nouvelle tranche, en fin de colonne.
+
+    La table ne fait que grandir : les lignes des personnes retirées du
+    registre restent en place jusqu'au prochain chargement complet.
+
+    Une ligne dont les notes sont en attente a la longueur `EN_ATTENTE` ;
+    elles sont lues au premier accès par `chargeur`.
+    """
+    AGE_ABSENT = -1
+    EN_ATTENTE = 0xFFFF
+
+    def __init__(self):
+        self.ids = array("q")
+        self.ages = array("i")
+        self.roles = array("B")
+        self.noms = []
+        self.groupes = array("I")
+        self.noms_groupes = []
+        self.debuts = array("I")
+        self.longueurs = array("H")
+        self.notes = array("f")
+        self.coefficients = array("f")
+        self.evaluations = array("I")
+        self.noms_evaluations = []
+        self.chargeur = None
+        self.__codes_groupes = {}
+        self.__codes_evaluations = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        if not 0 <= index < len(self.ids):
+            raise IndexError(index)
+        return VuePersonne(self, index)
+
+    def code_groupe(self, group):
+        code = self.__codes_groupes.get(group)
+        if code is None:
+            code = self.__codes_groupes[group] = len(self.noms_groupes)
+            self.noms_groupes.append(group)
+        return code
+
+    def code_evaluation(self, evaluation):
+        code = self.__codes_evaluations.get(evaluation)
+        if code is None:
+            code = self.__codes_evaluations[evaluation] = len(self.noms_evaluations)
+            self.noms_evaluations.append(evaluation)
+        return code
+
+    def ajouter(self, id_person, nom, age, group, type_person, notes=()):
+        """
+        Ajoute une ligne et retourne la vue correspondante.
+        """
+        self.ids.append(id_person)
+        self.noms.append(nom)
+        self.ages.append(self.AGE_ABSENT if age is None else age)
+        self.groupes.append(self.code_groupe(group))
+        self.roles.append(ROLES.index(type_person) if type_person in ROLES else 0)
+        self.debuts.append(0)
+        self.longueurs.append(0)
+        self.ecrire_notes(len(self.ids) - 1, notes if notes is not None else ())
+        return VuePersonne(self, len(self.ids) - 1)
+
+    def ecrire_notes(self, index, valeurs):
+        """
+        Range les notes de la ligne `index` dans une nouvelle tranche.
+        """
+        evaluations, notes, coefficients = ranger_notes(valeurs)
+        self.debuts[index] = len(self.notes)
+        self.longueurs[index] = len(notes)
+        self.notes.extend(notes)
+        if coefficients is None:
+            self.coefficients.extend(array("f", [COEFFICIENT_DEFAUT]) * len(notes))
+        else:
+            self.coefficients.extend(coefficients)
+        self.evaluations.extend(self.code_evaluation(e) for e in evaluations)
+
+    def attendre_notes(self, index, chargeur):
+        self.longueurs[index] = self.EN_ATTENTE
+        self.chargeur = chargeur
+
+    def hydrater(self, vue):
+        if self.longueurs[vue.index] == self.EN_ATTENTE:
+            self.chargeur.charger(vue)
+
+    def tranche(self, index):
+        debut = self.debuts[index]
+        return debut, debut + self.longueurs[index]
+
+    def creer_personne(self, ligne):
+        """
+        Même rôle que `creer_personne`, mais la personne est une vue sur la table.
+        """
+        return self.ajouter(*ligne)
+
+
+class VuePersonne:
+    """
+    Vue sur une ligne de `PersonTable`, avec la même interface que Person.
+    Les modifications d'attributs sont écrites dans la table.
+    """
+    __slots__ = ("table", "index")
+
+    def __init__(self, table, index):
+        self.table = table
+        self.index = index
+
+    @property
+    def id_person(self):
+        return self.table.ids[self.index]
+
+    @property
+    def nom(self):
+        return self.table.noms[self.index]
+
+    @nom.setter
+    def nom(self, valeur):
+        self.table.noms[self.index] = valeur
+
+    @property
+    def age(self):
+        age = self.table.ages[self.index]
+        return None if age == PersonTable.AGE_ABSENT else age
+
+    @age.setter
+    def age(self, valeur):
+        self.table.ages[self.index] = PersonTable.AGE_ABSENT if valeur is None else valeur
+
+    @property
+    def group(self):
+        return self.table.noms_groupes[self.table.groupes[self.index]]
+
+    @group.setter
+    def group(self, valeur):
+        self.table.groupes[self.index] = self.table.code_groupe(valeur)
+
+    @property
+    def notes(self):
+        self.table.hydrater(self)
+        debut, fin = self.table.tranche(self.index)
+        return [_relire(n) for n in self.table.notes[debut:fin]]
+
+    @notes.setter
+    def notes(self, valeurs):
+        self.table.ecrire_notes(self.index, valeurs)
+
+    def attendre_notes(self, chargeur):
+        self.table.attendre_notes(self.index, chargeur)
+
+    def notes_chargees(self):
+        return self.table.longueurs[self.index] != PersonTable.EN_ATTENTE
+
+    def evaluations(self):
+        table = self.table
+        table.hydrater(self)
+        debut, fin = table.tranche(self.index)
+        return [Note(table.noms_evaluations[table.evaluations[i]], _relire(table.notes[i]),
+                     _relire(table.coefficients[i])) for i in range(debut, fin)]
+
+    def tableaux_notes(self):
+        self.table.hydrater(self)
+        debut, fin = self.table.tranche(self.index)
+        return self.table.notes[debut:fin], self.table.coefficients[debut:fin]
+
+    def triplet_notes(self):
+        presentes = {n.evaluation: n.note for n in self.evaluations()}
+        return tuple(presentes.get(e) for e in EVALUATIONS_SAISIE)
+
+    def get_role(self):
+        return ROLES[self.table.roles[self.index]]
+
+    def moyenne_notes(self):
+        return moyenne_ponderee(*self.tableaux_notes())
@@ -0,0 +1,166 @@
+# gestion/pagination.py
+"""
+Vue paginée sur le registre des personnes, pour les listes à défilement virtuel.
+
+La vue conserve seulement la liste ordonnée des personnes retenues par le
+filtre courant (groupe, rôle, début du nom) et le tri courant ; les lignes
+affichables ne sont construites que page par page, à la demande, et les
+dernières pages servies sont gardées en cache. Une liste de 100 000 personnes
+ne coûte ainsi qu'un tri, quelle que soit la taille de la fenêtre.
+
+La vue se recalcule d'elle-même lorsque le registre a été modifié depuis le
+dernier calcul (voir `RegistrePersonnes.version`). Si le registre est modifié
+par un autre thread, le verrou qui le protège est passé à la vue.
+
+En chargement différé, la vue ne lit jamais la base : une moyenne dont les
+notes sont encore en attente s'affiche « - » et se trie en fin de liste.
+`en_attente` indique les personnes à précharger (les lignes affichées, ou
+toute la sélection pour un tri par moyenne) ; l'appelant les fait lire hors
+du thread de l'interface (voir `gestion.chargement.ChargeurNotes.precharger`)
+puis appelle `rafraichir`.
+"""
+
+import math
+from collections import OrderedDict
+from contextlib import nullcontext
+
+COLONNES = ("id", "nom", "age", "groupe", "role", "moyenne")
+TAILLE_PAGE_DEFAUT = 200
+PAGES_EN_CACHE = 8
+
+CLES_TRI = {
+    "id": lambda p: p.id_person,
+    "nom": lambda p: p.nom.casefold(),
+    "age": lambda p: p.age,
+    "groupe": lambda p: str(p.group),
+    "role": lambda p: p.get_role(),
+    "moyenne": lambda p: p.moyenne_notes() if p.notes_chargees() and p.notes else None,
+}
+
+
+def ligne_affichage(personne):
+    """
+    Valeurs affichées pour une personne, dans l'ordre de `COLONNES` (moyenne
+    « - » sans note, ou tant que les notes sont en attente).
+    """
+    moyenne = f"{personne.moyenne_notes():.2f}" if personne.notes_chargees() and personne.notes else "-"
+    return (personne.id_person, personne.nom, personne.age, personne.group, personne.get_role(), moyenne)
+
+
+class VuePaginee:
+    """
+    Sélection filtrée et triée du registre, servie par pages de `taille_page` lignes.
+    """
+    def __init__(self, registre, taille_page=TAILLE_PAGE_DEFAUT, verrou=None):
+        self.registre = registre
+        self.taille_page = taille_page
+        self.verrou = verrou if verrou is not None else nullcontext()
+        self.group = None
+        self.role = None
+        self.prefixe_nom = None
+        self.colonne_tri = None
+        self.descendant = False
+        self.__personnes = []
+        self.__pages = OrderedDict()
+        self.__version = None
+
+    def __len__(self):
+        self.__actualiser()
+        return len(self.__personnes)
+
+    def filtrer(self, group=None, role=None, prefixe_nom=None):
+        """
+        Change le filtre (les critères à None sont ignorés).
+        """
+        self.group, self.role, self.prefixe_nom = group, role, prefixe_nom or None
+        self.__version = None
+
+    def trier(self, colonne=None, descendant=False):
+        """
+        Trie sur une colonne de `COLONNES` (None : ordre d'affichage du registre).
+        """
+        if colonne is not None and colonne not in CLES_TRI:
+            raise ValueError(f"Colonne de tri inconnue : {colonne!r}")
+        self.colonne_tri, self.descendant = colonne, descendant
+        self.__version = None
+
+    def perimee(self):
+        """
+        Vrai si le registre a changé depuis le dernier calcul de la vue.
+        """
+        return self.__version != self.registre.version
+
+    def rafraichir(self):
+        """
+        Force le recalcul de la vue (tri et pages), par exemple après la
+        lecture de notes qui étaient en attente.
+        """
+        self.__version = None
+
+    def en_attente(self, debut, nombre):
+        """
+        Personnes dont les notes sont en attente parmi les lignes `debut` à
+        `debut + nombre`, ou dans toute la sélection si elle est triée par moyenne.
+        """
+        self.__actualiser()
+        if self.colonne_tri == "moyenne":
+            personnes = self.__personnes
+        else:
+            personnes = self.__personnes[max(debut, 0):max(debut, 0) + nombre]
+        with self.verrou:
+            return [p for p in personnes if not p.notes_chargees()]
+
+    def nb_pages(self):
+        return max(1, math.ceil(len(self) / self.taille_page))
+
+    def page(self, numero):
+        """
+        Lignes d'affichage de la page `numero` (à partir de 0).
+        """
+        self.__actualiser()
+        lignes = self.__pages.get(numero)
+        if lignes is not None:
+            self.__pages.move_to_end(numero)
+            return lignes
+        debut = numero * self.taille_page
+        personnes = self.__personnes[debut:debut + self.taille_page]
+        with self.verrou:
+            lignes = [ligne_affichage(p) for p in personnes]
+        self.__pages[numero] = lignes
+        if len(self.__pages) > PAGES_EN_CACHE:
+            self.__pages.popitem(last=False)
+        return lignes
+
+    def lignes(self, debut, nombre):
+        """
+        Lignes d'affichage de `debut` à `debut + nombre`, assemblées depuis les pages.
+        """
+        resultat = []
+        position = max(debut, 0)
+        fin = min(debut + nombre, len(self))
+        while position < fin:
+            numero, decalage = divmod(position, self.taille_page)
+            morceau = self.page(numero)[decalage:decalage + fin - position]
+            resultat.extend(morceau)
+            position += len(morceau)
+        return resultat
+
+    def __actualiser(self):
+        if not self.perimee():
+            return
+        with self.verrou:
+            version = self.registre.version
+            personnes = self.registre.rechercher(group=self.group, role=self.role, prefixe_nom=self.prefixe_nom)
+        if self.colonne_tri is not None:
+            # Les valeurs inconnues (None) restent en fin de liste, quel que soit le sens du tri.
+            cle = CLES_TRI[self.colonne_tri]
+            connues = [p for p in personnes if cle(p) is not None]
+            connues.sort(key=cle, reverse=self.descendant)
+            if len(connues) < len(personnes):
+                connues.extend(p for p in personnes if cle(p) is None)
+            personnes = connues
+        elif self.descendant:
+            personnes.reverse()
+        self.__personnes = personnes
+        self.__pages.clear()
+        self.__version = version
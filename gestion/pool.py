@@ -0,0 +1,233 @@
+# gestion/pool.py
+"""
+Pool de connexions à la base de données.
+
+Les connexions sont ouvertes à la demande jusqu'à `taille` connexions, prêtées
+par `connexion()` / `transaction()` puis rendues au pool. Une connexion restée
+inactive plus de `verification_apres` secondes est vérifiée (ping) avant d'être
+prêtée ; si elle a été coupée par le serveur, elle est remplacée par une
+nouvelle, avec plusieurs tentatives espacées.
+
+Le pool ne dépend d'aucun pilote : il reçoit une fabrique de connexions
+DB-API. On peut donc l'utiliser avec MySQL comme avec une base SQLite locale.
+"""
+
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+
+class PoolEpuise(Exception):
+    """
+    Aucune connexion n'a pu être obtenue du pool dans le délai imparti.
+    """
+
+
+def verifier_connexion(conn):
+    """
+    Vérifie qu'une connexion répond encore. Lève une exception sinon.
+    """
+    if hasattr(conn, "ping"):
+        conn.ping()
+        return
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT 1")
+        cur.fetchall()
+    finally:
+        cur.close()
+
+
+class PoolConnexions:
+    """
+    Pool de connexions thread-safe, indépendant du pilote utilisé.
+    """
+    def __init__(self, fabrique, taille=5, delai_attente=10.0, verification_apres=30.0,
+                 tentatives=3, pause_tentatives=0.5, erreurs_connexion=(Exception,),
+                 verifier=verifier_connexion):
+        self.__fabrique = fabrique
+        self.taille = taille
+        self.delai_attente = delai_attente
+        self.verification_apres = verification_apres
+        self.tentatives = tentatives
+        self.pause_tentatives = pause_tentatives
+        self.erreurs_connexion = erreurs_connexion
+        self.__verifier = verifier
+        # Pile LIFO : la connexion la plus récemment rendue (donc la plus « chaude ») est réutilisée en premier.
+        self.__libres = queue.LifoQueue()
+        self.__verrou = threading.Lock()
+        self.__ouvertes = 0
+
+    @property
+    def ouvertes(self):
+        return self.__ouvertes
+
+    def ouvrir(self):
+        """
+        Ouvre une connexion immédiatement et la place dans le pool, afin que
+        les erreurs de configuration apparaissent dès le démarrage.
+        """
+        self.rendre(self.acquerir())
+
+    def acquerir(self):
+        """
+        Emprunte une connexion valide au pool (à rendre avec `rendre`).
+        """
+        try:
+            conn, derniere_utilisation = self.__libres.get_nowait()
+        except queue.Empty:
+            conn = self.__reserver_et_connecter()
+            if conn is not None:
+                return conn
+            try:
+                conn, derniere_utilisation = self.__libres.get(timeout=self.delai_attente)
+            except queue.Empty:
+                raise PoolEpuise(
+                    f"Aucune connexion libre après {self.delai_attente} s ({self.taille} connexions ouvertes)."
+                ) from None
+        if time.monotonic() - derniere_utilisation > self.verification_apres:
+            try:
+                self.__verifier(conn)
+            except self.erreurs_connexion:
+                # Connexion périmée (coupée par le serveur) : on la remplace.
+                self.__fermer(conn)
+                try:
+                    return self.__connecter()
+                except BaseException:
+                    with self.__verrou:
+                        self.__ouvertes -= 1
+                    raise
+        return conn
+
+    def rendre(self, conn, defectueuse=False):
+        """
+        Rend une connexion au pool. Une connexion défectueuse est fermée.
+        """
+        if defectueuse:
+            self.__fermer(conn)
+            with self.__verrou:
+                self.__ouvertes -= 1
+            return
+        self.__libres.put((conn, time.monotonic()))
+
+    @contextmanager
+    def connexion(self):
+        """
+        Prête une connexion pour la durée du bloc `with`.
+        """
+        conn = self.acquerir()
+        defectueuse = False
+        try:
+            yield conn
+        except self.erreurs_connexion:
+            defectueuse = not self.__repond(conn)
+            raise
+        finally:
+            self.rendre(conn, defectueuse)
+
+    @contextmanager
+    def transaction(self, **options_curseur):
+        """
+        Prête un curseur dans une transaction : validée (commit) à la sortie
+        du bloc, annulée (rollback) si une exception est levée.
+        """
+        with self.connexion() as conn:
+            cur = conn.cursor(**options_curseur)
+            try:
+                yield cur
+                conn.commit()
+            except BaseException:
+                try:
+                    conn.rollback()
+                except self.erreurs_connexion:
+                    pass
+                raise
+            finally:
+                try:
+                    cur.close()
+                except self.erreurs_connexion:
+                    pass
+
+    def fermer(self):
+        """
+        Ferme toutes les connexions libres du pool.
+        """
+        while True:
+            try:
+                conn, _ = self.__libres.get_nowait()
+            except queue.Empty:
+                return
+            self.__fermer(conn)
+            with self.__verrou:
+                self.__ouvertes -= 1
+
+    def __reserver_et_connecter(self):
+        with self.__verrou:
+            if self.__ouvertes >= self.taille:
+                return None
+            self.__ouvertes += 1
+        try:
+            return self.__connecter()
+        except BaseException:
+            with self.__verrou:
+                self.__ouvertes -= 1
+            raise
+
+    def __connecter(self):
+        pause = self.pause_tentatives
+        for tentative in range(1, self.tentatives + 1):
+            try:
+                return self.__fabrique()
+            except self.erreurs_connexion:
+                if tentative == self.tentatives:
+                    raise
+                time.sleep(pause)
+                pause *= 2
+        raise PoolEpuise("Aucune tentative de connexion n'a été effectuée.")
+
+    def __repond(self, conn):
+        try:
+            self.__verifier(conn)
+            return True
+        except self.erreurs_connexion:
+            return False
+
+    @staticmethod
+    def __fermer(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+def creer_pool_mysql(config):
+    """
+    Crée un pool de connexions MySQL à partir de la configuration.
+    """
+    import mysql.connector
+    from mysql.connector import errors
+
+    def fabrique():
+        conn = mysql.connector.connect(
+            host=config["host"],
+            user=config["user"],
+            password=config["password"],
+            database=config["database"],
+            connection_timeout=config["delai_connexion"],
+        )
+        if config.get("lecture_seule"):
+            cur = conn.cursor()
+            cur.execute("SET SESSION TRANSACTION READ ONLY")
+            cur.close()
+        return conn
+
+    return PoolConnexions(
+        fabrique,
+        taille=config["taille_pool"],
+        delai_attente=config["delai_attente"],
+        verification_apres=config["verification_apres"],
+        tentatives=config["tentatives"],
+        pause_tentatives=config["pause_tentatives"],
+        erreurs_connexion=(errors.InterfaceError, errors.OperationalError),
+    )
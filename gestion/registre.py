@@ -0,0 +1,310 @@
+# gestion/registre.py
+"""
+Stockage en mémoire des personnes, indexé par ID.
+
+Un dictionnaire conserve l'ordre d'insertion : la recherche, l'ajout et la
+suppression par ID sont en O(1) tout en préservant l'ordre d'affichage.
+
+Des index secondaires sont tenus à jour à chaque ajout, modification et
+suppression :
+- groupe et rôle : dictionnaire valeur -> ensemble d'IDs ;
+- âge : liste triée de couples (âge, ID), interrogée par bissection ;
+- nom : liste triée de couples (nom en minuscules, ID), pour les préfixes ;
+- nom approché : index de trigrammes insensible aux accents (voir
+  `gestion.index_noms`), construit par `indexer_noms` (ou à défaut à la
+  première recherche approchée) puis tenu à jour, y compris par `vider` et
+  `remplacer`.
+
+Les entrées des personnes ajoutées une à une (chargement par lots, par
+exemple) sont mises en attente et fusionnées dans les listes triées par un
+seul tri, à la première lecture de ces index : une insertion triée par
+personne coûterait O(n) et rendrait le chargement quadratique. De même, une
+modification ou une suppression ne retire pas l'entrée de la liste triée
+(`del` en O(n)) : elle la marque comme retirée (pierre tombale), et les
+lectures l'ignorent. Les entrées marquées sont éliminées d'un seul passage
+quand elles dépassent le quart de la liste : retirer une personne coûte O(1)
+amorti, et une suppression en masse reste linéaire.
+
+Le numéro de `version` augmente à chaque modification, ce qui permet aux vues
+construites sur le registre (voir `gestion.pagination`) de savoir qu'elles
+doivent être recalculées.
+"""
+
+from bisect import bisect_left, bisect_right
+
+from gestion.index_noms import LIMITE_DEFAUT, SEUIL_DEFAUT, IndexNoms
+
+FIN_UNICODE = chr(0x10FFFF)
+CHAMPS_INDEXES = frozenset(("nom", "age", "group"))
+# Pierres tombales tolérées dans un index trié avant compactage : le quart de
+# la liste, plus une marge pour ne pas compacter sans cesse les petites listes.
+MARGE_COMPACTAGE = 1024
+
+
+class RegistrePersonnes:
+    """
+    Ensemble ordonné de personnes, accessible par leur `id_person`
+    et interrogeable par groupe, rôle, tranche d'âge, préfixe de nom et nom approché.
+    """
+    def __init__(self, personnes=()):
+        self.__par_id = {}
+        self.__rangs = {}
+        self.__compteur = 0
+        self.__par_groupe = {}
+        self.__par_role = {}
+        self.__ages = []
+        self.__noms = []
+        self.__ages_en_attente = []
+        self.__noms_en_attente = []
+        self.__ages_retires = set()
+        self.__noms_retires = set()
+        self.__index_noms = None
+        self.__version = 0
+        self.remplacer(personnes)
+
+    def __len__(self):
+        return len(self.__par_id)
+
+    def __iter__(self):
+        return iter(self.__par_id.values())
+
+    def __contains__(self, id_person):
+        return id_person in self.__par_id
+
+    @property
+    def version(self):
+        return self.__version
+
+    def obtenir(self, id_person):
+        """
+        Retourne la personne d'ID `id_person`, ou None si elle est absente.
+        """
+        return self.__par_id.get(id_person)
+
+    def ajouter(self, personne):
+        """
+        Ajoute une personne en fin de liste. L'ID ne doit pas déjà exister.
+        """
+        if personne.id_person in self.__par_id:
+            raise KeyError(personne.id_person)
+        self.__par_id[personne.id_person] = personne
+        self.__rangs[personne.id_person] = self.__compteur
+        self.__compteur += 1
+        self.__indexer(personne)
+        if self.__index_noms is not None:
+            self.__index_noms.ajouter(personne.id_person, personne.nom)
+        self.__version += 1
+
+    def retirer(self, id_person):
+        """
+        Retire et retourne la personne d'ID `id_person`, ou None si elle est absente.
+        """
+        personne = self.__par_id.pop(id_person, None)
+        if personne is not None:
+            del self.__rangs[id_person]
+            self.__desindexer(personne)
+            if self.__index_noms is not None:
+                self.__index_noms.retirer(id_person)
+            self.__version += 1
+        return personne
+
+    def modifier(self, id_person, **champs):
+        """
+        Met à jour des attributs d'une personne et, si `nom`, `age` ou `group`
+        changent, ses entrées d'index. Retourne la personne, ou None si elle est absente.
+        """
+        personne = self.__par_id.get(id_person)
+        if personne is None:
+            return None
+        if CHAMPS_INDEXES.isdisjoint(champs):
+            for champ, valeur in champs.items():
+                setattr(personne, champ, valeur)
+            self.__version += 1
+            return personne
+        self.__desindexer(personne)
+        for champ, valeur in champs.items():
+            setattr(personne, champ, valeur)
+        self.__indexer(personne)
+        if "nom" in champs and self.__index_noms is not None:
+            self.__index_noms.ajouter(id_person, personne.nom)
+        self.__version += 1
+        return personne
+
+    def vider(self):
+        self.__par_id.clear()
+        self.__rangs.clear()
+        self.__compteur = 0
+        self.__par_groupe.clear()
+        self.__par_role.clear()
+        self.__ages.clear()
+        self.__noms.clear()
+        self.__ages_en_attente.clear()
+        self.__noms_en_attente.clear()
+        self.__ages_retires.clear()
+        self.__noms_retires.clear()
+        if self.__index_noms is not None:
+            self.__index_noms = IndexNoms()
+        self.__version += 1
+
+    def remplacer(self, personnes):
+        """
+        Remplace tout le contenu par `personnes`, dans l'ordre donné.
+        """
+        self.vider()
+        for personne in personnes:
+            if personne.id_person in self.__par_id:
+                raise KeyError(personne.id_person)
+            self.__par_id[personne.id_person] = personne
+            self.__rangs[personne.id_person] = self.__compteur
+            self.__compteur += 1
+            self.__par_groupe.setdefault(personne.group, set()).add(personne.id_person)
+            self.__par_role.setdefault(personne.get_role(), set()).add(personne.id_person)
+        # Les index triés sont construits d'un bloc plutôt que par insertions successives.
+        self.__ages = sorted((p.age, p.id_person) for p in self.__par_id.values())
+        self.__noms = sorted((p.nom.casefold(), p.id_person) for p in self.__par_id.values())
+        if self.__index_noms is not None:
+            self.__index_noms = IndexNoms((p.id_person, p.nom) for p in self.__par_id.values())
+
+    def lister(self):
+        """
+        Retourne la liste des personnes dans l'ordre d'affichage.
+        """
+        return list(self.__par_id.values())
+
+    def rechercher(self, group=None, role=None, age_min=None, age_max=None, prefixe_nom=None):
+        """
+        Retourne, dans l'ordre d'affichage, les personnes satisfaisant tous les
+        critères renseignés (les critères à None sont ignorés).
+
+        Le critère le plus sélectif fournit les candidats ; les autres ne sont
+        ensuite vérifiés que sur ces candidats, du plus sélectif au moins sélectif.
+        """
+        criteres = []
+        if group is not None:
+            ids = self.__par_groupe.get(group, ())
+            criteres.append((len(ids), lambda: ids, lambda p: p.group == group))
+        if role is not None:
+            ids_role = self.__par_role.get(role, ())
+            criteres.append((len(ids_role), lambda: ids_role, lambda p: p.get_role() == role))
+        if age_min is not None or age_max is not None or prefixe_nom:
+            self.__fusionner_attente()
+        if age_min is not None or age_max is not None:
+            bas = bisect_left(self.__ages, (age_min,)) if age_min is not None else 0
+            haut = bisect_right(self.__ages, (age_max, float("inf"))) if age_max is not None else len(self.__ages)
+            criteres.append((
+                max(haut - bas, 0),
+                lambda: self.__vivantes(self.__ages, bas, haut, self.__ages_retires),
+                lambda p: (age_min is None or p.age >= age_min) and (age_max is None or p.age <= age_max),
+            ))
+        if prefixe_nom:
+            prefixe = prefixe_nom.casefold()
+            debut = bisect_left(self.__noms, (prefixe,))
+            fin = bisect_right(self.__noms, (prefixe + FIN_UNICODE,))
+            criteres.append((
+                fin - debut,
+                lambda: self.__vivantes(self.__noms, debut, fin, self.__noms_retires),
+                lambda p: p.nom.casefold().startswith(prefixe),
+            ))
+        if not criteres:
+            return self.lister()
+
+        criteres.sort(key=lambda critere: critere[0])
+        _, candidats, _ = criteres[0]
+        filtres = [filtre for _, _, filtre in criteres[1:]]
+        resultat = []
+        for id_person in candidats():
+            personne = self.__par_id[id_person]
+            if all(filtre(personne) for filtre in filtres):
+                resultat.append(personne)
+        resultat.sort(key=lambda p: self.__rangs[p.id_person])
+        return resultat
+
+    def rechercher_nom(self, texte, limite=LIMITE_DEFAUT, seuil=SEUIL_DEFAUT):
+        """
+        Recherche approchée par nom, insensible aux accents et à la casse.
+        Retourne au plus `limite` couples (personne, score entre 0 et 1),
+        du plus proche au moins proche.
+        """
+        self.indexer_noms()
+        return [(self.__par_id[id_person], score)
+                for id_person, score in self.__index_noms.rechercher(texte, limite, seuil)]
+
+    def indexer_noms(self):
+        """
+        Construit l'index des noms approchés s'il n'existe pas encore. Appelé
+        sur un registre vide, avant un chargement, il est rempli au fil des
+        ajouts au lieu d'être construit d'un bloc à la première recherche.
+        """
+        if self.__index_noms is None:
+            self.__index_noms = IndexNoms((p.id_person, p.nom) for p in self.__par_id.values())
+
+    def groupes(self):
+        """
+        Retourne la liste des groupes connus, triée.
+        """
+        return sorted(self.__par_groupe, key=str)
+
+    def __indexer(self, personne):
+        self.__par_groupe.setdefault(personne.group, set()).add(personne.id_person)
+        self.__par_role.setdefault(personne.get_role(), set()).add(personne.id_person)
+        self.__ajouter_trie(self.__ages_en_attente, self.__ages_retires, (personne.age, personne.id_person))
+        self.__ajouter_trie(self.__noms_en_attente, self.__noms_retires, (personne.nom.casefold(), personne.id_person))
+
+    def __fusionner_attente(self):
+        """
+        Verse les entrées en attente dans les index triés et, au-delà du seuil,
+        élimine les pierres tombales. Le tri (Timsort) repère la partie déjà
+        triée : le coût est O(n + k log k) pour k entrées.
+        """
+        for liste, attente, retires in (
+            (self.__ages, self.__ages_en_attente, self.__ages_retires),
+            (self.__noms, self.__noms_en_attente, self.__noms_retires),
+        ):
+            if attente:
+                if retires:
+                    # Une entrée retirée avant la fusion n'a pas à entrer dans la liste.
+                    entrantes = [entree for entree in attente if entree not in retires]
+                    retires.difference_update(attente)
+                else:
+                    entrantes = attente
+                liste.extend(entrantes)
+                liste.sort()
+                attente.clear()
+            if len(retires) > len(liste) // 4 + MARGE_COMPACTAGE:
+                liste[:] = [entree for entree in liste if entree not in retires]
+                retires.clear()
+
+    def __desindexer(self, personne):
+        self.__retirer_de(self.__par_groupe, personne.group, personne.id_person)
+        self.__retirer_de(self.__par_role, personne.get_role(), personne.id_person)
+        self.__ages_retires.add((personne.age, personne.id_person))
+        self.__noms_retires.add((personne.nom.casefold(), personne.id_person))
+        if len(self.__ages_retires) > len(self.__ages) // 4 + MARGE_COMPACTAGE:
+            self.__fusionner_attente()
+
+    @staticmethod
+    def __retirer_de(index, cle, id_person):
+        ids = index.get(cle)
+        if ids is not None:
+            ids.discard(id_person)
+            if not ids:
+                del index[cle]
+
+    @staticmethod
+    def __ajouter_trie(attente, retires, entree):
+        # Une entrée marquée retirée est encore présente (liste ou attente) :
+        # il suffit de lever la marque, sans l'ajouter une seconde fois.
+        if entree in retires:
+            retires.discard(entree)
+        else:
+            attente.append(entree)
+
+    @staticmethod
+    def __vivantes(liste, debut, fin, retires):
+        """
+        IDs des entrées `liste[debut:fin]` qui ne sont pas marquées retirées.
+        """
+        for i in range(debut, fin):
+            entree = liste[i]
+            if entree not in retires:
+                yield entree[1]
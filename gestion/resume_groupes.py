@@ -0,0 +1,140 @@
+# gestion/resume_groupes.py
+"""
+Table de synthèse `group_stats` : sommes et nombres de notes par groupe.
+
+Une ligne par (groupe, évaluation) : l'évaluation vide (`EMPLACEMENT_EFFECTIF`)
+compte les membres du groupe (`nb` = effectif) ; les autres cumulent, pour
+une évaluation, la somme et le nombre des notes ainsi que la somme des notes
+pondérées par leur coefficient et la somme des coefficients. La table est
+tenue à jour par les dépôts, dans la même transaction que chaque écriture, ce
+qui permet de lire les moyennes de groupe en O(nombre de groupes x nombre
+d'évaluations) au lieu de parcourir `evaluations`.
+
+`reconstruire` recalcule la table à partir des tables sources ; `comparer`
+confronte ce recalcul à la version maintenue au fil de l'eau.
+"""
+
+from collections import namedtuple
+
+EMPLACEMENT_EFFECTIF = ""
+TOLERANCE = 1e-6
+
+MoyennesGroupe = namedtuple("MoyennesGroupe", "effectif moyennes moyenne nb_notes")
+Ecart = namedtuple("Ecart", "groupe emplacement attendu stocke")
+
+REQUETE_EFFECTIFS = "SELECT COALESCE(ed_group, ''), COUNT(*) FROM etudiant GROUP BY COALESCE(ed_group, '')"
+REQUETE_NOTES = (
+    "SELECT COALESCE(e.ed_group, ''), v.evaluation, "
+    "SUM(v.note), COUNT(*), SUM(v.note * v.coefficient), SUM(v.coefficient) "
+    "FROM evaluations v JOIN etudiant e ON e.id = v.id_ed "
+    "GROUP BY COALESCE(e.ed_group, ''), v.evaluation"
+)
+
+
+def cle_groupe(group):
+    return "" if group is None else group
+
+
+def ajouter_delta(deltas, group, emplacement, somme, nb, somme_ponderee=0.0, poids=0.0):
+    """
+    Cumule un écart (somme, nb, somme pondérée, poids) dans le dictionnaire
+    {(groupe, emplacement): [somme, nb, somme pondérée, poids]}.
+    """
+    cle = (cle_groupe(group), emplacement)
+    courant = deltas.setdefault(cle, [0.0, 0, 0.0, 0.0])
+    courant[0] += somme
+    courant[1] += nb
+    courant[2] += somme_ponderee
+    courant[3] += poids
+
+
+def delta_notes(deltas, group, anciennes, nouvelles, signe=1):
+    """
+    Ajoute aux `deltas` le passage des notes `anciennes` aux notes
+    `nouvelles` (listes de `Note`) pour un membre de `group`.
+    """
+    for notes, sens in ((anciennes, -signe), (nouvelles, signe)):
+        for evaluation, note, coefficient in notes:
+            ajouter_delta(deltas, group, evaluation, sens * note, sens,
+                          sens * note * coefficient, sens * coefficient)
+
+
+def lignes_deltas(deltas):
+    """
+    Paramètres (groupe, emplacement, somme, nb, somme pondérée, poids) des écarts non nuls.
+    """
+    return [
+        (group, emplacement, somme, nb, somme_ponderee, poids)
+        for (group, emplacement), (somme, nb, somme_ponderee, poids) in deltas.items()
+        if nb or abs(somme) > TOLERANCE or abs(somme_ponderee) > TOLERANCE or abs(poids) > TOLERANCE
+    ]
+
+
+def reconstruire(cur):
+    """
+    Recalcule le contenu complet de `group_stats` depuis les tables sources.
+    Retourne {(groupe, emplacement): (somme, nb, somme pondérée, poids)}.
+    """
+    attendu = {}
+    cur.execute(REQUETE_EFFECTIFS)
+    for group, effectif in cur.fetchall():
+        attendu[(group, EMPLACEMENT_EFFECTIF)] = (0.0, int(effectif), 0.0, 0.0)
+    cur.execute(REQUETE_NOTES)
+    for group, evaluation, somme, nb, somme_ponderee, poids in cur.fetchall():
+        if nb:
+            attendu[(group, evaluation)] = (float(somme), int(nb), float(somme_ponderee), float(poids))
+    return attendu
+
+
+def lire(cur):
+    """
+    Contenu actuel de `group_stats` : {(groupe, emplacement): (somme, nb, somme pondérée, poids)}.
+    """
+    cur.execute("SELECT ed_group, evaluation, somme, nb, somme_ponderee, poids FROM group_stats")
+    return {
+        (group, evaluation): (float(somme), int(nb), float(somme_ponderee), float(poids))
+        for group, evaluation, somme, nb, somme_ponderee, poids in cur.fetchall()
+        if nb or abs(somme) > TOLERANCE
+    }
+
+
+def comparer(attendu, stocke):
+    """
+    Liste des écarts entre la table recalculée et la table maintenue.
+    """
+    vide = (0.0, 0, 0.0, 0.0)
+    ecarts = []
+    for cle in sorted(set(attendu) | set(stocke)):
+        a = attendu.get(cle, vide)
+        s = stocke.get(cle, vide)
+        if a[1] != s[1] or any(abs(x - y) > TOLERANCE for x, y in zip(a, s)):
+            ecarts.append(Ecart(cle[0], cle[1], a, s))
+    return ecarts
+
+
+def moyennes(contenu):
+    """
+    Convertit le contenu de la table en {groupe: MoyennesGroupe} : moyenne
+    de chaque évaluation ({évaluation: moyenne}) et moyenne générale du
+    groupe, pondérée par les coefficients.
+    """
+    par_groupe = {}
+    for (group, emplacement), valeurs in contenu.items():
+        par_groupe.setdefault(group, {})[emplacement] = valeurs
+    resultat = {}
+    for group, emplacements in par_groupe.items():
+        effectif = emplacements.pop(EMPLACEMENT_EFFECTIF, (0.0, 0, 0.0, 0.0))[1]
+        moyennes_notes = {
+            evaluation: somme / nb
+            for evaluation, (somme, nb, _, _) in sorted(emplacements.items())
+            if nb
+        }
+        somme_ponderee = sum(valeurs[2] for valeurs in emplacements.values())
+        poids = sum(valeurs[3] for valeurs in emplacements.values())
+        resultat[group] = MoyennesGroupe(
+            effectif,
+            moyennes_notes,
+            somme_ponderee / poids if poids else None,
+            sum(valeurs[1] for valeurs in emplacements.values()),
+        )
+    return resultat
@@ -0,0 +1,162 @@
+# gestion/service.py
+"""
+Façade asynchrone (asyncio) de la gestion des étudiants, pour un backend web.
+
+`AsyncGestionStagiaires` ne garde aucun état en mémoire : chaque appel
+interroge le dépôt, dont les méthodes bloquantes sont déportées dans un pool
+de threads de la taille du pool de connexions. Plusieurs lectures lancées
+ensemble (`asyncio.gather`) s'exécutent donc en parallèle, chacune sur sa
+propre connexion. Les méthodes retournent des dictionnaires sérialisables en
+JSON et n'affichent rien ; les erreurs sont levées (`ValueError` pour une
+saisie invalide, `ErreurBase` pour la base).
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from gestion.analyse import analyser
+from gestion.chargement import TAILLE_LOT_DEFAUT
+from gestion.config import charger_config
+from gestion.depots import creer_depot
+from gestion.validation import valider_age, valider_evaluation, valider_nom, valider_notes, valider_personne
+
+CHAMPS = ("id", "nom", "age", "groupe", "role", "notes")
+
+
+def en_dict(ligne):
+    """
+    Convertit un tuple (id, nom, age, groupe, type, notes) du dépôt en
+    dictionnaire ; chaque note devient {"evaluation", "note", "coefficient"}.
+    """
+    personne = dict(zip(CHAMPS, ligne))
+    personne["notes"] = [n._asdict() for n in personne["notes"]]
+    return personne
+
+
+class AsyncGestionStagiaires:
+    """
+    Service asynchrone sur un dépôt de personnes.
+
+        async with AsyncGestionStagiaires.depuis_config() as service:
+            personnes = await asyncio.gather(*(service.obtenir_personne(i) for i in ids))
+    """
+    def __init__(self, depot, nb_threads=None):
+        self.depot = depot
+        self.executeur = ThreadPoolExecutor(max_workers=nb_threads, thread_name_prefix="service-bd")
+
+    @classmethod
+    def depuis_config(cls, config=None):
+        """
+        Crée le dépôt décrit par la configuration ; un thread par connexion du pool.
+        """
+        config = config if config is not None else charger_config()
+        return cls(creer_depot(config), nb_threads=config["taille_pool"])
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.fermer()
+
+    async def _executer(self, fonction, *args):
+        boucle = asyncio.get_running_loop()
+        return await boucle.run_in_executor(self.executeur, functools.partial(fonction, *args))
+
+    async def lister_personnes(self, group=None, role=None, taille_lot=TAILLE_LOT_DEFAUT):
+        def lister():
+            return [
+                en_dict(ligne) for ligne in self.depot.iterer_personnes(taille_lot)
+                if (group is None or ligne[3] == group) and (role is None or ligne[4] == role)
+            ]
+        return await self._executer(lister)
+
+    async def obtenir_personne(self, id_person):
+        """
+        Retourne la personne (dictionnaire), ou None si elle n'existe pas.
+        """
+        ligne = await self._executer(self.depot.lire_personne, id_person)
+        return None if ligne is None else en_dict(ligne)
+
+    async def ajouter_personne(self, id_person, nom, age, group, type_person):
+        """
+        Valide puis enregistre une personne ; retourne son dictionnaire.
+        """
+        ligne = valider_personne(id_person, nom, age, group, type_person)
+        await self._executer(self.depot.inserer_personne, *ligne)
+        return en_dict(ligne + ([],))
+
+    async def modifier_personne(self, id_person, nom, age):
+        """
+        Modifie le nom et l'âge ; retourne False si la personne n'existe pas.
+        """
+        valider_nom(nom)
+        age = valider_age(age)
+        return await self._executer(self.depot.modifier_personne, id_person, nom, age)
+
+    async def supprimer_personne(self, id_person):
+        """
+        Supprime une personne et ses notes ; retourne False si elle n'existait pas.
+        """
+        return await self._executer(self.depot.supprimer_personne, id_person)
+
+    async def obtenir_notes(self, id_person):
+        """
+        Retourne la liste des évaluations {"evaluation", "note", "coefficient"}
+        d'une personne (liste vide si elle n'a aucune note).
+        """
+        notes = await self._executer(self.depot.lire_notes, id_person)
+        return [n._asdict() for n in notes]
+
+    async def enregistrer_notes(self, id_person, notes):
+        """
+        Valide et enregistre le triplet de notes (None pour une note absente).
+        """
+        notes = valider_notes(notes)
+        await self._executer(self.depot.enregistrer_notes, id_person, notes)
+        return notes
+
+    async def enregistrer_evaluation(self, id_person, evaluation, note, coefficient=None):
+        """
+        Valide et enregistre une note d'évaluation nommée (note None pour la
+        retirer, coefficient None pour le conserver).
+        """
+        saisie = valider_evaluation(evaluation, note, coefficient)
+        await self._executer(self.depot.enregistrer_notes, id_person, [saisie])
+        return saisie
+
+    async def moyennes_groupes(self):
+        """
+        Moyennes par groupe lues dans la table de synthèse `group_stats`.
+        """
+        moyennes = await self._executer(self.depot.moyennes_groupes)
+        return {group: stats._asdict() for group, stats in moyennes.items()}
+
+    async def statistiques(self, moteur=None):
+        """
+        Statistiques complètes (voir `gestion.analyse`), calculées dans le pool de threads.
+        """
+        def calculer():
+            ids, groupes, notes, debuts, coefficients = [], [], [], [0], []
+            for (id_person, _, _, group, _, valeurs) in self.depot.iterer_personnes():
+                ids.append(id_person)
+                groupes.append(str(group))
+                for _, note, coefficient in valeurs:
+                    notes.append(note)
+                    coefficients.append(coefficient)
+                debuts.append(len(notes))
+            return analyser(ids, groupes, notes, debuts, coefficients, moteur=moteur)
+
+        resultats = await self._executer(calculer)
+        return {
+            "groupes": {group: stats._asdict() for group, stats in resultats.par_groupe.items()},
+            "percentiles": resultats.percentiles,
+            "classement": [
+                {"rang": rang, "id": id_person, "moyenne": moyenne}
+                for rang, id_person, moyenne in resultats.classement(limite=20)
+            ],
+        }
+
+    async def fermer(self):
+        await self._executer(self.depot.fermer)
+        self.executeur.shutdown(wait=True)
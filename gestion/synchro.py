@@ -0,0 +1,118 @@
+# gestion/synchro.py
+"""
+Synchronisation incrémentale du registre en mémoire avec la base.
+
+Chaque écriture en base ajoute une entrée numérotée au journal des
+modifications (voir `gestion.depots`). Un client retient le numéro de la
+dernière entrée vue ; `Synchroniseur.synchroniser` ne relit ensuite que les
+personnes citées par les entrées plus récentes et les applique au registre :
+ajout ou mise à jour (index compris), retrait pour les pierres tombales. Le
+coût d'un rafraîchissement dépend du nombre de changements, pas de la taille
+de la table.
+
+Avec MySQL, les numéros sont attribués à l'insertion mais visibles au commit :
+une transaction lente peut valider un numéro inférieur à un autre déjà lu. Le
+synchroniseur retient donc les trous du journal sous la dernière version vue
+et les relit à chaque synchronisation, jusqu'à ce qu'ils se remplissent. Un
+trou qui ne se remplit pas (transaction annulée) est abandonné au bout de
+`delai_trous` secondes.
+"""
+
+import time
+from contextlib import nullcontext
+
+from gestion.modeles import relire_notes
+
+DELAI_TROUS_DEFAUT = 3600.0
+
+
+class Synchroniseur:
+    """
+    Suit la version du journal vue par un client et applique les changements
+    à `registre`. `fabrique(ligne)` construit une personne à partir d'un tuple
+    (id, nom, age, groupe, type, notes). Si le registre est partagé entre
+    threads, `verrou` est pris pendant l'application des changements (la
+    lecture en base se fait sans le tenir).
+
+    `trous` liste les intervalles (début, fin, apparition) de numéros absents
+    du journal sous `version`, relus à chaque synchronisation ; `apparition`
+    est lue sur `horloge`.
+    """
+    def __init__(self, depot, registre, fabrique, verrou=None, delai_trous=DELAI_TROUS_DEFAUT, horloge=time.monotonic):
+        self.depot = depot
+        self.registre = registre
+        self.fabrique = fabrique
+        self.verrou = verrou if verrou is not None else nullcontext()
+        self.delai_trous = delai_trous
+        self.horloge = horloge
+        self.version = 0
+        self.trous = []
+
+    @property
+    def version_sure(self):
+        """
+        Version jusqu'à laquelle toutes les entrées du journal ont été vues :
+        celle à retenir dans un instantané.
+        """
+        return min([self.version] + [debut - 1 for debut, _, _ in self.trous])
+
+    def marquer(self):
+        """
+        Relève la version courante du journal et ses trous. À appeler juste
+        avant un chargement complet : les écritures faites pendant le
+        chargement seront reprises à la synchronisation suivante.
+        """
+        version = self.depot.version_journal()
+        maintenant = self.horloge()
+        trous = [(debut, fin, maintenant) for debut, fin in self.depot.trous_journal(version)]
+        with self.verrou:
+            self.version, self.trous = version, trous
+        return version
+
+    def synchroniser(self):
+        """
+        Applique au registre les changements survenus depuis la dernière
+        synchronisation. Retourne le couple (personnes écrites, personnes supprimées).
+        """
+        maintenant = self.horloge()
+        trous = [trou for trou in self.trous if maintenant - trou[2] < self.delai_trous]
+        version, ecrites, supprimees, manquants = self.depot.changements_depuis(
+            self.version, [(debut, fin) for debut, fin, _ in trous])
+        with self.verrou:
+            nb_ecrites = sum(1 for ligne in ecrites if appliquer_ecriture(self.registre, ligne, self.fabrique))
+            nb_supprimees = sum(1 for id_person in supprimees if self.registre.retirer(id_person) is not None)
+            # Un trou déjà connu garde sa date d'apparition, même réduit.
+            self.trous = [(debut, fin, _apparition(trous, debut, maintenant)) for debut, fin in manquants]
+            self.version = max(self.version, version)
+        return nb_ecrites, nb_supprimees
+
+
+def _apparition(trous, numero, defaut):
+    for debut, fin, apparition in trous:
+        if debut <= numero <= fin:
+            return apparition
+    return defaut
+
+
+def appliquer_ecriture(registre, ligne, fabrique):
+    """
+    Ajoute ou met à jour une personne du registre. Retourne False si la
+    personne y figurait déjà à l'identique.
+    """
+    id_person, nom, age, group, type_person, notes = ligne
+    personne = registre.obtenir(id_person)
+    if personne is None:
+        registre.ajouter(fabrique(ligne))
+        return True
+    if personne.get_role() != type_person:
+        registre.retirer(id_person)
+        registre.ajouter(fabrique(ligne))
+        return True
+    # Des notes encore en attente (chargement différé) ne sont pas lues pour
+    # la comparaison : la ligne relue les fournit. Les notes en mémoire sont
+    # en float32 : celles de la base sont comparées après le même arrondi.
+    if (personne.nom, personne.age, personne.group) == (nom, age, group) and personne.notes_chargees() \
+            and personne.evaluations() == relire_notes(notes):
+        return False
+    registre.modifier(id_person, nom=nom, age=age, group=group, notes=notes)
+    return True
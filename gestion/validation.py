@@ -0,0 +1,120 @@
+# gestion/validation.py
+"""
+Règles de validation des personnes, communes au formulaire graphique,
+au menu console et à l'import en masse. Une saisie refusée lève
+`SaisieInvalide` (une `ValueError`).
+"""
+
+from gestion.exceptions import SaisieInvalide
+
+ROLES = ("Stagiaire", "Enseignant")
+AGE_MIN = 18
+AGE_MAX = 30
+NOTE_MIN = 0
+NOTE_MAX = 20
+LONGUEUR_EVALUATION_MAX = 50
+
+
+def valider_nom(nom):
+    """
+    Le nom ne doit contenir que des lettres et des espaces.
+    """
+    if not nom.replace(" ", "").isalpha():
+        raise SaisieInvalide("Le nom doit contenir uniquement des lettres.")
+    return nom
+
+
+def valider_age(age):
+    """
+    L'âge doit être un entier entre AGE_MIN et AGE_MAX. Retourne l'âge converti.
+    """
+    age = str(age).strip()
+    if not age.isdigit():
+        raise SaisieInvalide("L'âge doit être un nombre entier.")
+    age = int(age)
+    if age < AGE_MIN or age > AGE_MAX:
+        raise SaisieInvalide(f"L'âge doit être un nombre entre {AGE_MIN} et {AGE_MAX}.")
+    return age
+
+
+def valider_personne(id_person, nom, age, group, type_person):
+    """
+    Valide et convertit les champs d'une personne saisis sous forme de texte.
+    Retourne le tuple (id, nom, age, groupe, type) ; lève SaisieInvalide sinon.
+    """
+    id_person, nom, age, group, type_person = (
+        "" if valeur is None else str(valeur).strip()
+        for valeur in (id_person, nom, age, group, type_person)
+    )
+    if not id_person or not nom or not age or not group:
+        raise SaisieInvalide("Tous les champs doivent être remplis.")
+    valider_nom(nom)
+    try:
+        id_person = int(id_person)
+    except ValueError:
+        raise SaisieInvalide("L'ID doit être un nombre entier.") from None
+    age = valider_age(age)
+    if type_person not in ROLES:
+        raise SaisieInvalide(f"Le rôle doit être {' ou '.join(ROLES)}.")
+    return id_person, nom, age, group, type_person
+
+
+def valider_notes(notes):
+    """
+    Valide un triplet de notes (None ou texte vide pour une note absente).
+    Retourne la liste des trois notes converties en float ; lève SaisieInvalide sinon.
+    """
+    notes = list(notes)
+    if len(notes) > 3:
+        raise SaisieInvalide("Une personne a au plus trois notes.")
+    return [_convertir_note(note) for note in notes + [None] * (3 - len(notes))]
+
+
+def _convertir_note(note):
+    if note is None or (isinstance(note, str) and not note.strip()):
+        return None
+    try:
+        note = float(note)
+    except (TypeError, ValueError):
+        raise SaisieInvalide("Entrée invalide. Veuillez entrer un nombre valide.") from None
+    if not NOTE_MIN <= note <= NOTE_MAX:
+        raise SaisieInvalide(f"La note doit être comprise entre {NOTE_MIN} et {NOTE_MAX}.")
+    return note
+
+
+def valider_evaluation(evaluation, note, coefficient=None):
+    """
+    Valide une note d'évaluation nommée (note None ou vide pour la retirer,
+    coefficient None ou vide pour le conserver). Retourne le tuple
+    (évaluation, note, coefficient) converti ; lève SaisieInvalide sinon.
+    """
+    evaluation = "" if evaluation is None else str(evaluation).strip()
+    if not evaluation:
+        raise SaisieInvalide("Le nom de l'évaluation est obligatoire.")
+    if len(evaluation) > LONGUEUR_EVALUATION_MAX:
+        raise SaisieInvalide(f"Le nom de l'évaluation dépasse {LONGUEUR_EVALUATION_MAX} caractères.")
+    if coefficient is None or (isinstance(coefficient, str) and not coefficient.strip()):
+        coefficient = None
+    else:
+        try:
+            coefficient = float(coefficient)
+        except (TypeError, ValueError):
+            raise SaisieInvalide("Le coefficient doit être un nombre.") from None
+        if not coefficient > 0:
+            raise SaisieInvalide("Le coefficient doit être strictement positif.")
+    return evaluation, _convertir_note(note), coefficient
+
+
+def valider_notes_lot(saisies):
+    """
+    Valide d'un coup toute une saisie groupée {id: notes}, sans s'arrêter à la
+    première erreur. Retourne (valides, erreurs) : {id: notes converties} et
+    {id: message d'erreur}.
+    """
+    valides, erreurs = {}, {}
+    for id_person, notes in saisies.items():
+        try:
+            valides[id_person] = valider_notes(notes)
+        except SaisieInvalide as e:
+            erreurs[id_person] = str(e)
+    return valides, erreurs
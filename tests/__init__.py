@@ -0,0 +1,4 @@
+# tests/__init__.py
+"""
+Tests de la couche de données (`python -m pytest -q` depuis la racine du dépôt).
+"""
@@ -0,0 +1,48 @@
+# tests/conftest.py
+"""
+Fixtures communes : configuration SQLite isolée dans un dossier temporaire.
+"""
+
+import os
+
+import pytest
+
+from gestion.config import CONFIG_DEFAUT, charger_config
+from gestion.depots import DepotSQLite
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    """
+    Configuration SQLite sur une base du dossier temporaire, sans cache ni
+    écriture différée ; les variables GESTION_* de l'environnement sont ignorées.
+    """
+    monkeypatch.delenv("GESTION_CONFIG", raising=False)
+    for cle in CONFIG_DEFAUT:
+        monkeypatch.delenv(f"GESTION_{cle.upper()}", raising=False)
+    resultat = charger_config()
+    resultat.update(backend="sqlite", chemin_sqlite=os.path.join(str(tmp_path), "test.db"), cache_taille=0,
+                    ecriture_differee=False, instrumentation=False, pause_tentatives=0.0)
+    return resultat
+
+
+@pytest.fixture
+def depot(config):
+    depot = DepotSQLite(config)
+    yield depot
+    depot.fermer()
+
+
+@pytest.fixture
+def peuple(depot):
+    """
+    Dépôt avec trois personnes réparties en deux groupes, dont deux notées.
+    """
+    depot.inserer_personnes([
+        (1, "Ali Ben", 20, "G1", "Stagiaire"),
+        (2, "Sara", 25, "G2", "Enseignant"),
+        (3, "Lina", 19, "G1", "Stagiaire"),
+    ])
+    depot.enregistrer_notes(1, [12, 14, None])
+    depot.enregistrer_notes(3, [("partiel", 16, 2)])
+    return depot
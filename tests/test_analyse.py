@@ -0,0 +1,74 @@
+# tests/test_analyse.py
+"""
+Statistiques des notes : résultats du moteur en Python pur, et mêmes
+résultats avec NumPy (ignoré si NumPy n'est pas installé).
+"""
+
+import random
+
+import pytest
+
+from gestion.analyse import analyser, analyser_personnes
+from gestion.modeles import Note, creer_personne
+
+
+def personnes():
+    return [
+        creer_personne((1, "Ali", 20, "G1", "Stagiaire", [12, 14, None])),
+        creer_personne((2, "Sara", 21, "G1", "Stagiaire", [Note("partiel", 8, 3), Note("projet", 16, 1)])),
+        creer_personne((3, "Lina", 19, "G2", "Stagiaire", [9])),
+        creer_personne((4, "Omar", 22, "G2", "Stagiaire", [])),
+        creer_personne((5, "Yanis", 23, "G1", "Stagiaire", [12.5])),
+    ]
+
+
+def donnees_aleatoires(graine, nb=400):
+    hasard = random.Random(graine)
+    ids, groupes, notes, debuts, coefficients = [], [], [], [0], []
+    for i in range(nb):
+        ids.append(i)
+        groupes.append(hasard.choice(["G1", "G2", "G3"]))
+        for _ in range(hasard.choice([0, 1, 2, 3, 5])):
+            # Notes arrondies au demi-point : beaucoup d'ex aequo.
+            notes.append(hasard.randint(0, 40) / 2)
+            coefficients.append(hasard.choice([1.0, 1.0, 2.0, 0.5]))
+        debuts.append(len(notes))
+    return ids, groupes, notes, debuts, coefficients
+
+
+def test_moteur_python():
+    resultat = analyser_personnes(personnes(), moteur="python")
+    assert resultat.moyenne(1) == 13.0
+    assert resultat.moyenne(2) == 10.0
+    assert resultat.moyenne(4) is None
+    assert resultat.rang(1) == (1, 1) and resultat.rang(5) == (2, 2)
+    assert resultat.rang(2) == (3, 3) and resultat.rang(3) == (1, 4)
+    stats = resultat.par_groupe["G2"]
+    assert (stats.effectif, stats.evalues, stats.taux_reussite) == (2, 1, 0.0)
+    assert resultat.par_groupe["G1"].mediane == 12.5
+    assert [rang for rang, _, _ in resultat.classement()] == [1, 2, 3, 4]
+
+
+def test_ex_aequo_meme_rang():
+    resultat = analyser([1, 2, 3], ["G1"] * 3, [12, 12, 9], [0, 1, 2, 3], moteur="python")
+    assert [resultat.rang(i)[1] for i in (1, 2, 3)] == [1, 1, 3]
+
+
+@pytest.mark.parametrize("graine", [1, 2, 3])
+def test_numpy_equivalent_a_python(graine):
+    pytest.importorskip("numpy")
+    donnees = donnees_aleatoires(graine)
+    python = analyser(*donnees, moteur="python")
+    numpy = analyser(*donnees, moteur="numpy")
+    assert [int(i) for i in numpy.ids] == list(python.ids)
+    assert list(numpy.groupes) == list(python.groupes)
+    assert [float(m) for m in numpy.moyennes] == pytest.approx(list(python.moyennes), abs=1e-9)
+    assert [int(r) for r in numpy.rangs_groupe] == list(python.rangs_groupe)
+    assert [int(r) for r in numpy.rangs_general] == list(python.rangs_general)
+    assert numpy.percentiles == pytest.approx(python.percentiles, abs=1e-9)
+    assert numpy.par_groupe.keys() == python.par_groupe.keys()
+    for group, attendu in python.par_groupe.items():
+        obtenu = numpy.par_groupe[group]
+        assert (obtenu.effectif, obtenu.evalues) == (attendu.effectif, attendu.evalues)
+        assert tuple(obtenu[2:]) == pytest.approx(tuple(attendu[2:]), abs=1e-9, nan_ok=True)
+    assert numpy.resume() == python.resume()
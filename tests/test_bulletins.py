@@ -0,0 +1,80 @@
+# tests/test_bulletins.py
+"""
+Génération des bulletins : découpage des groupes en sous-lots, noms de
+dossiers sans collision, même résultat quel que soit le nombre de processus.
+"""
+
+import os
+
+import pytest
+
+from gestion import bulletins
+from gestion.bulletins import decouper, dossiers_groupes, generer_bulletins
+from gestion.depots import DepotSQLite
+from gestion.exceptions import ErreurBase
+
+
+def contenu(dossier):
+    """
+    {chemin relatif: contenu} de tous les fichiers de `dossier`.
+    """
+    fichiers = {}
+    for racine, _, noms in os.walk(dossier):
+        for nom in noms:
+            chemin = os.path.join(racine, nom)
+            with open(chemin, encoding="utf-8") as fichier:
+                fichiers[os.path.relpath(chemin, dossier)] = fichier.read()
+    return fichiers
+
+
+@pytest.fixture
+def promotion(depot):
+    """
+    Deux groupes de taille inégale, notés.
+    """
+    personnes = [(i, f"Stagiaire {i}", 18 + i % 5, "G1" if i <= 14 else "G 2", "Stagiaire") for i in range(1, 21)]
+    depot.inserer_personnes(personnes)
+    depot.enregistrer_notes_lot([(i, [8 + i % 9, 10 + i % 7, None]) for i in range(1, 21)])
+    return depot
+
+
+def test_decouper_gros_groupe_en_sous_lots(monkeypatch):
+    monkeypatch.setattr(bulletins, "TAILLE_SOUS_LOT_MIN", 1)
+    lots = decouper({"A": 9, "B": 2, "C": 1}, ["A", "B", "C"], 3)
+    # Part d'un processus : 12 / 3 = 4 personnes ; A (9) est coupé en trois.
+    assert lots == [("A", 0, 3), ("A", 1, 3), ("A", 2, 3), ("B", 0, 1), ("C", 0, 1)]
+
+
+def test_decouper_respecte_la_taille_minimale():
+    assert decouper({"A": 900, "B": 100}, ["A", "B"], 8) == [("A", 0, 2), ("A", 1, 2), ("B", 0, 1)]
+
+
+def test_dossiers_sans_collision():
+    noms = dossiers_groupes(["G1", "G 1", "G/1", "g1", None])
+    assert len(set(n.casefold() for n in noms.values())) == 5
+    # Les noms sûrs et sans homonyme restent tels quels.
+    assert dossiers_groupes(["G1", "G2"]) == {"G1": "G1", "G2": "G2"}
+    assert noms["G 1"].startswith("G_1-") and noms[None].startswith("sans_groupe-")
+
+
+def test_meme_resultat_avec_plusieurs_processus(config, promotion, tmp_path, monkeypatch):
+    monkeypatch.setattr(bulletins, "TAILLE_SOUS_LOT_MIN", 2)
+    seul = generer_bulletins(config, str(tmp_path / "seul"), nb_processus=1)
+    partages = generer_bulletins(config, str(tmp_path / "partage"), nb_processus=3)
+    assert sum(b.personnes for b in seul) == sum(b.personnes for b in partages) == 20
+    assert any(b.parties > 1 for b in partages)
+    attendu = contenu(tmp_path / "seul")
+    assert len(attendu) == 3 * (20 + 2)
+    assert contenu(tmp_path / "partage") == attendu
+
+
+def test_lecture_seule_chemin_a_echapper(config, tmp_path):
+    chemin = str(tmp_path / "base #1 ?.db")
+    DepotSQLite(dict(config, chemin_sqlite=chemin)).fermer()
+    depot = DepotSQLite(dict(config, chemin_sqlite=chemin, lecture_seule=True))
+    try:
+        assert depot.compter_personnes() == 0
+        with pytest.raises(ErreurBase):
+            depot.inserer_personnes([(1, "Ali", 20, "G1", "Stagiaire")])
+    finally:
+        depot.fermer()
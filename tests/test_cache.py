@@ -0,0 +1,97 @@
+# tests/test_cache.py
+"""
+Cache des notes : éviction LRU, expiration (TTL), invalidation par les
+écritures et par la synchronisation, mode revalidation.
+"""
+
+from gestion.cache import REVALIDATION, CacheLRU, DepotEnCache
+from gestion.modeles import Note
+
+
+class Horloge:
+    def __init__(self):
+        self.temps = 0.0
+
+    def __call__(self):
+        return self.temps
+
+
+def test_eviction_lru():
+    cache = CacheLRU(2, 60.0)
+    cache.placer("a", 1)
+    cache.placer("b", 2)
+    assert cache.obtenir("a") == (True, 1)
+    # « b » est maintenant le moins récemment utilisé.
+    cache.placer("c", 3)
+    assert cache.obtenir("b") == (False, None)
+    assert cache.obtenir("a") == (True, 1) and cache.obtenir("c") == (True, 3)
+    assert cache.evictions == 1 and len(cache) == 2
+
+
+def test_expiration():
+    horloge = Horloge()
+    cache = CacheLRU(10, 5.0, horloge=horloge)
+    cache.placer("a", 1)
+    horloge.temps = 4.9
+    assert cache.obtenir("a") == (True, 1)
+    horloge.temps = 5.0
+    assert cache.obtenir("a") == (False, None)
+    assert cache.expirations == 1 and len(cache) == 0
+    # Replacée, l'entrée repart pour une durée complète.
+    cache.placer("a", 2)
+    horloge.temps = 9.9
+    assert cache.obtenir("a") == (True, 2)
+
+
+def test_valeur_lue_avant_invalidation_ignoree():
+    cache = CacheLRU(10, 60.0)
+    generation = cache.generation("a")
+    cache.invalider("a")
+    cache.placer("a", "périmée", generation)
+    assert cache.obtenir("a") == (False, None)
+    cache.placer("a", "fraîche", cache.generation("a"))
+    assert cache.obtenir("a") == (True, "fraîche")
+
+
+def test_taille_nulle_desactive():
+    cache = CacheLRU(0, 60.0)
+    cache.placer("a", 1)
+    assert cache.obtenir("a") == (False, None)
+
+
+def test_lectures_servies_par_le_cache(peuple):
+    depot = DepotEnCache(peuple, 10, 60.0)
+    notes = depot.lire_notes(1)
+    assert depot.lire_notes(1) == notes
+    assert depot.statistiques()["succes"] == 1
+    depot.enregistrer_notes(1, [Note("note1", 18, 1)])
+    assert depot.lire_notes(1)[0] == Note("note1", 18.0, 1.0)
+
+
+def test_lecture_groupee_complete_le_cache(peuple):
+    depot = DepotEnCache(peuple, 10, 60.0)
+    depot.lire_notes(1)
+    assert set(depot.lire_notes_lot([1, 2, 3])) == {1, 3}
+    # Tout est maintenant en cache, y compris l'absence de notes de 2.
+    succes = depot.statistiques()["succes"]
+    depot.lire_notes_lot([1, 2, 3])
+    assert depot.statistiques()["succes"] == succes + 3
+
+
+def test_changements_d_un_autre_client_invalident(peuple):
+    depot = DepotEnCache(peuple, 10, 60.0)
+    version = depot.version_journal()
+    depot.lire_notes(3)
+    # Écriture faite par un autre client, directement en base.
+    peuple.enregistrer_notes(3, [("partiel", 11, 2)])
+    assert depot.lire_notes(3) == [Note("partiel", 16.0, 2.0)]
+    depot.changements_depuis(version)
+    assert depot.lire_notes(3) == [Note("partiel", 11.0, 2.0)]
+
+
+def test_mode_revalidation_compte_les_perimees(peuple):
+    depot = DepotEnCache(peuple, 10, 60.0, REVALIDATION)
+    depot.lire_notes(3)
+    peuple.enregistrer_notes(3, [("partiel", 11, 2)])
+    assert depot.lire_notes(3) == [Note("partiel", 11.0, 2.0)]
+    assert depot.statistiques()["perimees"] == 1
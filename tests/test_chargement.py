@@ -0,0 +1,71 @@
+# tests/test_chargement.py
+"""
+Chargement différé des notes : lecture par lots, hors du verrou du registre,
+sans écraser une saisie faite pendant la lecture.
+"""
+
+import threading
+
+from gestion.chargement import ChargeurNotes
+from gestion.modeles import Note, creer_personne
+
+
+class DepotLent:
+    """
+    Dépôt dont la lecture des notes exécute `pendant` avant de répondre.
+    """
+    def __init__(self, notes, pendant=None):
+        self.notes = notes
+        self.pendant = pendant
+        self.lectures = []
+
+    def lire_notes_lot(self, ids):
+        self.lectures.append(list(ids))
+        if self.pendant is not None:
+            self.pendant()
+        return {id_person: self.notes[id_person] for id_person in ids if id_person in self.notes}
+
+
+def creer(chargeur, *ids):
+    fabrique = chargeur.fabrique(creer_personne)
+    return [fabrique((id_person, f"Nom {id_person}", 20, "G1", "Stagiaire", None)) for id_person in ids]
+
+
+def test_lecture_groupee_au_premier_acces():
+    depot = DepotLent({1: [Note("note1", 12.0, 1.0)], 3: [Note("note1", 8.0, 1.0)]})
+    chargeur = ChargeurNotes(depot, taille_lot=10)
+    personnes = creer(chargeur, 1, 2, 3)
+    assert personnes[1].notes == []
+    assert depot.lectures == [[2, 1, 3]]
+    assert personnes[2].notes == [8.0]
+    assert chargeur.lectures == 1
+
+
+def test_verrou_libre_pendant_la_lecture():
+    verrou = threading.RLock()
+    libre = []
+
+    def pendant():
+        # Un autre thread (l'interface) prend le verrou du registre pendant la requête.
+        autre = threading.Thread(target=lambda: libre.append(verrou.acquire(timeout=1) and not verrou.release()))
+        autre.start()
+        autre.join()
+
+    chargeur = ChargeurNotes(DepotLent({1: [Note("note1", 12.0, 1.0)]}, pendant), verrou=verrou)
+    personnes = creer(chargeur, 1, 2)
+    chargeur.precharger(personnes)
+    assert libre == [True]
+    assert all(p.notes_chargees() for p in personnes)
+
+
+def test_saisie_pendant_la_lecture_conservee():
+    personnes = []
+
+    def pendant():
+        personnes[0].notes = [("note1", 18.0)]
+
+    chargeur = ChargeurNotes(DepotLent({1: [Note("note1", 12.0, 1.0)]}, pendant))
+    personnes.extend(creer(chargeur, 1, 2))
+    chargeur.precharger(personnes)
+    assert personnes[0].notes == [18.0]
+    assert personnes[1].notes_chargees()
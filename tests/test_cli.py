@@ -0,0 +1,84 @@
+# tests/test_cli.py
+"""
+Ligne de commande : codes de sortie (0 succès, 1 succès partiel, 2 erreur,
+3 personne introuvable) et mode lot transactionnel.
+"""
+
+import io
+import json
+
+import pytest
+
+from gestion import cli
+
+
+@pytest.fixture
+def lancer(config, tmp_path, capsys):
+    """
+    Exécute la ligne de commande sur la base de test ; retourne le code de
+    sortie et les documents JSON écrits sur la sortie standard.
+    """
+    chemin_config = tmp_path / "config.json"
+    chemin_config.write_text(json.dumps(config), encoding="utf-8")
+
+    def lancer(*arguments):
+        capsys.readouterr()
+        code = cli.main(["--config", str(chemin_config)] + list(arguments))
+        sortie = capsys.readouterr().out
+        return code, [json.loads(ligne) for ligne in sortie.splitlines()]
+
+    return lancer
+
+
+def test_codes_de_sortie(lancer):
+    assert lancer("add", "1", "Ali Ben", "20", "G1", "Stagiaire")[0] == cli.SUCCES
+    code, documents = lancer("get", "1")
+    assert code == cli.SUCCES and documents[0]["nom"] == "Ali Ben"
+    assert lancer("get", "99")[0] == cli.INTROUVABLE
+    assert lancer("delete", "99")[0] == cli.INTROUVABLE
+    # Saisie invalide (âge hors bornes), ID en double, note hors bornes.
+    assert lancer("add", "2", "Sara", "99", "G2", "Stagiaire")[0] == cli.ERREUR
+    assert lancer("add", "1", "Doublon", "20", "G1", "Stagiaire")[0] == cli.ERREUR
+    assert lancer("set-grades", "1", "25")[0] == cli.ERREUR
+    assert lancer("set-grades", "1", "12", "-e", "partiel=14:2")[0] == cli.SUCCES
+
+
+def test_import_partiel(lancer, tmp_path):
+    fichier = tmp_path / "etudiants.csv"
+    fichier.write_text("id,nom,age,groupe,role\n1,Ali,20,G1,Stagiaire\n2,Sara,99,G2,Stagiaire\n", encoding="utf-8")
+    code, documents = lancer("import", str(fichier))
+    assert code == cli.SUCCES_PARTIEL
+    assert (documents[0]["importees"], documents[0]["rejetees"]) == (1, 1)
+
+
+def test_lot_annule_sur_erreur(lancer, tmp_path):
+    fichier = tmp_path / "commandes.txt"
+    fichier.write_text("add 1 Ali 20 G1 Stagiaire\nadd 2 Sara 99 G2 Stagiaire\n", encoding="utf-8")
+    code, documents = lancer("--batch", str(fichier))
+    assert code == cli.ERREUR
+    assert documents[-1]["validee"] is False
+    # Rien n'a été enregistré, pas même la première commande.
+    assert lancer("get", "1")[0] == cli.INTROUVABLE
+
+
+def test_lot_continuer(lancer, tmp_path):
+    fichier = tmp_path / "commandes.txt"
+    fichier.write_text("add 1 Ali 20 G1 Stagiaire\nget 42\nset-grades 1 12\n", encoding="utf-8")
+    code, documents = lancer("--batch", str(fichier), "--continuer")
+    assert code == cli.SUCCES_PARTIEL
+    assert documents[-1] == {"commandes": 3, "reussies": 2, "echecs": 1, "validee": True}
+    assert lancer("get", "1")[1][0]["notes"]
+
+
+def test_lot_sur_entree_standard(lancer, monkeypatch):
+    monkeypatch.setattr("sys.stdin", io.StringIO("add 1 Ali 20 G1 Stagiaire\n"))
+    code, documents = lancer("--batch", "-")
+    assert code == cli.SUCCES
+    assert documents[-1]["validee"] is True
+
+
+def test_arguments_invalides(lancer):
+    # argparse termine le programme avec le code 2.
+    with pytest.raises(SystemExit) as sortie:
+        lancer("get", "pas-un-nombre")
+    assert sortie.value.code == 2
@@ -0,0 +1,164 @@
+# tests/test_ecriture_differee.py
+"""
+Écriture différée : fusion des opérations en attente, lots, sessions et
+rejeu du journal local.
+"""
+
+import pytest
+
+from gestion.ecriture_differee import Attente, DepotEcritureDifferee, JournalEcritures
+from gestion.exceptions import ErreurGestion
+from gestion.modeles import Note
+
+
+# ----- Attente -----
+
+def test_ajout_puis_suppression_ne_laisse_rien():
+    attente = Attente()
+    attente.ajout((7, "Zed", 22, "G3", "Stagiaire"))
+    attente.modification("Zed Ben", 23)
+    attente.saisie([12])
+    attente.suppression()
+    assert attente.vide()
+
+
+def test_suppression_d_une_personne_en_base():
+    attente = Attente()
+    attente.modification("Ali", 21)
+    attente.suppression()
+    assert attente.supprimer
+    assert (attente.inserer, attente.modifier, attente.notes) == (None, None, None)
+
+
+def test_modifications_fusionnees():
+    attente = Attente()
+    attente.modification("Ali", 20)
+    attente.modification("Ali Ben", 21)
+    assert attente.modifier == ("Ali Ben", 21)
+
+
+def test_modification_d_un_ajout_en_attente():
+    attente = Attente()
+    attente.ajout((7, "Zed", 22, "G3", "Stagiaire"))
+    attente.modification("Zed Ben", 23)
+    assert attente.inserer == (7, "Zed Ben", 23, "G3", "Stagiaire")
+    assert attente.modifier is None
+
+
+def test_saisies_fusionnees():
+    attente = Attente()
+    attente.saisie([("partiel", 10, 2), ("oral", 8)])
+    attente.saisie([("partiel", 12)])
+    # La dernière note l'emporte ; le coefficient « inchangé » reprend le précédent.
+    assert attente.notes == [Note("oral", 8.0, None), Note("partiel", 12.0, 2.0)]
+
+
+# ----- Dépôt -----
+
+@pytest.fixture
+def espion(peuple):
+    """
+    Enregistre les lots transmis au dépôt enveloppé.
+    """
+    lots = []
+    ecrire_lot = peuple.ecrire_lot
+
+    def enregistrer(**lot):
+        lots.append(lot)
+        return ecrire_lot(**lot)
+
+    peuple.ecrire_lot = enregistrer
+    return lots
+
+
+def creer_differe(depot, **options):
+    # Pas de vidange automatique pendant le test : seulement `flush`.
+    return DepotEcritureDifferee(depot, delai=3600.0, taille_lot=10 ** 6, **options)
+
+
+def test_ajout_puis_suppression_n_ecrit_rien(peuple, espion):
+    differe = creer_differe(peuple)
+    differe.inserer_personne(7, "Zed", 22, "G3", "Stagiaire")
+    differe.enregistrer_notes(7, [15])
+    differe.supprimer_personne(7)
+    assert len(differe) == 0
+    differe.flush()
+    assert espion == []
+    assert peuple.lire_personne(7) is None
+    differe.fermer()
+
+
+def test_operations_fusionnees_en_un_lot(peuple, espion):
+    differe = creer_differe(peuple)
+    differe.modifier_personne(1, "Ali", 21)
+    differe.modifier_personne(1, "Ali B", 22)
+    differe.enregistrer_notes(1, [("partiel", 10, 2)])
+    differe.enregistrer_notes(1, [("partiel", 13)])
+    differe.inserer_personne(7, "Zed", 22, "G3", "Stagiaire")
+    differe.flush()
+    assert len(espion) == 1
+    assert espion[0]["modifications"] == [(1, "Ali B", 22)]
+    assert peuple.lire_personne(1)[1:3] == ("Ali B", 22)
+    assert Note("partiel", 13.0, 2.0) in peuple.lire_notes(1)
+    assert peuple.lire_personne(7) is not None
+    assert peuple.verifier_stats() == []
+    differe.fermer()
+
+
+def test_lecture_vide_la_file(peuple):
+    differe = creer_differe(peuple)
+    differe.enregistrer_notes(3, [("partiel", 18)])
+    assert differe.lire_notes(3) == [Note("partiel", 18.0, 2.0)]
+    differe.fermer()
+
+
+def test_session_annulee_tout_ou_rien(peuple):
+    differe = creer_differe(peuple)
+    differe.modifier_personne(1, "Avant", 20)
+    with pytest.raises(RuntimeError):
+        with differe.session():
+            differe.inserer_personne(7, "Zed", 22, "G3", "Stagiaire")
+            differe.supprimer_personne(2)
+            raise RuntimeError("échec dans la session")
+    # Les écritures antérieures à la session ont été vidées et validées.
+    assert peuple.lire_personne(1)[1] == "Avant"
+    assert peuple.lire_personne(7) is None
+    assert peuple.lire_personne(2) is not None
+    differe.fermer()
+
+
+# ----- Journal -----
+
+def test_rejeu_du_journal(peuple, tmp_path):
+    chemin = str(tmp_path / "ecritures.journal")
+    # Journal laissé par un processus arrêté brutalement, dont le dernier lot
+    # (l'ajout de Lina, ID 3) avait déjà été validé.
+    journal = JournalEcritures(chemin)
+    journal.ajouter(3, "ajout", [[3, "Lina B", 19, "G1", "Stagiaire"]])
+    journal.ajouter(7, "ajout", [[7, "Zed", 22, "G3", "Stagiaire"]])
+    journal.ajouter(7, "saisie", [[["note1", 15.0, None]]])
+    journal.ajouter(2, "suppression", [])
+    journal.fermer()
+    with open(chemin, "ab") as fichier:
+        # Opération interrompue pendant son écriture : jamais acquittée.
+        fichier.write(b'{"id": 1, "operation": "suppr')
+
+    differe = creer_differe(peuple, journal=chemin)
+    assert len(differe) == 3
+    differe.flush()
+    assert peuple.lire_personne(3)[1] == "Lina B"
+    assert peuple.lire_notes(7) == [Note("note1", 15.0, 1.0)]
+    assert peuple.lire_personne(2) is None
+    assert peuple.lire_personne(1) is not None
+    assert peuple.verifier_stats() == []
+    differe.fermer()
+    assert JournalEcritures(chemin).relire() == []
+
+
+def test_journal_illisible(tmp_path):
+    chemin = tmp_path / "ecritures.journal"
+    chemin.write_bytes(b'pas du JSON\n{"id": 1, "operation": "suppression", "args": []}\n')
+    journal = JournalEcritures(str(chemin))
+    with pytest.raises(ErreurGestion):
+        journal.relire()
+    journal.fermer()
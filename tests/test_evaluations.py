@@ -0,0 +1,69 @@
+# tests/test_evaluations.py
+"""
+Évaluations nommées et pondérées : saisie, et migration de l'ancienne
+table `notes` (trois colonnes) vers `evaluations`.
+"""
+
+import sqlite3
+
+import pytest
+
+from gestion.depots import DepotSQLite
+from gestion.modeles import Note
+
+
+def test_notes_ponderees(peuple):
+    assert peuple.lire_notes(1) == [Note("note1", 12.0, 1.0), Note("note2", 14.0, 1.0)]
+    assert peuple.lire_notes(3) == [Note("partiel", 16.0, 2.0)]
+    # Une note None retire l'évaluation, les autres sont conservées.
+    peuple.enregistrer_notes(1, [None])
+    assert peuple.lire_notes(1) == [Note("note2", 14.0, 1.0)]
+
+
+def creer_base_v1(chemin):
+    """
+    Base au format d'origine : une ligne de trois notes par personne dans `notes`.
+    """
+    conn = sqlite3.connect(chemin)
+    conn.executescript(
+        "CREATE TABLE etudiant (id INTEGER PRIMARY KEY, name TEXT, age INTEGER, ed_group TEXT, type TEXT);"
+        "CREATE TABLE notes (id_note INTEGER PRIMARY KEY AUTOINCREMENT,"
+        " id_ed INTEGER REFERENCES etudiant(id) ON DELETE CASCADE, note1 REAL, note2 REAL, note3 REAL);"
+        "INSERT INTO etudiant VALUES (1, 'Ali Ben', 20, 'G1', 'Stagiaire');"
+        "INSERT INTO etudiant VALUES (2, 'Sara', 25, 'G2', 'Enseignant');"
+        "INSERT INTO etudiant VALUES (5, 'Lina', 19, 'G1', 'Stagiaire');"
+        "INSERT INTO notes (id_ed, note1, note2, note3) VALUES (1, 8, 9, 10);"
+        "INSERT INTO notes (id_ed, note1, note2, note3) VALUES (1, 12, 14, NULL);"
+        "INSERT INTO notes (id_ed, note1, note2, note3) VALUES (5, NULL, NULL, 9);"
+        # Ligne orpheline : sa personne n'existe plus.
+        "INSERT INTO notes (id_ed, note1, note2, note3) VALUES (99, 1, 2, 3);"
+    )
+    conn.commit()
+    conn.close()
+
+
+def test_migration_notes_vers_evaluations(config):
+    creer_base_v1(config["chemin_sqlite"])
+    depot = DepotSQLite(config)
+    try:
+        # Seule la ligne la plus récente d'une personne est reprise.
+        assert depot.lire_notes(1) == [Note("note1", 12.0, 1.0), Note("note2", 14.0, 1.0)]
+        assert depot.lire_notes(2) == []
+        assert depot.lire_notes(5) == [Note("note3", 9.0, 1.0)]
+        assert depot.lire_notes(99) == []
+        assert depot.verifier_stats() == []
+        moyennes = depot.moyennes_groupes()
+        assert moyennes["G1"].moyenne == pytest.approx((12 + 14 + 9) / 3)
+    finally:
+        depot.fermer()
+    conn = sqlite3.connect(config["chemin_sqlite"])
+    tables = {nom for (nom,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    conn.close()
+    assert "notes" not in tables and "notes_v1" in tables
+
+    # Une seconde ouverture ne reprend rien une deuxième fois.
+    depot = DepotSQLite(config)
+    try:
+        assert depot.lire_notes(1) == [Note("note1", 12.0, 1.0), Note("note2", 14.0, 1.0)]
+    finally:
+        depot.fermer()
@@ -0,0 +1,38 @@
+# tests/test_exportation.py
+"""
+Export puis réimport : les évaluations nommées et leurs coefficients
+survivent à chaque format.
+"""
+
+import pytest
+
+from gestion.depots import DepotSQLite
+from gestion.exportation import depuis_depot, exporter, lire_colonnes
+from gestion.importation import importer_fichier
+from gestion.modeles import Note
+
+
+@pytest.mark.parametrize("format_fichier, extension", [("csv", "csv"), ("jsonl", "jsonl"), ("colonnes", "gec")])
+def test_aller_retour(peuple, config, tmp_path, format_fichier, extension):
+    peuple.enregistrer_notes(1, [("oral, \"final\"", 9.5, 0.5)])
+    attendu = sorted(peuple.iterer_personnes())
+    fichier = str(tmp_path / f"export.{extension}")
+    assert exporter(depuis_depot(peuple), fichier, format_fichier) == 3
+
+    config = dict(config, chemin_sqlite=str(tmp_path / "copie.db"))
+    copie = DepotSQLite(config)
+    try:
+        rapport = importer_fichier(fichier, copie)
+        assert (len(rapport.importees), rapport.rejetees) == (3, 0)
+        assert sorted(copie.iterer_personnes()) == attendu
+        assert copie.verifier_stats() == []
+    finally:
+        copie.fermer()
+
+
+def test_colonnes_evaluations(peuple, tmp_path):
+    fichier = str(tmp_path / "export.gec")
+    exporter(depuis_depot(peuple), fichier, "colonnes")
+    (groupe,) = lire_colonnes(fichier, ["id", "evaluations"])
+    assert list(groupe["id"]) == [1, 2, 3]
+    assert groupe["evaluations"][2] == [Note("partiel", 16.0, 2.0)]
@@ -0,0 +1,19 @@
+# tests/test_importation.py
+"""
+Import en masse : validation ligne par ligne, rapport des rejets, notes des
+fichiers à trois colonnes.
+"""
+
+from gestion.importation import importer_fichier
+from gestion.modeles import Note
+
+
+def test_import_ancien_csv_et_rejets(depot, tmp_path):
+    fichier = tmp_path / "ancien.csv"
+    fichier.write_text("id,nom,age,groupe,role,note1,note2,note3\n"
+                       "1,Ali,20,G1,Stagiaire,12,,15\n"
+                       "2,Sara,20,G1,Stagiaire,25,,\n", encoding="utf-8")
+    rapport = importer_fichier(str(fichier), depot)
+    assert rapport.rejetees == 1
+    assert depot.lire_notes(1) == [Note("note1", 12.0, 1.0), Note("note3", 15.0, 1.0)]
+    assert depot.lire_personne(2) is None
@@ -0,0 +1,75 @@
+# tests/test_index_noms.py
+"""
+Recherche approchée des noms : repli des accents, classement, mise à jour de
+l'index au fil des modifications du registre.
+"""
+
+from gestion.index_noms import IndexNoms, replier
+from gestion.modeles import creer_personne
+from gestion.registre import RegistrePersonnes
+
+NOMS = [(1, "Benaïssa Karim"), (2, "BENAISSA Sofia"), (3, "Martin Paul"), (4, "Bennani Lina"), (5, "Dupont Éloïse")]
+
+
+def test_repli():
+    assert replier("Benaïssa") == replier("BENAISSA") == "benaissa"
+    assert replier("  Cœur-de-Lion ") == "coeur de lion"
+
+
+def test_accents_et_casse_ignores():
+    ids = [id_person for id_person, _ in IndexNoms(NOMS).rechercher("benaissa")]
+    assert set(ids[:2]) == {1, 2}
+    assert 3 not in ids
+
+
+def test_nom_exact_en_tete():
+    index = IndexNoms(NOMS)
+    resultats = index.rechercher("Dupont Eloise")
+    assert resultats[0] == (5, 1.0)
+
+
+def test_faute_de_frappe_toleree():
+    assert IndexNoms(NOMS).rechercher("Martn Paul")[0][0] == 3
+
+
+def test_limite():
+    index = IndexNoms(NOMS)
+    assert len(index.rechercher("benaissa", limite=1)) == 1
+    assert index.rechercher("benaissa", limite=0) == []
+    assert index.rechercher("benaissa", limite=-1) == []
+
+
+def test_recherche_vide_ou_inconnue():
+    index = IndexNoms(NOMS)
+    assert index.rechercher("") == []
+    assert index.rechercher("zzzz") == []
+
+
+def test_retrait_et_renommage():
+    index = IndexNoms(NOMS)
+    index.retirer(1)
+    index.ajouter(3, "Benaissa Paul")
+    ids = {id_person for id_person, _ in index.rechercher("benaissa")}
+    assert ids == {2, 3}
+    assert 1 not in index and len(index) == 4
+
+
+def test_compactage_conserve_les_resultats():
+    index = IndexNoms((i, f"Nom{i} Prenom{i}") for i in range(3000))
+    for i in range(2500):
+        index.retirer(i)
+    index.ajouter(9999, "Nom2999 Prenom2999")
+    assert {id_person for id_person, score in index.rechercher("Nom2999 Prenom2999") if score == 1.0} == {2999, 9999}
+
+
+def test_registre_tient_l_index_a_jour():
+    registre = RegistrePersonnes()
+    registre.indexer_noms()
+    for id_person, nom in NOMS:
+        registre.ajouter(creer_personne((id_person, nom, 20, "G1", "Stagiaire", [])))
+    registre.modifier(3, nom="Benaissa Paul")
+    registre.retirer(1)
+    assert {p.id_person for p, _ in registre.rechercher_nom("benaissa")} == {2, 3}
+    # L'index survit au remplacement du contenu.
+    registre.remplacer([creer_personne((7, "Bennani Omar", 30, "G2", "Stagiaire", []))])
+    assert [p.id_person for p, _ in registre.rechercher_nom("bennani")] == [7]
@@ -0,0 +1,61 @@
+# tests/test_instantane.py
+"""
+Instantané local du registre : relecture, et rejet de tout fichier qui ne
+peut pas servir (corrompu, tronqué, d'une autre base, absent).
+"""
+
+import pytest
+
+from gestion.instantane import ENTETE, ecrire_instantane, lire_instantane
+from gestion.modeles import Note, creer_personne
+
+SOURCE = "sqlite:/tmp/test.db"
+
+
+@pytest.fixture
+def chemin(tmp_path):
+    personnes = [
+        creer_personne((1, "Ali Ben", 20, "G1", "Stagiaire", [Note("note1", 12.0, 1.0), Note("partiel", 14.0, 2.0)])),
+        creer_personne((2, "Sara", None, "G2", "Enseignant", [])),
+        creer_personne((3, "Lina", 19, "G1", "Stagiaire", [Note("note3", 9.5, 1.0)])),
+    ]
+    chemin = str(tmp_path / "registre.gei")
+    assert ecrire_instantane(chemin, personnes, 42, SOURCE) == 3
+    return chemin
+
+
+def test_relecture(chemin):
+    instantane = lire_instantane(chemin, SOURCE)
+    assert instantane.version == 42
+    assert list(instantane.lignes()) == [
+        (1, "Ali Ben", 20, "G1", "Stagiaire", [Note("note1", 12.0, 1.0), Note("partiel", 14.0, 2.0)]),
+        (2, "Sara", None, "G2", "Enseignant", []),
+        (3, "Lina", 19, "G1", "Stagiaire", [Note("note3", 9.5, 1.0)]),
+    ]
+
+
+def test_octet_corrompu_rejete(chemin):
+    with open(chemin, "r+b") as fichier:
+        contenu = fichier.read()
+        # Un octet de la charge utile (après l'en-tête et la source) : la somme de contrôle ne correspond plus.
+        position = ENTETE.size + len(SOURCE) + 10
+        fichier.seek(position)
+        fichier.write(bytes([contenu[position] ^ 0xFF]))
+    assert lire_instantane(chemin, SOURCE) is None
+
+
+def test_fichier_tronque_rejete(chemin):
+    with open(chemin, "r+b") as fichier:
+        fichier.truncate(ENTETE.size + len(SOURCE) + 20)
+    assert lire_instantane(chemin, SOURCE) is None
+
+
+def test_autre_base_rejetee(chemin):
+    assert lire_instantane(chemin, "sqlite:/tmp/autre.db") is None
+
+
+def test_fichier_absent_ou_vide(tmp_path):
+    assert lire_instantane(str(tmp_path / "absent.gei"), SOURCE) is None
+    vide = tmp_path / "vide.gei"
+    vide.write_bytes(b"")
+    assert lire_instantane(str(vide), SOURCE) is None
@@ -0,0 +1,147 @@
+# tests/test_pool.py
+"""
+Pool de connexions : reconnexion après un ping en échec, tentatives, transactions.
+"""
+
+import pytest
+
+from gestion.pool import PoolConnexions
+
+
+class ConnexionCoupee(Exception):
+    pass
+
+
+class FausseConnexion:
+    """
+    Connexion DB-API factice : enregistre les validations et annulations ;
+    `ping` échoue une fois la connexion « coupée par le serveur ».
+    """
+    def __init__(self, numero):
+        self.numero = numero
+        self.coupee = False
+        self.fermee = False
+        self.validations = 0
+        self.annulations = 0
+
+    def ping(self):
+        if self.coupee:
+            raise ConnexionCoupee(f"connexion {self.numero} coupée")
+
+    def cursor(self, **options):
+        return FauxCurseur()
+
+    def commit(self):
+        self.validations += 1
+
+    def rollback(self):
+        self.annulations += 1
+
+    def close(self):
+        self.fermee = True
+
+
+class FauxCurseur:
+    def close(self):
+        pass
+
+
+class FausseFabrique:
+    """
+    Fabrique de connexions dont les `echecs` premiers appels échouent.
+    """
+    def __init__(self, echecs=0):
+        self.echecs = echecs
+        self.appels = 0
+        self.connexions = []
+
+    def __call__(self):
+        self.appels += 1
+        if self.appels <= self.echecs:
+            raise ConnexionCoupee("serveur injoignable")
+        conn = FausseConnexion(len(self.connexions) + 1)
+        self.connexions.append(conn)
+        return conn
+
+
+def creer_pool(fabrique, **options):
+    options.setdefault("pause_tentatives", 0.0)
+    return PoolConnexions(fabrique, erreurs_connexion=(ConnexionCoupee,), **options)
+
+
+def test_ping_en_echec_puis_reconnexion():
+    fabrique = FausseFabrique()
+    pool = creer_pool(fabrique, taille=1, verification_apres=0.0)
+    premiere = pool.acquerir()
+    pool.rendre(premiere)
+    premiere.coupee = True
+
+    conn = pool.acquerir()
+
+    assert conn is not premiere
+    assert premiere.fermee
+    assert fabrique.appels == 2
+    assert pool.ouvertes == 1
+    pool.rendre(conn)
+
+
+def test_connexion_recente_non_verifiee():
+    fabrique = FausseFabrique()
+    pool = creer_pool(fabrique, verification_apres=3600.0)
+    premiere = pool.acquerir()
+    pool.rendre(premiere)
+    premiere.coupee = True
+
+    assert pool.acquerir() is premiere
+
+
+def test_tentatives_de_connexion():
+    fabrique = FausseFabrique(echecs=2)
+    pool = creer_pool(fabrique, tentatives=3)
+    pool.ouvrir()
+    assert fabrique.appels == 3
+    assert pool.ouvertes == 1
+
+
+def test_tentatives_epuisees():
+    fabrique = FausseFabrique(echecs=5)
+    pool = creer_pool(fabrique, tentatives=3)
+    with pytest.raises(ConnexionCoupee):
+        pool.acquerir()
+    assert fabrique.appels == 3
+    # La place réservée est libérée : le pool n'est pas bloqué.
+    assert pool.ouvertes == 0
+
+
+def test_transaction_validee():
+    fabrique = FausseFabrique()
+    pool = creer_pool(fabrique)
+    with pool.transaction():
+        pass
+    conn = fabrique.connexions[0]
+    assert (conn.validations, conn.annulations) == (1, 0)
+
+
+def test_transaction_annulee_sur_exception():
+    fabrique = FausseFabrique()
+    pool = creer_pool(fabrique)
+    with pytest.raises(ValueError):
+        with pool.transaction():
+            raise ValueError("échec au milieu de la transaction")
+    conn = fabrique.connexions[0]
+    assert (conn.validations, conn.annulations) == (0, 1)
+    # La connexion, toujours valide, est rendue au pool et réutilisée.
+    assert pool.acquerir() is conn
+    assert pool.ouvertes == 1
+
+
+def test_connexion_defectueuse_retiree_du_pool():
+    fabrique = FausseFabrique()
+    pool = creer_pool(fabrique)
+    with pytest.raises(ConnexionCoupee):
+        with pool.connexion() as conn:
+            conn.coupee = True
+            raise ConnexionCoupee("coupure pendant la requête")
+    assert conn.fermee
+    assert pool.ouvertes == 0
+    assert pool.acquerir() is not conn
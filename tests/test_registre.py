@@ -0,0 +1,123 @@
+# tests/test_registre.py
+"""
+Registre en mémoire : accès par ID dans l'ordre d'insertion, index
+secondaires (groupe, rôle, âge, préfixe de nom) et pierres tombales.
+"""
+
+import random
+
+import pytest
+
+from gestion.modeles import creer_personne
+from gestion.registre import RegistrePersonnes
+
+
+def personne(id_person, nom, age=20, group="G1", role="Stagiaire"):
+    return creer_personne((id_person, nom, age, group, role, []))
+
+
+@pytest.fixture
+def registre():
+    return RegistrePersonnes([
+        personne(3, "Lina", 19),
+        personne(1, "Ali Ben", 20),
+        personne(2, "Sara", 25, "G2", "Enseignant"),
+        personne(4, "Alice", 22, "G2"),
+    ])
+
+
+def ids(personnes):
+    return [p.id_person for p in personnes]
+
+
+def test_acces_par_id_et_ordre(registre):
+    assert registre.obtenir(2).nom == "Sara"
+    assert registre.obtenir(9) is None
+    assert 3 in registre and len(registre) == 4
+    assert ids(registre.lister()) == [3, 1, 2, 4]
+    registre.retirer(1)
+    registre.ajouter(personne(1, "Ali Ben"))
+    assert ids(registre) == [3, 2, 4, 1]
+
+
+def test_id_en_double_refuse(registre):
+    with pytest.raises(KeyError):
+        registre.ajouter(personne(2, "Autre"))
+    with pytest.raises(KeyError):
+        RegistrePersonnes([personne(1, "A"), personne(1, "B")])
+
+
+def test_retirer_et_modifier_absent(registre):
+    assert registre.retirer(9) is None
+    assert registre.modifier(9, nom="X") is None
+
+
+def test_version_augmente(registre):
+    version = registre.version
+    registre.modifier(1, age=30)
+    registre.retirer(2)
+    assert registre.version == version + 2
+
+
+def test_criteres_combines(registre):
+    assert ids(registre.rechercher(group="G2")) == [2, 4]
+    assert ids(registre.rechercher(role="Stagiaire", group="G2")) == [4]
+    assert ids(registre.rechercher(age_min=20, age_max=22)) == [1, 4]
+    assert ids(registre.rechercher(prefixe_nom="al")) == [1, 4]
+    assert ids(registre.rechercher(prefixe_nom="AL", age_min=21)) == [4]
+    assert ids(registre.rechercher()) == [3, 1, 2, 4]
+    assert registre.rechercher(group="G9") == []
+
+
+def test_index_suivent_les_modifications(registre):
+    registre.modifier(1, nom="Bob", age=40, group="G2")
+    assert ids(registre.rechercher(prefixe_nom="al")) == [4]
+    assert ids(registre.rechercher(prefixe_nom="bo")) == [1]
+    assert ids(registre.rechercher(age_min=40)) == [1]
+    assert ids(registre.rechercher(group="G1")) == [3]
+    assert registre.groupes() == ["G1", "G2"]
+    # Retour à l'ancienne valeur : l'entrée marquée retirée redevient valide, sans doublon.
+    registre.modifier(1, nom="Ali Ben", age=20)
+    assert ids(registre.rechercher(prefixe_nom="al")) == [1, 4]
+    assert ids(registre.rechercher(age_min=20, age_max=20)) == [1]
+
+
+def test_suppression_en_masse_compacte(registre):
+    for i in range(10, 5010):
+        registre.ajouter(personne(i, f"Nom{i}", i % 50))
+    assert len(registre.rechercher(age_min=0)) == 5004
+    for i in range(10, 5000):
+        registre.retirer(i)
+    assert ids(registre.rechercher(prefixe_nom="nom")) == list(range(5000, 5010))
+    assert ids(registre.rechercher(age_min=0, age_max=19)) == [3, 5000, 5001, 5002, 5003, 5004, 5005, 5006, 5007, 5008, 5009]
+
+
+def test_equivalent_a_un_filtrage_complet():
+    """
+    Suite aléatoire d'ajouts, modifications et retraits : les index donnent
+    toujours le même résultat qu'un parcours de toutes les personnes.
+    """
+    hasard = random.Random(7)
+    registre = RegistrePersonnes()
+    noms = ["ali", "Alice", "bob", "Bénédicte", "carla"]
+    prochain = 0
+    for _ in range(3000):
+        operation = hasard.random()
+        existants = ids(registre)
+        if operation < 0.45 or not existants:
+            registre.ajouter(personne(prochain, hasard.choice(noms) + str(prochain % 7), hasard.randint(18, 30),
+                                      hasard.choice(["G1", "G2", "G3"])))
+            prochain += 1
+        elif operation < 0.75:
+            registre.modifier(hasard.choice(existants), nom=hasard.choice(noms), age=hasard.randint(18, 30))
+        else:
+            registre.retirer(hasard.choice(existants))
+        if hasard.random() < 0.05:
+            criteres = dict(group=hasard.choice(["G1", "G2", None]), age_min=hasard.choice([None, 20, 25]),
+                            age_max=hasard.choice([None, 22, 28]), prefixe_nom=hasard.choice([None, "al", "B", "bé"]))
+            attendu = [p for p in registre.lister()
+                       if (criteres["group"] is None or p.group == criteres["group"])
+                       and (criteres["age_min"] is None or p.age >= criteres["age_min"])
+                       and (criteres["age_max"] is None or p.age <= criteres["age_max"])
+                       and (not criteres["prefixe_nom"] or p.nom.casefold().startswith(criteres["prefixe_nom"].casefold()))]
+            assert ids(registre.rechercher(**criteres)) == ids(attendu)
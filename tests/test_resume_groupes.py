@@ -0,0 +1,29 @@
+# tests/test_resume_groupes.py
+"""
+Table de synthèse `group_stats` : tenue à jour par les écritures, écarts
+détectés et corrigés par `verifier_stats`.
+"""
+
+import sqlite3
+
+
+def test_verifier_stats_detecte_et_corrige_un_ecart(peuple, config):
+    assert peuple.verifier_stats() == []
+    conn = sqlite3.connect(config["chemin_sqlite"])
+    conn.execute("UPDATE group_stats SET somme = somme + 5 WHERE ed_group = 'G1' AND evaluation = 'note1'")
+    conn.commit()
+    conn.close()
+
+    ecarts = peuple.verifier_stats()
+    assert ecarts
+    assert peuple.verifier_stats() == ecarts
+    assert peuple.verifier_stats(corriger=True) == ecarts
+    assert peuple.verifier_stats() == []
+
+
+def test_stats_suivent_les_ecritures(peuple):
+    peuple.enregistrer_notes_lot([(1, [("partiel", 10, 3)]), (3, [("partiel", None)])])
+    peuple.modifier_personne(1, "Ali", 21)
+    peuple.supprimer_personne(3)
+    peuple.ecrire_lot(insertions=[(6, "Noa", 21, "G2", "Stagiaire")], saisies=[(6, [15])])
+    assert peuple.verifier_stats() == []
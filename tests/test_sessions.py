@@ -0,0 +1,41 @@
+# tests/test_sessions.py
+"""
+Sessions du dépôt (mode lot) : tout ou rien, et étapes annulées seules.
+"""
+
+import pytest
+
+from gestion.exceptions import ErreurBase
+from gestion.modeles import Note
+
+
+def test_session_annulee_sur_exception(peuple):
+    with pytest.raises(RuntimeError):
+        with peuple.session():
+            peuple.inserer_personne(4, "Zed", 22, "G3", "Stagiaire")
+            peuple.enregistrer_notes(1, [20])
+            raise RuntimeError("échec au milieu de la session")
+    assert peuple.lire_personne(4) is None
+    assert peuple.lire_notes(1)[0] == Note("note1", 12.0, 1.0)
+    assert peuple.verifier_stats() == []
+
+
+def test_session_validee(peuple):
+    with peuple.session():
+        peuple.inserer_personne(4, "Zed", 22, "G3", "Stagiaire")
+        peuple.supprimer_personne(2)
+    assert peuple.lire_personne(4) is not None
+    assert peuple.lire_personne(2) is None
+
+
+def test_etape_annulee_seule(peuple):
+    with peuple.session():
+        peuple.inserer_personne(4, "Zed", 22, "G3", "Stagiaire")
+        with pytest.raises(ErreurBase):
+            with peuple.etape():
+                peuple.inserer_personne(5, "Noa", 21, "G3", "Stagiaire")
+                # Clé en double : l'étape est annulée, pas la session.
+                peuple.inserer_personne(1, "Doublon", 21, "G3", "Stagiaire")
+    assert peuple.lire_personne(4) is not None
+    assert peuple.lire_personne(5) is None
+    assert peuple.lire_personne(1)[1] == "Ali Ben"
@@ -0,0 +1,111 @@
+# tests/test_synchro.py
+"""
+Synchronisation incrémentale : changements appliqués une seule fois, notes
+float32 reconnues identiques, trous du journal relus tant qu'ils sont ouverts.
+"""
+
+import sqlite3
+
+import pytest
+
+from gestion.depots import intervalles_manquants
+from gestion.modeles import creer_personne
+from gestion.registre import RegistrePersonnes
+from gestion.synchro import Synchroniseur
+
+
+class Horloge:
+    def __init__(self):
+        self.temps = 0.0
+
+    def __call__(self):
+        return self.temps
+
+
+@pytest.fixture
+def horloge():
+    return Horloge()
+
+
+@pytest.fixture
+def synchro(peuple, horloge):
+    registre = RegistrePersonnes()
+    synchro = Synchroniseur(peuple, registre, creer_personne, delai_trous=60.0, horloge=horloge)
+    synchro.marquer()
+    registre.remplacer(creer_personne(ligne) for ligne in peuple.iterer_personnes())
+    return synchro
+
+
+def deplacer_entree(config, numero):
+    """
+    Renumérote la dernière entrée du journal en `numero` : comme un commit
+    MySQL validé après des entrées plus récentes.
+    """
+    with sqlite3.connect(config["chemin_sqlite"]) as conn:
+        conn.execute("UPDATE journal SET version = ? WHERE version = (SELECT MAX(version) FROM journal)", (numero,))
+
+
+def ouvrir_trou(config, debut, fin):
+    """
+    Ajoute au journal une entrée après le trou [debut, fin].
+    """
+    with sqlite3.connect(config["chemin_sqlite"]) as conn:
+        conn.execute("INSERT INTO journal (version, id_ed, operation) VALUES (?, 2, 'ecriture')", (fin + 1,))
+
+
+def test_intervalles_manquants():
+    assert intervalles_manquants([(1, 10)], [3, 4, 8]) == [(1, 2), (5, 7), (9, 10)]
+    assert intervalles_manquants([(1, 3), (6, 6)], [1, 2, 3, 6]) == []
+    assert intervalles_manquants([(5, 6)], []) == [(5, 6)]
+
+
+def test_changements_appliques_une_fois(peuple, synchro):
+    peuple.modifier_personne(2, "Sara K", 26)
+    peuple.supprimer_personne(3)
+    assert synchro.synchroniser() == (1, 1)
+    assert synchro.registre.obtenir(2).nom == "Sara K"
+    assert synchro.registre.obtenir(3) is None
+    assert synchro.synchroniser() == (0, 0)
+
+
+def test_notes_float32_sans_changement(peuple, synchro):
+    peuple.enregistrer_notes(1, (12.34567, None, None))
+    assert synchro.synchroniser() == (1, 0)
+    # La relecture des mêmes notes (arrondies en float32 en mémoire) n'est pas un changement.
+    synchro.version = 0
+    assert synchro.synchroniser() == (0, 0)
+
+
+def test_commit_tardif_relu(config, peuple, synchro):
+    version = synchro.version
+    ouvrir_trou(config, version + 1, version + 5)
+    assert synchro.synchroniser() == (0, 0)
+    assert synchro.trous[0][:2] == (version + 1, version + 5)
+    assert synchro.version_sure == version
+    # Une écriture validée dans le trou, sous la dernière version vue.
+    peuple.modifier_personne(1, "Ali B", 21)
+    deplacer_entree(config, version + 3)
+    assert synchro.synchroniser() == (1, 0)
+    assert synchro.registre.obtenir(1).nom == "Ali B"
+    assert [trou[:2] for trou in synchro.trous] == [(version + 1, version + 2), (version + 4, version + 5)]
+
+
+def test_trous_releves_au_marquage(config, peuple, horloge):
+    version = peuple.version_journal()
+    ouvrir_trou(config, version + 1, version + 2)
+    synchro = Synchroniseur(peuple, RegistrePersonnes(), creer_personne, horloge=horloge)
+    assert synchro.marquer() == version + 3
+    assert synchro.trous == [(version + 1, version + 2, 0.0)]
+
+
+def test_trou_abandonne_apres_delai(config, peuple, synchro, horloge):
+    version = synchro.version
+    ouvrir_trou(config, version + 1, version + 1)
+    synchro.synchroniser()
+    horloge.temps = 30.0
+    synchro.synchroniser()
+    assert synchro.trous == [(version + 1, version + 1, 0.0)]
+    horloge.temps = 61.0
+    synchro.synchroniser()
+    assert synchro.trous == []
+    assert synchro.version_sure == version + 2